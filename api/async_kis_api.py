@@ -0,0 +1,334 @@
+"""
+한국투자증권 REST API 비동기 클라이언트
+
+웹소켓 모니터링 이벤트 루프에서 매도 주문 경로를 스레드 풀을 거치지 않고 실행하기 위한 클라이언트입니다.
+- 주문/잔고/현재가/체결 조회만 KISApi와 같은 요청/응답 형식으로 제공합니다.
+- 헤더와 토큰은 KISApi(프로세스 전역 자격 증명 캐시)를 그대로 사용합니다.
+- 이벤트 루프별 aiohttp 세션 하나로 keep-alive 연결을 재사용하고,
+  호출 전에 KISApi와 같은 호출 한도 제한기를 await로 통과합니다.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from api.kis_api import KISApi, KST, BALANCE_MAX_PAGES, BALANCE_CONTINUE_FLAGS
+from api.credential_cache import credential_cache, ACCESS_TOKEN
+from api.rate_limiter import kis_rate_limiter, QUOTE, ORDER, RATE_LIMITED_MSG_CD
+from api.quote_cache import quote_cache
+from api.balance_cache import balance_snapshot
+from api.retry_policy import (
+    kis_circuit_breakers, request_timeout, limiter_timeout, limiter_deadline_exceeded, CircuitOpenError,
+    DeadlineExceeded, RATE_LIMIT_RETRY, ORDER_RATE_LIMIT_RETRY, ORDER_SEND_RETRY
+)
+from config.config import M_ACCOUNT_NUMBER, HTTP_POOL_MAXSIZE
+from config.condition import QUOTE_MAX_AGE_ORDER
+from utils import json_codec
+
+REQUEST_TIMEOUT = 10
+
+
+def _require_aiohttp():
+    """aiohttp 모듈을 불러옵니다. 설치되어 있지 않으면 안내 메시지와 함께 ImportError를 발생시킵니다."""
+    try:
+        import aiohttp
+    except ImportError as e:
+        raise ImportError("비동기 KIS 클라이언트를 사용하려면 aiohttp를 설치하세요. (pip install aiohttp)") from e
+    return aiohttp
+
+
+class AsyncKISApi:
+    """KISApi의 주문/잔고/시세/체결 조회 메서드를 asyncio로 제공하는 클래스입니다."""
+
+    def __init__(self, kis_api: Optional[KISApi] = None):
+        self.kis_api = kis_api or KISApi()
+        self.rate_limiter = kis_rate_limiter
+        self._session = None
+        self._session_loop = None
+
+    def _get_session(self):
+        """현재 이벤트 루프의 aiohttp 세션을 반환합니다. 루프가 바뀌었거나 닫혔으면 새로 만듭니다."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            aiohttp = _require_aiohttp()
+            connector = aiohttp.TCPConnector(limit=HTTP_POOL_MAXSIZE, limit_per_host=HTTP_POOL_MAXSIZE)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        """세션의 연결을 닫습니다."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    async def _request(self, method, url, is_mock=False, endpoint_class=QUOTE, raise_for_status=False,
+                       with_headers=False, rate_limit_retry=RATE_LIMIT_RETRY, **kwargs):
+        """
+        호출 한도 제한기를 await로 통과한 뒤 요청하고 JSON 응답을 반환합니다. (with_headers면 (JSON, 응답 헤더))
+        초당 거래건수 초과(EGW00201) 재요청, 서킷 브레이커, 작업 마감은 KISApi._request와 같은 방식으로 처리합니다.
+        """
+        aiohttp = _require_aiohttp()
+        session = self._get_session()
+        breaker = kis_circuit_breakers[is_mock]
+        async for attempt in rate_limit_retry.attempts_async():
+            request_timeout(REQUEST_TIMEOUT)
+            breaker.check()
+            try:
+                if not await self.rate_limiter.acquire_async(endpoint_class, is_mock, timeout=limiter_timeout()):
+                    raise limiter_deadline_exceeded()
+                timeout = request_timeout(REQUEST_TIMEOUT)
+                async with session.request(method, url, timeout=aiohttp.ClientTimeout(total=timeout), **kwargs) as response:
+                    status = response.status
+                    text = await response.text()
+                    response_headers = response.headers
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # 마감 초과/취소 등 서버 상태를 알 수 없는 실패는 시험 슬롯만 반납합니다.
+                breaker.release()
+                raise
+            if status == 200 and endpoint_class != ORDER:
+                breaker.record_success()
+                break
+            if RATE_LIMITED_MSG_CD not in text:
+                if status >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                break
+            breaker.record_success()
+            self.rate_limiter.penalize(is_mock)
+            logging.warning("[%s] 초당 호출 한도 초과 (%s/%s): %s", endpoint_class, attempt, rate_limit_retry.max_attempts, url)
+        if raise_for_status and status >= 400:
+            raise _require_aiohttp().ClientResponseError(
+                response.request_info, response.history, status=status, message=text[:200])
+        if with_headers:
+            return json_codec.loads(text), response_headers
+        return json_codec.loads(text)
+
+    async def _build_headers(self, is_mock=False, tr_id=None, hashkey=None):
+        """토큰이 캐시에 없을 때만 별도 스레드에서 발급받고, 헤더는 KISApi와 같은 방식으로 만듭니다."""
+        if credential_cache.peek(ACCESS_TOKEN, "mock" if is_mock else "real") is None:
+            await asyncio.to_thread(self.kis_api._ensure_token, is_mock)
+        return self.kis_api._build_headers(is_mock=is_mock, tr_id=tr_id, hashkey=hashkey)
+
+    async def _get_hashkey(self, payload, is_mock=False):
+        """KISApi._get_hashkey의 비동기 버전 (메모이제이션 공유)"""
+        hashkey = KISApi._cached_hashkey(payload, is_mock)
+        if hashkey is not None:
+            return hashkey
+        url = f"{self.kis_api.mock_url if is_mock else self.kis_api.real_url}/uapi/hashkey"
+        try:
+            response = await self._request("POST", url, is_mock=is_mock, raise_for_status=True,
+                                           headers=await self._build_headers(is_mock=is_mock), data=payload)
+            hashkey = response['HASH']
+        except Exception as e:
+            logging.error("비동기 해시 키 발급 실패: %s", e)
+            return None
+        KISApi._remember_hashkey(payload, is_mock, hashkey)
+        return hashkey
+
+######################################################################################
+################################    시세 조회   ###################################
+######################################################################################
+
+    async def get_stock_price(self, ticker, max_age=0):
+        """KISApi.get_stock_price의 비동기 버전 (현재가 캐시 공유. 동시 요청 합류는 하지 않음)"""
+        quote = quote_cache.peek(ticker, max_age)
+        if quote is not None:
+            return quote
+        headers = await self._build_headers(is_mock=False, tr_id="FHPST01010000")
+        url = f"{self.kis_api.real_url}/uapi/domestic-stock/v1/quotations/inquire-price-2"
+        params = {
+            "FID_COND_MRKT_DIV_CODE": "J",
+            "FID_INPUT_ISCD": ticker
+        }
+        quote = await self._request("GET", url, is_mock=False, params=params, headers=headers)
+        if quote.get('rt_cd', '0') == '0' and quote.get('output'):
+            quote_cache.set(ticker, quote)
+        return quote
+
+    async def get_current_price(self, ticker: str, max_age: float = 0) -> tuple[int, str]:
+        """KISApi.get_current_price의 비동기 버전. 실패 시 (0, "0")"""
+        try:
+            output = (await self.get_stock_price(ticker, max_age)).get('output') or {}
+            return int(output.get('stck_prpr')), output.get('trht_yn')
+        except Exception as e:
+            logging.error("비동기 현재가 조회 실패: %s, %s", ticker, e)
+            return 0, "0"
+
+######################################################################################
+################################    주문 메서드   ###################################
+######################################################################################
+
+    async def place_order(self, ticker, quantity, order_type=None, price=None):
+        """KISApi.place_order의 비동기 버전 (같은 형식의 결과 딕셔너리 반환)"""
+        if not ticker or quantity is None:
+            logging.error("[place_order_async] 잘못된 주문 파라미터: ticker=%s, quantity=%s", ticker, quantity)
+            return {"rt_cd": "1", "msg_cd": "00010000", "msg1": "잘못된 주문 파라미터"}
+
+        quantity = int(quantity)
+        if quantity <= 0:
+            logging.warning("[place_order_async] 주문 수량이 0 이하입니다. ticker=%s", ticker)
+            return {"rt_cd": "1", "msg_cd": "00010001", "msg1": "주문 수량이 0 이하입니다."}
+
+        tr_id_code = "VTTC0802U" if order_type == 'buy' else "VTTC0801U"
+
+        if order_type == 'buy':
+            price_to_use = price if price is not None else (await self.get_current_price(ticker, QUOTE_MAX_AGE_ORDER))[0]
+            try:
+                available_cash = await self.get_available_cash()
+                if available_cash <= 0 or not price_to_use:
+                    return {"rt_cd": "1", "msg_cd": "40250000", "msg1": "모의투자 주문가능금액이 부족합니다."}
+                max_qty = int((available_cash * 0.99) // price_to_use)  # 1% 여유 확보
+                if max_qty <= 0:
+                    return {"rt_cd": "1", "msg_cd": "40250000", "msg1": "모의투자 주문가능금액이 부족합니다."}
+                quantity = min(quantity, max_qty)
+            except Exception as e:
+                logging.error("[place_order_async] available cash check 실패: %s", e)
+
+        data = {
+            "CANO": M_ACCOUNT_NUMBER,
+            "ACNT_PRDT_CD": "01",
+            "PDNO": ticker,
+            "ORD_DVSN": "01" if price is None else "00",  # 01: 시장가, 00: 지정가
+            "ORD_QTY": str(quantity),
+            "ORD_UNPR": "0" if price is None else str(price),
+        }
+        payload = KISApi._canonical_body(data)
+        hashkey = await self._get_hashkey(payload, is_mock=True)
+        headers = await self._build_headers(is_mock=True, tr_id=tr_id_code, hashkey=hashkey)
+        url = f"{self.kis_api.mock_url}/uapi/domestic-stock/v1/trading/order-cash"
+
+        error = None
+        async for attempt in ORDER_SEND_RETRY.attempts_async():
+            try:
+                result = await self._request("POST", url, is_mock=True, endpoint_class=ORDER, raise_for_status=True,
+                                             rate_limit_retry=ORDER_RATE_LIMIT_RETRY, data=payload, headers=headers)
+                if result.get('rt_cd') == '0':
+                    balance_snapshot.invalidate()  # 주문 접수 → 잔고 스냅샷 무효화
+                return result
+            except (CircuitOpenError, DeadlineExceeded) as e:
+                error = e
+                break
+            except Exception as e:
+                error = e
+                logging.error("[place_order_async] API 호출 실패(%s/%s): %s", attempt, ORDER_SEND_RETRY.max_attempts, e)
+        logging.error("[place_order_async] 주문 전송 포기: %s", error)
+        return {"rt_cd": "1", "msg_cd": "50000000", "msg1": f"API 호출 실패: {error}"}
+
+    async def revise_order(self, order_num, quantity, order_price):
+        """KISApi.revise_order의 비동기 버전"""
+        body = {
+            "CANO": M_ACCOUNT_NUMBER,
+            "ACNT_PRDT_CD": "01",
+            "KRX_FWDG_ORD_ORGNO": "00950",
+            "ORGN_ODNO": str(order_num).zfill(8),
+            "ORD_DVSN": "01",
+            "RVSE_CNCL_DVSN_CD": "01", # 01:정정, 02:취소
+            "ORD_QTY": str(quantity),
+            "ORD_UNPR": str(order_price),
+            "QTY_ALL_ORD_YN": "Y",
+            "ALGO_NO": ""
+        }
+        payload = KISApi._canonical_body(body)
+        hashkey = await self._get_hashkey(payload, is_mock=True)
+        headers = await self._build_headers(is_mock=True, tr_id="VTTC0803U", hashkey=hashkey)
+        url = f"{self.kis_api.mock_url}/uapi/domestic-stock/v1/trading/order-rvsecncl"
+        return await self._request("POST", url, is_mock=True, endpoint_class=ORDER, headers=headers, data=payload)
+
+    async def purchase_availability_inquiry(self, ticker=None):
+        """KISApi.purchase_availability_inquiry의 비동기 버전"""
+        body = {
+            "CANO": M_ACCOUNT_NUMBER,
+            "ACNT_PRDT_CD": "01",
+            "PDNO": "" if ticker is None else ticker,
+            "ORD_UNPR": "",
+            "ORD_DVSN": "01",
+            "CMA_EVLU_AMT_ICLD_YN": "N",
+            "OVRS_ICLD_YN": "N"
+        }
+        headers = await self._build_headers(is_mock=True, tr_id="VTTC8908R")
+        url = f"{self.kis_api.mock_url}/uapi/domestic-stock/v1/trading/inquire-psbl-order"
+        return await self._request("GET", url, is_mock=True, headers=headers, params=body)
+
+    async def get_available_cash(self):
+        """KISApi.get_available_cash의 비동기 버전. 실패 시 0."""
+        try:
+            return KISApi.parse_available_cash(await self.purchase_availability_inquiry())
+        except Exception as e:
+            logging.error("get_available_cash_async error: %s", e)
+            return 0
+
+######################################################################################
+################################    잔고 메서드   ###################################
+######################################################################################
+
+    async def daily_order_execution_inquiry(self, order_num):
+        """KISApi.daily_order_execution_inquiry의 비동기 버전"""
+        formatted_date = datetime.now(KST).strftime('%Y%m%d')
+        body = {
+            "CANO": M_ACCOUNT_NUMBER,
+            "ACNT_PRDT_CD": "01",
+            "INQR_STRT_DT": formatted_date,
+            "INQR_END_DT": formatted_date,
+            "UNPR_DVSN": "01",
+            "SLL_BUY_DVSN_CD": "00",
+            "INQR_DVSN": "00",
+            "PDNO": "",
+            "CCLD_DVSN": "00",
+            "ORD_GNO_BRNO": "",
+            "ODNO": order_num,
+            "INQR_DVSN_3": "00",
+            "INQR_DVSN_1": "",
+            "CTX_AREA_FK100": "",
+            "CTX_AREA_NK100": "",
+        }
+        headers = await self._build_headers(is_mock=True, tr_id="VTTC8001R")
+        url = f"{self.kis_api.mock_url}/uapi/domestic-stock/v1/trading/inquire-daily-ccld"
+        return await self._request("GET", url, is_mock=True, headers=headers, params=body)
+
+    async def balance_inquiry(self, max_age: float = 0):
+        """KISApi.balance_inquiry의 비동기 버전 (잔고 스냅샷 공유. 동시 요청 합류는 하지 않음)"""
+        holdings = balance_snapshot.peek(max_age)
+        if holdings is not None:
+            return holdings
+        generation = balance_snapshot.generation
+        body = {
+            "CANO": M_ACCOUNT_NUMBER,
+            "ACNT_PRDT_CD": "01",
+            "AFHR_FLPR_YN": "N",
+            "OFL_YN": "",
+            "INQR_DVSN": "02",
+            "UNPR_DVSN": "01",
+            "FUND_STTL_ICLD_YN": "N",
+            "FNCG_AMT_AUTO_RDPT_YN": "N",
+            "PRCS_DVSN": "00",
+            "CTX_AREA_FK100": "",
+            "CTX_AREA_NK100": "",
+        }
+        url = f"{self.kis_api.mock_url}/uapi/domestic-stock/v1/trading/inquire-balance"
+        for page in range(BALANCE_MAX_PAGES):
+            headers = await self._build_headers(is_mock=True, tr_id="VTTC8434R")
+            if page > 0:
+                headers["tr_cont"] = "N"  # 연속 조회
+            response, response_headers = await self._request(
+                "GET", url, is_mock=True, headers=headers, params=body, with_headers=True)
+            output1 = response.get("output1")
+            if output1 is None:
+                break
+            holdings = (holdings or []) + output1
+            if response_headers.get("tr_cont") not in BALANCE_CONTINUE_FLAGS:
+                break
+            body["CTX_AREA_FK100"] = response.get("ctx_area_fk100", "")
+            body["CTX_AREA_NK100"] = response.get("ctx_area_nk100", "")
+
+        if holdings is not None:
+            balance_snapshot.set(holdings, generation)
+        return holdings
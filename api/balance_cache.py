@@ -0,0 +1,114 @@
+"""
+KIS 계좌 잔고 스냅샷
+
+매도 전 보유 수량 확인, 매수 후 세션 동기화, 웹소켓 모니터링 시작 시 세션 동기화가 모두 같은 계좌 전체 잔고를
+조회하므로, 프로세스 전역 스냅샷 하나를 두고 종목별 보유 내역을 메모리에서 제공합니다.
+- 호출하는 쪽이 허용하는 나이(max_age)보다 오래되었으면 다시 조회하고, 동시에 조회하면 한 스레드만 요청합니다.
+- 체결통보/주문 접수 시 invalidate()로 무효화하여 다음 조회에서 새로 받아 옵니다.
+- 조회 도중 무효화되면 받아 온 결과는 반환하되 캐시에는 저장하지 않습니다. (체결 이전 잔고일 수 있음)
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+Holdings = List[Dict[str, Any]]
+BalanceLoader = Callable[[], Optional[Holdings]]
+
+
+class BalanceSnapshot:
+    """계좌 보유 종목 목록(output1)과 조회 시각을 보관하는 스레드 안전 스냅샷"""
+
+    def __init__(self):
+        # (보유 종목 목록, 조회 시각 monotonic 초). 통째로 교체하므로 읽기에는 락이 필요 없습니다.
+        self._entry: Optional[tuple] = None
+        self._generation = 0
+        self._fetch_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def peek(self, max_age: float) -> Optional[Holdings]:
+        """max_age 초 이내에 조회한 잔고가 있으면 반환합니다."""
+        entry = self._entry
+        if entry is not None and max_age > 0 and time.monotonic() - entry[1] <= max_age:
+            return entry[0]
+        return None
+
+    def set(self, holdings: Holdings, generation: Optional[int] = None):
+        """조회 결과를 저장합니다. generation이 주어지고 그 사이 무효화되었으면 저장하지 않습니다."""
+        if generation is not None and generation != self._generation:
+            return
+        self._entry = (holdings, time.monotonic())
+
+    def get(self, loader: BalanceLoader, max_age: float = 0) -> Optional[Holdings]:
+        """
+        스냅샷을 반환하고, 없거나 max_age보다 오래되었으면 loader로 조회합니다.
+
+        Args:
+            loader: 보유 종목 목록(output1 전체 페이지)을 반환하는 조회 함수. 실패 시 None
+            max_age: 허용하는 스냅샷 나이(초). 0이면 항상 새로 조회
+
+        Returns:
+            보유 종목 목록 또는 조회 실패 시 None
+        """
+        holdings = self.peek(max_age)
+        if holdings is not None:
+            self._count('hits')
+            return holdings
+
+        requested_at = time.monotonic()
+        with self._fetch_lock:
+            # 락을 기다리는 동안 다른 스레드가 요청 이후에 받아 온 잔고가 있으면 그대로 사용합니다.
+            entry = self._entry
+            if entry is not None and (entry[1] >= requested_at or self.peek(max_age) is not None):
+                self._count('coalesced')
+                return entry[0]
+
+            self._count('misses')
+            generation = self._generation
+            holdings = loader()
+            if holdings is not None:
+                self.set(holdings, generation)
+            return holdings
+
+    def holding(self, ticker: str, loader: BalanceLoader, max_age: float = 0) -> Optional[Dict[str, Any]]:
+        """종목의 잔고 행을 반환합니다. 보유하지 않으면 {}, 조회 실패 시 None"""
+        holdings = self.get(loader, max_age)
+        if holdings is None:
+            return None
+        return next((item for item in holdings if item.get('pdno') == ticker), {})
+
+    def invalidate(self):
+        """체결/주문으로 잔고가 바뀌었음을 알립니다. 진행 중인 조회 결과도 저장되지 않습니다."""
+        with self._stats_lock:
+            self._generation += 1
+            self._entry = None
+            self.invalidations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """적중/미적중/동시 요청 합류/무효화 횟수와 현재 스냅샷 나이를 반환합니다."""
+        entry = self._entry
+        with self._stats_lock:
+            total = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'invalidations': self.invalidations,
+                'hit_ratio': round((self.hits + self.coalesced) / total, 3) if total else 0.0,
+                'age': round(time.monotonic() - entry[1], 1) if entry else None,
+            }
+
+
+# 프로세스 전역 계좌 잔고 스냅샷
+balance_snapshot = BalanceSnapshot()
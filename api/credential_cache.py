@@ -0,0 +1,150 @@
+"""
+KIS 접근 토큰 / 웹소켓 인증키 프로세스 전역 캐시
+
+KISApi, KISWebSocket 인스턴스가 여러 곳에서 생성되어도 자격 증명은 이 캐시 하나를 공유합니다.
+- 조회(peek)는 락 없이 딕셔너리만 읽으므로 주문/시세 요청 경로에서 DB나 네트워크를 거치지 않습니다.
+- 만료(또는 만료 임박) 시 갱신은 종류별 락으로 한 스레드만 수행(single-flight)하고,
+  동시에 기다리던 호출자는 갱신된 값을 그대로 사용합니다.
+- 갱신 시점이 지났지만 아직 만료되지 않은 값은 그대로 반환하고 갱신은 백그라운드 스레드에서 수행하므로,
+  주문 경로가 인증 요청을 기다리지 않습니다. (refresh()로 거래 시간대 전에 미리 갱신)
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Tuple
+
+# 자격 증명 종류
+ACCESS_TOKEN = 'token'
+WS_APPROVAL = 'approval'
+
+# 만료 시각보다 이만큼 일찍 갱신합니다. (요청 도중 만료 방지)
+REFRESH_MARGIN = timedelta(minutes=5)
+
+CredentialLoader = Callable[[], Tuple[Optional[str], Optional[datetime]]]
+
+
+def _to_epoch(expires_at: datetime) -> float:
+    """만료 시각을 epoch 초로 변환합니다. 시간대가 없는 값은 UTC로 간주합니다."""
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at.timestamp()
+
+
+class CredentialCache:
+    """(종류, 'real'/'mock') 별 자격 증명과 만료 시각을 보관하는 스레드 안전 캐시"""
+
+    def __init__(self, refresh_margin: timedelta = REFRESH_MARGIN):
+        self.refresh_margin = refresh_margin.total_seconds()
+        # key -> (값, 갱신 시점 epoch 초, 만료 epoch 초). 항목은 통째로 교체하므로 읽기에는 락이 필요 없습니다.
+        self._entries: Dict[Tuple[str, str], Tuple[str, float, float]] = {}
+        self._refresh_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def peek(self, kind: str, credential_type: str) -> Optional[str]:
+        """유효한 값이 캐시에 있으면 반환하고, 없거나 만료 임박이면 None을 반환합니다."""
+        entry = self._entries.get((kind, credential_type))
+        if entry is not None and time.time() < entry[1]:
+            return entry[0]
+        return None
+
+    def set(self, kind: str, credential_type: str, value: str, expires_at: datetime):
+        """값과 만료 시각을 저장합니다."""
+        expires_epoch = _to_epoch(expires_at)
+        self._entries[(kind, credential_type)] = (value, expires_epoch - self.refresh_margin, expires_epoch)
+
+    def needs_refresh(self, kind: str, credential_type: str, lead: timedelta = timedelta(0)) -> bool:
+        """값이 없거나 지금부터 lead 이내에 갱신 시점이 도래하면 True를 반환합니다."""
+        entry = self._entries.get((kind, credential_type))
+        return entry is None or time.time() + lead.total_seconds() >= entry[1]
+
+    def invalidate(self, kind: Optional[str] = None, credential_type: Optional[str] = None):
+        """조건에 맞는 항목을 제거합니다. (인증 오류 응답 시 강제 갱신용)"""
+        for key in list(self._entries):
+            if (kind is None or key[0] == kind) and (credential_type is None or key[1] == credential_type):
+                self._entries.pop(key, None)
+
+    def _refresh_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        lock = self._refresh_locks.get(key)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._refresh_locks.setdefault(key, threading.Lock())
+        return lock
+
+    def get(self, kind: str, credential_type: str, loader: CredentialLoader) -> Optional[str]:
+        """
+        캐시된 값을 반환하고, 없으면 loader로 한 번만 발급받아 저장합니다.
+
+        Args:
+            kind: ACCESS_TOKEN 또는 WS_APPROVAL
+            credential_type: 'real' 또는 'mock'
+            loader: (값, 만료 시각)을 반환하는 발급 함수. 실패 시 (None, None)
+
+        Returns:
+            유효한 자격 증명 또는 발급 실패 시 None
+        """
+        value = self.peek(kind, credential_type)
+        if value is not None:
+            return value
+
+        entry = self._entries.get((kind, credential_type))
+        if entry is not None and time.time() < entry[2]:
+            # 아직 만료 전이면 현재 값을 사용하고 갱신은 백그라운드에서 한 번만 수행합니다.
+            self._refresh_in_background(kind, credential_type, loader)
+            return entry[0]
+
+        with self._refresh_lock((kind, credential_type)):
+            # 락을 기다리는 동안 다른 스레드가 갱신했으면 그 값을 사용합니다.
+            value = self.peek(kind, credential_type)
+            if value is not None:
+                return value
+
+            value, expires_at = loader()
+            if value and expires_at:
+                self.set(kind, credential_type, value, expires_at)
+                if self.peek(kind, credential_type) is None:
+                    logging.warning("%s %s 자격 증명의 남은 유효 시간이 갱신 여유보다 짧습니다.", credential_type, kind)
+            return value
+
+    def refresh(self, kind: str, credential_type: str, loader: CredentialLoader,
+                lead: timedelta = timedelta(0)) -> Optional[str]:
+        """
+        lead 이내에 갱신 시점이 도래하는 경우 미리 새 값을 발급받습니다. (백그라운드 갱신 작업용)
+
+        loader는 lead 이후까지 유효한 값을 반환해야 합니다.
+        """
+        if not self.needs_refresh(kind, credential_type, lead):
+            return self.peek(kind, credential_type)
+        with self._refresh_lock((kind, credential_type)):
+            if not self.needs_refresh(kind, credential_type, lead):
+                return self.peek(kind, credential_type)
+            value, expires_at = loader()
+            if value and expires_at:
+                self.set(kind, credential_type, value, expires_at)
+                logging.info("%s %s 자격 증명을 미리 갱신했습니다. (만료: %s)", credential_type, kind, expires_at)
+            else:
+                logging.error("%s %s 자격 증명 사전 갱신에 실패했습니다.", credential_type, kind)
+            return value
+
+    def _refresh_in_background(self, kind: str, credential_type: str, loader: CredentialLoader):
+        lock = self._refresh_lock((kind, credential_type))
+        # 이미 다른 스레드가 갱신 중이면 새로 시작하지 않습니다.
+        if not lock.acquire(blocking=False):
+            return
+
+        def _run():
+            try:
+                if self.peek(kind, credential_type) is None:
+                    value, expires_at = loader()
+                    if value and expires_at:
+                        self.set(kind, credential_type, value, expires_at)
+            except Exception as e:
+                logging.error("%s %s 자격 증명 백그라운드 갱신 중 오류: %s", credential_type, kind, e)
+            finally:
+                lock.release()
+
+        threading.Thread(target=_run, name=f"Credential_Refresh_{kind}_{credential_type}", daemon=True).start()
+
+
+# 프로세스 전역 자격 증명 캐시
+credential_cache = CredentialCache()
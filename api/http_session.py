@@ -0,0 +1,83 @@
+"""
+KIS REST API용 keep-alive HTTP 세션 풀
+
+호출마다 requests.get/post를 쓰면 매번 TCP+TLS 연결을 새로 맺으므로,
+호스트(실전/모의 서버)별로 requests.Session 하나를 프로세스 전역에서 공유하여 연결을 재사용합니다.
+- 세션에는 쿠키/기본 헤더를 두지 않고 요청마다 헤더를 넘기므로 여러 스레드에서 함께 사용해도 안전합니다.
+- 어댑터는 연결 수립 실패만 재시도합니다. 읽기 오류/5xx 재시도는 작업 마감과 서킷 브레이커를 따르는
+  api.retry_policy 한 곳에서만 처리합니다. (요청이 서버에 전달되기 전 실패라 주문 POST도 중복되지 않음)
+"""
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.config import HTTP_POOL_MAXSIZE, HTTP_RETRY_TOTAL
+from utils import json_codec
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=HTTP_RETRY_TOTAL,
+        connect=HTTP_RETRY_TOTAL,
+        read=0,
+        status=0,
+        other=0,
+        redirect=0,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry, pool_block=False)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """url의 호스트(scheme://host:port)에 해당하는 공유 세션을 반환합니다."""
+    parts = urlsplit(url)
+    key = f"{parts.scheme}://{parts.netloc}"
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = _sessions[key] = _build_session()
+    return session
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """공유 세션으로 GET 요청을 보냅니다. (requests.get과 같은 인자)"""
+    return get_session(url).get(url, **kwargs)
+
+
+def http_post(url: str, **kwargs) -> requests.Response:
+    """공유 세션으로 POST 요청을 보냅니다. (requests.post와 같은 인자)"""
+    return get_session(url).post(url, **kwargs)
+
+
+def decode_json(response: requests.Response):
+    """
+    응답 본문(바이트)을 JSON 코덱으로 디코딩합니다. (response.json() 대체)
+
+    Raises:
+        requests.exceptions.JSONDecodeError: response.json()과 같은 예외 (RequestException 처리 경로 유지)
+    """
+    try:
+        return json_codec.loads(response.content)
+    except json_codec.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+
+
+def close_sessions():
+    """모든 공유 세션의 연결을 닫습니다. (프로그램 종료 시)"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -1,36 +1,68 @@
 import json
 import requests
 import logging
-from requests.exceptions import RequestException
+from requests.exceptions import RequestException, ConnectionError as RequestsConnectionError, Timeout
 from utils.string_utils import unicode_to_korean
-from config.config import R_APP_KEY, R_APP_SECRET, M_APP_KEY, M_APP_SECRET, M_ACCOUNT_NUMBER
-from config.condition import BUY_DAY_AGO
+from utils import json_codec
+from config.config import R_APP_KEY, R_APP_SECRET, M_APP_KEY, M_APP_SECRET, M_ACCOUNT_NUMBER, KIS_REAL_URL, KIS_MOCK_URL
+from config.condition import BUY_DAY_AGO, QUOTE_MAX_AGE_ORDER
 from datetime import datetime, timedelta, timezone
 from database.db_manager_upper import DatabaseManager
-import time
+from api.http_session import http_get, http_post, decode_json
+from api.credential_cache import credential_cache, ACCESS_TOKEN, WS_APPROVAL, REFRESH_MARGIN
+from api.rate_limiter import kis_rate_limiter, QUOTE, ORDER, RATE_LIMITED_MSG_CD
+from api.quote_cache import quote_cache
+from api.balance_cache import balance_snapshot
+from api.retry_policy import (
+    kis_circuit_breakers, request_timeout, limiter_timeout, limiter_deadline_exceeded, CircuitOpenError,
+    DeadlineExceeded, RATE_LIMIT_RETRY, ORDER_RATE_LIMIT_RETRY, TOKEN_RETRY, ORDER_SEND_RETRY
+)
 from threading import Lock
+from types import MappingProxyType
+from collections import OrderedDict
 from zoneinfo import ZoneInfo
 KST = ZoneInfo("Asia/Seoul")
 
+# 주문 본문별 hashkey 메모이제이션 최대 개수
+HASHKEY_MEMO_SIZE = 256
+# 관심종목(멀티종목) 시세조회 요청당 최대 종목 수
+MULTI_PRICE_MAX_TICKERS = 30
+# 잔고 조회 연속 조회 최대 페이지 수 / 다음 페이지가 있음을 뜻하는 응답 헤더 tr_cont 값
+BALANCE_MAX_PAGES = 20
+BALANCE_CONTINUE_FLAGS = ("F", "M")
+
 
 
 class KISApi:
     """한국투자증권 API와 상호작용하기 위한 클래스입니다."""
-    _global_api_lock = Lock()  # 전역 API 호출 락
+    rate_limiter = kis_rate_limiter  # 모든 REST 호출이 공유하는 초당 호출 한도 제한기
+    # REST 서버 주소 (실전 / 모의). 로컬 대역 서버로 측정할 때는 인스턴스에서 바꿉니다.
+    real_url = KIS_REAL_URL
+    mock_url = KIS_MOCK_URL
+    # (is_mock, 직렬화된 주문 본문) -> hashkey. 같은 본문의 해시는 변하지 않으므로 프로세스 전역에서 재사용합니다.
+    _hashkey_memo = OrderedDict()
+    _hashkey_lock = Lock()
+    # 계정 유형(is_mock)별 고정 헤더. 요청마다 복사하여 토큰/tr_id/hashkey를 더하므로 여러 스레드에서 동시에 호출해도 안전합니다.
+    _BASE_HEADERS = {
+        False: MappingProxyType({
+            "content-type": "application/json; charset=utf-8",
+            "appkey": R_APP_KEY,
+            "appsecret": R_APP_SECRET,
+            "tr_cont": "",
+            "custtype": "P",
+        }),
+        True: MappingProxyType({
+            "content-type": "application/json; charset=utf-8",
+            "appkey": M_APP_KEY,
+            "appsecret": M_APP_SECRET,
+            "tr_cont": "",
+            "custtype": "P",
+        }),
+    }
 
     def __init__(self):
         """KISApi 클래스의 인스턴스를 초기화합니다."""
-        self.headers = {"content-type": "application/json; charset=utf-8"}
         self.w_headers = {"content-type": "utf-8"}
-        self.real_token = None
-        self.mock_token = None
-        self.real_token_expires_at = None
-        self.mock_token_expires_at = None
-        self.real_approval = None
-        self.mock_approval = None
-        self.real_approval_expires_at = None
-        self.mock_approval_expires_at = None
-        self.hashkey = None
         self.upper_limit_stocks = {}
         self.watchlist = set()
 
@@ -38,7 +70,7 @@ class KISApi:
 #########################    인증 관련 메서드   #######################################
 ######################################################################################
 
-    def _get_token(self, app_key, app_secret, token_type, max_retries=3, retry_delay=5):
+    def _get_token(self, app_key, app_secret, token_type, retry_policy=TOKEN_RETRY, min_valid=REFRESH_MARGIN):
         """
         지정된 토큰 유형에 대한 액세스 토큰을 가져옵니다.
 
@@ -46,21 +78,22 @@ class KISApi:
             app_key (str): 애플리케이션 키
             app_secret (str): 애플리케이션 시크릿
             token_type (str): 토큰 유형 ('real' 또는 'mock')
-            max_retries (int): 최대 재시도 횟수
-            retry_delay (int): 재시도 간 대기 시간(초)
+            retry_policy (RetryPolicy): 발급 실패 시 재시도 정책 (시도 횟수/백오프)
+            min_valid (timedelta): DB에 저장된 토큰을 재사용하기 위한 최소 남은 유효 시간
 
         Returns:
             tuple: (액세스 토큰, 만료 시간) 또는 실패 시 (None, None)
         """
         db_manager = DatabaseManager()
         
-        # Check if we have a valid cached token
+        # Check if we have a valid cached token (다른 프로세스가 발급한 토큰 재사용)
         cached_token, cached_expires_at = db_manager.get_token(token_type)
-        if cached_token and cached_expires_at > datetime.now(KST):
+        if cached_token and cached_expires_at - min_valid > datetime.now(KST):
+            db_manager.close()
             logging.info("Using cached %s token", token_type)
             return cached_token, cached_expires_at
 
-        url = "https://openapi.koreainvestment.com:9443/oauth2/tokenP"
+        url = f"{self.real_url}/oauth2/tokenP"
         headers = {"content-type": "application/json"}
         body = {
             "grant_type": "client_credentials",
@@ -68,11 +101,11 @@ class KISApi:
             "appsecret": app_secret
         }
 
-        for attempt in range(max_retries):
+        for attempt in retry_policy.attempts():
             try:
-                response = requests.post(url, headers=headers, json=body, timeout=10)
+                response = http_post(url, headers=headers, json=body, timeout=request_timeout(10))
                 response.raise_for_status()
-                token_data = response.json()
+                token_data = decode_json(response)
                 
                 if "access_token" in token_data:
                     access_token = token_data["access_token"]
@@ -82,23 +115,20 @@ class KISApi:
                     db_manager.save_token(token_type, access_token, expires_at)
                     db_manager.close()
                     
-                    logging.info("Successfully obtained and cached %s token on attempt %d", token_type, attempt + 1)
+                    logging.info("Successfully obtained and cached %s token on attempt %d", token_type, attempt)
                     return access_token, expires_at
                 else:
-                    logging.warning("Unexpected response format on attempt %d: %s", attempt + 1, token_data)
+                    logging.warning("Unexpected response format on attempt %d: %s", attempt, token_data)
             except RequestException as e:
-                logging.error("An error occurred while fetching the %s token on attempt %d: %s", token_type, attempt + 1, e)
-                if attempt < max_retries - 1:
-                    logging.info("Retrying in %d seconds...", retry_delay)
-                    time.sleep(retry_delay)
-                else:
-                    logging.error("Max retries reached. Unable to obtain %s token.", token_type)
+                logging.error("An error occurred while fetching the %s token on attempt %d: %s", token_type, attempt, e)
+        logging.error("Retries exhausted. Unable to obtain %s token.", token_type)
         db_manager.close()
         return None, None
 
     def _ensure_token(self, is_mock):
         """
         유효한 토큰이 있는지 확인하고, 필요한 경우 새 토큰을 가져옵니다.
+        토큰은 프로세스 전역 캐시에서 공유하며, 만료 시 한 스레드만 발급을 요청합니다.
 
         Args:
             is_mock (bool): 모의 거래 여부
@@ -106,87 +136,282 @@ class KISApi:
         Returns:
             str: 유효한 액세스 토큰
         """
-        now = datetime.now(KST)
+        token_type = "mock" if is_mock else "real"
+        token = credential_cache.peek(ACCESS_TOKEN, token_type)
+        if token is not None:
+            return token
         if is_mock:
-            if not self.mock_token or now >= self.mock_token_expires_at:
-                self.mock_token, self.mock_token_expires_at = self._get_token(M_APP_KEY, M_APP_SECRET, "mock")
-            return self.mock_token
-        else:
-            if not self.real_token or now >= self.real_token_expires_at:
-                self.real_token, self.real_token_expires_at = self._get_token(R_APP_KEY, R_APP_SECRET, "real")
-            return self.real_token
+            return credential_cache.get(ACCESS_TOKEN, token_type,
+                                        lambda: self._get_token(M_APP_KEY, M_APP_SECRET, token_type))
+        return credential_cache.get(ACCESS_TOKEN, token_type,
+                                    lambda: self._get_token(R_APP_KEY, R_APP_SECRET, token_type))
+
+    def _get_approval(self, app_key, app_secret, approval_type, retry_policy=TOKEN_RETRY, min_valid=REFRESH_MARGIN):
+        """
+        웹소켓 인증키를 발급합니다.
+
+        Args:
+            app_key (str): 애플리케이션 키
+            app_secret (str): 애플리케이션 시크릿
+            approval_type (str): 인증키 유형 ('real' 또는 'mock')
+            retry_policy (RetryPolicy): 발급 실패 시 재시도 정책 (시도 횟수/백오프)
+            min_valid (timedelta): DB에 저장된 인증키를 재사용하기 위한 최소 남은 유효 시간
+
+        Returns:
+            tuple: (인증키, 만료 시간(UTC)) 또는 실패 시 (None, None)
+        """
+        db_manager = DatabaseManager()
+        try:
+            # DB의 expires_at은 UTC 기준으로 저장됩니다.
+            cached_approval, cached_expires_at = db_manager.get_approval(approval_type)
+            if isinstance(cached_expires_at, str):
+                try:
+                    cached_expires_at = datetime.fromisoformat(cached_expires_at)
+                except (ValueError, TypeError) as e:
+                    logging.error(f"Failed to parse cached_expires_at: {e}")
+                    cached_expires_at = None
+            if isinstance(cached_expires_at, datetime):
+                cached_expires_at = cached_expires_at.replace(tzinfo=timezone.utc)
+                if cached_approval and cached_expires_at - min_valid > datetime.now(timezone.utc):
+                    logging.info("Using cached %s approval", approval_type)
+                    return cached_approval, cached_expires_at
+
+            url = f"{self.real_url}/oauth2/Approval"
+            headers = {"content-type": "application/json; utf-8"}
+            body = {
+                "grant_type": "client_credentials",
+                "appkey": app_key,
+                "secretkey": app_secret,
+            }
+
+            for attempt in retry_policy.attempts():
+                try:
+                    response = http_post(url, headers=headers, json=body, timeout=request_timeout(10))
+                    response.raise_for_status()
+                    approval_data = decode_json(response)
+
+                    if "approval_key" in approval_data:
+                        approval_key = approval_data["approval_key"]
+                        expires_at = datetime.now(timezone.utc) + timedelta(seconds=86400)
+
+                        # Save the new approval_key to the database
+                        db_manager.save_approval(approval_type, approval_key, expires_at.replace(tzinfo=None))
+
+                        logging.info("Successfully obtained and cached %s approval_key on attempt %d", approval_type, attempt)
+                        return approval_key, expires_at
+                    else:
+                        logging.warning("Unexpected response format on attempt %d: %s", attempt, approval_data)
+                except RequestException as e:
+                    logging.error("An error occurred while fetching the %s approval_key on attempt %d: %s", approval_type, attempt, e)
+            logging.error("Retries exhausted. Unable to obtain %s approval_key.", approval_type)
+            return None, None
+        finally:
+            db_manager.close()
+
+    def ensure_approval(self, is_mock):
+        """
+        유효한 웹소켓 인증키를 반환합니다. (프로세스 전역 캐시 공유)
+
+        Args:
+            is_mock (bool): 모의 거래 여부
+
+        Returns:
+            str: 유효한 웹소켓 인증키
+        """
+        approval_type = "mock" if is_mock else "real"
+        approval = credential_cache.peek(WS_APPROVAL, approval_type)
+        if approval is not None:
+            return approval
+        app_key, app_secret = (M_APP_KEY, M_APP_SECRET) if is_mock else (R_APP_KEY, R_APP_SECRET)
+        return credential_cache.get(WS_APPROVAL, approval_type,
+                                    lambda: self._get_approval(app_key, app_secret, approval_type))
+
+    def refresh_credentials(self, lead=timedelta(0), approval_types=("mock",)):
+        """
+        lead 이내에 갱신 시점이 도래하는 토큰/웹소켓 인증키를 미리 발급받습니다.
+        (스케줄러에서 거래 시간대 전에 호출하여 주문 경로가 인증을 기다리지 않도록 함)
+
+        Args:
+            lead (timedelta): 지금부터 이 시간 동안은 갱신 없이 사용할 수 있어야 함
+            approval_types (tuple): 미리 갱신할 웹소켓 인증키 유형
+        """
+        min_valid = lead + REFRESH_MARGIN
+        for token_type, app_key, app_secret in (("real", R_APP_KEY, R_APP_SECRET), ("mock", M_APP_KEY, M_APP_SECRET)):
+            credential_cache.refresh(
+                ACCESS_TOKEN, token_type,
+                lambda: self._get_token(app_key, app_secret, token_type, min_valid=min_valid),
+                lead=lead,
+            )
+        for approval_type in approval_types:
+            app_key, app_secret = (M_APP_KEY, M_APP_SECRET) if approval_type == "mock" else (R_APP_KEY, R_APP_SECRET)
+            credential_cache.refresh(
+                WS_APPROVAL, approval_type,
+                lambda: self._get_approval(app_key, app_secret, approval_type, min_valid=min_valid),
+                lead=lead,
+            )
 
 ######################################################################################
 ###############################    헤더와 해쉬   ########################################
 ######################################################################################
 
-    def _set_headers(self, is_mock=False, tr_id=None):
+    def _request(self, method, url, is_mock=False, endpoint_class=QUOTE, rate_limit_retry=RATE_LIMIT_RETRY, **kwargs):
+        """
+        호출 한도 제한기를 통과한 뒤 KIS REST API를 호출합니다.
+
+        브로커가 초당 거래건수 초과(EGW00201)로 응답하면 제한기를 비우고
+        rate_limit_retry 정책의 백오프만큼 물러난 뒤 정책의 최대 횟수까지 다시 요청합니다.
+        (한도 초과 재요청은 여기서만 하므로 호출 측은 결과를 다시 재시도하지 않습니다)
+        연결 실패/5xx 응답이 이어져 서킷 브레이커가 열려 있으면 요청하지 않고 CircuitOpenError를,
+        deadline_scope로 지정한 작업 마감이 지났거나 제한기 대기가 마감을 넘으면
+        DeadlineExceeded를 발생시킵니다. (둘 다 RequestException)
+
+        Args:
+            method (str): "GET" 또는 "POST"
+            url (str): 요청 URL
+            is_mock (bool): 모의 거래 여부 (계정 유형별 한도 선택)
+            endpoint_class (str): QUOTE(조회) 또는 ORDER(주문)
+            rate_limit_retry (RetryPolicy): 한도 초과 응답 재요청 정책
+            **kwargs: http_get / http_post 인자
+
+        Returns:
+            requests.Response: 마지막 응답
+        """
+        send = http_post if method == "POST" else http_get
+        breaker = kis_circuit_breakers[is_mock]
+        for attempt in rate_limit_retry.attempts():
+            # 마감이 지났으면 브레이커의 시험 슬롯을 잡기 전에 실패시킵니다.
+            request_timeout(kwargs.get("timeout"))
+            breaker.check()
+            try:
+                if not self.rate_limiter.acquire(endpoint_class, is_mock, timeout=limiter_timeout()):
+                    raise limiter_deadline_exceeded()
+                kwargs["timeout"] = request_timeout(kwargs.get("timeout"))
+                response = send(url, **kwargs)
+                status_code = response.status_code
+                text = response.text if status_code != 200 or endpoint_class == ORDER else ""
+            except (RequestsConnectionError, Timeout) as e:
+                if isinstance(e, DeadlineExceeded):
+                    breaker.release()
+                else:
+                    breaker.record_failure()
+                raise
+            except BaseException:
+                # 서버 상태를 알 수 없는 실패는 기록하지 않고 시험 슬롯만 반납합니다.
+                breaker.release()
+                raise
+            # 조회 응답은 크기가 크므로 오류 상태 코드일 때만 본문에서 한도 초과 코드를 찾습니다.
+            if status_code == 200 and endpoint_class != ORDER:
+                breaker.record_success()
+                return response
+            if RATE_LIMITED_MSG_CD not in text:
+                if status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                return response
+            # 한도 초과 응답은 서버가 살아 있다는 뜻이므로 브레이커에는 성공으로 기록합니다.
+            breaker.record_success()
+            self.rate_limiter.penalize(is_mock)
+            logging.warning("[%s] 초당 호출 한도 초과 (%s/%s): %s", endpoint_class, attempt, rate_limit_retry.max_attempts, url)
+        return response
+
+    def _build_headers(self, is_mock=False, tr_id=None, hashkey=None):
         """
-        API 요청에 필요한 헤더를 설정합니다.
+        API 요청 한 건에 사용할 헤더를 새로 만들어 반환합니다. (공유 상태를 변경하지 않음)
 
         Args:
             is_mock (bool): 모의 거래 여부
             tr_id (str, optional): 거래 ID
+            hashkey (str, optional): 요청 본문 해시 키
+
+        Returns:
+            dict: 요청 헤더
         """
-        token = self._ensure_token(is_mock)
-        self.headers["authorization"] = f"Bearer {token}"
-        self.headers["appkey"] = M_APP_KEY if is_mock else R_APP_KEY
-        self.headers["appsecret"] = M_APP_SECRET if is_mock else R_APP_SECRET
+        headers = dict(self._BASE_HEADERS[is_mock])
+        headers["authorization"] = f"Bearer {self._ensure_token(is_mock)}"
         if tr_id:
-            self.headers["tr_id"] = tr_id
-        self.headers["tr_cont"] = ""
-        self.headers["custtype"] = "P"
-
-    def _get_hashkey(self, body, is_mock=False):
+            headers["tr_id"] = tr_id
+        if hashkey:
+            headers["hashkey"] = hashkey
+        return headers
+
+    @staticmethod
+    def _canonical_body(body):
+        """요청 본문을 키 순서를 고정한 JSON 문자열로 직렬화합니다. (hashkey 메모이제이션 키이자 전송 본문)"""
+        return json_codec.dumps(body, sort_keys=True)
+
+    @classmethod
+    def _cached_hashkey(cls, payload, is_mock):
+        with cls._hashkey_lock:
+            hashkey = cls._hashkey_memo.get((is_mock, payload))
+            if hashkey is not None:
+                cls._hashkey_memo.move_to_end((is_mock, payload))
+            return hashkey
+
+    @classmethod
+    def _remember_hashkey(cls, payload, is_mock, hashkey):
+        with cls._hashkey_lock:
+            cls._hashkey_memo[(is_mock, payload)] = hashkey
+            cls._hashkey_memo.move_to_end((is_mock, payload))
+            while len(cls._hashkey_memo) > HASHKEY_MEMO_SIZE:
+                cls._hashkey_memo.popitem(last=False)
+
+    def _get_hashkey(self, payload, is_mock=False):
         """
-        주어진 요청 본문에 대한 해시 키를 생성합니다.
+        주문 본문에 대한 해시 키를 반환합니다. 같은 본문은 발급받은 값을 재사용합니다.
 
         Args:
-            body (dict): 요청 본문
+            payload (str): _canonical_body로 직렬화한 요청 본문
+            is_mock (bool): 모의 거래 여부
 
         Returns:
-            str: 생성된 해시 키
+            str: 해시 키 또는 실패 시 None
         """
-        if is_mock:
-            url = "https://openapivts.koreainvestment.com:29443/uapi/hashkey"
-            self._set_headers(is_mock=True)
+        hashkey = self._cached_hashkey(payload, is_mock)
+        if hashkey is not None:
+            return hashkey
 
+        if is_mock:
+            url = f"{self.mock_url}/uapi/hashkey"
         else:
-            url = "https://openapi.koreainvestment.com:9443/uapi/hashkey"
-            self._set_headers(is_mock=False)
-
+            url = f"{self.real_url}/uapi/hashkey"
 
-        
         try:
-            response = requests.post(url=url, headers=self.headers, data=json.dumps(body), timeout=10)
+            response = self._request("POST", url, is_mock=is_mock, headers=self._build_headers(is_mock=is_mock), data=payload, timeout=10)
             response.raise_for_status()
-            tmp = response.json()
-            self.hashkey = tmp['HASH']
+            hashkey = decode_json(response)['HASH']
         except requests.exceptions.RequestException as e:
-            print(f"An error occurred while fetching the hash key: {e}")
+            logging.error("An error occurred while fetching the hash key: %s", e)
+            return None
+        self._remember_hashkey(payload, is_mock, hashkey)
+        return hashkey
 
 ######################################################################################
 #########################    상한가 관련 메서드   #######################################
 ######################################################################################
 
-    def get_stock_price(self, ticker):
+    def get_stock_price(self, ticker, max_age=0):
         """
         지정된 종목의 현재 주가 정보를 가져옵니다.
 
         Args:
             ticker (str): 종목 코드
+            max_age (float): 현재가 캐시에서 허용하는 응답 나이(초). 0이면 항상 새로 조회
 
         Returns:
             dict: 주가 정보를 포함한 딕셔너리
         """
-        self._set_headers(is_mock=False, tr_id="FHPST01010000")
-        url = "https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/quotations/inquire-price-2"
+        return quote_cache.get(ticker, lambda: self._fetch_stock_price(ticker), max_age)
+
+    def _fetch_stock_price(self, ticker):
+        headers = self._build_headers(is_mock=False, tr_id="FHPST01010000")
+        url = f"{self.real_url}/uapi/domestic-stock/v1/quotations/inquire-price-2"
         params = {
             "FID_COND_MRKT_DIV_CODE": "J",
             "FID_INPUT_ISCD": ticker
         }
-        response = requests.get(url=url, params=params, headers=self.headers, timeout=10)
-        json_response = response.json()
+        response = self._request("GET", url, is_mock=False, params=params, headers=headers, timeout=10)
+        json_response = decode_json(response)
         # print(json.dumps(json_response,indent=2))
 
         return json_response
@@ -199,7 +424,7 @@ class KISApi:
         Returns:
             dict: 상한가 종목 정보를 포함한 딕셔너리
         """
-        url = "https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/quotations/capture-uplowprice"
+        url = f"{self.real_url}/uapi/domestic-stock/v1/quotations/capture-uplowprice"
         body = {
             "FID_COND_MRKT_DIV_CODE": "J",
             "FID_COND_SCR_DIV_CODE": "11300",
@@ -212,13 +437,11 @@ class KISApi:
             "FID_INPUT_PRICE_2": "",
             "FID_VOL_CNT": ""
         }
-        self._get_hashkey(body, is_mock=False)
-        self._set_headers(is_mock=False, tr_id="FHKST130000C0")
-        self.headers["hashkey"] = self.hashkey
+        headers = self._build_headers(is_mock=False, tr_id="FHKST130000C0")
         
-        response = requests.get(url=url, headers=self.headers, params=body, timeout=10)
+        response = self._request("GET", url, is_mock=False, headers=headers, params=body, timeout=10)
         
-        upper_limit_stocks = response.json()
+        upper_limit_stocks = decode_json(response)
         return upper_limit_stocks
 
 
@@ -229,7 +452,7 @@ class KISApi:
         Returns:
             dict: 상승/하락 순위 정보를 포함한 딕셔너리
         """
-        url = "https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/ranking/fluctuation"
+        url = f"{self.real_url}/uapi/domestic-stock/v1/ranking/fluctuation"
         body = {
             "fid_cond_mrkt_div_code":"J",
             "fid_cond_scr_div_code":"20170",
@@ -249,13 +472,11 @@ class KISApi:
             "fid_input_date_2": "20241124"
         }
         
-        self._get_hashkey(body, is_mock=False)
-        self._set_headers(is_mock=False, tr_id="FHPST01700000")
-        self.headers["hashkey"] = self.hashkey
+        headers = self._build_headers(is_mock=False, tr_id="FHPST01700000")
         
-        response = requests.get(url=url, headers=self.headers, params=body, timeout=10)
+        response = self._request("GET", url, is_mock=False, headers=headers, params=body, timeout=10)
         
-        updown = response.json()
+        updown = decode_json(response)
         # print('상승 종목: ',json.dumps(updown, indent=2, ensure_ascii=False))
         return updown
 
@@ -264,9 +485,9 @@ class KISApi:
         분봉 데이터를 요청합니다. (inquire-time-dailychartprice)
         """
         tr_id = "FHKST03010230"
-        self._set_headers(is_mock=False, tr_id=tr_id)
+        headers = self._build_headers(is_mock=False, tr_id=tr_id)
         
-        url = "https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/quotations/inquire-time-dailychartprice"
+        url = f"{self.real_url}/uapi/domestic-stock/v1/quotations/inquire-time-dailychartprice"
         
         params = {
             "FID_COND_MRKT_DIV_CODE": "J",
@@ -278,10 +499,9 @@ class KISApi:
         }
         
         try:
-            with self._global_api_lock:
-                response = requests.get(url=url, params=params, headers=self.headers, timeout=10)
-                response.raise_for_status()
-            return response.json()
+            response = self._request("GET", url, is_mock=False, params=params, headers=headers, timeout=10)
+            response.raise_for_status()
+            return decode_json(response)
         except requests.exceptions.RequestException as e:
             logging.error(f"분봉 데이터 조회 중 오류 발생 (ticker: {ticker}, date: {date}, time: {time}): {e}")
             return None
@@ -300,18 +520,19 @@ class KISApi:
         formatted_response = json.loads(json.dumps(response, default=unicode_to_korean_converter))
         print(json.dumps(formatted_response, ensure_ascii=False, indent=2))
 
-    def get_current_price(self, ticker: str) -> tuple[int, str]:
+    def get_current_price(self, ticker: str, max_age: float = 0) -> tuple[int, str]:
         """
         지정된 종목의 현재 주가 정보를 가져옵니다.
 
         Args:
             ticker (str): 종목 코드
+            max_age (float): 현재가 캐시에서 허용하는 응답 나이(초)
 
         Returns:
             tuple: (현재가(int), 거래정지여부(str)) 또는 (None, None) if error
         """
         try:
-            stock_price_info = self.get_stock_price(ticker)
+            stock_price_info = self.get_stock_price(ticker, max_age)
             
             if not stock_price_info or 'output' not in stock_price_info:
                 print(f"주가 정보 조회 실패: {ticker}")
@@ -337,6 +558,63 @@ class KISApi:
             print(f"get_current_price 에러: {ticker}, {e}")
             return 0, "0"
 
+    def get_multi_stock_prices(self, tickers):
+        """
+        여러 종목의 현재가를 관심종목(멀티종목) 시세조회로 한 번에 가져옵니다. (요청당 최대 30종목)
+
+        응답을 종목별 레코드로 나누어 반환하며, 실패한 묶음이나 응답에 없는 종목은 결과에서 빠지므로
+        호출하는 쪽에서 get_stock_price로 개별 조회합니다.
+        멀티종목 응답에는 단기과열(short_over_yn)/거래정지(trht_yn) 필드가 없으므로 경고 판정은 check_market_warnings로 합니다.
+
+        Args:
+            tickers (Iterable[str]): 종목 코드 목록
+
+        Returns:
+            dict: {종목코드: {'stck_prpr', 'hts_kor_isnm', 'stck_hgpr', 'acml_vol'}}
+        """
+        url = f"{self.real_url}/uapi/domestic-stock/v1/quotations/intstock-multprice"
+        unique_tickers = list(dict.fromkeys(ticker for ticker in tickers if ticker))
+        records = {}
+        for start in range(0, len(unique_tickers), MULTI_PRICE_MAX_TICKERS):
+            chunk = unique_tickers[start:start + MULTI_PRICE_MAX_TICKERS]
+            params = {}
+            for index, ticker in enumerate(chunk, start=1):
+                params[f"FID_COND_MRKT_DIV_CODE_{index}"] = "J"
+                params[f"FID_INPUT_ISCD_{index}"] = ticker
+            headers = self._build_headers(is_mock=False, tr_id="FHKST11300006")
+            try:
+                response = self._request("GET", url, is_mock=False, params=params, headers=headers, timeout=10)
+                response.raise_for_status()
+                output = decode_json(response).get('output') or []
+            except (RequestException, ValueError) as e:
+                logging.error("멀티종목 시세 조회 실패 (%s종목): %s", len(chunk), e)
+                continue
+
+            wanted = set(chunk)
+            for row in output:
+                ticker = row.get('inter_shrn_iscd')
+                if ticker in wanted:
+                    records[ticker] = {
+                        'stck_prpr': row.get('inter2_prpr'),
+                        'hts_kor_isnm': row.get('inter_kor_isnm'),
+                        'stck_hgpr': row.get('inter2_hgpr'),
+                        'acml_vol': row.get('acml_vol'),
+                    }
+        return records
+
+    def check_market_warnings(self, ticker, max_age=0):
+        """
+        단기과열/거래정지 종목이 아니면 True를 반환합니다. (주식현재가 시세2 응답의 short_over_yn, trht_yn)
+
+        Args:
+            ticker (str): 종목 코드
+            max_age (float): 현재가 캐시에서 허용하는 응답 나이(초)
+        """
+        record = (self.get_stock_price(ticker, max_age) or {}).get('output')
+        if not record:
+            return False
+        return record.get('short_over_yn', 'N') == 'N' and record.get('trht_yn', 'N') == 'N'
+
     # def get_balance(self):
     #     """
     #     계좌 예수금 확인 및 return
@@ -362,7 +640,7 @@ class KISApi:
     #     self._set_headers(is_mock=True, tr_id="VTTC8434R")
     #     self.headers["hashkey"] = self.hashkey
         
-    #     response = requests.get(url=url, headers=self.headers, params=body, timeout=10)
+    #     response = http_get(url=url, headers=self.headers, params=body, timeout=10)
     #     json_response = response.json()
     #     # print(json.dumps(json_response, indent=2))
     #     # print(json.dumps(json_response.get('output2')[0].get('dnca_tot_amt'), indent=2))
@@ -401,7 +679,7 @@ class KISApi:
         # --- 시장·지정가 구분 및 가격 선정 ---
         # price 가 None 이면 시장가, 지정가면 입력값 사용
         if price is None:
-            price_to_use, _ = self.get_current_price(ticker)
+            price_to_use, _ = self.get_current_price(ticker, QUOTE_MAX_AGE_ORDER)
         else:
             price_to_use = price
 
@@ -435,23 +713,34 @@ class KISApi:
             "ORD_UNPR": "0" if price is None else str(price),
         }
         # hashkey 생성 및 헤더 설정
-        self._get_hashkey(data, is_mock=True)
-        self._set_headers(is_mock=True, tr_id=tr_id_code)
-        self.headers["hashkey"] = self.hashkey
-        url = "https://openapivts.koreainvestment.com:29443/uapi/domestic-stock/v1/trading/order-cash"
-
-        for attempt in range(1, 4):
+        # hashkey는 주문 POST에만 필요하며, 해시를 계산한 본문과 같은 바이트를 전송합니다.
+        payload = self._canonical_body(data)
+        hashkey = self._get_hashkey(payload, is_mock=True)
+        headers = self._build_headers(is_mock=True, tr_id=tr_id_code, hashkey=hashkey)
+        url = f"{self.mock_url}/uapi/domestic-stock/v1/trading/order-cash"
+
+        # 전송 실패는 ORDER_SEND_RETRY 정책으로 재시도합니다. (서킷 브레이커 차단/작업 마감 초과는 재시도해도 소용없으므로 바로 실패)
+        error = None
+        for attempt in ORDER_SEND_RETRY.attempts():
             try:
-                with KISApi._global_api_lock:
-                    response = requests.post(url=url, data=json.dumps(data), headers=self.headers, timeout=10)
+                # 주문 간 간격은 호출 한도 제한기(ORDER 버킷)가 맞추므로 별도 전역 락 없이 전송합니다.
+                response = self._request("POST", url, is_mock=True, endpoint_class=ORDER,
+                                         rate_limit_retry=ORDER_RATE_LIMIT_RETRY,
+                                         data=payload, headers=headers, timeout=10)
                 response.raise_for_status()
-                return response.json()
+                result = decode_json(response)
+                # 주문이 접수되면 곧 잔고가 바뀌므로 잔고 스냅샷을 무효화합니다.
+                if result.get('rt_cd') == '0':
+                    balance_snapshot.invalidate()
+                return result
+            except (CircuitOpenError, DeadlineExceeded) as e:
+                error = e
+                break
             except RequestException as e:
-                logging.error("[place_order] API 호출 실패(%s/3): %s", attempt, e)
-                if attempt < 3:
-                    time.sleep(1)
-                    continue
-                return {"rt_cd": "1", "msg_cd": "50000000", "msg1": f"API 호출 실패: {e}"}
+                error = e
+                logging.error("[place_order] API 호출 실패(%s/%s): %s", attempt, ORDER_SEND_RETRY.max_attempts, e)
+        logging.error("[place_order] 주문 전송 포기: %s", error)
+        return {"rt_cd": "1", "msg_cd": "50000000", "msg1": f"API 호출 실패: {error}"}
 
 
     # def sell_order(self, ticker, quantity, price=None):
@@ -483,7 +772,7 @@ class KISApi:
     #     for attempt in range(1, 4):
     #         try:
     #             with KISApi._global_api_lock:
-    #                 response = requests.post(url=url, data=json.dumps(data), headers=self.headers, timeout=10)
+    #                 response = http_post(url=url, data=json.dumps(data), headers=self.headers, timeout=10)
     #             response.raise_for_status()
     #             return response.json()
     #         except RequestException as e:
@@ -502,7 +791,7 @@ class KISApi:
         # 주문번호는 8자리로 맞춰야 함
         order_num = str(order_num).zfill(8)
         
-        url = "https://openapivts.koreainvestment.com:29443/uapi/domestic-stock/v1/trading/order-rvsecncl"
+        url = f"{self.mock_url}/uapi/domestic-stock/v1/trading/order-rvsecncl"
         body = {
             "CANO": M_ACCOUNT_NUMBER,
             "ACNT_PRDT_CD": "01",
@@ -515,12 +804,12 @@ class KISApi:
             "QTY_ALL_ORD_YN": "Y"
         }
 
-        self._get_hashkey(body, is_mock=True)
-        self._set_headers(is_mock=True, tr_id="VTTC0803U")
-        self.headers["hashkey"] = self.hashkey
+        payload = self._canonical_body(body)
+        hashkey = self._get_hashkey(payload, is_mock=True)
+        headers = self._build_headers(is_mock=True, tr_id="VTTC0803U", hashkey=hashkey)
         
-        response = requests.post(url=url, headers=self.headers, json=body, timeout=10)
-        json_response = response.json()
+        response = self._request("POST", url, is_mock=True, endpoint_class=ORDER, headers=headers, data=payload, timeout=10)
+        json_response = decode_json(response)
         
         return json_response
 
@@ -534,7 +823,7 @@ class KISApi:
         # 주문번호는 8자리로 맞춰야 함
         order_num = str(order_num).zfill(8)
         
-        url = "https://openapivts.koreainvestment.com:29443/uapi/domestic-stock/v1/trading/order-rvsecncl"
+        url = f"{self.mock_url}/uapi/domestic-stock/v1/trading/order-rvsecncl"
         body = {
             "CANO": M_ACCOUNT_NUMBER,
             "ACNT_PRDT_CD": "01",
@@ -547,12 +836,12 @@ class KISApi:
             "QTY_ALL_ORD_YN": "Y",
             "ALGO_NO": ""
         }
-        self._get_hashkey(body, is_mock=True)
-        self._set_headers(is_mock=True, tr_id="VTTC0803U")
-        self.headers["hashkey"] = self.hashkey
+        payload = self._canonical_body(body)
+        hashkey = self._get_hashkey(payload, is_mock=True)
+        headers = self._build_headers(is_mock=True, tr_id="VTTC0803U", hashkey=hashkey)
         
-        response = requests.post(url=url, headers=self.headers, json=body, timeout=10)
-        json_response = response.json()
+        response = self._request("POST", url, is_mock=True, endpoint_class=ORDER, headers=headers, data=payload, timeout=10)
+        json_response = decode_json(response)
         
         return json_response
 
@@ -561,7 +850,7 @@ class KISApi:
         """
         주문가능조회
         """
-        url = "https://openapivts.koreainvestment.com:29443/uapi/domestic-stock/v1/trading/inquire-psbl-order"
+        url = f"{self.mock_url}/uapi/domestic-stock/v1/trading/inquire-psbl-order"
         body = {
             "CANO": M_ACCOUNT_NUMBER,
             "ACNT_PRDT_CD": "01",
@@ -572,33 +861,36 @@ class KISApi:
             "OVRS_ICLD_YN": "N"
         }
         
-        self._get_hashkey(body, is_mock=True)
-        self._set_headers(is_mock=True, tr_id="VTTC8908R")
-        self.headers["hashkey"] = self.hashkey
+        headers = self._build_headers(is_mock=True, tr_id="VTTC8908R")
 
-        response = requests.get(url=url, headers=self.headers, params=body, timeout=10)
-        json_response = response.json()
+        response = self._request("GET", url, is_mock=True, headers=headers, params=body, timeout=10)
+        json_response = decode_json(response)
         
         return json_response
     
     def get_available_cash(self):
         """현재 주문가능 현금(모의투자 서버 기준)을 정수로 반환합니다. 실패 시 0."""
         try:
-            resp = self.purchase_availability_inquiry()
-            if not resp:
-                return 0
-            target = None
-            if 'output' in resp and resp['output']:
-                target = resp['output'][0] if isinstance(resp['output'], list) else resp['output']
-            elif 'output1' in resp and resp['output1']:
-                target = resp['output1'][0] if isinstance(resp['output1'], list) else resp['output1']
-            if target:
-                cash_str = target.get('ord_psbl_cash') or target.get('ord_psbl_cash_amt') or '0'
-                return int(str(cash_str).replace(',', ''))
+            return self.parse_available_cash(self.purchase_availability_inquiry())
         except Exception as e:
             logging.error("get_available_cash error: %s", e)
         return 0
 
+    @staticmethod
+    def parse_available_cash(resp):
+        """주문가능조회 응답에서 주문가능 현금을 정수로 꺼냅니다. 값이 없으면 0."""
+        if not resp:
+            return 0
+        target = None
+        if 'output' in resp and resp['output']:
+            target = resp['output'][0] if isinstance(resp['output'], list) else resp['output']
+        elif 'output1' in resp and resp['output1']:
+            target = resp['output1'][0] if isinstance(resp['output1'], list) else resp['output1']
+        if target:
+            cash_str = target.get('ord_psbl_cash') or target.get('ord_psbl_cash_amt') or '0'
+            return int(str(cash_str).replace(',', ''))
+        return 0
+
 ######################################################################################
 ################################    잔고 메서드   ###################################
 ######################################################################################
@@ -610,7 +902,7 @@ class KISApi:
         today = datetime.now(KST)
         formatted_date = today.strftime('%Y%m%d')
         # url="https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/trading/inquire-daily-ccld"
-        url="https://openapivts.koreainvestment.com:29443/uapi/domestic-stock/v1/trading/inquire-daily-ccld"
+        url=f"{self.mock_url}/uapi/domestic-stock/v1/trading/inquire-daily-ccld"
         body = {
             "CANO": M_ACCOUNT_NUMBER,
             "ACNT_PRDT_CD": "01",
@@ -629,12 +921,10 @@ class KISApi:
             "CTX_AREA_NK100": "",
         }
 
-        self._get_hashkey(body, is_mock=True)
-        self._set_headers(is_mock=True, tr_id="VTTC8001R")
-        self.headers["hashkey"] = self.hashkey
+        headers = self._build_headers(is_mock=True, tr_id="VTTC8001R")
         
-        response = requests.get(url=url, headers=self.headers, params=body, timeout=10)
-        response_json = response.json()        
+        response = self._request("GET", url, is_mock=True, headers=headers, params=body, timeout=10)
+        response_json = decode_json(response)        
         # print(json.dumps(response_json, indent=2, ensure_ascii=False))
 
         return response_json
@@ -643,10 +933,22 @@ class KISApi:
 
 
 
-    def balance_inquiry(self, max_retries: int = 3, retry_delay: float = 1.0):
+    def balance_inquiry(self, max_age: float = 0):
+        """
+        계좌 보유 종목 목록(output1)을 잔고 스냅샷을 거쳐 반환합니다.
 
+        Args:
+            max_age: 허용하는 스냅샷 나이(초). 0이면 항상 새로 조회
+
+        Returns:
+            List[Dict]: 전체 페이지의 보유 종목 목록. 조회 실패 시 None
+        """
+        return balance_snapshot.get(self._fetch_balance, max_age)
+
+    def _fetch_balance(self):
+        """잔고 조회 API를 연속 조회 키(CTX_AREA_FK100/NK100)로 마지막 페이지까지 호출합니다."""
         # url="https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/trading/inquire-daily-ccld"
-        url="https://openapivts.koreainvestment.com:29443/uapi/domestic-stock/v1/trading/inquire-balance"
+        url=f"{self.mock_url}/uapi/domestic-stock/v1/trading/inquire-balance"
         body = {
             "CANO": M_ACCOUNT_NUMBER,
             "ACNT_PRDT_CD": "01",
@@ -660,19 +962,28 @@ class KISApi:
             "CTX_AREA_FK100": "",
             "CTX_AREA_NK100": "",
         }
-                
-        # 전역 락을 사용하여 동시 호출 방지
-        with KISApi._global_api_lock:
-            self._get_hashkey(body, is_mock=True)
-            self._set_headers(is_mock=True, tr_id="VTTC8434R")
-            local_headers = self.headers.copy()
-            local_headers["hashkey"] = self.hashkey
-            response = requests.get(url=url, headers=local_headers, params=body, timeout=10)
-        json_response = response.json()
-        output1 = json_response.get("output1")
-
-        # List[Dict] -> Dict 반환
-        return output1
+
+        holdings = None
+        for page in range(BALANCE_MAX_PAGES):
+            # 요청마다 헤더를 새로 만들므로 다른 조회와 동시에 호출해도 안전합니다. (조회 API는 hashkey 불필요)
+            headers = self._build_headers(is_mock=True, tr_id="VTTC8434R")
+            if page > 0:
+                headers["tr_cont"] = "N"  # 연속 조회
+            response = self._request("GET", url, is_mock=True, headers=headers, params=body, timeout=10)
+            json_response = decode_json(response)
+            output1 = json_response.get("output1")
+            if output1 is None:
+                break
+            holdings = (holdings or []) + output1
+
+            # 응답 헤더 tr_cont가 F/M이면 다음 페이지가 있습니다.
+            if response.headers.get("tr_cont") not in BALANCE_CONTINUE_FLAGS:
+                break
+            body["CTX_AREA_FK100"] = json_response.get("ctx_area_fk100", "")
+            body["CTX_AREA_NK100"] = json_response.get("ctx_area_nk100", "")
+
+        # List[Dict] 반환
+        return holdings
 
     
 
@@ -682,8 +993,8 @@ class KISApi:
 
     def get_volume_rank(self):
         """ 거래량 상위 종목 조회 """
-        self._set_headers(tr_id="FHPST01710000")
-        url = "https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/quotations/volume-rank"
+        headers = self._build_headers(tr_id="FHPST01710000")
+        url = f"{self.real_url}/uapi/domestic-stock/v1/quotations/volume-rank"
         body = {
             "FID_COND_MRKT_DIV_CODE": "J",
             "FID_COND_SCR_DIV_CODE": "20171",
@@ -698,9 +1009,9 @@ class KISApi:
             "FID_INPUT_DATE_1": ""
         }
 
-        response = requests.get(url=url, params=body, headers=self.headers, timeout=10)
+        response = self._request("GET", url, is_mock=False, params=body, headers=headers, timeout=10)
         response.raise_for_status()
-        response_json = response.json()
+        response_json = decode_json(response)
         # print(json.dumps(response_json, indent=2, ensure_ascii=False))
         
         return response_json
@@ -722,7 +1033,7 @@ class KISApi:
         end_date = datetime.now(KST).strftime("%Y%m%d")
         start_date = (datetime.now(KST) - timedelta(days=days)).strftime("%Y%m%d")
         
-        url = "https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/quotations/inquire-daily-price"
+        url = f"{self.real_url}/uapi/domestic-stock/v1/quotations/inquire-daily-price"
         body = {
             "FID_COND_MRKT_DIV_CODE": "J",
             "FID_INPUT_ISCD": ticker,
@@ -731,11 +1042,10 @@ class KISApi:
             # "ST_DATE": start_date,
             # "END_DATE": end_date
         }
-        self._get_hashkey(body, is_mock=False)
-        self._set_headers(is_mock=False, tr_id="FHKST01010400")
+        headers = self._build_headers(is_mock=False, tr_id="FHKST01010400")
         
-        response = requests.get(url=url, params=body, headers=self.headers, timeout=10)
-        json_response = response.json()
+        response = self._request("GET", url, is_mock=False, params=body, headers=headers, timeout=10)
+        json_response = decode_json(response)
         
         # print(json.dumps(json_response, indent=2, e_ascii=False))
         
@@ -766,20 +1076,17 @@ class KISApi:
         return round(diff_1_2, 2), round(diff_2_3, 2)
     
     def get_basic_stock_info(self, ticker):
-        self._set_headers(tr_id="FHPST01710000")
-        url = "https://openapi.koreainvestment.com:9443/uapi/domestic-stock/v1/quotations/search-stock-info"
+        url = f"{self.real_url}/uapi/domestic-stock/v1/quotations/search-stock-info"
         body = {
             "PRDT_TYPE_CD": "300",
             "PDNO": ticker
         }
 
-        self._get_hashkey(body, is_mock=False)
-        self._set_headers(is_mock=False, tr_id="CTPF1002R")
-        self.headers["hashkey"] = self.hashkey
+        headers = self._build_headers(is_mock=False, tr_id="CTPF1002R")
 
-        response = requests.get(url=url, params=body, headers=self.headers, timeout=10)
+        response = self._request("GET", url, is_mock=False, params=body, headers=headers, timeout=10)
         response.raise_for_status()
-        response_json = response.json()
+        response_json = decode_json(response)
         # print(json.dumps(response_json, indent=2, ensure_ascii=False))
         
         return response_json
@@ -1,4 +1,4 @@
-import json
+import base64
 import requests
 import logging
 import time
@@ -6,30 +6,42 @@ import asyncio
 import websockets
 from requests.exceptions import RequestException
 from websockets.exceptions import ConnectionClosed
-from config.config import R_APP_KEY, R_APP_SECRET, M_APP_KEY, M_APP_SECRET
+from config.config import R_APP_KEY, R_APP_SECRET, M_APP_KEY, M_APP_SECRET, HTS_ID
 from config.condition import (
     SELLING_POINT_UPPER,
     RISK_MGMT_UPPER,
     RISK_MGMT_STRONG_MOMENTUM,
     KRX_TRADING_START,
     KRX_TRADING_END,
-    TRAILING_STOP_PERCENTAGE
+    TRAILING_STOP_PERCENTAGE,
+    BALANCE_MAX_AGE_MONITOR
 )
 from utils.trading_logger import TradingLogger
 from utils.slack_logger import SlackLogger
+from utils import json_codec
 from datetime import datetime, timedelta, time
 from database.db_manager_upper import DatabaseManager
 from api.kis_api import KISApi
+from api.async_kis_api import AsyncKISApi
+from api.credential_cache import credential_cache, WS_APPROVAL
+from api.order_tracker import order_tracker, ExecutionNotice, EXECUTION_NOTICE_TR_IDS
+from api.balance_cache import balance_snapshot
+
+
+def _require_aes():
+    """체결통보 복호화용 AES 모듈을 불러옵니다. 설치되어 있지 않으면 안내 메시지와 함께 ImportError를 발생시킵니다."""
+    try:
+        from Crypto.Cipher import AES
+        from Crypto.Util.Padding import unpad
+    except ImportError as e:
+        raise ImportError("체결통보를 받으려면 pycryptodome을 설치하세요. (pip install pycryptodome)") from e
+    return AES, unpad
 
 
 
 class KISWebSocket:
-    def __init__(self, callback=None):
+    def __init__(self, callback=None, async_kis_api=None):
         self.db_manager = DatabaseManager()
-        self.real_approval = None
-        self.mock_approval = None
-        self.real_approval_expires_at = None
-        self.mock_approval_expires_at = None
         self.hashkey = None
         self.upper_limit_stocks = {}
         # sell_order 콜백 (필수)
@@ -59,7 +71,8 @@ class KISWebSocket:
         self.LOCK_TIMEOUT = 10
         self.recv_lock = asyncio.Lock()
         self.kis_api = KISApi()
-        self.api_lock = asyncio.Lock()
+        # 매도 콜백과 같은 비동기 클라이언트를 공유하여 연결 풀을 함께 사용합니다.
+        self.async_kis_api = async_kis_api or AsyncKISApi(self.kis_api)
         # 매수 중인 종목 추적 (key: 종목코드, value: 매수 중 상태)
         self.buying_in_progress = {}
         self.buy_status_lock = asyncio.Lock()
@@ -69,6 +82,10 @@ class KISWebSocket:
         self.global_sell_semaphore = asyncio.Semaphore(1)
         # 티커별 매도 락 (key: 종목코드, value: 락 객체)
         self.ticker_sell_locks = {}
+        # 진행 중인 비동기 매도 작업 (모니터 작업이 취소되어도 끝까지 실행되도록 참조 유지)
+        self.sell_tasks = set()
+        # 체결통보 복호화 키/IV (구독 성공 응답으로 받음)
+        self.notice_cipher = None
 
 
     ######################################################################################
@@ -213,20 +230,28 @@ class KISWebSocket:
                     self.logger.error(f"{ticker} - 세션 없음 - 모니터링 중단 중 오류: {str(e)}")
                 return True  # True 반환하여 모니터링 루프가 종료되도록 함
 
-            # 매도 실행
-            try:
-                loop = asyncio.get_event_loop()
-                sell_results = await asyncio.wait_for(
-                    loop.run_in_executor(
-                        None,
-                        self._sell_order,
-                        session_id, ticker, target_price
-                    ),
-                        timeout=30.0  # 30초 타임아웃
+            # 매도 실행 (비동기 콜백은 이벤트 루프에서 바로 실행하고, 동기 콜백만 스레드 풀을 거칩니다)
+            if asyncio.iscoroutinefunction(self._sell_order):
+                # 코루틴을 취소하면 주문/정정과 세션 정리 사이에서 끊겨 미체결 주문과 세션이 남으므로
+                # 시간 제한을 두지 않고(sell_order_async가 장 마감을 작업 마감으로 둠),
+                # 모니터 작업이 취소되어도 매도는 끝까지 진행되도록 shield로 감쌉니다.
+                sell_task = asyncio.create_task(self._sell_order(session_id, ticker, target_price))
+                self.sell_tasks.add(sell_task)
+                sell_task.add_done_callback(self.sell_tasks.discard)
+                sell_results = await asyncio.shield(sell_task)
+            else:
+                try:
+                    sell_results = await asyncio.wait_for(
+                        asyncio.get_running_loop().run_in_executor(
+                            None,
+                            self._sell_order,
+                            session_id, ticker, target_price
+                        ),
+                        timeout=30.0  # 30초 타임아웃 (스레드의 매도는 계속 실행됨)
                     )
-            except asyncio.TimeoutError:
-                self.logger.error(f"{ticker} 매도 주문 타임아웃 (30초)")
-                return False
+                except asyncio.TimeoutError:
+                    self.logger.error(f"{ticker} 매도 주문 타임아웃 (30초)")
+                    return False
 
             # 매도 결과 처리
             sell_duration_ms = (datetime.now() - start_time).total_seconds() * 1000
@@ -306,96 +331,10 @@ class KISWebSocket:
     ##############################    인증 관련 메서드   #####################################
     ######################################################################################
 
-    async def _get_approval(
-        self, app_key, app_secret, approval_type, max_retries=3, retry_delay=5
-    ):
-        """
-        웹소켓 인증키 발급
-        """
-
-        cached_approval, cached_expires_at = self.db_manager.get_approval(approval_type)
-        if cached_approval and cached_expires_at:
-            # cached_expires_at이 문자열이면 datetime 객체로 변환
-            if isinstance(cached_expires_at, str):
-                try:
-                    cached_expires_at = datetime.fromisoformat(cached_expires_at)
-                except (ValueError, TypeError) as e:
-                    logging.error(f"Failed to parse cached_expires_at: {e}")
-                    cached_expires_at = None
-            
-            # datetime 객체인 경우에만 비교
-            if cached_expires_at and hasattr(cached_expires_at, '__gt__'):
-                if not isinstance(cached_expires_at, datetime):
-                    try:
-                        if isinstance(cached_expires_at, str):
-                            cached_expires_at = datetime.fromisoformat(cached_expires_at)
-                        elif isinstance(cached_expires_at, (int, float)):
-                            cached_expires_at = datetime.fromtimestamp(cached_expires_at)
-                        # 다른 타입들에 대한 변환 로직 추가 가능
-                    except (ValueError, TypeError) as e:
-                        logging.error(f"Failed to convert cached_expires_at: {e}")
-                        cached_expires_at = None
-                
-                # datetime 객체인지 다시 확인 후 비교
-                if isinstance(cached_expires_at, datetime) and cached_expires_at > datetime.utcnow():
-                    logging.info("Using cached %s approval", approval_type)
-                    return cached_approval, cached_expires_at
-
-        url = "https://openapi.koreainvestment.com:9443/oauth2/Approval"
-        headers = {"content-type": "application/json; utf-8"}
-        body = {
-            "grant_type": "client_credentials",
-            "appkey": app_key,
-            "secretkey": app_secret,
-        }
-
-        for attempt in range(max_retries):
-            try:
-                response = requests.post(url, headers=headers, json=body, timeout=10)
-                response.raise_for_status()
-                approval_data = response.json()
-
-                if "approval_key" in approval_data:
-                    self.approval_key = approval_data["approval_key"]
-
-                    expires_at = datetime.utcnow() + timedelta(seconds=86400)
-
-                    # Save the new approval_key to the database
-                    self.db_manager.save_approval(
-                        approval_type, self.approval_key, expires_at
-                    )
-
-                    logging.info(
-                        "Successfully obtained and cached %s approval_key on attempt %d",
-                        approval_type,
-                        attempt + 1,
-                    )
-                    return self.approval_key, expires_at
-                else:
-                    logging.warning(
-                        "Unexpected response format on attempt %d: %s",
-                        attempt + 1,
-                        approval_data,
-                    )
-            except RequestException as e:
-                logging.error(
-                    "An error occurred while fetching the %s approval_key on attempt %d: %s",
-                    approval_type,
-                    attempt + 1,
-                    e,
-                )
-                if attempt < max_retries - 1:
-                    logging.info("Retrying in %d seconds...", retry_delay)
-                    await asyncio.sleep(retry_delay)
-                else:
-                    logging.error(
-                        "Max retries reached. Unable to obtain %s approval_key.",
-                        approval_type,
-                    )
-
     async def _ensure_approval(self, is_mock):
         """
         유효한 웹소켓 인증키가 있는지 확인하고, 필요한 경우 새 인증키를 가져옵니다.
+        인증키는 프로세스 전역 캐시에서 공유하며, 발급은 이벤트 루프를 막지 않도록 별도 스레드에서 수행합니다.
 
         Args:
             is_mock (bool): 모의 거래 여부
@@ -403,22 +342,11 @@ class KISWebSocket:
         Returns:
             str: 유효한 액세스 인증키
         """
-        # print("##########is_mock: ", is_mock)
-        now = datetime.now()
-        if is_mock:
-            if not self.mock_approval or self.mock_approval_expires_at is None or now >= self.mock_approval_expires_at:
-                (
-                    self.mock_approval,
-                    self.mock_approval_expires_at,
-                ) = await self._get_approval(M_APP_KEY, M_APP_SECRET, "mock")
-            return self.mock_approval
-        else:
-            if not self.real_approval or self.real_approval_expires_at is None or now >= self.real_approval_expires_at:
-                (
-                    self.real_approval,
-                    self.real_approval_expires_at,
-                ) = await self._get_approval(R_APP_KEY, R_APP_SECRET, "real")
-            return self.real_approval
+        approval = credential_cache.peek(WS_APPROVAL, "mock" if is_mock else "real")
+        if approval is None:
+            approval = await asyncio.to_thread(self.kis_api.ensure_approval, is_mock)
+        self.approval_key = approval
+        return approval
 
     ######################################################################################
     ##############################    웹소켓 연결   #######################################
@@ -650,8 +578,18 @@ class KISWebSocket:
                 # 구독 성공 메시지 체크
                 if "SUBSCRIBE SUCCESS" in data_str:
                     # JSON 파싱 시도
-                    data_dict = json.loads(data_str)
+                    data_dict = json_codec.loads(data_str)
                     ticker = data_dict["header"]["tr_key"]
+                    if data_dict["header"].get("tr_id") in EXECUTION_NOTICE_TR_IDS.values():
+                        output = data_dict.get("body", {}).get("output", {})
+                        self.notice_cipher = (output.get("key"), output.get("iv"))
+                        order_tracker.feed_active = True
+                        print("[WS] 체결통보 구독 성공")
+                    continue
+
+                # 체결통보 (암호화된 본문: "1|H0STCNI9|001|...")
+                if data_str[:1] in ("0", "1") and data_str[2:10] in EXECUTION_NOTICE_TR_IDS.values():
+                    self._handle_execution_notice(data_str)
                     continue
 
                 # # 실시간 호가 데이터일 경우
@@ -698,6 +636,8 @@ class KISWebSocket:
             print("웹소켓이 이미 연결되어 있어 connect_websocket 메서드 종료")
             return
 
+        # 재연결 후 구독 성공 응답을 받을 때까지는 체결통보를 받지 못합니다.
+        order_tracker.feed_active = False
         try:
             # 기존 웹소켓 정리
             if self.websocket:
@@ -727,6 +667,7 @@ class KISWebSocket:
             self.is_connected = True
             print(f"웹소켓 연결 성공! (ID: {id(self.websocket)})")
             print("이벤트 루프 저장 및 웹소켓 연결 성공")
+            await self.subscribe_execution_notice()
 
         except asyncio.TimeoutError:
             print("웹소켓 연결 타임아웃")
@@ -759,6 +700,7 @@ class KISWebSocket:
 
     async def _close_internal(self):
         self.is_connected = False
+        order_tracker.feed_active = False
 
         # 모든 활성 태스크 취소
         for ticker, task in list(self.active_tasks.items()):
@@ -788,6 +730,7 @@ class KISWebSocket:
                 print(f"웹소켓 종료 중 오류: {e}")
 
         # 리소스 정리
+        await self.async_kis_api.close()
         self.websocket = None
         self.subscribed_tickers.clear()
         self.ticker_queues.clear()
@@ -836,7 +779,7 @@ class KISWebSocket:
                 return
 
         try:
-            await self.websocket.send(json.dumps(request_data))
+            await self.websocket.send(json_codec.dumps(request_data))
             self.subscribed_tickers.add(ticker)
             # print(f"종목 구독 성공: {ticker}")
         except Exception as e:
@@ -853,6 +796,59 @@ class KISWebSocket:
                 await self._close_internal()
                 self.websocket = None
 
+    async def subscribe_execution_notice(self, is_mock=True):
+        """
+        계좌 실시간 체결통보를 구독합니다. (HTS_ID 미설정 시 구독하지 않고 REST 체결 조회만 사용)
+        """
+        if not HTS_ID:
+            return False
+        try:
+            _require_aes()
+        except ImportError as e:
+            self.logger.warning(f"체결통보 구독 건너뜀: {e}")
+            return False
+
+        request_data = {
+            "header": {**self.connect_headers, "tr_type": "1"},
+            "body": {
+                "input": {
+                    "tr_id": EXECUTION_NOTICE_TR_IDS[is_mock],  # 실시간 체결통보 TR ID
+                    "tr_key": HTS_ID,
+                }
+            },
+        }
+        try:
+            await self.websocket.send(json_codec.dumps(request_data))
+            return True
+        except Exception as e:
+            self.logger.error(f"체결통보 구독 실패: {e}")
+            return False
+
+    def _handle_execution_notice(self, data_str):
+        """암호화된 체결통보를 복호화하여 주문 체결 추적기에 전달합니다."""
+        try:
+            encrypted, tr_id, _count, body = data_str.split("|", 3)
+            if encrypted == "1":
+                if self.notice_cipher is None:
+                    return
+                AES, unpad = _require_aes()
+                key, iv = self.notice_cipher
+                cipher = AES.new(key.encode("utf-8"), AES.MODE_CBC, iv.encode("utf-8"))
+                body = unpad(cipher.decrypt(base64.b64decode(body)), AES.block_size).decode("utf-8")
+            notice = ExecutionNotice.from_fields(body.split("^"))
+            order_tracker.publish(notice)
+            if notice.is_fill:
+                balance_snapshot.invalidate()  # 체결로 잔고가 바뀌었으므로 다음 조회에서 새로 받음
+                self.logger.info("체결통보 수신", {
+                    "주문번호": notice.order_no,
+                    "종목코드": notice.ticker,
+                    "구분": notice.side,
+                    "체결수량": notice.quantity,
+                    "체결단가": notice.price
+                })
+        except Exception as e:
+            self.logger.error(f"체결통보 처리 중 오류: {e}")
+
     async def unsubscribe_ticker(self, ticker):
         """종목 구독 취소"""
         if ticker not in self.subscribed_tickers:
@@ -877,7 +873,7 @@ class KISWebSocket:
         }
 
         try:
-            await self.websocket.send(json.dumps(request_data))
+            await self.websocket.send(json_codec.dumps(request_data))
             self.subscribed_tickers.discard(ticker)  # remove 대신 discard 사용
             print(f"종목 구독 취소 성공: {ticker}")
         except websockets.exceptions.ConnectionClosed:
@@ -1094,21 +1090,19 @@ class KISWebSocket:
         # 장 운영 시간 체크
         return market_start <= now <= market_end
 
-    async def check_balance_async(self, ticker):
-        """비동기적으로 종목의 잔고를 확인합니다."""
+    async def check_balance_async(self, ticker, max_age=BALANCE_MAX_AGE_MONITOR):
+        """비동기적으로 종목의 잔고를 확인합니다. (잔고 스냅샷이 max_age초 이내면 메모리에서 조회)"""
         try:
-            # API 락 획득 후 잔고 조회
-            async with self.api_lock:
-                balance_list = await asyncio.to_thread(self.kis_api.balance_inquiry)
-                if not balance_list:
-                    return None
-                
-                # 해당 종목 찾기
-                balance_data = next(
-                    (item for item in balance_list if item.get("pdno") == ticker),
-                    None
-                )
-                return balance_data
+            balance_list = await self.async_kis_api.balance_inquiry(max_age)
+            if not balance_list:
+                return None
+
+            # 해당 종목 찾기
+            balance_data = next(
+                (item for item in balance_list if item.get("pdno") == ticker),
+                None
+            )
+            return balance_data
         except Exception as e:
             self.logger.error(
                 "비동기 잔고 조회 실패",
@@ -0,0 +1,176 @@
+"""
+주문 체결 추적기 (실시간 체결통보 → 주문 대기자)
+
+KISWebSocket이 계좌 체결통보(H0STCNI0 실전 / H0STCNI9 모의)를 받아 publish()하면,
+주문을 낸 스레드는 wait_for_fill(), 이벤트 루프의 코루틴은 wait_for_fill_async()로
+전량 체결(또는 거부)이나 타임아웃까지 기다립니다.
+- 통보가 대기보다 먼저 도착해도 주문번호별 누적 체결 수량을 보관하므로 놓치지 않습니다.
+- 체결통보 구독이 끊겨 있으면(feed_active False) 대기자는 타임아웃까지 기다리므로,
+  호출하는 쪽은 기존처럼 REST 체결 조회로 확인합니다.
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# 체결통보 TR ID (실전 / 모의)
+EXECUTION_NOTICE_TR_IDS = {False: "H0STCNI0", True: "H0STCNI9"}
+
+# 체결통보 필드 순서 (복호화한 본문을 '^'로 나눈 값)
+NOTICE_FIELDS = (
+    "CUST_ID", "ACNT_NO", "ODER_NO", "OODER_NO", "SELN_BYOV_CLS", "RCTF_CLS", "ODER_KIND", "ODER_COND",
+    "STCK_SHRN_ISCD", "CNTG_QTY", "CNTG_UNPR", "STCK_CNTG_HOUR", "RFUS_YN", "CNTG_YN", "ACPT_YN",
+    "BRNC_NO", "ODER_QTY", "ACNT_NAME", "CNTG_ISNM", "CRDT_CLS", "CRDT_LOAN_DATE", "CNTG_ISNM40", "ODER_PRC",
+)
+
+# 주문번호별 상태 보관 시간(초)
+ORDER_STATE_RETENTION = 6 * 60 * 60
+
+
+def _to_int(value) -> int:
+    try:
+        return int(str(value).strip() or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclass
+class ExecutionNotice:
+    """체결통보 한 건"""
+    order_no: str
+    original_order_no: str
+    ticker: str
+    side: str            # 'sell' 또는 'buy'
+    quantity: int        # 이번 통보의 체결 수량 (접수 통보면 주문 수량)
+    price: int
+    order_qty: int
+    is_fill: bool        # True: 체결, False: 접수/정정/취소 확인
+    rejected: bool
+
+    @classmethod
+    def from_fields(cls, fields: List[str]) -> "ExecutionNotice":
+        row = dict(zip(NOTICE_FIELDS, fields))
+        return cls(
+            order_no=row.get("ODER_NO", ""),
+            original_order_no=row.get("OODER_NO", ""),
+            ticker=row.get("STCK_SHRN_ISCD", ""),
+            side="sell" if row.get("SELN_BYOV_CLS") == "01" else "buy",
+            quantity=_to_int(row.get("CNTG_QTY")),
+            price=_to_int(row.get("CNTG_UNPR")),
+            order_qty=_to_int(row.get("ODER_QTY")),
+            is_fill=row.get("CNTG_YN") == "2",
+            rejected=row.get("RFUS_YN") == "1",
+        )
+
+
+@dataclass
+class _OrderState:
+    filled_qty: int = 0
+    order_qty: int = 0
+    rejected: bool = False
+    updated: float = 0.0
+
+
+class OrderTracker:
+    """주문번호별 누적 체결 수량을 보관하고 체결을 기다리는 스레드/코루틴을 깨웁니다."""
+
+    def __init__(self, retention: float = ORDER_STATE_RETENTION):
+        self.retention = retention
+        self.feed_active = False
+        self._orders: Dict[str, _OrderState] = {}
+        self._cond = threading.Condition()
+        self._async_waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+
+    @staticmethod
+    def _key(order_no) -> str:
+        # 주문 응답(ODNO)과 체결통보(ODER_NO)의 0 채움 자릿수가 달라 앞의 0을 떼고 비교합니다.
+        return str(order_no).strip().lstrip("0") or "0"
+
+    def publish(self, notice: ExecutionNotice):
+        """체결통보를 반영하고 해당 주문을 기다리는 대기자를 깨웁니다."""
+        key = self._key(notice.order_no)
+        now = time.monotonic()
+        with self._cond:
+            state = self._orders.setdefault(key, _OrderState())
+            if notice.is_fill:
+                state.filled_qty += notice.quantity
+            if notice.order_qty:
+                state.order_qty = notice.order_qty
+            state.rejected = state.rejected or notice.rejected
+            state.updated = now
+            self._prune(now)
+            self._cond.notify_all()
+            waiters = self._async_waiters.pop(key, [])
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(self._wake, future)
+
+    @staticmethod
+    def _wake(future: asyncio.Future):
+        if not future.done():
+            future.set_result(None)
+
+    def _prune(self, now: float):
+        expired = [key for key, state in self._orders.items() if now - state.updated > self.retention]
+        for key in expired:
+            del self._orders[key]
+
+    def filled_quantity(self, order_no) -> int:
+        state = self._orders.get(self._key(order_no))
+        return state.filled_qty if state else 0
+
+    @staticmethod
+    def _is_filled(state: Optional[_OrderState], quantity: Optional[int]) -> bool:
+        if state is None:
+            return False
+        target = quantity or state.order_qty
+        return target > 0 and state.filled_qty >= target
+
+    def _is_done(self, state: Optional[_OrderState], quantity: Optional[int]) -> bool:
+        return state is not None and (state.rejected or self._is_filled(state, quantity))
+
+    def wait_for_fill(self, order_no, quantity: Optional[int] = None, timeout: float = 0) -> bool:
+        """
+        주문이 전량 체결(또는 거부)되거나 timeout 초가 지날 때까지 기다립니다. 다른 락을 쥔 채로 호출하지 마세요.
+
+        Args:
+            order_no: 주문번호 (ODNO)
+            quantity: 전량 체결로 볼 수량. 없으면 체결통보의 주문 수량
+            timeout: 최대 대기 시간(초)
+
+        Returns:
+            bool: 체결통보로 전량 체결이 확인되면 True (타임아웃/거부는 False)
+        """
+        if not order_no:
+            return False
+        key = self._key(order_no)
+        with self._cond:
+            self._cond.wait_for(lambda: self._is_done(self._orders.get(key), quantity), timeout)
+            return self._is_filled(self._orders.get(key), quantity)
+
+    async def wait_for_fill_async(self, order_no, quantity: Optional[int] = None, timeout: float = 0) -> bool:
+        """wait_for_fill의 비동기 버전 (이벤트 루프를 막지 않음)"""
+        if not order_no:
+            return False
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        key = self._key(order_no)
+        while True:
+            with self._cond:
+                state = self._orders.get(key)
+                remaining = deadline - loop.time()
+                if self._is_done(state, quantity) or remaining <= 0:
+                    return self._is_filled(state, quantity)
+                future = loop.create_future()
+                self._async_waiters.setdefault(key, []).append((loop, future))
+            try:
+                await asyncio.wait_for(future, remaining)
+            except asyncio.TimeoutError:
+                with self._cond:
+                    waiters = self._async_waiters.get(key, [])
+                    if (loop, future) in waiters:
+                        waiters.remove((loop, future))
+
+
+# 프로세스 전역 주문 체결 추적기
+order_tracker = OrderTracker()
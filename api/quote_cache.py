@@ -0,0 +1,101 @@
+"""
+KIS 현재가 조회 결과 단기 캐시
+
+종목 선별(시장 경고/거래정지 확인), 주문 가격 산정 등에서 같은 종목의 현재가를 몇 초 간격으로 반복 조회하므로,
+프로세스 전역 캐시 하나를 두고 호출하는 쪽이 허용하는 나이(max_age)만큼 지난 값은 다시 조회합니다.
+- 같은 종목을 여러 스레드가 동시에 조회하면 한 스레드만 요청하고(single-flight) 나머지는 그 결과를 사용합니다.
+- max_age=0 은 항상 새로 조회하되, 결과는 캐시에 저장하여 다른 호출자가 재사용할 수 있게 합니다.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+QuoteLoader = Callable[[], Optional[Dict[str, Any]]]
+
+
+class QuoteCache:
+    """종목코드별 현재가 응답과 조회 시각을 보관하는 스레드 안전 캐시"""
+
+    def __init__(self):
+        # ticker -> (응답, 조회 시각 monotonic 초). 항목은 통째로 교체하므로 읽기에는 락이 필요 없습니다.
+        self._entries: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def peek(self, ticker: str, max_age: float) -> Optional[Dict[str, Any]]:
+        """max_age 초 이내에 조회한 응답이 있으면 반환합니다."""
+        entry = self._entries.get(ticker)
+        if entry is not None and max_age > 0 and time.monotonic() - entry[1] <= max_age:
+            return entry[0]
+        return None
+
+    def set(self, ticker: str, quote: Dict[str, Any], fetched_at: Optional[float] = None):
+        self._entries[ticker] = (quote, time.monotonic() if fetched_at is None else fetched_at)
+
+    def _fetch_lock(self, ticker: str) -> threading.Lock:
+        lock = self._fetch_locks.get(ticker)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._fetch_locks.setdefault(ticker, threading.Lock())
+        return lock
+
+    def get(self, ticker: str, loader: QuoteLoader, max_age: float = 0) -> Optional[Dict[str, Any]]:
+        """
+        캐시된 응답을 반환하고, 없거나 max_age보다 오래되었으면 loader로 조회합니다.
+
+        Args:
+            ticker: 종목코드
+            loader: 현재가 응답(dict)을 반환하는 조회 함수
+            max_age: 허용하는 캐시 나이(초). 0이면 항상 새로 조회
+
+        Returns:
+            현재가 응답. 정상 응답(rt_cd '0')만 캐시에 저장합니다.
+        """
+        quote = self.peek(ticker, max_age)
+        if quote is not None:
+            self._count('hits')
+            return quote
+
+        requested_at = time.monotonic()
+        with self._fetch_lock(ticker):
+            # 락을 기다리는 동안 다른 스레드가 받아 온 값이 허용 나이 이내이거나 요청 이후의 값이면 그대로 사용합니다.
+            entry = self._entries.get(ticker)
+            if entry is not None and (entry[1] >= requested_at or self.peek(ticker, max_age) is not None):
+                self._count('coalesced')
+                return entry[0]
+
+            self._count('misses')
+            quote = loader()
+            if quote and quote.get('rt_cd', '0') == '0' and quote.get('output'):
+                self.set(ticker, quote)
+            return quote
+
+    def invalidate(self, ticker: Optional[str] = None):
+        if ticker is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(ticker, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """적중/미적중/동시 요청 합류 횟수를 반환합니다."""
+        with self._stats_lock:
+            total = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_ratio': round((self.hits + self.coalesced) / total, 3) if total else 0.0,
+                'entries': len(self._entries),
+            }
+
+
+# 프로세스 전역 현재가 캐시
+quote_cache = QuoteCache()
@@ -0,0 +1,162 @@
+"""
+KIS REST API 호출 속도 제한기 (토큰 버킷)
+
+브로커의 초당 호출 한도는 계정 유형(실전/모의)별 앱키 단위로 적용되므로,
+프로세스 전역의 버킷 하나를 모든 KISApi 인스턴스가 공유합니다.
+- 계정 유형별 전체 버킷 + 주문 전용 버킷(주문 API는 두 버킷 모두 통과)
+- 예약 방식: 토큰이 부족하면 잔량을 음수로 예약하고 필요한 시간만큼만 대기하므로, 대기자 간 순서가 보장됩니다.
+- acquire()는 스레드에서 블로킹으로, acquire_async()는 이벤트 루프에서 await로 사용합니다.
+- 한도 초과 응답(EGW00201)을 받으면 penalize()로 버킷을 비워 다음 호출을 늦춥니다.
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from config.config import (KIS_RATE_LIMIT_REAL, KIS_RATE_LIMIT_MOCK, KIS_ORDER_RATE_LIMIT_REAL,
+                           KIS_ORDER_RATE_LIMIT_MOCK, KIS_RATE_LIMIT_HEADROOM)
+
+# 엔드포인트 분류
+QUOTE = 'quote'
+ORDER = 'order'
+
+# 브로커의 초당 거래건수 초과 응답 코드
+RATE_LIMITED_MSG_CD = 'EGW00201'
+
+
+class TokenBucket:
+    """초당 rate개 토큰이 채워지고 최대 capacity개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError(f"유효하지 않은 호출 한도: {rate}")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        # 지표
+        self.acquired = 0
+        self.throttled = 0
+        self.penalties = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1.0, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        토큰을 예약하고 사용 가능해질 때까지 기다려야 하는 시간(초)을 반환합니다.
+        max_wait보다 오래 기다려야 하면 예약하지 않고 None을 반환합니다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, (tokens - self._tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= tokens
+            self.acquired += 1
+            if wait > 0:
+                self.throttled += 1
+                self.total_wait += wait
+                if wait > self.max_wait:
+                    self.max_wait = wait
+            return wait
+
+    def cancel(self, tokens: float = 1.0):
+        """reserve로 예약한 토큰을 반환합니다. (다른 버킷 예약 실패 시)"""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+            self.acquired -= 1
+
+    def penalize(self, seconds: Optional[float] = None):
+        """한도 초과 응답을 받았을 때 seconds(기본: 토큰 1개 주기) 동안 호출을 막습니다."""
+        with self._lock:
+            self._refill(time.monotonic())
+            seconds = 1.0 / self.rate if seconds is None else seconds
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+            self.penalties += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'rate_per_sec': round(self.rate, 3),
+                'acquired': self.acquired,
+                'throttled': self.throttled,
+                'penalties': self.penalties,
+                'total_wait_ms': round(self.total_wait * 1000, 1),
+                'max_wait_ms': round(self.max_wait * 1000, 1),
+            }
+
+
+class KISRateLimiter:
+    """계정 유형(실전/모의)과 엔드포인트 분류(조회/주문)별 토큰 버킷 모음"""
+
+    def __init__(self, limits: Dict[Tuple[str, str], float], headroom: float = KIS_RATE_LIMIT_HEADROOM):
+        # limits: {(account_type, None 또는 ORDER): 브로커 초당 한도}
+        self.buckets: Dict[Tuple[str, Optional[str]], TokenBucket] = {
+            key: TokenBucket(rate * headroom) for key, rate in limits.items()
+        }
+
+    def _buckets_for(self, endpoint_class: str, is_mock: bool):
+        account_type = 'mock' if is_mock else 'real'
+        buckets = [self.buckets[(account_type, None)]]
+        class_bucket = self.buckets.get((account_type, endpoint_class))
+        if class_bucket is not None:
+            buckets.append(class_bucket)
+        return buckets
+
+    def _reserve(self, endpoint_class: str, is_mock: bool, timeout: Optional[float]) -> Optional[float]:
+        reserved = []
+        wait = 0.0
+        for bucket in self._buckets_for(endpoint_class, is_mock):
+            bucket_wait = bucket.reserve(max_wait=timeout)
+            if bucket_wait is None:
+                for reserved_bucket in reserved:
+                    reserved_bucket.cancel()
+                return None
+            reserved.append(bucket)
+            wait = max(wait, bucket_wait)
+        return wait
+
+    def acquire(self, endpoint_class: str = QUOTE, is_mock: bool = False, timeout: Optional[float] = None) -> bool:
+        """호출 가능할 때까지 블로킹 대기합니다. timeout 안에 불가능하면 대기하지 않고 False를 반환합니다."""
+        wait = self._reserve(endpoint_class, is_mock, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self, endpoint_class: str = QUOTE, is_mock: bool = False,
+                            timeout: Optional[float] = None) -> bool:
+        """acquire()의 비동기 버전 (이벤트 루프를 막지 않고 대기)"""
+        wait = self._reserve(endpoint_class, is_mock, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+    def penalize(self, is_mock: bool, seconds: Optional[float] = None):
+        """한도 초과 응답을 받은 계정 유형의 전체 버킷을 비웁니다."""
+        self.buckets[('mock' if is_mock else 'real', None)].penalize(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """버킷별 호출/대기 지표를 반환합니다."""
+        return {
+            f"{account_type}:{endpoint_class or 'all'}": bucket.snapshot()
+            for (account_type, endpoint_class), bucket in self.buckets.items()
+        }
+
+
+# 프로세스 전역 KIS 호출 속도 제한기
+kis_rate_limiter = KISRateLimiter({
+    ('real', None): KIS_RATE_LIMIT_REAL,
+    ('mock', None): KIS_RATE_LIMIT_MOCK,
+    ('real', ORDER): KIS_ORDER_RATE_LIMIT_REAL,
+    ('mock', ORDER): KIS_ORDER_RATE_LIMIT_MOCK,
+})
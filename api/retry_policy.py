@@ -0,0 +1,291 @@
+"""
+KIS 호출 재시도 정책 / 마감 시각 / 서킷 브레이커
+
+토큰 발급, 주문 전송, 초당 거래건수 초과 재주문 등 흩어져 있던 재시도 루프를 한 정책으로 통일합니다.
+- RetryPolicy: 지터가 섞인 지수 백오프로 재시도하며, 마감 시각(Deadline)까지 남은 시간보다 오래 쉬어야 하면 멈춥니다.
+- Deadline: 작업 단위 마감 시각. deadline_scope()로 지정하면 그 안의 모든 KIS REST 요청이 마감을 따릅니다.
+  (예: 장 마감 직전 매도가 마감 이후까지 재시도하지 않도록 KRX_TRADING_END를 마감으로 지정)
+- CircuitBreaker: 연결 실패/5xx가 연속되면 일정 시간 요청을 보내지 않고 바로 실패시킵니다.
+재시도/포기/차단 횟수는 정책·브레이커 이름별로 집계하여 snapshot()으로 확인합니다.
+"""
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+
+from config.config import (
+    KIS_RETRY_BASE_DELAY, KIS_RETRY_MAX_DELAY, KIS_BREAKER_FAILURE_THRESHOLD, KIS_BREAKER_RESET_SECONDS,
+    KIS_RATE_LIMIT_RETRIES
+)
+
+
+class CircuitOpenError(RequestsConnectionError):
+    """서킷 브레이커가 열려 있어 요청을 보내지 않았습니다. (기존 RequestException 처리 경로로 전달)"""
+
+
+class DeadlineExceeded(Timeout):
+    """작업 마감 시각이 지나 요청을 보내지 않았습니다."""
+
+
+class Deadline:
+    """monotonic 시계 기준 작업 마감 시각"""
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    @classmethod
+    def at(cls, when: dt_time, now: Optional[datetime] = None) -> "Deadline":
+        """오늘 when 시각(예: KRX_TRADING_END)을 마감으로 합니다. 이미 지났으면 바로 만료됩니다."""
+        now = now or datetime.now()
+        return cls.after((datetime.combine(now.date(), when) - now).total_seconds())
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("kis_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """현재 스레드/코루틴에 지정된 작업 마감 시각"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]):
+    """
+    블록 안의 KIS 요청과 재시도가 deadline을 따르도록 합니다. 바깥에 더 이른 마감이 있으면 그것을 유지합니다.
+    (contextvars 기반이므로 스레드와 asyncio 태스크별로 독립적입니다)
+    """
+    outer = _current_deadline.get()
+    if deadline is None or (outer is not None and outer.expires_at <= deadline.expires_at):
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def request_timeout(timeout: Optional[float]) -> Optional[float]:
+    """
+    요청 타임아웃을 현재 작업 마감까지 남은 시간 이내로 줄입니다.
+
+    Raises:
+        DeadlineExceeded: 마감이 이미 지난 경우
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return timeout
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        retry_metrics.add("deadline", "rejected")
+        raise DeadlineExceeded("작업 마감 시각이 지나 KIS 요청을 보내지 않습니다.")
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def limiter_timeout() -> Optional[float]:
+    """호출 한도 제한기에서 기다릴 수 있는 최대 시간 (현재 작업 마감까지 남은 시간, 마감이 없으면 None)"""
+    deadline = current_deadline()
+    return None if deadline is None else max(0.0, deadline.remaining())
+
+
+def limiter_deadline_exceeded() -> DeadlineExceeded:
+    """제한기 대기가 작업 마감을 넘어 요청을 포기할 때 발생시킬 예외"""
+    retry_metrics.add("deadline", "rejected")
+    return DeadlineExceeded("호출 한도 대기가 작업 마감을 넘어 KIS 요청을 보내지 않습니다.")
+
+
+class _Metrics:
+    """이름별 재시도/차단 지표 집계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def add(self, name: str, metric: str, value: int = 1):
+        with self._lock:
+            counters = self._counters.setdefault(name, {})
+            counters[metric] = counters.get(metric, 0) + value
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: dict(counters) for name, counters in self._counters.items()}
+
+
+retry_metrics = _Metrics()
+
+
+class RetryPolicy:
+    """
+    지터가 섞인 지수 백오프 재시도 정책
+
+        for attempt in policy.attempts():
+            result = call()
+            if ok(result):
+                break
+        else:
+            give_up()
+
+    성공하면 break하고, 실패하면 다음 반복으로 넘어가면(continue) 백오프만큼 쉰 뒤 다시 시도합니다.
+    시도 횟수를 다 쓰거나 마감 전에 다시 시도할 수 없으면 반복이 끝납니다(for-else로 포기 처리).
+    """
+
+    def __init__(self, name: str, max_attempts: int = 3, base_delay: float = KIS_RETRY_BASE_DELAY,
+                 max_delay: float = KIS_RETRY_MAX_DELAY, multiplier: float = 2.0, jitter: float = 0.5):
+        self.name = name
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def backoff(self, attempt: int) -> float:
+        """attempt번째 시도가 실패한 뒤 쉴 시간(초). 지터 비율만큼 무작위로 줄여 동시 재시도를 분산합니다."""
+        delay = min(self.max_delay, self.base_delay * (self.multiplier ** (attempt - 1)))
+        return delay * (1 - self.jitter * random.random())
+
+    def _next_delay(self, attempt: int, deadline: Optional[Deadline]) -> Optional[float]:
+        """다음 시도 전 대기 시간. 다시 시도할 수 없으면 None (포기 사유를 집계)"""
+        if attempt >= self.max_attempts:
+            retry_metrics.add(self.name, "exhausted")
+            return None
+        delay = self.backoff(attempt)
+        if deadline is not None and deadline.remaining() <= delay:
+            retry_metrics.add(self.name, "deadline_exceeded")
+            return None
+        retry_metrics.add(self.name, "retries")
+        return delay
+
+    def attempts(self, deadline: Optional[Deadline] = None) -> Iterator[int]:
+        """시도 번호(1부터)를 내주고, 재시도 전에는 백오프만큼 쉽니다. deadline 미지정 시 현재 작업 마감을 따릅니다."""
+        deadline = deadline or current_deadline()
+        attempt = 1
+        while True:
+            retry_metrics.add(self.name, "attempts")
+            yield attempt
+            delay = self._next_delay(attempt, deadline)
+            if delay is None:
+                return
+            time.sleep(delay)
+            attempt += 1
+
+    async def attempts_async(self, deadline: Optional[Deadline] = None) -> AsyncIterator[int]:
+        """attempts의 비동기 버전 (asyncio.sleep으로 대기)"""
+        deadline = deadline or current_deadline()
+        attempt = 1
+        while True:
+            retry_metrics.add(self.name, "attempts")
+            yield attempt
+            delay = self._next_delay(attempt, deadline)
+            if delay is None:
+                return
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold번이면 열려서(open) reset_timeout초 동안 요청을 막고,
+    그 뒤 한 요청만 시험 삼아 보내(half-open) 성공하면 닫고 실패하면 다시 엽니다.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = KIS_BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = KIS_BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """요청을 보내도 되는지 확인합니다. 막히면 short_circuits를 집계합니다."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+        retry_metrics.add(self.name, "short_circuits")
+        return False
+
+    def check(self):
+        """요청을 보낼 수 없으면 CircuitOpenError를 발생시킵니다."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name}: 연속 실패로 요청을 일시 차단 중입니다.")
+
+    def release(self):
+        """
+        성공/실패를 판단할 수 없이 끝난 요청(마감 초과, 취소, 응답 읽기 오류 등)의 half-open 시험 슬롯을 반납합니다.
+        반납하지 않으면 이후 요청이 모두 차단되므로, check()를 통과한 요청은 반드시 기록하거나 반납해야 합니다.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self._failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                tripped = True
+            else:
+                tripped = False
+        if tripped:
+            retry_metrics.add(self.name, "trips")
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self._failures}
+
+
+# KIS 서버(실전/모의)별 서킷 브레이커
+kis_circuit_breakers = {
+    False: CircuitBreaker("kis-real"),
+    True: CircuitBreaker("kis-mock"),
+}
+
+# 용도별 재시도 정책
+TOKEN_RETRY = RetryPolicy("token", max_attempts=3, base_delay=2.0, max_delay=10.0)
+ORDER_SEND_RETRY = RetryPolicy("order-send", max_attempts=3, base_delay=0.5, max_delay=2.0)
+# 초당 거래건수 초과(EGW00201) 응답 재요청. 제한기 페널티에 더해 브로커의 1초 집계 구간이 지나도록 물러납니다.
+# KIS 클라이언트의 _request 한 곳에서만 적용하며, 주문은 더 오래 재요청하는 ORDER_RATE_LIMIT_RETRY를 사용합니다.
+ORDER_RATE_LIMIT_RETRY = RetryPolicy("order-rate-limit", max_attempts=10, base_delay=0.2, max_delay=2.0)
+RATE_LIMIT_RETRY = RetryPolicy("rate-limit", max_attempts=KIS_RATE_LIMIT_RETRIES + 1, base_delay=0.1, max_delay=1.0)
+
+
+def snapshot() -> Dict[str, Dict[str, object]]:
+    """정책/브레이커 이름별 지표와 브레이커 상태를 반환합니다."""
+    metrics = retry_metrics.snapshot()
+    for breaker in kis_circuit_breakers.values():
+        metrics.setdefault(breaker.name, {}).update(breaker.snapshot())
+    return metrics
@@ -1,6 +1,7 @@
 from flask import Flask, render_template_string, request, jsonify
 import pandas as pd
 from backtest import BacktestEngine
+from database.query_stats import query_stats
 from datetime import datetime, timedelta
 import logging
 
@@ -52,7 +53,7 @@ HTML_TEMPLATE = '''
                         {% for session in available_sessions %}
                         <option value="{{ session.trade_session_id }}" 
                                 {% if current_values.session_id == session.trade_session_id|string %}selected{% endif %}>
-                            {{ session.ticker }}({{ session.name }}) - {{ session.high_rise_date }}
+                            {{ session.ticker }}({{ session.name }}) - {{ session.high_rise_date }}{% if session.bar_count %} [{{ session.bar_count }}분봉]{% endif %}
                         </option>
                         {% endfor %}
                     </select>
@@ -89,6 +90,9 @@ HTML_TEMPLATE = '''
             <h3>선택된 거래 세션 정보</h3>
             <p><strong>종목:</strong> {{ session_info.ticker }}({{ session_info.name }})</p>
             <p><strong>급등일:</strong> {{ session_info.high_rise_date }}</p>
+            {% if session_info.bar_count %}
+            <p><strong>분봉 데이터:</strong> {{ session_info.bar_count }}개 ({{ session_info.first_datetime }} ~ {{ session_info.last_datetime }})</p>
+            {% endif %}
             <p><strong>매수시간:</strong> {{ current_values.buy_time_1 }} / {{ current_values.buy_time_2 }}</p>
             <p><strong>투자금액:</strong> {{ current_values.investment_amount }}원</p>
         </div>
@@ -432,5 +436,10 @@ def backtest():
         optimization_results=optimization_results
     )
 
+@app.route('/db-stats')
+def db_stats():
+    """쿼리 지문별 실행 시간 통계"""
+    return jsonify(query_stats.snapshot())
+
 if __name__ == '__main__':
     app.run(host='127.0.0.1', port=5001, debug=True)
@@ -7,7 +7,8 @@ import logging
 from datetime import datetime, date, time, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
-from database.db_manager_upper import DatabaseManager
+from database.storage_backend import create_storage_backend
+from config.config import BACKTEST_PARQUET_DIR
 from config.condition import (
     SELLING_POINT_UPPER, RISK_MGMT_UPPER, RISK_MGMT_STRONG_MOMENTUM,
     TRAILING_STOP_PERCENTAGE, BACKTEST_BUY_TIME_1, BACKTEST_BUY_TIME_2,
@@ -36,12 +37,18 @@ class BacktestResult:
 class BacktestEngine:
     """백테스트 엔진"""
     
-    def __init__(self):
+    def __init__(self, parquet_dir: Optional[str] = BACKTEST_PARQUET_DIR):
         self.db_manager = None
+        self.parquet_dir = parquet_dir
         self.logger = logging.getLogger(__name__)
         
     def __enter__(self):
-        self.db_manager = DatabaseManager()
+        if self.parquet_dir:
+            # Parquet 보관본에서 필요한 컬럼만 직접 읽습니다. (DB 연결 불필요)
+            from database.parquet_store import ParquetMinuteReader
+            self.db_manager = ParquetMinuteReader(self.parquet_dir)
+        else:
+            self.db_manager = create_storage_backend()
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -341,13 +348,7 @@ class BacktestEngine:
     def get_available_sessions(self) -> List[Dict[str, Any]]:
         """백테스트 가능한 거래 세션 목록을 반환합니다."""
         try:
-            self.db_manager.cursor.execute('''
-                SELECT DISTINCT trade_session_id, ticker, name, high_rise_date
-                FROM minute_prices
-                ORDER BY high_rise_date DESC, ticker
-            ''')
-            sessions = self.db_manager.cursor.fetchall()
-            return sessions
+            return self.db_manager.get_minute_sessions()
         except Exception as e:
             self.logger.error(f"거래 세션 조회 중 오류: {e}")
             return []
@@ -5,9 +5,13 @@ import traceback
 # 프로젝트 루트 경로를 sys.path에 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from database.db_manager_upper import DatabaseManager
+from database.storage_backend import create_storage_backend
 import pandas as pd
 
+def _is_missing_table(error):
+    """테이블이 없어서 발생한 오류인지 확인합니다. (MariaDB 1146 / SQLite no such table)"""
+    return "1146" in str(error) or "no such table" in str(error)
+
 def check_latest_date(db_manager, table_name):
     """지정된 테이블의 가장 최신 날짜를 확인합니다."""
     try:
@@ -20,7 +24,7 @@ def check_latest_date(db_manager, table_name):
             print(f"*** {table_name} 테이블에 데이터가 없거나 날짜 정보가 없습니다. ***")
             
     except Exception as e:
-        if "1146" in str(e): # MariaDB error code for "Table doesn't exist"
+        if _is_missing_table(e):
             print(f"*** {table_name} 테이블이 존재하지 않습니다. ***")
         else:
             print(f"*** {table_name} 테이블 최신 날짜 조회 중 오류 발생: ***")
@@ -46,16 +50,16 @@ def check_table(db_manager, table_name):
             
     except Exception as e:
         # 테이블이 없는 경우 등 예외 처리
-        if "1146" in str(e): # MariaDB error code for "Table doesn't exist"
+        if _is_missing_table(e):
             print(f"\n*** {table_name} 테이블이 존재하지 않습니다. ***")
         else:
             print(f"\n{table_name} 테이블 조회 중 오류 발생: {e}")
 
 def check_all_data():
-    """MariaDB의 주요 테이블 내용을 확인합니다.""" 
-    db_manager = DatabaseManager()
+    """저장소(DB_BACKEND)의 주요 테이블 내용을 확인합니다.""" 
+    db_manager = create_storage_backend()
     try:
-        print("MariaDB의 주요 테이블 데이터 확인을 시작합니다...")
+        print("저장소의 주요 테이블 데이터 확인을 시작합니다...")
         print("-" * 40)
         check_latest_date(db_manager, "pykrx_upper_stocks")
         check_latest_date(db_manager, "selected_pykrx_upper_stocks")
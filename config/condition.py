@@ -67,6 +67,18 @@ SELL_WAIT = 3
 # 매수 시작일로부터 days_later일 후 매도
 DAYS_LATER = 7 #마지막 매수로부터 4(7-3)일째 매도
 
+# 현재가 캐시 허용 나이(초): 종목 선별/거래정지 확인, 주문 가격 산정, 미체결 정정(항상 새로 조회)
+QUOTE_MAX_AGE_SELECTION = 30
+QUOTE_MAX_AGE_ORDER = 1
+QUOTE_MAX_AGE_REVISE = 0
+
+# 잔고 스냅샷 허용 나이(초): 매도 전 보유 수량 확인, 모니터링 시작 시 세션 동기화, 매수/매도 후 세션 동기화(항상 새로 조회)
+BALANCE_MAX_AGE_SELL = 5
+BALANCE_MAX_AGE_MONITOR = 30
+BALANCE_MAX_AGE_SYNC = 0
+# 장중 잔고 스냅샷 주기 갱신 간격(초)
+BALANCE_REFRESH_SECONDS = 20
+
 ######################################################
 ##################    스케줄링   ######################
 ######################################################
@@ -97,6 +109,17 @@ ORDER_MINUTE_2 = 40
 # # 매수 시간 3
 ORDER_HOUR_3 = 15
 ORDER_MINUTE_3 = 00
+# 오래된 데이터 정리 시간 (장 시작 전 조회에 영향이 없도록 새벽에 실행)
+RETENTION_HOUR = 2
+RETENTION_MINUTE = 0
+# 이 시각까지 끝나지 않은 정리 작업은 다음 날로 미룹니다.
+RETENTION_DEADLINE_HOUR = 6
+# 토큰/웹소켓 인증키 사전 갱신: 점검 주기(분)와 만료 몇 분 전에 미리 갱신할지
+CREDENTIAL_REFRESH_INTERVAL_MINUTES = 10
+CREDENTIAL_REFRESH_LEAD_MINUTES = 30
+# 매수/매도 시간대 몇 분 전에 점검하고, 그 시점부터 몇 분 동안 갱신 없이 쓸 수 있어야 하는지
+CREDENTIAL_PRE_WINDOW_MINUTES = 10
+CREDENTIAL_WINDOW_LEAD_MINUTES = 90
 
 
 
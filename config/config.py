@@ -17,9 +17,34 @@ M_APP_SECRET = os.getenv('M_APP_SECRET')
 # Account Numbers
 R_ACCOUNT_NUMBER = os.getenv('R_ACCOUNT_NUMBER')
 M_ACCOUNT_NUMBER = os.getenv('M_ACCOUNT_NUMBER')
+# HTS ID (실시간 체결통보 구독 키. 미설정 시 REST 체결 조회만 사용)
+HTS_ID = os.getenv('HTS_ID')
 
 # API URLs
 BASE_URL = "https://openapi.koreainvestment.com:9443"
+# KIS REST 서버 주소 (실전 / 모의). 로컬 대역 서버(tests/kis_stub_server.py)로 지연/처리량을 측정할 때 바꿉니다.
+KIS_REAL_URL = os.getenv('KIS_REAL_URL', BASE_URL)
+KIS_MOCK_URL = os.getenv('KIS_MOCK_URL', "https://openapivts.koreainvestment.com:29443")
+# KIS REST 호스트별 keep-alive 연결 풀 크기 / 연결 실패 재시도 횟수
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 10))
+HTTP_RETRY_TOTAL = int(os.getenv('HTTP_RETRY_TOTAL', 2))
+# KIS REST 초당 호출 한도 (계정 유형별 전체 / 주문 전용). 여유율만큼 낮춰 한도 바로 아래로 호출합니다.
+KIS_RATE_LIMIT_REAL = float(os.getenv('KIS_RATE_LIMIT_REAL', 20))
+KIS_RATE_LIMIT_MOCK = float(os.getenv('KIS_RATE_LIMIT_MOCK', 2))
+KIS_ORDER_RATE_LIMIT_REAL = float(os.getenv('KIS_ORDER_RATE_LIMIT_REAL', 10))
+KIS_ORDER_RATE_LIMIT_MOCK = float(os.getenv('KIS_ORDER_RATE_LIMIT_MOCK', 2))
+KIS_RATE_LIMIT_HEADROOM = float(os.getenv('KIS_RATE_LIMIT_HEADROOM', 0.9))
+# 초당 거래건수 초과 응답 시 재요청 횟수
+KIS_RATE_LIMIT_RETRIES = int(os.getenv('KIS_RATE_LIMIT_RETRIES', 3))
+# KIS 호출 재시도 백오프 기본값(초) / 연속 실패 시 서킷 브레이커가 열리는 횟수와 다시 시험하기까지 시간(초)
+KIS_RETRY_BASE_DELAY = float(os.getenv('KIS_RETRY_BASE_DELAY', 0.5))
+KIS_RETRY_MAX_DELAY = float(os.getenv('KIS_RETRY_MAX_DELAY', 5))
+KIS_BREAKER_FAILURE_THRESHOLD = int(os.getenv('KIS_BREAKER_FAILURE_THRESHOLD', 5))
+KIS_BREAKER_RESET_SECONDS = float(os.getenv('KIS_BREAKER_RESET_SECONDS', 30))
+# 매수/세션 갱신 시 동시에 진행하는 세션 수 (주문 호출 자체는 호출 한도 제한기가 조절)
+ORDER_CONCURRENCY = int(os.getenv('ORDER_CONCURRENCY', 5))
+# JSON 코덱: auto(orjson이 있으면 사용) / orjson / json(표준 모듈)
+JSON_CODEC = os.getenv('JSON_CODEC', 'auto')
 
 # Database - sqlite3
 DB_NAME = "quant_trading.db"
@@ -29,8 +54,29 @@ DB_CONFIG = {
     'user': os.getenv('DB_USER'),         # 데이터베이스 사용자 이름
     'password': os.getenv('DB_PASS'),  # 데이터베이스 비밀번호
     'database': os.getenv('DB_NAME'),  # 사용할 데이터베이스 이름
-    'port': int(os.getenv('DB_PORT', 3306))            # MariaDB 기본 포트
+    'port': int(os.getenv('DB_PORT', 3306)),           # MariaDB 기본 포트
+    'local_infile': os.getenv('DB_LOCAL_INFILE', 'true').lower() == 'true'  # LOAD DATA LOCAL INFILE 허용 여부
 }
+# 저장소 백엔드 선택 ('mariadb' 또는 'sqlite')
+DB_BACKEND = os.getenv('DB_BACKEND', 'mariadb')
+# 내장 SQLite 백엔드 파일 경로 (':memory:' 사용 가능)
+SQLITE_DB_PATH = os.getenv('SQLITE_DB_PATH', DB_NAME)
+# 쿼리 계측 (실행 시간 통계 / 느린 쿼리 로그)
+DB_QUERY_STATS = os.getenv('DB_QUERY_STATS', 'true').lower() == 'true'
+DB_SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', 200))
+DB_SLOW_QUERY_LOG = os.getenv('DB_SLOW_QUERY_LOG', 'slow_queries.jsonl')
+# 세션/거래내역 write-behind 그룹 커밋 주기(ms)와 최대 행 수
+WRITE_BEHIND_FLUSH_MS = int(os.getenv('WRITE_BEHIND_FLUSH_MS', 200))
+WRITE_BEHIND_MAX_ROWS = int(os.getenv('WRITE_BEHIND_MAX_ROWS', 500))
+# 재시도 후에도 저장하지 못한 write-behind 배치를 보관할 JSONL 파일 (replay_dead_letters로 다시 저장)
+WRITE_BEHIND_DEAD_LETTER = os.getenv('WRITE_BEHIND_DEAD_LETTER', 'write_behind_dead_letter.jsonl')
+# 백테스트 분봉을 DB 대신 읽을 Parquet 디렉토리 (parquet_minute_prices.py export 결과, 비어 있으면 DB 사용)
+BACKTEST_PARQUET_DIR = os.getenv('BACKTEST_PARQUET_DIR') or None
+# 보존 기간 정리: 한 트랜잭션에서 삭제할 행 수 / 청크 사이 대기 시간(ms)
+RETENTION_CHUNK_ROWS = int(os.getenv('RETENTION_CHUNK_ROWS', 5000))
+RETENTION_CHUNK_SLEEP_MS = int(os.getenv('RETENTION_CHUNK_SLEEP_MS', 100))
+# 분봉 보존 기간(일). 0이면 분봉은 삭제하지 않습니다. (parquet_minute_prices.py로 먼저 보관 권장)
+MINUTE_BARS_RETENTION_DAYS = int(os.getenv('MINUTE_BARS_RETENTION_DAYS', 0))
 
 
 # Slack
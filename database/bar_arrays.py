@@ -0,0 +1,64 @@
+"""
+분봉 스트리밍 조회 결과를 NumPy 배열로 변환하는 유틸리티
+
+커서에서 fetchmany로 고정 크기 청크씩 읽어 미리 할당한 배열에 바로 채우므로,
+전체 기간 분봉을 읽어도 파이썬 dict/tuple 목록이 한꺼번에 메모리에 올라가지 않습니다.
+"""
+from typing import Any, Dict
+
+import numpy as np
+
+# 한 번에 fetchmany로 가져올 행 수
+MINUTE_BAR_FETCH_SIZE = 10000
+
+
+def empty_bar_arrays() -> Dict[str, np.ndarray]:
+    """read_bar_arrays와 같은 형태의 빈 배열 딕셔너리를 반환합니다."""
+    return {
+        'trade_session_id': np.empty(0, dtype=np.int32),
+        'datetime': np.empty(0, dtype='datetime64[s]'),
+        'price': np.empty(0, dtype=np.int32),
+    }
+
+
+def read_bar_arrays(cursor: Any, expected_rows: int, chunk_size: int = MINUTE_BAR_FETCH_SIZE) -> Dict[str, np.ndarray]:
+    """
+    (trade_session_id, epoch 초, price) 튜플을 반환하는 커서를 배열로 읽어들입니다.
+
+    Args:
+        cursor: 조회가 실행된 튜플 커서 (unbuffered/서버 사이드 커서 권장)
+        expected_rows: 예상 행 수 (minute_sessions.bar_count 합계). 배열 사전 할당에 사용합니다.
+        chunk_size: fetchmany 청크 크기
+
+    Returns:
+        {'trade_session_id': int32, 'datetime': datetime64[s], 'price': int32} 배열 딕셔너리
+    """
+    capacity = max(int(expected_rows), chunk_size)
+    session_ids = np.empty(capacity, dtype=np.int32)
+    epochs = np.empty(capacity, dtype=np.int64)
+    prices = np.empty(capacity, dtype=np.int32)
+    size = 0
+
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        chunk = np.asarray(rows, dtype=np.int64)
+        end = size + len(chunk)
+        if end > capacity:
+            # 요약 정보 갱신 이후 분봉이 추가된 경우에만 배열을 늘립니다.
+            capacity = max(end, capacity * 2)
+            session_ids = np.resize(session_ids, capacity)
+            epochs = np.resize(epochs, capacity)
+            prices = np.resize(prices, capacity)
+        session_ids[size:end] = chunk[:, 0]
+        epochs[size:end] = chunk[:, 1]
+        prices[size:end] = chunk[:, 2]
+        size = end
+
+    # 슬라이스/뷰로 반환하여 최종 단계에서 배열이 한 번 더 복사되지 않도록 합니다.
+    return {
+        'trade_session_id': session_ids[:size],
+        'datetime': epochs[:size].view('datetime64[s]'),
+        'price': prices[:size],
+    }
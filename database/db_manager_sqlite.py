@@ -0,0 +1,399 @@
+import sqlite3
+import logging
+import zlib
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from config.config import SQLITE_DB_PATH
+from database.storage_backend import StorageBackend
+from database.query_stats import instrument_cursor
+from database.bar_arrays import MINUTE_BAR_FETCH_SIZE, empty_bar_arrays, read_bar_arrays
+
+# DATE/DATETIME 컬럼은 ISO 문자열로 저장하고 조회 시 파이썬 객체로 복원합니다.
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=' '))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter('DATETIME', lambda raw: datetime.fromisoformat(raw.decode()))
+sqlite3.register_converter('DATE', lambda raw: date.fromisoformat(raw.decode()[:10]))
+
+
+# minute_sessions 요약 컬럼 (MariaDB 구현과 동일)
+MINUTE_SESSION_SUMMARY_COLUMNS = {
+    'bar_count': 'INTEGER NOT NULL DEFAULT 0',
+    'first_datetime': 'DATETIME',
+    'last_datetime': 'DATETIME',
+    'checksum': 'INTEGER NOT NULL DEFAULT 0',
+}
+
+
+def _crc32(value: Any) -> int:
+    """MariaDB CRC32()와 같은 값을 반환합니다."""
+    return zlib.crc32(str(value).encode('utf-8'))
+
+
+class _BitXor:
+    """MariaDB BIT_XOR() 집계 함수 대체"""
+
+    def __init__(self):
+        self.value = 0
+
+    def step(self, value):
+        if value is not None:
+            self.value ^= value
+
+    def finalize(self):
+        return self.value
+
+
+def _dict_factory(cursor: sqlite3.Cursor, row: tuple) -> Dict[str, Any]:
+    """MariaDB의 cursor(dictionary=True)와 같은 형태로 행을 반환합니다."""
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteDatabaseManager(StorageBackend):
+    """
+    서버 없이 프로세스 내에서 동작하는 SQLite 저장소
+
+    오프라인 백테스트와 CI에서 DatabaseManager 대신 사용합니다.
+    WAL 모드로 열어 백테스트(읽기)와 분봉 적재(쓰기)가 동시에 진행될 수 있습니다.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or SQLITE_DB_PATH
+        self.conn = sqlite3.connect(
+            self.db_path,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+        )
+        self.conn.row_factory = _dict_factory
+        self.conn.create_function('crc32', 1, _crc32, deterministic=True)
+        self.conn.create_aggregate('bit_xor', 1, _BitXor)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.cursor = instrument_cursor(self.conn.cursor())
+        self._create_tables()
+
+    def _create_tables(self):
+        """필요한 데이터베이스 테이블을 생성합니다."""
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS pykrx_upper_stocks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ticker TEXT NOT NULL,
+                name TEXT NOT NULL,
+                date DATE NOT NULL,
+                trade_condition TEXT,
+                UNIQUE (ticker, date)
+            );
+
+            CREATE TABLE IF NOT EXISTS selected_pykrx_upper_stocks (
+                no INTEGER PRIMARY KEY AUTOINCREMENT,
+                date DATE,
+                ticker TEXT,
+                name TEXT,
+                closing_price REAL,
+                trade_condition TEXT DEFAULT 'normal'
+            );
+
+            CREATE TABLE IF NOT EXISTS minute_sessions (
+                trade_session_id INTEGER NOT NULL PRIMARY KEY,
+                high_rise_date DATE NOT NULL,
+                ticker TEXT NOT NULL,
+                name TEXT NOT NULL,
+                bar_count INTEGER NOT NULL DEFAULT 0,
+                first_datetime DATETIME,
+                last_datetime DATETIME,
+                checksum INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_minute_sessions_ticker ON minute_sessions (ticker);
+            CREATE INDEX IF NOT EXISTS idx_minute_sessions_high_rise_date ON minute_sessions (high_rise_date);
+
+            CREATE TABLE IF NOT EXISTS minute_bars (
+                trade_session_id INTEGER NOT NULL,
+                datetime DATETIME NOT NULL,
+                price INTEGER NOT NULL,
+                PRIMARY KEY (trade_session_id, datetime)
+            ) WITHOUT ROWID;
+        ''')
+
+        # 요약 컬럼 추가 이전에 생성된 테이블 보정
+        self.cursor.execute('PRAGMA table_info(minute_sessions)')
+        existing_columns = {row['name'] for row in self.cursor.fetchall()}
+        for column, definition in MINUTE_SESSION_SUMMARY_COLUMNS.items():
+            if column not in existing_columns:
+                self.cursor.execute(f'ALTER TABLE minute_sessions ADD COLUMN {column} {definition}')
+        self.conn.commit()
+
+    def save_pykrx_upper_stocks(self, stocks_data: List[Dict[str, Any]]):
+        """pykrx_upper_stocks 테이블에 데이터를 저장합니다."""
+        if not stocks_data:
+            return
+
+        try:
+            data_to_insert = [
+                (stock['ticker'], stock['name'], stock['date'], stock.get('trade_condition'))
+                for stock in stocks_data
+            ]
+            with self.conn:
+                self.cursor.executemany('''
+                    INSERT INTO pykrx_upper_stocks (ticker, name, date, trade_condition)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (ticker, date) DO UPDATE SET
+                        name = excluded.name,
+                        trade_condition = excluded.trade_condition
+                ''', data_to_insert)
+            logging.info(f"{len(data_to_insert)}개의 데이터가 pykrx_upper_stocks 테이블에 성공적으로 저장/업데이트되었습니다.")
+        except sqlite3.Error as e:
+            logging.error(f"pykrx_upper_stocks 테이블에 데이터 저장 중 오류 발생: {e}")
+            raise
+
+    def get_pykrx_upper_stocks(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """지정된 기간의 pykrx_upper_stocks 데이터를 조회합니다."""
+        try:
+            self.cursor.execute('''
+                SELECT date, ticker, name, trade_condition
+                FROM pykrx_upper_stocks
+                WHERE date BETWEEN ? AND ?
+            ''', (start_date, end_date))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("pykrx_upper_stocks 조회 중 오류 발생: %s", e)
+            raise
+
+    def save_selected_pykrx_upper_stocks(self, stocks_data: List[Dict[str, Any]]):
+        """선별된 급등주 정보를 selected_pykrx_upper_stocks 테이블에 저장합니다."""
+        if not stocks_data:
+            logging.info("저장할 선별된 급등주 데이터가 없습니다.")
+            return
+        try:
+            # trade_condition을 기준으로 정렬 ('strong_momentum'이 먼저 오도록)
+            sorted_stocks = sorted(stocks_data, key=lambda x: x.get('trade_condition') == 'strong_momentum', reverse=True)
+            insert_data = [
+                (stock.get('date'), stock.get('ticker'), stock.get('name'),
+                 stock.get('closing_price'), stock.get('trade_condition'))
+                for stock in sorted_stocks
+            ]
+            with self.conn:
+                self.cursor.execute('DELETE FROM selected_pykrx_upper_stocks')
+                self.cursor.executemany('''
+                    INSERT INTO selected_pykrx_upper_stocks (date, ticker, name, closing_price, trade_condition)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', insert_data)
+            logging.info(f"{len(stocks_data)}개의 선별된 급등주 정보가 selected_pykrx_upper_stocks 테이블에 저장되었습니다.")
+        except sqlite3.Error as e:
+            logging.error("selected_pykrx_upper_stocks 저장 중 오류 발생: %s", e)
+            raise
+
+    def get_selected_pykrx_upper_stocks(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """지정된 기간 또는 전체 기간의 selected_pykrx_upper_stocks 데이터를 조회합니다."""
+        try:
+            query = '''
+                SELECT s.no as id, s.date, s.ticker, s.name, s.closing_price, s.trade_condition
+                FROM selected_pykrx_upper_stocks s
+            '''
+            params = []
+            if start_date and end_date:
+                query += ' WHERE s.date BETWEEN ? AND ?'
+                params.extend([start_date, end_date])
+
+            self.cursor.execute(query, tuple(params))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("selected_pykrx_upper_stocks 조회 중 오류 발생: %s", e)
+            raise
+
+    def get_selected_pykrx_upper_stocks_by_date_range(self, start_date: date, end_date: date,
+                                                      buy_offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        지정된 날짜 범위 내의 급등일 중 매수일도 범위 안에 있는 종목만 선택적으로 가져옵니다.
+
+        매수일은 급등일(휴장일이면 다음 영업일)로부터 buy_offset 영업일 후이며,
+        trading_calendar 대신 DateUtils로 계산합니다. (MariaDB 구현과 같은 결과)
+        """
+        # 휴장일 달력(holidayskr)은 이 조회에서만 필요하므로 지연 임포트합니다.
+        from utils.date_utils import DateUtils
+
+        try:
+            self.cursor.execute('''
+                SELECT s.no as id, s.date, s.ticker, s.name, s.closing_price, s.trade_condition
+                FROM selected_pykrx_upper_stocks s
+                WHERE s.date BETWEEN ? AND ?
+                ORDER BY s.date ASC
+            ''', (start_date, end_date))
+            stocks = self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("선별된 급등주 데이터 조회 중 오류: %s", e)
+            raise
+
+        filtered_stocks = []
+        for stock in stocks:
+            stock['buy_date'] = DateUtils.get_target_date(stock['date'], buy_offset)
+            if start_date <= stock['buy_date'] <= end_date:
+                filtered_stocks.append(stock)
+        logging.info(f"기간 필터링 후 {len(filtered_stocks)}개의 종목이 최종 선별되었습니다.")
+        return filtered_stocks
+
+    def save_minute_prices(self, price_data: List[Dict[str, Any]]):
+        """분봉 데이터를 minute_sessions(세션 정보)와 minute_bars(분봉 가격)에 나누어 저장합니다."""
+        if not price_data:
+            logging.info("저장할 분봉 데이터가 없습니다.")
+            return
+
+        sessions = {
+            row['trade_session_id']: (row['trade_session_id'], row['high_rise_date'], row['ticker'], row['name'])
+            for row in price_data
+        }
+        try:
+            # 세션/분봉 저장을 하나의 트랜잭션으로 처리합니다.
+            with self.conn:
+                self.cursor.executemany('''
+                    INSERT INTO minute_sessions (trade_session_id, high_rise_date, ticker, name)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (trade_session_id) DO UPDATE SET
+                        high_rise_date = excluded.high_rise_date,
+                        ticker = excluded.ticker,
+                        name = excluded.name
+                ''', list(sessions.values()))
+                self.cursor.executemany('''
+                    INSERT INTO minute_bars (trade_session_id, datetime, price)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (trade_session_id, datetime) DO UPDATE SET price = excluded.price
+                ''', [(row['trade_session_id'], row['datetime'], row['price']) for row in price_data])
+                self._refresh_minute_session_summary(set(sessions))
+            logging.info(f"{len(price_data)}개의 분봉 데이터가 저장되었습니다.")
+        except sqlite3.Error as e:
+            logging.error(f"분봉 데이터 저장 중 오류 발생: {e}")
+            raise
+
+    def _refresh_minute_session_summary(self, session_ids: Optional[Set[int]] = None):
+        """
+        minute_bars를 집계하여 minute_sessions의 요약 컬럼을 갱신합니다.
+
+        커밋하지 않으므로 분봉 저장과 같은 트랜잭션 안에서 호출해야 합니다.
+        session_ids가 None이면 전체 세션을 다시 집계합니다.
+        """
+        where_clause = ''
+        params: tuple = ()
+        if session_ids is not None:
+            if not session_ids:
+                return
+            where_clause = 'WHERE trade_session_id IN (%s)' % ', '.join(['?'] * len(session_ids))
+            params = tuple(session_ids)
+
+        # 체크섬 입력 문자열은 MariaDB의 CONCAT(datetime, ':', price)와 동일한 형식입니다.
+        self.cursor.execute(f'''
+            UPDATE minute_sessions
+            SET bar_count = a.bar_count,
+                first_datetime = a.first_datetime,
+                last_datetime = a.last_datetime,
+                checksum = a.checksum
+            FROM (
+                SELECT trade_session_id,
+                       COUNT(*) AS bar_count,
+                       MIN(datetime) AS first_datetime,
+                       MAX(datetime) AS last_datetime,
+                       bit_xor(crc32(datetime || ':' || price)) AS checksum
+                FROM minute_bars
+                {where_clause}
+                GROUP BY trade_session_id
+            ) AS a
+            WHERE minute_sessions.trade_session_id = a.trade_session_id
+        ''', params)
+
+    def rebuild_minute_session_summary(self):
+        """전체 세션의 minute_sessions 요약 컬럼을 minute_bars 기준으로 다시 계산합니다."""
+        try:
+            with self.conn:
+                self._refresh_minute_session_summary()
+            logging.info("minute_sessions 요약 정보를 재계산했습니다.")
+        except sqlite3.Error as e:
+            logging.error(f"minute_sessions 요약 정보 재계산 중 오류 발생: {e}")
+            raise
+
+    def get_minute_sessions(self) -> List[Dict[str, Any]]:
+        """분봉 데이터가 저장된 거래 세션 목록을 조회합니다."""
+        try:
+            self.cursor.execute('''
+                SELECT trade_session_id, ticker, name, high_rise_date,
+                       bar_count, first_datetime, last_datetime, checksum
+                FROM minute_sessions
+                ORDER BY high_rise_date DESC, ticker
+            ''')
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"minute_sessions 조회 중 오류 발생: {e}")
+            raise
+
+    def get_all_minute_prices_for_session(self, trade_session_id: int) -> List[Dict[str, Any]]:
+        """지정된 거래 세션 ID의 모든 분봉 데이터를 조회합니다."""
+        try:
+            self.cursor.execute('''
+                SELECT s.ticker, s.name, b.datetime, b.price
+                FROM minute_bars b
+                JOIN minute_sessions s ON s.trade_session_id = b.trade_session_id
+                WHERE b.trade_session_id = ?
+                ORDER BY b.datetime ASC
+            ''', (trade_session_id,))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"trade_session_id={trade_session_id}에 대한 전체 분봉 데이터 조회 중 오류 발생: {e}")
+            raise
+
+    def get_minute_prices_after_datetime(self, trade_session_id: int, start_datetime: datetime) -> List[Dict[str, Any]]:
+        """지정된 거래 세션 ID와 시작 시간 이후의 분봉 데이터를 조회합니다."""
+        try:
+            self.cursor.execute('''
+                SELECT datetime, price
+                FROM minute_bars
+                WHERE trade_session_id = ? AND datetime >= ?
+                ORDER BY datetime ASC
+            ''', (trade_session_id, start_datetime))
+            return self.cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("분봉 데이터 조회 중 오류 발생: %s", e)
+            raise
+
+    def load_minute_bar_arrays(self, trade_session_ids: Optional[Sequence[int]] = None,
+                               chunk_size: int = MINUTE_BAR_FETCH_SIZE) -> Dict[str, np.ndarray]:
+        """
+        분봉 데이터를 fetchmany 청크 단위로 읽어 NumPy 배열로 반환합니다.
+
+        SQLite 커서는 결과를 단계적으로 반환하므로 별도의 서버 사이드 커서 없이 스트리밍됩니다.
+        """
+        where_clause = ''
+        params: tuple = ()
+        if trade_session_ids is not None:
+            if not trade_session_ids:
+                return empty_bar_arrays()
+            where_clause = 'WHERE trade_session_id IN (%s)' % ', '.join(['?'] * len(trade_session_ids))
+            params = tuple(trade_session_ids)
+
+        try:
+            self.cursor.execute(f'SELECT COALESCE(SUM(bar_count), 0) AS total FROM minute_sessions {where_clause}', params)
+            expected_rows = int(self.cursor.fetchone()['total'])
+
+            # dict 변환 비용을 피하기 위해 튜플을 반환하는 별도 커서를 사용합니다.
+            stream = self.conn.cursor()
+            stream.row_factory = None
+            try:
+                stream.execute(f'''
+                    SELECT trade_session_id, CAST(strftime('%s', datetime) AS INTEGER), price
+                    FROM minute_bars
+                    {where_clause}
+                    ORDER BY trade_session_id, datetime
+                ''', params)
+                return read_bar_arrays(stream, expected_rows, chunk_size)
+            finally:
+                stream.close()
+        except sqlite3.Error as e:
+            logging.error(f"분봉 데이터 스트리밍 조회 중 오류 발생: {e}")
+            raise
+
+    def close(self):
+        """데이터베이스 연결을 종료합니다."""
+        try:
+            if self.conn:
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
+        except sqlite3.Error as e:
+            logging.error(f"데이터베이스 종료 중 오류: {e}")
@@ -2,16 +2,75 @@ import mariadb
 from mariadb import Cursor as MariaDBCursor
 from mariadb.connections import Connection as MariaDBConnection
 import logging
-from datetime import datetime, timedelta
+import numpy as np
+import os
+import tempfile
+from datetime import date, datetime, timedelta
 from config.config import DB_CONFIG
 from config.condition import STRONG_MOMENTUM
 from utils.date_utils import DateUtils
-from typing import Any, Dict, List, Optional, Sequence, cast, Union
+from database.storage_backend import StorageBackend
+from database.query_stats import instrument_cursor
+from database.retention import RetentionPurger
+from database.write_behind import write_behind
+from database.bar_arrays import MINUTE_BAR_FETCH_SIZE, empty_bar_arrays, read_bar_arrays
+from typing import Any, Dict, List, Optional, Sequence, Set, cast, Union
 from zoneinfo import ZoneInfo
 KST = ZoneInfo("Asia/Seoul")
 
-
-class DatabaseManager:
+# local-infile 비활성화 시 서버/클라이언트가 반환하는 에러 코드
+# 1148: ER_NOT_ALLOWED_COMMAND, 2068: CR_LOAD_DATA_LOCAL_INFILE_REJECTED,
+# 3948: ER_CLIENT_LOCAL_FILES_DISABLED, 4166: ER_LOAD_INFILE_CAPABILITY_DISABLED
+LOCAL_INFILE_DISABLED_ERRNOS = (1148, 2068, 3948, 4166)
+
+
+def _tsv_field(value: Any) -> str:
+    """LOAD DATA INFILE 기본 이스케이프 규칙에 맞춰 TSV 필드 문자열을 만듭니다."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    return (str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n'))
+
+
+def _next_month(month_start: date) -> date:
+    """주어진 월 1일의 다음 달 1일을 반환합니다."""
+    if month_start.month == 12:
+        return date(month_start.year + 1, 1, 1)
+    return date(month_start.year, month_start.month + 1, 1)
+
+
+# trading_session_upper upsert (단건 저장과 write-behind 배치 저장에서 공통 사용)
+TRADING_SESSION_UPSERT_SQL = '''
+    INSERT INTO trading_session_upper
+        (id, start_date, `current_date`, ticker, name, high_price, fund, spent_fund, quantity, avr_price, count, trade_condition)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        `current_date` = VALUES(`current_date`),
+        spent_fund = VALUES(spent_fund),
+        quantity = VALUES(quantity),
+        avr_price = CASE
+            WHEN VALUES(quantity) > 0 THEN VALUES(avr_price)
+            ELSE avr_price
+        END,
+        count = VALUES(count),
+        trade_condition = VALUES(trade_condition)
+'''
+
+TRADE_HISTORY_INSERT_SQL = '''
+    INSERT INTO trade_history (
+        trade_date, trade_time, ticker, name, buy_avg_price, sell_price,
+        quantity, profit_amount, profit_rate, remaining_assets)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+'''
+
+
+class DatabaseManager(StorageBackend):
     cursor: MariaDBCursor
 
     def __init__(self):
@@ -24,7 +83,7 @@ class DatabaseManager:
         - database: 데이터베이스명
         """
         self.conn = mariadb.connect(**DB_CONFIG)
-        self.cursor = self.conn.cursor(dictionary=True)
+        self.cursor = instrument_cursor(self.conn.cursor(dictionary=True))
         self._create_tables()
 
     def __enter__(self):
@@ -57,7 +116,7 @@ class DatabaseManager:
                 self.conn = mariadb.connect(**DB_CONFIG)
             if self.cursor:
                 self.cursor.close()
-            self.cursor = self.conn.cursor(dictionary=True)
+            self.cursor = instrument_cursor(self.conn.cursor(dictionary=True))
         except mariadb.Error as e:
             logging.error(f"커서 재설정 오류: {e}")
             raise
@@ -99,9 +158,15 @@ class DatabaseManager:
                 quantity INT,
                 avr_price INT,
                 count INT,
-                is_strong_momentum BOOLEAN DEFAULT FALSE
+                is_strong_momentum BOOLEAN DEFAULT FALSE,
+                trade_condition VARCHAR(50)
             ) ENGINE=InnoDB
         ''')
+        # 세션 저장 쿼리가 사용하는 trade_condition 컬럼 보정
+        self.cursor.execute('''
+            ALTER TABLE trading_session_upper
+                ADD COLUMN IF NOT EXISTS trade_condition VARCHAR(50)
+        ''')
         
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS upper_stocks (
@@ -153,19 +218,54 @@ class DatabaseManager:
             ) ENGINE=InnoDB
         ''')
 
+        # 분봉 데이터는 세션 차원 테이블(minute_sessions)과
+        # 좁은 팩트 테이블(minute_bars, 월 단위 RANGE 파티션)로 정규화하여 저장합니다.
+        # 기존 minute_prices 테이블은 migrate_minute_prices.py로 이관합니다.
         self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS minute_prices (
-                trade_session_id INT NOT NULL COMMENT '거래 세션 ID (selected_pykrx_upper_stocks.no 참조)',
+            CREATE TABLE IF NOT EXISTS minute_sessions (
+                trade_session_id INT NOT NULL PRIMARY KEY COMMENT '거래 세션 ID (selected_pykrx_upper_stocks.no 참조)',
                 high_rise_date DATE NOT NULL COMMENT '급등일',
                 ticker VARCHAR(20) NOT NULL COMMENT '종목 코드',
                 name VARCHAR(100) NOT NULL COMMENT '종목명',
+                bar_count INT NOT NULL DEFAULT 0 COMMENT '분봉 개수',
+                first_datetime DATETIME NULL COMMENT '첫 분봉 시간',
+                last_datetime DATETIME NULL COMMENT '마지막 분봉 시간',
+                checksum INT UNSIGNED NOT NULL DEFAULT 0 COMMENT '분봉 데이터 체크섬 (BIT_XOR(CRC32(datetime:price)))',
+                INDEX idx_ticker (ticker),
+                INDEX idx_high_rise_date (high_rise_date)
+            ) ENGINE=InnoDB COMMENT '분봉 세션 정보'
+        ''')
+        # 요약 컬럼 추가 이전에 생성된 테이블 보정
+        self.cursor.execute('''
+            ALTER TABLE minute_sessions
+                ADD COLUMN IF NOT EXISTS bar_count INT NOT NULL DEFAULT 0 COMMENT '분봉 개수',
+                ADD COLUMN IF NOT EXISTS first_datetime DATETIME NULL COMMENT '첫 분봉 시간',
+                ADD COLUMN IF NOT EXISTS last_datetime DATETIME NULL COMMENT '마지막 분봉 시간',
+                ADD COLUMN IF NOT EXISTS checksum INT UNSIGNED NOT NULL DEFAULT 0 COMMENT '분봉 데이터 체크섬 (BIT_XOR(CRC32(datetime:price)))'
+        ''')
+
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS minute_bars (
+                trade_session_id INT NOT NULL COMMENT '거래 세션 ID (minute_sessions 참조)',
                 datetime DATETIME NOT NULL COMMENT '분봉 시간',
                 price INT NOT NULL COMMENT '해당 분 종가',
-                PRIMARY KEY (trade_session_id, datetime),
-                INDEX idx_ticker_datetime (ticker, datetime)
+                PRIMARY KEY (trade_session_id, datetime)
             ) ENGINE=InnoDB COMMENT '종목별 분봉 데이터'
+            PARTITION BY RANGE COLUMNS(datetime) (
+                PARTITION p_future VALUES LESS THAN (MAXVALUE)
+            )
         ''')
         
+        # 영업일 달력: bd_ordinal은 해당 날짜까지의 누적 영업일 수 (휴장일은 직전 영업일과 같은 값)
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS trading_calendar (
+                cal_date DATE NOT NULL PRIMARY KEY COMMENT '날짜',
+                is_business_day BOOLEAN NOT NULL COMMENT '영업일 여부',
+                bd_ordinal INT NOT NULL COMMENT '누적 영업일 순번',
+                INDEX idx_bd_ordinal (bd_ordinal, is_business_day)
+            ) ENGINE=InnoDB COMMENT '영업일 달력'
+        ''')
+
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS selected_pykrx_upper_stocks (
                 no INT AUTO_INCREMENT PRIMARY KEY,
@@ -208,32 +308,149 @@ class DatabaseManager:
             self.conn.rollback()
             raise
 
-    def save_minute_prices(self, price_data: List[Dict[str, Any]]):
-        """minute_prices 테이블에 분봉 데이터를 저장합니다."""
+    def save_minute_prices(self, price_data: List[Dict[str, Any]], use_bulk_load: bool = True):
+        """
+        분봉 데이터를 minute_sessions(세션 정보)와 minute_bars(분봉 가격)에 나누어 저장합니다.
+
+        기본적으로 임시 TSV 파일 + LOAD DATA LOCAL INFILE로 스테이징 테이블에 적재한 뒤
+        한 번의 INSERT ... SELECT로 병합합니다. 서버/클라이언트에서 local-infile이
+        비활성화되어 있으면 튜플 기반 executemany 경로로 대체합니다.
+        """
         if not price_data:
             logging.info("저장할 분봉 데이터가 없습니다.")
             return
 
-        query = '''
-            INSERT INTO minute_prices (trade_session_id, high_rise_date, ticker, name, datetime, price)
-            VALUES (%(trade_session_id)s, %(high_rise_date)s, %(ticker)s, %(name)s, %(datetime)s, %(price)s)
-            ON DUPLICATE KEY UPDATE price = VALUES(price), name = VALUES(name)
+        total_data_count = len(price_data)
+        logging.info(f"총 {total_data_count}개의 분봉 데이터를 DB에 저장합니다...")
+
+        # ALTER TABLE은 암묵적 커밋을 유발하므로 데이터 적재 트랜잭션 전에 파티션을 준비합니다.
+        datetimes = [row['datetime'] for row in price_data]
+        self.ensure_minute_bar_partitions(min(datetimes), max(datetimes))
+
+        if use_bulk_load:
+            try:
+                self._bulk_load_minute_prices(price_data)
+                logging.info("분봉 데이터 저장 완료 (LOAD DATA LOCAL INFILE).")
+                return
+            except mariadb.Error as e:
+                try:
+                    self.conn.rollback()
+                except mariadb.Error as e_rb:
+                    logging.error(f"롤백 중 오류 발생: {e_rb}")
+                if getattr(e, 'errno', None) not in LOCAL_INFILE_DISABLED_ERRNOS:
+                    logging.error(f"분봉 데이터 벌크 적재 중 오류 발생: {e}")
+                    raise
+                logging.warning(f"local-infile 비활성화로 executemany 경로로 전환합니다: {e}")
+
+        self._executemany_minute_prices(price_data)
+        logging.info("분봉 데이터 저장 완료.")
+
+    def _bulk_load_minute_prices(self, price_data: List[Dict[str, Any]]):
+        """임시 TSV 파일을 스테이징 테이블에 적재한 후 minute_sessions/minute_bars로 병합합니다."""
+        self.cursor.execute('''
+            CREATE TEMPORARY TABLE IF NOT EXISTS minute_prices_staging (
+                trade_session_id INT NOT NULL,
+                high_rise_date DATE NOT NULL,
+                ticker VARCHAR(20) NOT NULL,
+                name VARCHAR(100) NOT NULL,
+                datetime DATETIME NOT NULL,
+                price INT NOT NULL
+            ) ENGINE=InnoDB
+        ''')
+        self.cursor.execute('TRUNCATE TABLE minute_prices_staging')
+
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', suffix='.tsv', delete=False) as f:
+            tsv_path = f.name
+            for row in price_data:
+                f.write('\t'.join((
+                    str(int(row['trade_session_id'])),
+                    _tsv_field(row['high_rise_date']),
+                    _tsv_field(row['ticker']),
+                    _tsv_field(row['name']),
+                    _tsv_field(row['datetime']),
+                    str(int(row['price'])),
+                )))
+                f.write('\n')
+
+        try:
+            # LOAD DATA 구문은 파일명을 바인드 파라미터로 받지 않으므로 리터럴로 전달합니다.
+            escaped_path = tsv_path.replace('\\', '\\\\').replace("'", "\\'")
+            self.cursor.execute(f'''
+                LOAD DATA LOCAL INFILE '{escaped_path}'
+                INTO TABLE minute_prices_staging
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                LINES TERMINATED BY '\\n'
+                (trade_session_id, high_rise_date, ticker, name, datetime, price)
+            ''')
+            self.cursor.execute('''
+                INSERT INTO minute_sessions (trade_session_id, high_rise_date, ticker, name)
+                SELECT trade_session_id, MAX(high_rise_date), MAX(ticker), MAX(name)
+                FROM minute_prices_staging
+                GROUP BY trade_session_id
+                ON DUPLICATE KEY UPDATE
+                    high_rise_date = VALUES(high_rise_date),
+                    ticker = VALUES(ticker),
+                    name = VALUES(name)
+            ''')
+            self.cursor.execute('''
+                INSERT INTO minute_bars (trade_session_id, datetime, price)
+                SELECT trade_session_id, datetime, price
+                FROM minute_prices_staging
+                ON DUPLICATE KEY UPDATE price = VALUES(price)
+            ''')
+            self._refresh_minute_session_summary({row['trade_session_id'] for row in price_data})
+            self.conn.commit()
+        finally:
+            os.remove(tsv_path)
+
+    def _executemany_minute_prices(self, price_data: List[Dict[str, Any]]):
+        """튜플 기반 executemany로 minute_sessions/minute_bars에 배치 저장합니다."""
+        session_query = '''
+            INSERT INTO minute_sessions (trade_session_id, high_rise_date, ticker, name)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                high_rise_date = VALUES(high_rise_date),
+                ticker = VALUES(ticker),
+                name = VALUES(name)
         '''
-        
+        bar_query = '''
+            INSERT INTO minute_bars (trade_session_id, datetime, price)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE price = VALUES(price)
+        '''
+
+        sessions = {
+            row['trade_session_id']: (row['trade_session_id'], row['high_rise_date'], row['ticker'], row['name'])
+            for row in price_data
+        }
+
         batch_size = 10000  # 한 번에 처리할 데이터 수
         total_data_count = len(price_data)
-        logging.info(f"총 {total_data_count}개의 분봉 데이터를 DB에 저장합니다...")
+
+        try:
+            self.cursor.execute("START TRANSACTION")
+            self.cursor.executemany(session_query, list(sessions.values()))
+            self.conn.commit()
+        except mariadb.Error as e:
+            logging.error(f"minute_sessions 저장 중 오류 발생: {e}")
+            self.conn.rollback()
+            raise
 
         for i in range(0, total_data_count, batch_size):
-            batch_data = price_data[i:i + batch_size]
+            batch_data = [
+                (row['trade_session_id'], row['datetime'], row['price'])
+                for row in price_data[i:i + batch_size]
+            ]
             try:
-                # 각 배치마다 트랜잭션을 시작하고 커밋합니다.
+                # 각 배치마다 트랜잭션을 시작하고, 해당 배치 세션의 요약 정보와 함께 커밋합니다.
                 self.cursor.execute("START TRANSACTION")
-                self.cursor.executemany(query, batch_data)
+                self.cursor.executemany(bar_query, batch_data)
+                self._refresh_minute_session_summary({bar[0] for bar in batch_data})
                 self.conn.commit()
                 logging.info(f"{i + len(batch_data)} / {total_data_count} 데이터 처리 완료...")
             except mariadb.Error as e:
-                logging.error(f"minute_prices 저장 중 오류 발생: {e}")
+                logging.error(f"minute_bars 저장 중 오류 발생: {e}")
                 try:
                     self.conn.rollback()
                 except mariadb.Error as e_rb:
@@ -241,16 +458,119 @@ class DatabaseManager:
                 # 오류가 발생하면 전체 프로세스를 중단합니다.
                 raise
 
-        logging.info("분봉 데이터 저장 완료.")
+    def _refresh_minute_session_summary(self, session_ids: Optional[Set[int]] = None):
+        """
+        minute_bars를 집계하여 minute_sessions의 요약 컬럼(분봉 개수, 첫/마지막 시간, 체크섬)을 갱신합니다.
+
+        커밋하지 않으므로 분봉 저장과 같은 트랜잭션 안에서 호출해야 합니다.
+        session_ids가 None이면 전체 세션을 다시 집계합니다.
+        """
+        where_clause = ''
+        params: tuple = ()
+        if session_ids is not None:
+            if not session_ids:
+                return
+            where_clause = 'WHERE trade_session_id IN (%s)' % ', '.join(['%s'] * len(session_ids))
+            params = tuple(session_ids)
+
+        self.cursor.execute(f'''
+            UPDATE minute_sessions s
+            JOIN (
+                SELECT trade_session_id,
+                       COUNT(*) AS bar_count,
+                       MIN(`datetime`) AS first_datetime,
+                       MAX(`datetime`) AS last_datetime,
+                       BIT_XOR(CRC32(CONCAT(`datetime`, ':', price))) AS checksum
+                FROM minute_bars
+                {where_clause}
+                GROUP BY trade_session_id
+            ) a ON a.trade_session_id = s.trade_session_id
+            SET s.bar_count = a.bar_count,
+                s.first_datetime = a.first_datetime,
+                s.last_datetime = a.last_datetime,
+                s.checksum = a.checksum
+        ''', params)
+
+    def rebuild_minute_session_summary(self):
+        """전체 세션의 minute_sessions 요약 컬럼을 minute_bars 기준으로 다시 계산합니다."""
+        try:
+            self.cursor.execute("START TRANSACTION")
+            self._refresh_minute_session_summary()
+            self.conn.commit()
+            logging.info("minute_sessions 요약 정보를 재계산했습니다.")
+        except mariadb.Error as e:
+            logging.error(f"minute_sessions 요약 정보 재계산 중 오류 발생: {e}")
+            self.conn.rollback()
+            raise
+
+    def ensure_minute_bar_partitions(self, start: Union[date, datetime], end: Union[date, datetime]):
+        """
+        minute_bars 테이블에 start~end 기간을 덮는 월 단위 파티션(pYYYYMM)을 생성합니다.
+
+        RANGE 파티션은 마지막 파티션 뒤로만 분할할 수 있으므로, 이미 존재하는
+        가장 최근 월 이후의 파티션만 p_future를 재구성하여 추가합니다.
+        그보다 과거의 데이터는 가장 오래된 월 파티션에 함께 저장됩니다.
+        """
+        try:
+            self.cursor.execute('''
+                SELECT PARTITION_NAME AS partition_name
+                FROM information_schema.PARTITIONS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'minute_bars'
+            ''')
+            existing_months = sorted(
+                row['partition_name'][1:] for row in self.cursor.fetchall()
+                if row['partition_name'] and row['partition_name'][1:].isdigit()
+            )
+
+            month = date(start.year, start.month, 1)
+            if existing_months:
+                last = existing_months[-1]
+                month = max(month, _next_month(date(int(last[:4]), int(last[4:]), 1)))
+            end_month = date(end.year, end.month, 1)
+
+            new_partitions = []
+            while month <= end_month:
+                upper = _next_month(month)
+                new_partitions.append(
+                    f"PARTITION p{month.strftime('%Y%m')} VALUES LESS THAN ('{upper.isoformat()}')"
+                )
+                month = upper
+
+            if not new_partitions:
+                return
+
+            new_partitions.append("PARTITION p_future VALUES LESS THAN (MAXVALUE)")
+            self.cursor.execute(
+                'ALTER TABLE minute_bars REORGANIZE PARTITION p_future INTO (%s)' % ', '.join(new_partitions)
+            )
+            logging.info(f"minute_bars 파티션 {len(new_partitions) - 1}개를 추가했습니다.")
+        except mariadb.Error as e:
+            logging.error(f"minute_bars 파티션 생성 중 오류 발생: {e}")
+            raise
+
+    def get_minute_sessions(self) -> List[Dict[str, Any]]:
+        """분봉 데이터가 저장된 거래 세션 목록을 조회합니다."""
+        try:
+            self.cursor.execute('''
+                SELECT trade_session_id, ticker, name, high_rise_date,
+                       bar_count, first_datetime, last_datetime, checksum
+                FROM minute_sessions
+                ORDER BY high_rise_date DESC, ticker
+            ''')
+            return self.cursor.fetchall()
+        except mariadb.Error as e:
+            logging.error(f"minute_sessions 조회 중 오류 발생: {e}")
+            raise
 
     def get_all_minute_prices_for_session(self, trade_session_id: int) -> List[Dict[str, Any]]:
         """지정된 거래 세션 ID의 모든 분봉 데이터를 조회합니다."""
         try:
             self.cursor.execute('''
-                SELECT ticker, name, `datetime`, price
-                FROM minute_prices
-                WHERE trade_session_id = %s
-                ORDER BY `datetime` ASC
+                SELECT s.ticker, s.name, b.`datetime`, b.price
+                FROM minute_bars b
+                JOIN minute_sessions s ON s.trade_session_id = b.trade_session_id
+                WHERE b.trade_session_id = %s
+                ORDER BY b.`datetime` ASC
             ''', (trade_session_id,))
             return self.cursor.fetchall()
         except mariadb.Error as e:
@@ -262,7 +582,7 @@ class DatabaseManager:
         try:
             self.cursor.execute('''
                 SELECT `datetime`, price
-                FROM minute_prices
+                FROM minute_bars
                 WHERE trade_session_id = %s AND `datetime` >= %s
                 ORDER BY `datetime` ASC
             ''', (trade_session_id, start_datetime))
@@ -271,6 +591,44 @@ class DatabaseManager:
             logging.error("분봉 데이터 조회 중 오류 발생: %s", e)
             raise
 
+    def load_minute_bar_arrays(self, trade_session_ids: Optional[Sequence[int]] = None,
+                               chunk_size: int = MINUTE_BAR_FETCH_SIZE) -> Dict[str, np.ndarray]:
+        """
+        분봉 데이터를 unbuffered 커서로 스트리밍하여 NumPy 배열로 반환합니다.
+
+        minute_sessions.bar_count 합계로 배열을 미리 할당하고 fetchmany 청크 단위로 채우므로
+        전체 기간을 읽어도 메모리 사용량이 결과 배열 + 청크 1개 수준으로 유지됩니다.
+        시간은 세션 타임존의 영향을 받지 않도록 '1970-01-01' 기준 초 단위로 읽습니다.
+        """
+        where_clause = ''
+        params: tuple = ()
+        if trade_session_ids is not None:
+            if not trade_session_ids:
+                return empty_bar_arrays()
+            where_clause = 'WHERE trade_session_id IN (%s)' % ', '.join(['%s'] * len(trade_session_ids))
+            params = tuple(trade_session_ids)
+
+        stream = None
+        try:
+            self.cursor.execute(f'SELECT COALESCE(SUM(bar_count), 0) AS total FROM minute_sessions {where_clause}', params)
+            expected_rows = int(self.cursor.fetchone()['total'])
+
+            # 결과셋을 클라이언트에 한 번에 버퍼링하지 않는 서버 사이드 스트리밍 커서
+            stream = self.conn.cursor(buffered=False)
+            stream.execute(f'''
+                SELECT trade_session_id, TIMESTAMPDIFF(SECOND, '1970-01-01 00:00:00', `datetime`), price
+                FROM minute_bars
+                {where_clause}
+                ORDER BY trade_session_id, `datetime`
+            ''', params)
+            return read_bar_arrays(stream, expected_rows, chunk_size)
+        except mariadb.Error as e:
+            logging.error(f"분봉 데이터 스트리밍 조회 중 오류 발생: {e}")
+            raise
+        finally:
+            if stream is not None:
+                stream.close()
+
     def get_pykrx_upper_stocks(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
         """지정된 기간의 pykrx_upper_stocks 데이터를 조회합니다."""
         try:
@@ -350,41 +708,77 @@ class DatabaseManager:
             self.conn.rollback()
             raise
 
-    def get_selected_pykrx_upper_stocks_by_date_range(self, start_date, end_date):
+    def refresh_trading_calendar(self, start: date, end: date):
+        """
+        start~end 기간의 trading_calendar를 DateUtils 휴장일 기준으로 다시 채웁니다.
+
+        bd_ordinal은 기간 시작일부터 다시 매기므로 항상 전체 기간을 한 번에 재생성합니다.
+        """
+        rows = []
+        ordinal = 0
+        current = start
+        while current <= end:
+            is_business_day = DateUtils.is_business_day(current)
+            if is_business_day:
+                ordinal += 1
+            rows.append((current, is_business_day, ordinal))
+            current += timedelta(days=1)
+
+        try:
+            self.cursor.execute("START TRANSACTION")
+            self.cursor.execute('DELETE FROM trading_calendar')
+            self.cursor.executemany('''
+                INSERT INTO trading_calendar (cal_date, is_business_day, bd_ordinal)
+                VALUES (%s, %s, %s)
+            ''', rows)
+            self.conn.commit()
+            logging.info(f"trading_calendar를 {start} ~ {end} 기간({len(rows)}일)으로 재생성했습니다.")
+        except mariadb.Error as e:
+            logging.error(f"trading_calendar 생성 중 오류: {e}")
+            self.conn.rollback()
+            raise
+
+    def ensure_trading_calendar(self, start: date, end: date):
+        """trading_calendar가 start~end 기간을 포함하지 않으면 연 단위로 넓혀 재생성합니다."""
+        self.cursor.execute('SELECT MIN(cal_date) AS first_date, MAX(cal_date) AS last_date FROM trading_calendar')
+        row = self.cursor.fetchone()
+        first_date, last_date = row['first_date'], row['last_date']
+        if first_date is not None and first_date <= start and end <= last_date:
+            return
+        calendar_start = date(start.year, 1, 1) if first_date is None else min(date(start.year, 1, 1), first_date)
+        calendar_end = date(end.year, 12, 31) if last_date is None else max(date(end.year, 12, 31), last_date)
+        self.refresh_trading_calendar(calendar_start, calendar_end)
+
+    def get_selected_pykrx_upper_stocks_by_date_range(self, start_date, end_date, buy_offset: int = 0):
         """
-        지정된 날짜 범위 내에 매수일(급등일)이 포함되는 종목만 선택적으로 가져옵니다.
-        DB 쿼리에서 직접 날짜를 계산하고 필터링하여 효율성을 높입니다.
+        지정된 날짜 범위 내의 급등일 중 매수일도 범위 안에 있는 종목만 선택적으로 가져옵니다.
+
+        매수일은 급등일(휴장일이면 다음 영업일)로부터 buy_offset 영업일 후이며,
+        trading_calendar의 bd_ordinal 조인으로 한 번의 SQL에서 계산/필터링합니다.
         """
         try:
             self._reset_cursor()
-            # MariaDB는 주말/공휴일을 알지 못하므로, D+2, D+3, D+4, D+5 까지의 가능성을 모두 고려하여
-            # 백테스트 기간의 시작일보다 5일 전부터 데이터를 조회합니다.
-            query_start_date = start_date - timedelta(days=5)
+            # 급등일은 기존과 같이 start_date~end_date로 조회하고, 달력 조인은 매수일 확인에만 사용합니다.
+            self.ensure_trading_calendar(start_date, end_date + timedelta(days=buy_offset + 15))
 
-            query = """
-                SELECT no as id, `date`, ticker, name, closing_price, trade_condition
-                FROM selected_pykrx_upper_stocks
-                WHERE `date` BETWEEN %s AND %s
-                ORDER BY `date` ASC
-            """
-            # 전체 기간에 대해 우선 DB에서 데이터를 가져옵니다.
-            self.cursor.execute(query, (start_date, end_date))
-            all_stocks = self.cursor.fetchall()
-
-            if not all_stocks:
+            self.cursor.execute('''
+                SELECT s.no AS id, s.`date`, s.ticker, s.name, s.closing_price, s.trade_condition,
+                       b.cal_date AS buy_date
+                FROM selected_pykrx_upper_stocks s
+                JOIN trading_calendar c ON c.cal_date = s.`date`
+                JOIN trading_calendar b
+                  ON b.is_business_day = 1
+                 AND b.bd_ordinal = c.bd_ordinal + (1 - c.is_business_day) + %s
+                WHERE s.`date` BETWEEN %s AND %s
+                  AND b.cal_date BETWEEN %s AND %s
+                ORDER BY s.`date` ASC
+            ''', (buy_offset, start_date, end_date, start_date, end_date))
+            filtered_stocks = self.cursor.fetchall()
+
+            if not filtered_stocks:
                 logging.info("선별된 급등주 데이터가 없습니다.")
                 return []
 
-            filtered_stocks = []
-            for stock in all_stocks:
-                high_rise_date = stock['date']
-                # 매수 날짜는 급등일 + 2 영업일
-                buy_date = DateUtils.get_target_date(high_rise_date, later=0)
-                
-                # 계산된 매수 날짜가 백테스트 기간 내에 있는지 확인
-                if buy_date and start_date <= buy_date <= end_date:
-                    filtered_stocks.append(stock)
-            
             logging.info(f"기간 필터링 후 {len(filtered_stocks)}개의 종목이 최종 선별되었습니다.")
             return filtered_stocks
 
@@ -529,18 +923,49 @@ class DatabaseManager:
             logging.error("Error deleting upper stocks: %s", e)
             raise
 
-    def delete_old_stocks(self, date):
+    def delete_old_stocks(self, date, deadline: Optional[datetime] = None) -> int:
+        """date 이전 upper_stocks 데이터를 청크 단위로 나누어 삭제합니다."""
         try:
-            self.cursor.execute(
-                'DELETE FROM upper_stocks WHERE date < %s',
-                (date,)
-            )
-            self.conn.commit()
+            deleted = RetentionPurger(self, deadline=deadline).purge('upper_stocks', date)
             logging.info("Deleted upper stocks before date: %s", date)
+            return deleted
         except mariadb.Error as e:
             logging.error("Error deleting old stocks: %s", e)
             raise
 
+    def _refresh_purged_minute_sessions(self, table: str, session_ids: Set[int]):
+        """
+        분봉이 삭제된 세션의 minute_sessions 요약을 갱신하고, 분봉이 하나도 남지 않은 세션은 삭제합니다.
+
+        RetentionPurger의 on_purged 콜백으로, 분봉 삭제와 같은 트랜잭션 안에서 호출됩니다.
+        """
+        self._refresh_minute_session_summary(session_ids)
+        placeholders = ', '.join(['%s'] * len(session_ids))
+        self.cursor.execute(f'''
+            DELETE FROM minute_sessions
+            WHERE trade_session_id IN ({placeholders})
+              AND NOT EXISTS (
+                  SELECT 1 FROM minute_bars b WHERE b.trade_session_id = minute_sessions.trade_session_id
+              )
+        ''', tuple(session_ids))
+
+    def purge_old_minute_bars(self, cutoff: Union[date, datetime], deadline: Optional[datetime] = None) -> int:
+        """
+        cutoff 이전 분봉을 파티션 DROP / 청크 삭제로 정리하고, 분봉이 모두 정리된 세션 메타데이터도 삭제합니다.
+
+        cutoff에 걸친 세션은 남은 분봉 기준으로 요약(분봉 개수, 첫 분봉 시간, 체크섬)을 다시 계산합니다.
+        """
+        try:
+            purger = RetentionPurger(self, deadline=deadline, on_purged=self._refresh_purged_minute_sessions)
+            deleted = purger.purge('minute_bars', cutoff)
+            # 분봉 정리가 마감 시각으로 중단된 경우 세션 메타데이터는 다음 실행에서 정리합니다.
+            if not purger.past_deadline():
+                purger.purge('minute_sessions', cutoff)
+            return deleted
+        except mariadb.Error as e:
+            logging.error("분봉 보존 기간 정리 중 오류 발생: %s", e)
+            raise
+
     def get_selected_stock_to_trade(self, exclude_tickers: List[str] = []) -> Optional[Dict[str, Any]]:
         try:
             self._reset_cursor()
@@ -659,7 +1084,19 @@ class DatabaseManager:
             logging.error("Error reordering selected stocks: %s", e)
             raise
 
+    @staticmethod
+    def _flush_pending_sessions(session_id):
+        """
+        write-behind 큐에 남은 세션 upsert를 먼저 커밋합니다.
+
+        직접 쓰기/삭제 이후에 이전 upsert가 반영되어 값을 덮어쓰거나 삭제된 세션을 되살리지 않도록 합니다.
+        """
+        if not write_behind.flush():
+            logging.error("세션 %s 쓰기 전 write-behind 저장 실패 (dead-letter: %s)",
+                          session_id, write_behind.dead_letter_path)
+
     def save_trading_session_upper(self, session_id, start_date, current_date, ticker, name, high_price, fund, spent_fund, quantity, avr_price, count, trade_condition: Optional[str] = None):
+        self._flush_pending_sessions(session_id)
         try:
             # 파라미터 유효성 검사
             if not all([session_id, ticker, name]):
@@ -672,21 +1109,7 @@ class DatabaseManager:
                 raise ValueError(f"유효하지 않은 평균가: {avr_price}")
 
             # SQL 쿼리 실행
-            self.cursor.execute('''
-                INSERT INTO trading_session_upper
-                    (id, start_date, current_date, ticker, name, high_price, fund, spent_fund, quantity, avr_price, count, trade_condition)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    `current_date` = VALUES(`current_date`),
-                    spent_fund = VALUES(spent_fund),
-                    quantity = VALUES(quantity),
-                    avr_price = CASE
-                        WHEN VALUES(quantity) > 0 THEN VALUES(avr_price)
-                        ELSE avr_price
-                    END,
-                    count = VALUES(count),
-                    trade_condition = VALUES(trade_condition)
-            ''', (
+            self.cursor.execute(TRADING_SESSION_UPSERT_SQL, (
                 session_id,
                 start_date,
                 current_date,
@@ -703,8 +1126,8 @@ class DatabaseManager:
 
             self.conn.commit()
             logging.info(
-                "Trading session saved/updated - ID: %s, Ticker: %s, Quantity: %s, AvgPrice: %s, StrongMomentum: %s",
-                random_id, ticker, quantity, avr_price, is_strong_momentum
+                "Trading session saved/updated - ID: %s, Ticker: %s, Quantity: %s, AvgPrice: %s, TradeCondition: %s",
+                session_id, ticker, quantity, avr_price, trade_condition
             )
             
         except mariadb.Error as e:
@@ -730,14 +1153,16 @@ class DatabaseManager:
                 ''', (random_id,))
             else:
                 self.cursor.execute('SELECT * FROM trading_session_upper')
-                
-            return self.cursor.fetchall()
+
+            # 아직 커밋되지 않은 write-behind upsert를 반영합니다.
+            return [write_behind.merge_pending_session(row['id'], row) for row in self.cursor.fetchall()]
         
         except mariadb.Error as e:
             logging.error("Error loading trading session: %s", e)
             raise
 
     def delete_session_one_row(self, session_id):
+        self._flush_pending_sessions(session_id)
         try:
             # 커서 재설정
             self._reset_cursor()
@@ -761,12 +1186,9 @@ class DatabaseManager:
                 WHERE id = %s
             ''', (session_id,))
             
-            result = self.cursor.fetchone()
-            if result:
-                return result
-            else:
-                return None
-            
+            # 아직 커밋되지 않은 write-behind upsert를 반영합니다.
+            return write_behind.merge_pending_session(session_id, self.cursor.fetchone())
+
         except mariadb.Error as e:
             logging.error("Error getting session by ID: %s", e)
             raise
@@ -779,12 +1201,7 @@ class DatabaseManager:
                             sell_price, quantity, profit_amount, profit_rate, remaining_assets):
         """거래 내역을 trade_history 테이블에 저장"""
         try:
-            self.cursor.execute('''
-                INSERT INTO trade_history (
-                    trade_date, trade_time, ticker, name, buy_avg_price, sell_price,
-                    quantity, profit_amount, profit_rate, remaining_assets)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ''', (
+            self.cursor.execute(TRADE_HISTORY_INSERT_SQL, (
                 trade_date, trade_time, ticker, name, buy_avg_price, sell_price,
                 quantity, profit_amount, profit_rate, remaining_assets
             ))
@@ -794,6 +1211,25 @@ class DatabaseManager:
             self.conn.rollback()
             raise
 
+    def save_trading_writes_batch(self, session_rows: List[tuple], history_rows: List[tuple]):
+        """
+        write-behind 큐에 쌓인 trading_session_upper upsert와 trade_history insert를
+        하나의 트랜잭션으로 저장합니다. (행 순서는 TRADING_SESSION_UPSERT_SQL / TRADE_HISTORY_INSERT_SQL 파라미터 순서)
+        """
+        if not session_rows and not history_rows:
+            return
+        try:
+            self.cursor.execute("START TRANSACTION")
+            if session_rows:
+                self.cursor.executemany(TRADING_SESSION_UPSERT_SQL, session_rows)
+            if history_rows:
+                self.cursor.executemany(TRADE_HISTORY_INSERT_SQL, history_rows)
+            self.conn.commit()
+        except mariadb.Error as e:
+            logging.error("write-behind 배치 저장 중 오류 발생: %s", e)
+            self.conn.rollback()
+            raise
+
     ################## Utility ###################################
     def delete_upper_limit_stocks(self, date):
         try:
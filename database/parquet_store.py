@@ -0,0 +1,292 @@
+"""
+분봉 데이터 Parquet 보관/복원 모듈
+
+minute_sessions / minute_bars 데이터를 다음 구조의 Parquet 파일로 내보내고 다시 가져옵니다.
+
+    <root>/sessions.parquet                       세션 메타데이터 (minute_sessions)
+    <root>/bars/month=YYYY-MM/part-0.parquet      월별 분봉 (trade_session_id, ticker, datetime, price)
+
+- ticker 컬럼은 딕셔너리 인코딩, datetime/trade_session_id 컬럼은 DELTA_BINARY_PACKED 인코딩으로 저장합니다.
+- 월 파일 안의 분봉은 (trade_session_id, datetime) 순으로 정렬되어 있어 row group 통계로 세션 단위 조회를 걸러낼 수 있습니다.
+- ParquetMinuteReader는 백테스트 엔진이 DB 없이 Parquet를 직접 읽을 때 사용하며, 필요한 컬럼만 읽습니다.
+
+pyarrow는 이 모듈의 기능을 사용할 때만 불러옵니다.
+"""
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from database.bar_arrays import empty_bar_arrays
+
+SESSIONS_FILE = 'sessions.parquet'
+BARS_DIR = 'bars'
+# 가져오기 시 save_minute_prices 한 번에 넘기는 행 수
+IMPORT_BATCH_ROWS = 50000
+# 월 파일 row group 크기 (세션 단위 조회 시 통계로 건너뛸 수 있는 단위)
+ROW_GROUP_ROWS = 65536
+
+SESSION_COLUMNS = ('trade_session_id', 'high_rise_date', 'ticker', 'name',
+                   'bar_count', 'first_datetime', 'last_datetime', 'checksum')
+
+
+def _require_pyarrow():
+    """pyarrow 모듈을 불러옵니다. 설치되어 있지 않으면 안내 메시지와 함께 ImportError를 발생시킵니다."""
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet 기능을 사용하려면 pyarrow를 설치하세요. (pip install pyarrow)") from e
+    return pa, pq, ds
+
+
+def _month_key(value: Any) -> str:
+    return value.strftime('%Y-%m')
+
+
+def _sessions_schema(pa):
+    return pa.schema([
+        ('trade_session_id', pa.int32()),
+        ('high_rise_date', pa.date32()),
+        ('ticker', pa.dictionary(pa.int32(), pa.string())),
+        ('name', pa.string()),
+        ('bar_count', pa.int32()),
+        ('first_datetime', pa.timestamp('s')),
+        ('last_datetime', pa.timestamp('s')),
+        ('checksum', pa.uint32()),
+    ])
+
+
+def _bars_schema(pa):
+    return pa.schema([
+        ('trade_session_id', pa.int32()),
+        ('ticker', pa.dictionary(pa.int32(), pa.string())),
+        ('datetime', pa.timestamp('s')),
+        ('price', pa.int32()),
+        ('month', pa.string()),
+    ])
+
+
+def export_minute_bars(db_manager: Any, root: str, trade_session_ids: Optional[Sequence[int]] = None,
+                       compression: str = 'zstd') -> Dict[str, int]:
+    """
+    저장소의 분봉 데이터를 월별 Parquet 파일로 내보냅니다.
+
+    분봉은 세션 요약(첫/마지막 분봉 시간)으로 고른 해당 월의 세션만 한 달씩 불러오므로,
+    메모리 사용량은 전체 보관 기간이 아니라 가장 큰 한 달 분량에 비례합니다.
+    root에 이전 내보내기 결과가 있으면 월 디렉토리를 비우고 다시 씁니다.
+
+    Args:
+        db_manager: StorageBackend 구현체 (get_minute_sessions / load_minute_bar_arrays 사용)
+        root: 출력 디렉토리
+        trade_session_ids: 내보낼 세션 ID 목록 (None이면 전체)
+        compression: Parquet 압축 코덱
+
+    Returns:
+        {'YYYY-MM': 행 수} 형태의 월별 내보낸 행 수
+    """
+    pa, pq, _ = _require_pyarrow()
+
+    sessions = db_manager.get_minute_sessions()
+    if trade_session_ids is not None:
+        wanted = set(trade_session_ids)
+        sessions = [s for s in sessions if s['trade_session_id'] in wanted]
+    sessions.sort(key=lambda s: s['trade_session_id'])
+
+    bars_root = os.path.join(root, BARS_DIR)
+    os.makedirs(bars_root, exist_ok=True)
+    # 이전 내보내기에서 남은 월 디렉토리가 이번 보관본에 섞이지 않도록 먼저 비웁니다.
+    for entry in os.listdir(bars_root):
+        if entry.startswith('month='):
+            shutil.rmtree(os.path.join(bars_root, entry))
+
+    session_table = pa.Table.from_pylist(
+        [{column: session.get(column) for column in SESSION_COLUMNS} for session in sessions],
+        schema=_sessions_schema(pa),
+    )
+    pq.write_table(session_table, os.path.join(root, SESSIONS_FILE), compression=compression)
+
+    # 세션 ID -> ticker 매핑 (분봉 행마다 문자열을 만들지 않고 인덱스로 딕셔너리 배열을 구성)
+    session_ids = np.array([s['trade_session_id'] for s in sessions], dtype=np.int32)
+    tickers = pa.array([s['ticker'] for s in sessions], type=pa.string())
+
+    # 세션 요약의 첫/마지막 분봉 시간으로 월별 세션 목록을 만들어, 한 달 분량씩만 불러와 내보냅니다.
+    month_sessions: Dict[np.datetime64, List[int]] = {}
+    for session in sessions:
+        if not session.get('bar_count'):
+            continue
+        first_month = np.datetime64(session['first_datetime'], 'M')
+        last_month = np.datetime64(session['last_datetime'], 'M')
+        for month in np.arange(first_month, last_month + 1):
+            month_sessions.setdefault(month, []).append(session['trade_session_id'])
+
+    exported = {}
+    for month in sorted(month_sessions):
+        bars = db_manager.load_minute_bar_arrays(month_sessions[month])
+        # 스트리밍 조회 결과가 (세션, 시간) 순이므로 월별로 잘라내도 정렬이 유지됩니다.
+        mask = bars['datetime'].astype('datetime64[M]') == month
+        if not mask.any():
+            continue
+        month_session_ids = bars['trade_session_id'][mask]
+        ticker_indices = np.searchsorted(session_ids, month_session_ids).astype(np.int32)
+        table = pa.table({
+            'trade_session_id': pa.array(month_session_ids, type=pa.int32()),
+            'ticker': pa.DictionaryArray.from_arrays(pa.array(ticker_indices), tickers),
+            'datetime': pa.array(bars['datetime'][mask], type=pa.timestamp('s')),
+            'price': pa.array(bars['price'][mask], type=pa.int32()),
+        })
+
+        month_key = str(month)
+        month_dir = os.path.join(bars_root, f"month={month_key}")
+        os.makedirs(month_dir, exist_ok=True)
+        pq.write_table(
+            table, os.path.join(month_dir, 'part-0.parquet'),
+            compression=compression,
+            row_group_size=ROW_GROUP_ROWS,
+            use_dictionary=['ticker'],
+            column_encoding={'trade_session_id': 'DELTA_BINARY_PACKED', 'datetime': 'DELTA_BINARY_PACKED'},
+        )
+        exported[month_key] = table.num_rows
+        logging.info(f"{month_key} 분봉 {table.num_rows}건 내보내기 완료")
+
+    if not exported:
+        logging.info("내보낼 분봉 데이터가 없습니다.")
+    return exported
+
+
+def import_minute_bars(db_manager: Any, root: str, months: Optional[Iterable[str]] = None,
+                       batch_rows: int = IMPORT_BATCH_ROWS) -> int:
+    """
+    export_minute_bars로 만든 Parquet 파일을 저장소로 가져옵니다.
+
+    Args:
+        db_manager: StorageBackend 구현체 (save_minute_prices 사용)
+        root: export_minute_bars 출력 디렉토리
+        months: 가져올 월 목록 ('YYYY-MM', None이면 전체)
+        batch_rows: save_minute_prices 한 번에 넘기는 행 수
+
+    Returns:
+        가져온 분봉 행 수
+    """
+    _, pq, _ = _require_pyarrow()
+
+    sessions = {
+        session['trade_session_id']: session
+        for session in pq.read_table(os.path.join(root, SESSIONS_FILE),
+                                     columns=['trade_session_id', 'high_rise_date', 'ticker', 'name']).to_pylist()
+    }
+
+    bars_root = os.path.join(root, BARS_DIR)
+    month_dirs = sorted(d for d in os.listdir(bars_root) if d.startswith('month='))
+    if months is not None:
+        wanted = {f"month={month}" for month in months}
+        month_dirs = [d for d in month_dirs if d in wanted]
+
+    imported = 0
+    for month_dir in month_dirs:
+        parquet_file = pq.ParquetFile(os.path.join(bars_root, month_dir, 'part-0.parquet'))
+        for batch in parquet_file.iter_batches(batch_size=batch_rows,
+                                               columns=['trade_session_id', 'datetime', 'price']):
+            price_data = []
+            for trade_session_id, bar_datetime, price in zip(*(column.to_pylist() for column in batch.columns)):
+                session = sessions[trade_session_id]
+                price_data.append({
+                    'trade_session_id': trade_session_id,
+                    'high_rise_date': session['high_rise_date'],
+                    'ticker': session['ticker'],
+                    'name': session['name'],
+                    'datetime': bar_datetime,
+                    'price': price,
+                })
+            db_manager.save_minute_prices(price_data)
+            imported += len(price_data)
+        logging.info(f"{month_dir[len('month='):]} 분봉 가져오기 완료 (누적 {imported}건)")
+
+    return imported
+
+
+class ParquetMinuteReader:
+    """export_minute_bars 출력 디렉토리를 백테스트용 분봉 저장소처럼 읽는 읽기 전용 리더"""
+
+    def __init__(self, root: str):
+        pa, pq, ds = _require_pyarrow()
+        self._pa = pa
+        self._ds = ds
+        self.root = root
+        self._sessions = pq.read_table(os.path.join(root, SESSIONS_FILE)).to_pylist()
+        self._sessions_by_id = {session['trade_session_id']: session for session in self._sessions}
+        # 스키마를 지정하여 빈 보관본에서도 같은 형태로 조회되도록 합니다.
+        schema = _bars_schema(pa)
+        self._dataset = ds.dataset(os.path.join(root, BARS_DIR), schema=schema, format='parquet',
+                                   partitioning=ds.partitioning(pa.schema([schema.field('month')]), flavor='hive'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get_minute_sessions(self) -> List[Dict[str, Any]]:
+        """세션 목록을 최신 상승일 순으로 반환합니다. (DB 구현과 같은 형태)"""
+        return sorted(self._sessions, key=lambda s: (s['high_rise_date'], s['trade_session_id']), reverse=True)
+
+    def _session_filter(self, trade_session_id: int, start_datetime: Optional[datetime] = None):
+        ds = self._ds
+        expression = ds.field('trade_session_id') == trade_session_id
+        session = self._sessions_by_id.get(trade_session_id)
+        # 세션의 첫/마지막 분봉 시간으로 월 파티션을 먼저 걸러냅니다.
+        if session and session.get('first_datetime') and session.get('last_datetime'):
+            first = max(start_datetime, session['first_datetime']) if start_datetime else session['first_datetime']
+            expression &= (ds.field('month') >= _month_key(first)) & (ds.field('month') <= _month_key(session['last_datetime']))
+        if start_datetime is not None:
+            expression &= ds.field('datetime') >= self._pa.scalar(start_datetime, type=self._pa.timestamp('s'))
+        return expression
+
+    def _read_session(self, trade_session_id: int, start_datetime: Optional[datetime] = None):
+        """세션 분봉의 (datetime, price) 컬럼만 시간 순으로 읽습니다."""
+        table = self._dataset.to_table(columns=['datetime', 'price'],
+                                       filter=self._session_filter(trade_session_id, start_datetime))
+        table = table.sort_by('datetime')
+        return table.column('datetime').to_pylist(), table.column('price').to_pylist()
+
+    def get_all_minute_prices_for_session(self, trade_session_id: int) -> List[Dict[str, Any]]:
+        """세션의 전체 분봉을 시간 순으로 반환합니다."""
+        session = self._sessions_by_id.get(trade_session_id)
+        if session is None:
+            return []
+        datetimes, prices = self._read_session(trade_session_id)
+        return [
+            {'ticker': session['ticker'], 'name': session['name'], 'datetime': bar_datetime, 'price': price}
+            for bar_datetime, price in zip(datetimes, prices)
+        ]
+
+    def get_minute_prices_after_datetime(self, trade_session_id: int, start_datetime: datetime) -> List[Dict[str, Any]]:
+        """세션의 start_datetime 이후 분봉을 시간 순으로 반환합니다."""
+        if trade_session_id not in self._sessions_by_id:
+            return []
+        datetimes, prices = self._read_session(trade_session_id, start_datetime)
+        return [{'datetime': bar_datetime, 'price': price} for bar_datetime, price in zip(datetimes, prices)]
+
+    def load_minute_bar_arrays(self, trade_session_ids: Optional[Sequence[int]] = None) -> Dict[str, np.ndarray]:
+        """분봉을 (trade_session_id, datetime, price) NumPy 배열로 반환합니다. (DB 구현과 같은 형태)"""
+        if trade_session_ids is not None and not trade_session_ids:
+            return empty_bar_arrays()
+        expression = None
+        if trade_session_ids is not None:
+            expression = self._ds.field('trade_session_id').isin(list(trade_session_ids))
+        table = self._dataset.to_table(columns=['trade_session_id', 'datetime', 'price'], filter=expression)
+        if not table.num_rows:
+            return empty_bar_arrays()
+        table = table.sort_by([('trade_session_id', 'ascending'), ('datetime', 'ascending')])
+        return {
+            'trade_session_id': table.column('trade_session_id').to_numpy().astype(np.int32, copy=False),
+            'datetime': table.column('datetime').to_numpy().astype('datetime64[s]', copy=False),
+            'price': table.column('price').to_numpy().astype(np.int32, copy=False),
+        }
+
+    def close(self):
+        self._dataset = None
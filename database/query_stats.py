@@ -0,0 +1,227 @@
+"""
+DB 쿼리 실행 시간 계측 모듈
+
+DatabaseManager의 커서를 감싸 execute/executemany마다 다음을 수집합니다.
+- 쿼리 지문(리터럴/플레이스홀더를 정규화한 SQL)별 실행 횟수, 누적/최대 시간, 처리 행 수
+- log2(마이크로초) 버킷 지연 시간 히스토그램
+- 호출한 DatabaseManager 메서드 이름
+- 임계값을 넘는 느린 쿼리는 JSONL 파일에 기록
+
+snapshot()/format_snapshot()으로 현재까지의 통계를 조회합니다.
+"""
+import json
+import logging
+import re
+import sys
+import threading
+from datetime import datetime
+from functools import lru_cache
+from time import perf_counter_ns
+from typing import Any, Dict, List, Optional
+
+from config.config import DB_QUERY_STATS, DB_SLOW_QUERY_MS, DB_SLOW_QUERY_LOG
+
+# 히스토그램 버킷 수 (버킷 i: 2^(i-1) ~ 2^i 마이크로초)
+HISTOGRAM_BUCKETS = 32
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql: str) -> str:
+    """리터럴과 IN 목록 길이를 정규화하여 같은 형태의 쿼리를 하나로 묶는 지문을 만듭니다."""
+    normalized = _STRING_LITERAL.sub('?', sql)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _IN_LIST.sub('IN (?+)', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+class _StatementStats:
+    """쿼리 지문 하나에 대한 누적 통계"""
+    __slots__ = ('count', 'errors', 'total_ns', 'max_ns', 'rows', 'histogram', 'callers')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.rows = 0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+        self.callers: Dict[str, int] = {}
+
+
+class QueryStats:
+    """프로세스 전체의 쿼리 통계 저장소"""
+
+    def __init__(self, slow_query_ms: float = DB_SLOW_QUERY_MS, slow_query_log: Optional[str] = DB_SLOW_QUERY_LOG):
+        self.slow_query_ns = int(slow_query_ms * 1_000_000)
+        self.slow_query_log = slow_query_log
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _StatementStats] = {}
+        self._by_sql: Dict[str, _StatementStats] = {}
+
+    def record(self, sql: str, elapsed_ns: int, rows: int, caller: str, failed: bool = False):
+        """쿼리 1회 실행 결과를 기록합니다."""
+        # 원본 SQL 문자열 -> 통계 객체 캐시로 호출마다 지문을 다시 계산하지 않습니다.
+        stats = self._by_sql.get(sql)
+        if stats is None:
+            stats = self._register(sql)
+        # 버킷 i: 약 2^(i-1) ~ 2^i 마이크로초 (1024ns 단위로 근사)
+        bucket = (elapsed_ns >> 10).bit_length()
+        if bucket >= HISTOGRAM_BUCKETS:
+            bucket = HISTOGRAM_BUCKETS - 1
+        with self._lock:
+            stats.count += 1
+            stats.total_ns += elapsed_ns
+            if elapsed_ns > stats.max_ns:
+                stats.max_ns = elapsed_ns
+            if rows > 0:
+                stats.rows += rows
+            if failed:
+                stats.errors += 1
+            stats.histogram[bucket] += 1
+            callers = stats.callers
+            callers[caller] = callers.get(caller, 0) + 1
+
+        if elapsed_ns >= self.slow_query_ns:
+            self._write_slow_query(fingerprint(sql), sql, elapsed_ns, rows, caller, failed)
+
+    def _register(self, sql: str) -> _StatementStats:
+        """SQL 문자열을 지문별 통계 객체에 연결합니다."""
+        key = fingerprint(sql)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = _StatementStats()
+            # 동적으로 생성되는 SQL(IN 목록 등)로 캐시가 무한히 커지지 않도록 제한합니다.
+            if len(self._by_sql) < 4096:
+                self._by_sql[sql] = stats
+        return stats
+
+    def _write_slow_query(self, key: str, sql: str, elapsed_ns: int, rows: int, caller: str, failed: bool):
+        """느린 쿼리를 JSONL 파일에 한 줄씩 기록합니다. (바인드 파라미터는 기록하지 않습니다.)"""
+        if not self.slow_query_log:
+            return
+        entry = {
+            'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+            'elapsed_ms': round(elapsed_ns / 1_000_000, 3),
+            'caller': caller,
+            'rows': rows,
+            'failed': failed,
+            'fingerprint': key,
+            'sql': _WHITESPACE.sub(' ', sql).strip()[:2000],
+        }
+        try:
+            with open(self.slow_query_log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError as e:
+            logging.error(f"느린 쿼리 로그 기록 중 오류 발생: {e}")
+
+    @staticmethod
+    def _percentile_ms(histogram: List[int], count: int, ratio: float) -> float:
+        """히스토그램 버킷 상한으로 백분위 지연 시간(ms)을 추정합니다."""
+        threshold = count * ratio
+        seen = 0
+        for bucket, bucket_count in enumerate(histogram):
+            seen += bucket_count
+            if seen >= threshold:
+                return (1 << bucket) / 1000
+        return (1 << (len(histogram) - 1)) / 1000
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """쿼리 지문별 통계를 누적 시간이 큰 순서로 반환합니다."""
+        with self._lock:
+            items = [
+                (key, stats.count, stats.errors, stats.total_ns, stats.max_ns, stats.rows,
+                 list(stats.histogram), dict(stats.callers))
+                for key, stats in self._stats.items()
+            ]
+
+        result = []
+        for key, count, errors, total_ns, max_ns, rows, histogram, callers in items:
+            result.append({
+                'fingerprint': key,
+                'count': count,
+                'errors': errors,
+                'rows': rows,
+                'total_ms': round(total_ns / 1_000_000, 3),
+                'avg_ms': round(total_ns / count / 1_000_000, 3),
+                'max_ms': round(max_ns / 1_000_000, 3),
+                'p50_ms': self._percentile_ms(histogram, count, 0.50),
+                'p95_ms': self._percentile_ms(histogram, count, 0.95),
+                'p99_ms': self._percentile_ms(histogram, count, 0.99),
+                'histogram_us': {f"<{1 << bucket}": n for bucket, n in enumerate(histogram) if n},
+                'callers': callers,
+            })
+        result.sort(key=lambda item: item['total_ms'], reverse=True)
+        return result
+
+    def format_snapshot(self, top: int = 20) -> str:
+        """snapshot() 결과를 로그/콘솔 출력용 표 문자열로 만듭니다."""
+        lines = [f"{'total_ms':>10} {'count':>7} {'avg_ms':>8} {'p95_ms':>8} {'max_ms':>9}  caller / query"]
+        for item in self.snapshot()[:top]:
+            callers = ','.join(sorted(item['callers'], key=item['callers'].get, reverse=True))
+            lines.append(
+                f"{item['total_ms']:>10.1f} {item['count']:>7} {item['avg_ms']:>8.2f} "
+                f"{item['p95_ms']:>8.2f} {item['max_ms']:>9.2f}  {callers} / {item['fingerprint'][:120]}"
+            )
+        return '\n'.join(lines)
+
+    def reset(self):
+        """누적 통계를 초기화합니다."""
+        with self._lock:
+            self._stats.clear()
+            self._by_sql.clear()
+
+
+# 프로세스 전역 통계 저장소
+query_stats = QueryStats()
+
+
+class InstrumentedCursor:
+    """execute/executemany 실행 시간을 query_stats에 기록하는 커서 래퍼"""
+    __slots__ = ('_cursor', '_stats')
+
+    def __init__(self, cursor: Any, stats: QueryStats = query_stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def execute(self, sql: str, *args):
+        start = perf_counter_ns()
+        failed = True
+        try:
+            result = self._cursor.execute(sql, *args)
+            failed = False
+            return result
+        finally:
+            self._stats.record(sql, perf_counter_ns() - start, self._cursor.rowcount,
+                               sys._getframe(1).f_code.co_name, failed)
+
+    def executemany(self, sql: str, *args):
+        start = perf_counter_ns()
+        failed = True
+        try:
+            result = self._cursor.executemany(sql, *args)
+            failed = False
+            return result
+        finally:
+            self._stats.record(sql, perf_counter_ns() - start, self._cursor.rowcount,
+                               sys._getframe(1).f_code.co_name, failed)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name: str):
+        return getattr(self._cursor, name)
+
+
+def instrument_cursor(cursor: Any) -> Any:
+    """계측이 활성화되어 있으면 커서를 InstrumentedCursor로 감싸서 반환합니다."""
+    if not DB_QUERY_STATS:
+        return cursor
+    return InstrumentedCursor(cursor)
@@ -0,0 +1,190 @@
+"""
+오래된 데이터 보존 기간 정리 모듈
+
+큰 범위를 한 번의 DELETE로 지우면 긴 락과 undo 로그 증가로 장중 조회에 영향을 주므로,
+- 월 파티션 전체가 보존 기간을 지난 경우 파티션을 DROP 하고
+- 나머지 행은 기본키 순서의 keyset 청크 단위로 나누어 청크마다 커밋하며
+- 청크 사이에 잠시 쉬어 다른 쿼리가 끼어들 수 있도록 합니다.
+deadline을 지정하면 그 시각 이후에는 남은 분량을 다음 실행으로 미룹니다.
+요약 테이블이 있는 대상(minute_bars → minute_sessions)은 삭제된 행의 그룹 ID를 모아
+on_purged 콜백으로 넘기므로, 호출자가 같은 트랜잭션 안에서 요약을 갱신할 수 있습니다.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from config.config import RETENTION_CHUNK_ROWS, RETENTION_CHUNK_SLEEP_MS
+
+
+@dataclass(frozen=True)
+class RetentionTarget:
+    """정리 대상 테이블 정의"""
+    table: str
+    date_column: str
+    # 기본키 컬럼 (keyset 청크 순서)
+    key_columns: Tuple[str, ...]
+    # date_column 기준 RANGE 월 파티션(pYYYYMM) 테이블 여부
+    partitioned: bool = False
+    # 요약 테이블이 집계하는 그룹 컬럼 (삭제 후 on_purged 콜백으로 해당 그룹 ID를 전달)
+    group_column: Optional[str] = None
+
+
+RETENTION_TARGETS: Dict[str, RetentionTarget] = {
+    'upper_stocks': RetentionTarget('upper_stocks', 'date', ('date', 'ticker')),
+    'minute_bars': RetentionTarget('minute_bars', 'datetime', ('trade_session_id', 'datetime'), partitioned=True,
+                                   group_column='trade_session_id'),
+    # 분봉이 모두 정리된 세션의 메타데이터 (minute_bars 정리 후 실행)
+    'minute_sessions': RetentionTarget('minute_sessions', 'last_datetime', ('trade_session_id',)),
+}
+
+# 진행 상황 콜백: (테이블, 누적 삭제 행 수, 삭제 예정 행 수)
+ProgressCallback = Callable[[str, int, int], None]
+# 삭제 후 콜백: (테이블, 행이 삭제된 그룹 ID 집합). 커밋 전에 호출됩니다.
+PurgedCallback = Callable[[str, Set[Any]], None]
+
+
+def _log_progress(table: str, deleted: int, total: int):
+    logging.info(f"{table} 보존 기간 정리 진행: {deleted} / {total}")
+
+
+class RetentionPurger:
+    """보존 기간이 지난 행을 청크 단위로 나누어 삭제합니다."""
+
+    def __init__(self, db_manager: Any, chunk_rows: int = RETENTION_CHUNK_ROWS,
+                 sleep_ms: int = RETENTION_CHUNK_SLEEP_MS, deadline: Optional[datetime] = None,
+                 progress: Optional[ProgressCallback] = _log_progress,
+                 on_purged: Optional[PurgedCallback] = None):
+        self.db_manager = db_manager
+        self.cursor = db_manager.cursor
+        self.chunk_rows = chunk_rows
+        self.sleep_seconds = sleep_ms / 1000
+        self.deadline = deadline
+        self.progress = progress
+        self.on_purged = on_purged
+
+    def past_deadline(self) -> bool:
+        """마감 시각이 지나 남은 정리를 다음 실행으로 미뤄야 하면 True"""
+        return self.deadline is not None and datetime.now() >= self.deadline
+
+    def purge(self, table: str, cutoff: Union[date, datetime, str]) -> int:
+        """
+        table에서 날짜 컬럼이 cutoff 이전인 행을 삭제합니다.
+
+        Returns:
+            삭제한 행 수 (파티션 DROP으로 삭제된 행 포함)
+        """
+        target = RETENTION_TARGETS[table]
+        deleted = 0
+        if target.partitioned:
+            deleted += self.drop_expired_partitions(target, cutoff)
+        deleted += self._delete_in_chunks(target, cutoff)
+        logging.info(f"{table} 보존 기간 정리 완료: {cutoff} 이전 {deleted}건 삭제")
+        return deleted
+
+    def drop_expired_partitions(self, target: RetentionTarget, cutoff: Union[date, datetime, str]) -> int:
+        """상한값이 cutoff 이하인(모든 행이 cutoff 이전인) 월 파티션을 DROP 합니다."""
+        cutoff_key = str(cutoff)[:10]
+        self.cursor.execute('''
+            SELECT PARTITION_NAME AS partition_name, PARTITION_DESCRIPTION AS upper_bound, TABLE_ROWS AS table_rows
+            FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+        ''', (target.table,))
+        partitions = self.cursor.fetchall()
+
+        # 가장 최근 파티션(p_future 포함)은 항상 남겨 둡니다.
+        expired = [
+            row for row in partitions[:-1]
+            if row['upper_bound'] != 'MAXVALUE' and row['upper_bound'].strip("'")[:10] <= cutoff_key
+        ]
+        dropped_rows = 0
+        for row in expired:
+            if self.past_deadline():
+                logging.info(f"{target.table} 파티션 정리를 마감 시각 이후로 미룹니다.")
+                break
+            group_ids: Set[Any] = set()
+            if target.group_column and self.on_purged:
+                self.cursor.execute(
+                    f"SELECT DISTINCT `{target.group_column}` AS group_id "
+                    f"FROM {target.table} PARTITION ({row['partition_name']})"
+                )
+                group_ids = {r['group_id'] for r in self.cursor.fetchall()}
+            # DROP PARTITION은 메타데이터 작업이라 행 수와 무관하게 빠르게 끝납니다. (암묵적 커밋)
+            self.cursor.execute(f"ALTER TABLE {target.table} DROP PARTITION {row['partition_name']}")
+            dropped_rows += row['table_rows'] or 0
+            if group_ids:
+                try:
+                    self.cursor.execute("START TRANSACTION")
+                    self.on_purged(target.table, group_ids)
+                    self.db_manager.conn.commit()
+                except Exception as e:
+                    self.db_manager.conn.rollback()
+                    logging.error(f"{target.table} 파티션 삭제 후 요약 갱신 중 오류 발생: {e}")
+                    raise
+            logging.info(f"{target.table} 파티션 {row['partition_name']} 삭제 (약 {row['table_rows']}행)")
+        return dropped_rows
+
+    def _delete_in_chunks(self, target: RetentionTarget, cutoff: Union[date, datetime, str]) -> int:
+        keys = ', '.join(f"`{column}`" for column in target.key_columns)
+        placeholders = ', '.join(['%s'] * len(target.key_columns))
+        date_column = f"`{target.date_column}`"
+
+        self.cursor.execute(f"SELECT COUNT(*) AS cnt FROM {target.table} WHERE {date_column} < %s", (cutoff,))
+        total = self.cursor.fetchone()['cnt']
+        if not total:
+            return 0
+
+        deleted = 0
+        last_key: Optional[List[Any]] = None
+        while not self.past_deadline():
+            # 이번 청크의 마지막 기본키를 찾고 (last_key, upper_key] 범위만 삭제하여 락 범위를 제한합니다.
+            after = f"AND ({keys}) > ({placeholders})" if last_key else ''
+            params: List[Any] = [cutoff] + (last_key or [])
+            self.cursor.execute(f'''
+                SELECT {keys} FROM {target.table}
+                WHERE {date_column} < %s {after}
+                ORDER BY {keys}
+                LIMIT 1 OFFSET %s
+            ''', params + [self.chunk_rows - 1])
+            upper = self.cursor.fetchone()
+            upper_key = [upper[column] for column in target.key_columns] if upper else None
+
+            if upper_key:
+                where = f"WHERE {date_column} < %s {after} AND ({keys}) <= ({placeholders})"
+                chunk_params = params + upper_key
+            else:
+                # 마지막 청크
+                where = f"WHERE {date_column} < %s {after}"
+                chunk_params = params
+
+            try:
+                self.cursor.execute("START TRANSACTION")
+                group_ids: Set[Any] = set()
+                if target.group_column and self.on_purged:
+                    self.cursor.execute(
+                        f"SELECT DISTINCT `{target.group_column}` AS group_id FROM {target.table} {where}",
+                        chunk_params
+                    )
+                    group_ids = {r['group_id'] for r in self.cursor.fetchall()}
+                self.cursor.execute(f"DELETE FROM {target.table} {where}", chunk_params)
+                deleted += max(self.cursor.rowcount, 0)
+                if group_ids:
+                    self.on_purged(target.table, group_ids)
+                self.db_manager.conn.commit()
+            except Exception as e:
+                self.db_manager.conn.rollback()
+                logging.error(f"{target.table} 보존 기간 정리 중 오류 발생: {e}")
+                raise
+
+            if self.progress:
+                self.progress(target.table, deleted, total)
+            if not upper_key:
+                break
+            last_key = upper_key
+            time.sleep(self.sleep_seconds)
+        else:
+            logging.info(f"{target.table} 보존 기간 정리를 마감 시각 이후로 미룹니다. ({deleted} / {total})")
+
+        return deleted
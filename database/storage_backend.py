@@ -0,0 +1,104 @@
+"""
+저장소 백엔드 공통 인터페이스
+
+백테스트/분봉 저장 경로와 급등주 수집 스크립트(pykrx_select_upper_stocks.py,
+pykrx_fetch_minute_data.py, check_db_data.py)에서 사용하는 메서드를 정의하고,
+설정(DB_BACKEND)에 따라 MariaDB 또는 내장 SQLite 구현을 생성합니다.
+실거래 경로(토큰, 거래 세션, 거래 내역, 보존 기간 정리)는 MariaDB DatabaseManager만 지원합니다.
+"""
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config.config import DB_BACKEND
+from database.bar_arrays import MINUTE_BAR_FETCH_SIZE
+
+
+class StorageBackend(ABC):
+    """분봉/급등주 데이터 저장소가 구현해야 하는 메서드 모음"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @abstractmethod
+    def save_pykrx_upper_stocks(self, stocks_data: List[Dict[str, Any]]):
+        """pykrx_upper_stocks 테이블에 데이터를 저장/갱신합니다."""
+
+    @abstractmethod
+    def get_pykrx_upper_stocks(self, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """지정된 기간의 pykrx_upper_stocks 데이터를 조회합니다."""
+
+    @abstractmethod
+    def save_selected_pykrx_upper_stocks(self, stocks_data: List[Dict[str, Any]]):
+        """선별된 급등주 정보를 selected_pykrx_upper_stocks 테이블에 저장합니다."""
+
+    @abstractmethod
+    def get_selected_pykrx_upper_stocks(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """지정된 기간 또는 전체 기간의 selected_pykrx_upper_stocks 데이터를 조회합니다."""
+
+    @abstractmethod
+    def get_selected_pykrx_upper_stocks_by_date_range(self, start_date: date, end_date: date,
+                                                      buy_offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        급등일과 매수일(급등일로부터 buy_offset 영업일 후)이 모두 start_date~end_date에 포함되는 선별 종목을 조회합니다.
+
+        각 행에는 계산된 매수일(buy_date)이 포함됩니다.
+        """
+
+    @abstractmethod
+    def save_minute_prices(self, price_data: List[Dict[str, Any]]):
+        """분봉 데이터를 minute_sessions/minute_bars에 저장합니다."""
+
+    @abstractmethod
+    def rebuild_minute_session_summary(self):
+        """전체 세션의 minute_sessions 요약 컬럼을 다시 계산합니다."""
+
+    @abstractmethod
+    def get_minute_sessions(self) -> List[Dict[str, Any]]:
+        """분봉 데이터가 저장된 거래 세션 목록을 조회합니다."""
+
+    @abstractmethod
+    def get_all_minute_prices_for_session(self, trade_session_id: int) -> List[Dict[str, Any]]:
+        """지정된 거래 세션 ID의 모든 분봉 데이터를 조회합니다."""
+
+    @abstractmethod
+    def get_minute_prices_after_datetime(self, trade_session_id: int, start_datetime: datetime) -> List[Dict[str, Any]]:
+        """지정된 거래 세션 ID와 시작 시간 이후의 분봉 데이터를 조회합니다."""
+
+    @abstractmethod
+    def load_minute_bar_arrays(self, trade_session_ids: Optional[Sequence[int]] = None,
+                               chunk_size: int = MINUTE_BAR_FETCH_SIZE) -> Dict[str, np.ndarray]:
+        """
+        분봉 데이터를 스트리밍 커서로 읽어 NumPy 배열로 반환합니다.
+
+        trade_session_ids가 None이면 전체 분봉을 (trade_session_id, datetime) 순으로 읽습니다.
+        """
+
+    @abstractmethod
+    def close(self):
+        """저장소 연결을 종료합니다."""
+
+
+def create_storage_backend(backend: Optional[str] = None) -> StorageBackend:
+    """
+    설정된 저장소 백엔드 인스턴스를 생성합니다.
+
+    Args:
+        backend: 'mariadb' 또는 'sqlite' (None이면 DB_BACKEND 설정값 사용)
+
+    구현 모듈은 지연 임포트하여 SQLite만 사용하는 환경에서
+    MariaDB 커넥터가 설치되어 있지 않아도 동작하도록 합니다.
+    """
+    backend = (backend or DB_BACKEND).lower()
+    if backend == 'sqlite':
+        from database.db_manager_sqlite import SQLiteDatabaseManager
+        return SQLiteDatabaseManager()
+    if backend == 'mariadb':
+        from database.db_manager_upper import DatabaseManager
+        return DatabaseManager()
+    raise ValueError(f"지원하지 않는 저장소 백엔드입니다: {backend}")
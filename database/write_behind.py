@@ -0,0 +1,275 @@
+"""
+trading_session_upper / trade_history write-behind 큐
+
+주문 경로 스레드는 큐에 행을 넣기만 하고 바로 반환하며,
+전용 스레드가 N ms 또는 M 행 단위로 모아 하나의 트랜잭션으로 커밋합니다.
+종료 시 stop()을 호출하면 큐에 남은 행을 모두 저장한 후 스레드를 종료합니다.
+재시도 후에도 저장하지 못한 배치는 dead-letter 파일(JSONL)에 남기고 flush()/stop()이 False를 반환하며,
+replay_dead_letters()로 나중에 다시 저장할 수 있습니다.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.config import WRITE_BEHIND_FLUSH_MS, WRITE_BEHIND_MAX_ROWS, WRITE_BEHIND_DEAD_LETTER
+
+# 큐 항목 종류
+_SESSION = 'session'
+_HISTORY = 'history'
+_FLUSH = 'flush'
+_STOP = 'stop'
+
+# 배치 저장 실패 시 재시도 횟수 / 대기 시간(초)
+WRITE_RETRY = 3
+WRITE_RETRY_DELAY = 1
+
+# trading_session_upper 컬럼 순서 (TRADING_SESSION_UPSERT_SQL 파라미터 순서와 동일)
+SESSION_COLUMNS = ('id', 'start_date', 'current_date', 'ticker', 'name', 'high_price', 'fund',
+                   'spent_fund', 'quantity', 'avr_price', 'count', 'trade_condition')
+# upsert가 기존 행에서 갱신하는 컬럼 (TRADING_SESSION_UPSERT_SQL의 ON DUPLICATE KEY UPDATE)
+SESSION_UPDATE_COLUMNS = ('current_date', 'spent_fund', 'quantity', 'avr_price', 'count', 'trade_condition')
+
+
+def _default_db_factory():
+    from database.db_manager_upper import DatabaseManager
+    return DatabaseManager()
+
+
+class WriteBehindQueue:
+    """세션/거래내역 쓰기를 모아서 그룹 커밋하는 백그라운드 작성기"""
+
+    def __init__(self, db_factory: Callable[[], Any] = _default_db_factory,
+                 flush_interval_ms: int = WRITE_BEHIND_FLUSH_MS, max_batch_rows: int = WRITE_BEHIND_MAX_ROWS,
+                 dead_letter_path: Optional[str] = WRITE_BEHIND_DEAD_LETTER):
+        self._db_factory = db_factory
+        self.dead_letter_path = dead_letter_path
+        # 최종 실패한 배치 수 / 행 수 (flush()/stop()이 대기 중 실패 여부를 판단하는 기준)
+        self.failed_batches = 0
+        self.failed_rows = 0
+        self._db = None
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch_rows = max_batch_rows
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        # 아직 커밋되지 않은 세션의 최신 상태 (읽기 시 DB 값 대신 사용)
+        self._pending_sessions: Dict[Any, Tuple[int, Dict[str, Any]]] = {}
+        self._pending_lock = threading.Lock()
+        self._sequence = 0
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="DB_Write_Behind", daemon=True)
+                self._thread.start()
+
+    def submit_session(self, session_id, start_date, current_date, ticker, name, high_price, fund,
+                       spent_fund, quantity, avr_price, count, trade_condition: Optional[str] = None):
+        """trading_session_upper upsert를 큐에 넣습니다. (DatabaseManager.save_trading_session_upper와 같은 인자)"""
+        if not all([session_id, ticker, name]):
+            raise ValueError("필수 파라미터가 누락되었습니다.")
+        if not isinstance(quantity, int) or quantity < 0:
+            raise ValueError(f"유효하지 않은 수량: {quantity}")
+        if not isinstance(avr_price, (int, float)) or avr_price < 0:
+            raise ValueError(f"유효하지 않은 평균가: {avr_price}")
+
+        row = (session_id, start_date, current_date, ticker, name, high_price, fund,
+               spent_fund, quantity, avr_price, count, trade_condition)
+        with self._pending_lock:
+            self._sequence += 1
+            previous = self._pending_sessions.get(session_id, (0, {}))[1]
+            pending = dict(zip(SESSION_COLUMNS, row))
+            # upsert와 동일하게 수량이 0이면 기존 평균가를 유지합니다.
+            if quantity == 0 and 'avr_price' in previous:
+                pending['avr_price'] = previous['avr_price']
+            self._pending_sessions[session_id] = (self._sequence, pending)
+            # 큐에 넣는 순서와 sequence 순서를 일치시키기 위해 락 안에서 넣습니다.
+            self._queue.put((_SESSION, (self._sequence, row)))
+        self._ensure_started()
+
+    def submit_trade_history(self, trade_date, trade_time, ticker, name, buy_avg_price,
+                             sell_price, quantity, profit_amount, profit_rate, remaining_assets):
+        """trade_history insert를 큐에 넣습니다. (DatabaseManager.save_trade_history와 같은 인자)"""
+        self._ensure_started()
+        self._queue.put((_HISTORY, (trade_date, trade_time, ticker, name, buy_avg_price,
+                                    sell_price, quantity, profit_amount, profit_rate, remaining_assets)))
+
+    def get_pending_session(self, session_id) -> Optional[Dict[str, Any]]:
+        """아직 커밋되지 않은 세션 상태가 있으면 반환합니다."""
+        with self._pending_lock:
+            pending = self._pending_sessions.get(session_id)
+            return dict(pending[1]) if pending else None
+
+    def merge_pending_session(self, session_id, row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """DB에서 읽은 세션 행(없으면 None)에 아직 커밋되지 않은 upsert를 반영하여 반환합니다."""
+        pending = self.get_pending_session(session_id)
+        if pending is None:
+            return row
+        if row is None:
+            return pending
+        merged = dict(row)
+        for column in SESSION_UPDATE_COLUMNS:
+            # upsert와 동일하게 수량이 0이면 기존 평균가를 유지합니다.
+            if column == 'avr_price' and pending['quantity'] == 0:
+                continue
+            merged[column] = pending[column]
+        return merged
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        지금까지 큐에 넣은 행이 모두 처리될 때까지 기다립니다.
+
+        Returns:
+            모두 커밋되었으면 True, 대기 시간을 넘겼거나 대기 중 저장에 실패한 배치가 있으면 False
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        failed_before = self.failed_batches
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout) and self.failed_batches == failed_before
+
+    def stop(self, timeout: Optional[float] = 30) -> bool:
+        """
+        남은 행을 모두 저장하고 작성기 스레드를 종료합니다.
+
+        Returns:
+            모두 커밋하고 종료했으면 True, 종료 대기 시간을 넘겼거나 남은 행 저장에 실패했으면 False
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        failed_before = self.failed_batches
+        self._queue.put((_STOP, None))
+        self._thread.join(timeout)
+        stopped = not self._thread.is_alive()
+        if not stopped:
+            logging.error("write-behind 큐 종료 대기 시간 초과 (미저장 %s건)", self._queue.qsize())
+        if self.failed_rows:
+            logging.error("write-behind 저장 실패 %s건이 %s에 남아 있습니다. replay_dead_letters로 다시 저장하세요.",
+                          self.failed_rows, self.dead_letter_path)
+        return stopped and self.failed_batches == failed_before
+
+    def _run(self):
+        while True:
+            batch: List[tuple] = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # 주기(N ms) 또는 최대 행 수(M)에 도달하거나 flush/stop 요청이 오면 배치를 마감합니다.
+            while batch[-1][0] in (_SESSION, _HISTORY) and len(batch) < self.max_batch_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            sessions = [payload for kind, payload in batch if kind == _SESSION]
+            history_rows = [payload for kind, payload in batch if kind == _HISTORY]
+            self._write([row for _, row in sessions], history_rows)
+
+            # 커밋(또는 최종 실패)된 세션은 대기 상태에서 제거합니다. 이후 다시 제출된 최신 상태는 유지합니다.
+            with self._pending_lock:
+                for sequence, row in sessions:
+                    pending = self._pending_sessions.get(row[0])
+                    if pending is not None and pending[0] == sequence:
+                        del self._pending_sessions[row[0]]
+
+            for kind, payload in batch:
+                if kind == _FLUSH:
+                    payload.set()
+            if any(kind == _STOP for kind, _ in batch):
+                self._close_db()
+                return
+
+    def _write(self, session_rows: List[tuple], history_rows: List[tuple]):
+        if not session_rows and not history_rows:
+            return
+        last_error: Optional[Exception] = None
+        for attempt in range(1, WRITE_RETRY + 1):
+            try:
+                if self._db is None:
+                    self._db = self._db_factory()
+                self._db.save_trading_writes_batch(session_rows, history_rows)
+                break
+            except Exception as e:
+                last_error = e
+                logging.error("write-behind 배치 저장 실패 (시도 %s/%s): %s", attempt, WRITE_RETRY, e)
+                # 연결 문제일 수 있으므로 다음 시도에서 새로 연결합니다.
+                self._close_db()
+                if attempt < WRITE_RETRY:
+                    time.sleep(WRITE_RETRY_DELAY)
+        else:
+            self.failed_batches += 1
+            self.failed_rows += len(session_rows) + len(history_rows)
+            self._write_dead_letter(session_rows, history_rows, last_error)
+
+    def _write_dead_letter(self, session_rows: List[tuple], history_rows: List[tuple], error: Exception):
+        """최종 실패한 배치를 dead-letter 파일에 한 줄(JSON)로 남깁니다."""
+        entry = {
+            'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+            'error': str(error),
+            'sessions': session_rows,
+            'history': history_rows,
+        }
+        try:
+            if not self.dead_letter_path:
+                raise OSError("dead-letter 파일 경로가 설정되지 않았습니다.")
+            # 날짜/시간/Decimal 값은 문자열로 기록합니다. (MariaDB가 다시 저장할 때 그대로 해석)
+            with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            logging.error("write-behind 배치 저장 최종 실패 - 세션 %s건, 거래내역 %s건을 %s에 보관했습니다.",
+                          len(session_rows), len(history_rows), self.dead_letter_path)
+        except OSError as e:
+            logging.error("write-behind 배치 저장 최종 실패 (dead-letter 기록 실패: %s) - 세션 %s건: %s, 거래내역 %s건: %s",
+                          e, len(session_rows), session_rows, len(history_rows), history_rows)
+
+    def _close_db(self):
+        if self._db is not None:
+            try:
+                self._db.close()
+            except Exception as e:
+                logging.error("write-behind DB 연결 종료 중 오류: %s", e)
+            self._db = None
+
+
+# 프로세스 전역 write-behind 큐 (TradingUpper / 웹소켓 모니터 / DatabaseManager가 공유)
+write_behind = WriteBehindQueue()
+
+
+def replay_dead_letters(db: Any, path: str = WRITE_BEHIND_DEAD_LETTER) -> int:
+    """
+    dead-letter 파일에 남은 배치를 순서대로 다시 저장합니다.
+
+    배치마다 커밋하며, 도중에 실패하면 아직 저장하지 못한 배치만 파일에 남기고 예외를 다시 발생시킵니다.
+
+    Returns:
+        다시 저장한 행 수
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding='utf-8') as f:
+        lines = [line for line in f if line.strip()]
+
+    replayed = 0
+    for index, line in enumerate(lines):
+        entry = json.loads(line)
+        session_rows = [tuple(row) for row in entry['sessions']]
+        history_rows = [tuple(row) for row in entry['history']]
+        try:
+            db.save_trading_writes_batch(session_rows, history_rows)
+        except Exception:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.writelines(lines[index:])
+            raise
+        replayed += len(session_rows) + len(history_rows)
+
+    os.remove(path)
+    logging.info("write-behind dead-letter %s건을 다시 저장했습니다.", replayed)
+    return replayed
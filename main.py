@@ -18,16 +18,29 @@ import time
 import atexit
 import asyncio
 import signal, sys
-from datetime import datetime
+from datetime import datetime, timedelta, time as dt_time
 from trading.trading_upper import TradingUpper
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.executors.pool import ThreadPoolExecutor
 from config.condition import GET_ULS_HOUR, GET_ULS_MINUTE, GET_SELECT_HOUR, GET_SELECT_MINUTE, ORDER_HOUR_1, ORDER_HOUR_2, ORDER_MINUTE_1, ORDER_MINUTE_2
+from config.condition import RETENTION_HOUR, RETENTION_MINUTE, RETENTION_DEADLINE_HOUR
+from config.condition import ORDER_HOUR_3, ORDER_MINUTE_3, KRX_START_HOUR, KRX_START_MINUTE
+from config.condition import KRX_TRADING_START, KRX_TRADING_END, BALANCE_REFRESH_SECONDS
+from config.condition import (CREDENTIAL_REFRESH_INTERVAL_MINUTES, CREDENTIAL_REFRESH_LEAD_MINUTES,
+                              CREDENTIAL_PRE_WINDOW_MINUTES, CREDENTIAL_WINDOW_LEAD_MINUTES)
 from api.kis_websocket import KISWebSocket
 from utils.decorators import business_day_only
 from utils.slack_logger import SlackLogger
 from utils.trading_logger import TradingLogger
+from database.query_stats import query_stats
+from api.http_session import close_sessions
+from api.rate_limiter import kis_rate_limiter
+from api.quote_cache import quote_cache
+from api.balance_cache import balance_snapshot
+from api import retry_policy
+from utils.date_utils import DateUtils
 
 class MainProcess:
     def __init__(self):
@@ -58,6 +71,12 @@ class MainProcess:
                 self.scheduler.shutdown(wait=False)
         except:
             pass
+        # 큐에 남은 세션/거래내역을 모두 저장
+        write_behind = self.trading_upper.write_behind
+        if not write_behind.stop():
+            self.logger.error("세션/거래내역 저장을 마치지 못했습니다.",
+                              {"dead_letter": write_behind.dead_letter_path, "failed_rows": write_behind.failed_rows})
+        close_sessions()
 
     def schedule_manager(self):
         """스케줄 작업을 관리하는 메서드"""
@@ -102,13 +121,46 @@ class MainProcess:
                 replace_existing=True
             )
 
+            # 토큰/웹소켓 인증키 사전 갱신 (주기 점검 + 매수/매도 시간대 직전 점검)
+            self.scheduler.add_job(
+                self.refresh_credentials,
+                IntervalTrigger(minutes=CREDENTIAL_REFRESH_INTERVAL_MINUTES),
+                id='refresh_credentials',
+                next_run_time=datetime.now(),
+                replace_existing=True
+            )
+            for hour, minute in self._trading_windows():
+                before = datetime.combine(datetime.now().date(), dt_time(hour, minute)) - timedelta(minutes=CREDENTIAL_PRE_WINDOW_MINUTES)
+                self.scheduler.add_job(
+                    self.refresh_credentials_before_window,
+                    CronTrigger(hour=before.hour, minute=before.minute),
+                    id=f'refresh_credentials_{hour:02d}{minute:02d}',
+                    replace_existing=True
+                )
+
+            # 장중 잔고 스냅샷 주기 갱신 (체결통보 수신 시에는 즉시 무효화)
+            self.scheduler.add_job(
+                self.refresh_balance,
+                IntervalTrigger(seconds=BALANCE_REFRESH_SECONDS),
+                id='refresh_balance',
+                replace_existing=True
+            )
+
+            self.scheduler.add_job(
+                self.purge_old_data,
+                CronTrigger(hour=RETENTION_HOUR, minute=RETENTION_MINUTE),
+                id='purge_old_data',
+                replace_existing=True
+            )
+
             # 스케줄러 시작
             self.scheduler.start()
             
             print(f"등록된 작업: 상승 추세매매 조회({GET_ULS_HOUR}:{GET_ULS_MINUTE}), " 
                   f"종목 선정({GET_SELECT_HOUR}:{GET_SELECT_MINUTE}), "
                   f"매수 시간({ORDER_HOUR_1}:{ORDER_MINUTE_1}, "
-                  f"{ORDER_HOUR_2}:{ORDER_MINUTE_2}) ")
+                  f"{ORDER_HOUR_2}:{ORDER_MINUTE_2}), "
+                  f"데이터 정리({RETENTION_HOUR}:{RETENTION_MINUTE}) ")
 
             # 명시적인 무한 루프로 스케줄러 유지
             while True:
@@ -154,6 +206,52 @@ class MainProcess:
         except Exception as e:
             print(f"매수 태스크 실행 에러: {str(e)}")
 
+    @staticmethod
+    def _trading_windows():
+        """인증이 필요한 매수/매도 시간대 (시, 분) 목록"""
+        return sorted({
+            (GET_SELECT_HOUR, GET_SELECT_MINUTE),
+            (KRX_START_HOUR, KRX_START_MINUTE),
+            (ORDER_HOUR_1, ORDER_MINUTE_1),
+            (ORDER_HOUR_2, ORDER_MINUTE_2),
+            (ORDER_HOUR_3, ORDER_MINUTE_3),
+        })
+
+    def refresh_credentials(self):
+        """만료가 임박한 토큰/웹소켓 인증키를 미리 갱신"""
+        try:
+            self.trading_upper.kis_api.refresh_credentials(lead=timedelta(minutes=CREDENTIAL_REFRESH_LEAD_MINUTES))
+        except Exception as e:
+            print(f"인증 정보 갱신 에러: {str(e)}")
+
+    @business_day_only()
+    def refresh_credentials_before_window(self):
+        """매수/매도 시간대 동안 만료되지 않도록 시작 전에 토큰/웹소켓 인증키를 갱신"""
+        try:
+            self.trading_upper.kis_api.refresh_credentials(lead=timedelta(minutes=CREDENTIAL_WINDOW_LEAD_MINUTES))
+        except Exception as e:
+            print(f"인증 정보 갱신 에러: {str(e)}")
+
+    def refresh_balance(self):
+        """장중 잔고 스냅샷을 주기적으로 갱신 (매도/모니터링 경로가 메모리에서 보유 내역을 읽도록)"""
+        now = datetime.now()
+        if not (KRX_TRADING_START <= now.time() <= KRX_TRADING_END) or not DateUtils.is_business_day(now):
+            return
+        try:
+            # 다른 경로가 주기의 절반 이내에 이미 조회했다면 다시 요청하지 않습니다.
+            self.trading_upper.kis_api.balance_inquiry(BALANCE_REFRESH_SECONDS / 2)
+        except Exception as e:
+            print(f"잔고 스냅샷 갱신 에러: {str(e)}")
+
+    def purge_old_data(self):
+        """보존 기간이 지난 데이터를 청크 단위로 정리 (장 시작 전 마감 시각까지만 실행)"""
+        deadline = datetime.combine(datetime.now().date(), dt_time(RETENTION_DEADLINE_HOUR))
+        try:
+            self.trading_upper.delete_old_stocks(deadline=deadline)
+            self.trading_upper.delete_old_minute_bars(deadline=deadline)
+        except Exception as e:
+            print(f"데이터 정리 태스크 실행 에러: {str(e)}")
+
 ######################################################################################
 #################################    모니터링 실행   #####################################
 ######################################################################################
@@ -169,7 +267,7 @@ class MainProcess:
         
         try:    
             # trading = TradingLogic()
-            kis_websocket = KISWebSocket(self.trading_upper.sell_order)
+            kis_websocket = KISWebSocket(self.trading_upper.sell_order_async, self.trading_upper.async_kis_api)
             self.trading_upper.kis_websocket = kis_websocket  # KISWebSocket 인스턴스 설정
             sessions_info = self.trading_upper.get_session_info_upper()
 
@@ -258,6 +356,17 @@ class MainProcess:
         self.stop_event.set()   # 루프 중단 신호
         self.stop_all()
         self.cleanup()
+        self.log_runtime_stats()
+
+    def log_runtime_stats(self):
+        """종료 시 쿼리/호출 한도/시세 캐시/잔고 스냅샷/재시도 통계를 로그로 남깁니다."""
+        self.logger.info(query_stats.format_snapshot())
+        for bucket, metrics in kis_rate_limiter.snapshot().items():
+            self.logger.info(f"[rate-limit] {bucket}", metrics)
+        self.logger.info("[quote-cache]", quote_cache.snapshot())
+        self.logger.info("[balance-snapshot]", balance_snapshot.snapshot())
+        for name, metrics in retry_policy.snapshot().items():
+            self.logger.info(f"[retry] {name}", metrics)
     
 ##################################  이까지 클래스  ####################################
 
@@ -0,0 +1,117 @@
+import argparse
+import sys
+import os
+
+# 프로젝트 루트 경로를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from database.db_manager_upper import DatabaseManager
+
+def migrate_data(chunk_size: int = 50000, drop_legacy: bool = False):
+    """기존 minute_prices 데이터를 minute_sessions / minute_bars 테이블로 마이그레이션합니다."""
+    # MariaDB 연결 (연결 시 신규 테이블이 자동으로 생성됩니다.)
+    db_manager = DatabaseManager()
+    cursor = db_manager.cursor
+
+    try:
+        # 1. 레거시 테이블 존재 여부 확인
+        cursor.execute('''
+            SELECT COUNT(*) AS cnt FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'minute_prices'
+        ''')
+        if not cursor.fetchone()['cnt']:
+            print("마이그레이션할 minute_prices 테이블이 없습니다.")
+            return
+
+        cursor.execute('SELECT MIN(datetime) AS min_dt, MAX(datetime) AS max_dt, COUNT(*) AS cnt FROM minute_prices')
+        summary = cursor.fetchone()
+        if not summary['cnt']:
+            print("minute_prices 테이블에 마이그레이션할 데이터가 없습니다.")
+            return
+
+        # 2. 데이터 기간에 맞는 월 파티션을 먼저 생성
+        db_manager.ensure_minute_bar_partitions(summary['min_dt'], summary['max_dt'])
+
+        # 3. 세션 메타데이터 이관 (세션당 1행)
+        cursor.execute("START TRANSACTION")
+        cursor.execute('''
+            INSERT INTO minute_sessions (trade_session_id, high_rise_date, ticker, name)
+            SELECT trade_session_id, MAX(high_rise_date), MAX(ticker), MAX(name)
+            FROM minute_prices
+            GROUP BY trade_session_id
+            ON DUPLICATE KEY UPDATE
+                high_rise_date = VALUES(high_rise_date),
+                ticker = VALUES(ticker),
+                name = VALUES(name)
+        ''')
+        db_manager.conn.commit()
+
+        # 4. 분봉 데이터는 PK 순서의 keyset 청크 단위로 이관 (긴 트랜잭션/락 방지)
+        last_session_id, last_datetime = -1, summary['min_dt']
+        migrated = 0
+        while True:
+            cursor.execute('''
+                SELECT trade_session_id, datetime
+                FROM minute_prices
+                WHERE (trade_session_id, datetime) > (%s, %s)
+                ORDER BY trade_session_id, datetime
+                LIMIT 1 OFFSET %s
+            ''', (last_session_id, last_datetime, chunk_size - 1))
+            upper = cursor.fetchone()
+
+            cursor.execute("START TRANSACTION")
+            if upper:
+                cursor.execute('''
+                    INSERT INTO minute_bars (trade_session_id, datetime, price)
+                    SELECT trade_session_id, datetime, price
+                    FROM minute_prices
+                    WHERE (trade_session_id, datetime) > (%s, %s)
+                      AND (trade_session_id, datetime) <= (%s, %s)
+                    ON DUPLICATE KEY UPDATE price = VALUES(price)
+                ''', (last_session_id, last_datetime, upper['trade_session_id'], upper['datetime']))
+            else:
+                # 마지막 청크
+                cursor.execute('''
+                    INSERT INTO minute_bars (trade_session_id, datetime, price)
+                    SELECT trade_session_id, datetime, price
+                    FROM minute_prices
+                    WHERE (trade_session_id, datetime) > (%s, %s)
+                    ON DUPLICATE KEY UPDATE price = VALUES(price)
+                ''', (last_session_id, last_datetime))
+            migrated += cursor.rowcount if cursor.rowcount > 0 else 0
+            db_manager.conn.commit()
+            print(f"{min(migrated, summary['cnt'])} / {summary['cnt']} 데이터 처리 완료...")
+
+            if not upper:
+                break
+            last_session_id, last_datetime = upper['trade_session_id'], upper['datetime']
+
+        # 5. 세션 요약 정보(분봉 개수, 첫/마지막 시간, 체크섬) 재계산
+        db_manager.rebuild_minute_session_summary()
+
+        # 6. 이관 결과 검증
+        cursor.execute('SELECT COUNT(*) AS cnt FROM minute_bars')
+        bar_count = cursor.fetchone()['cnt']
+        if bar_count < summary['cnt']:
+            print(f"경고: minute_bars 행 수({bar_count})가 minute_prices 행 수({summary['cnt']})보다 적습니다.")
+            return
+
+        if drop_legacy:
+            cursor.execute('DROP TABLE minute_prices')
+            db_manager.conn.commit()
+            print("레거시 minute_prices 테이블을 삭제했습니다.")
+
+        print(f"총 {summary['cnt']}개의 분봉 데이터를 성공적으로 minute_bars로 마이그레이션했습니다.")
+
+    except Exception as e:
+        db_manager.conn.rollback()
+        print(f"데이터 마이그레이션 중 오류 발생: {e}")
+    finally:
+        db_manager.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='minute_prices -> minute_sessions/minute_bars 마이그레이션')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='한 트랜잭션에서 이관할 행 수')
+    parser.add_argument('--drop-legacy', action='store_true', help='검증 후 기존 minute_prices 테이블 삭제')
+    args = parser.parse_args()
+    migrate_data(chunk_size=args.chunk_size, drop_legacy=args.drop_legacy)
@@ -0,0 +1,52 @@
+import argparse
+import logging
+import sys
+import os
+
+# 프로젝트 루트 경로를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+from database.parquet_store import export_minute_bars, import_minute_bars
+from database.storage_backend import create_storage_backend
+
+
+def export_data(root: str, trade_session_ids=None, compression: str = 'zstd'):
+    """저장소의 분봉 데이터를 월별 Parquet 파일로 내보냅니다."""
+    with create_storage_backend() as db_manager:
+        try:
+            exported = export_minute_bars(db_manager, root, trade_session_ids, compression)
+            print(f"총 {sum(exported.values())}개의 분봉 데이터를 {len(exported)}개 월 파일로 내보냈습니다. ({root})")
+        except Exception as e:
+            print(f"Parquet 내보내기 중 오류 발생: {e}")
+
+
+def import_data(root: str, months=None):
+    """월별 Parquet 파일의 분봉 데이터를 저장소로 가져옵니다."""
+    with create_storage_backend() as db_manager:
+        try:
+            imported = import_minute_bars(db_manager, root, months)
+            print(f"총 {imported}개의 분봉 데이터를 가져왔습니다. ({root})")
+        except Exception as e:
+            print(f"Parquet 가져오기 중 오류 발생: {e}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='분봉 데이터 Parquet 내보내기/가져오기')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='분봉 데이터를 월별 Parquet 파일로 내보내기')
+    export_parser.add_argument('root', help='출력 디렉토리')
+    export_parser.add_argument('--session', type=int, nargs='+', help='내보낼 거래 세션 ID (기본: 전체)')
+    export_parser.add_argument('--compression', default='zstd', help='Parquet 압축 코덱 (기본: zstd)')
+
+    import_parser = subparsers.add_parser('import', help='월별 Parquet 파일을 저장소로 가져오기')
+    import_parser.add_argument('root', help='export 출력 디렉토리')
+    import_parser.add_argument('--month', nargs='+', help='가져올 월 (YYYY-MM, 기본: 전체)')
+
+    args = parser.parse_args()
+    if args.command == 'export':
+        export_data(args.root, args.session, args.compression)
+    else:
+        import_data(args.root, args.month)
@@ -7,7 +7,7 @@ from typing import List, Dict, Any
 
 from pykrx import stock
 
-from database.db_manager_upper import DatabaseManager
+from database.storage_backend import create_storage_backend
 from utils.date_utils import DateUtils
 
 # 로깅 설정
@@ -88,7 +88,7 @@ def fetch_and_save_minute_data(start_date_str: str, end_date_str: str):
         logging.error("날짜 형식이 잘못되었습니다. YYYYMMDD 형식으로 입력해주세요.")
         return
     
-    with DatabaseManager() as db:
+    with create_storage_backend() as db:
         stocks_to_process = db.get_selected_pykrx_upper_stocks_by_date_range(start_date, end_date)
 
     if not stocks_to_process:
@@ -110,7 +110,7 @@ def fetch_and_save_minute_data(start_date_str: str, end_date_str: str):
 
     if all_minute_data:
         logging.info(f"총 {len(all_minute_data)}건의 분봉 데이터를 데이터베이스에 저장합니다.")
-        with DatabaseManager() as db:
+        with create_storage_backend() as db:
             db.save_minute_prices(all_minute_data)
     else:
         logging.info("저장할 분봉 데이터가 없습니다.")
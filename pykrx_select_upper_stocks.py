@@ -2,16 +2,16 @@ import logging
 from datetime import datetime, timedelta
 import pandas as pd
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from database.db_manager_upper import DatabaseManager
+from database.storage_backend import create_storage_backend
 from api.kis_api import KISApi
 from api.krx_api import KRXApi
 from trading.trading_upper import TradingUpper
 from utils.date_utils import DateUtils
-from config.condition import BUY_PERCENT_UPPER
+from config.condition import BUY_PERCENT_UPPER, QUOTE_MAX_AGE_SELECTION
 
 class StockSelector:
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = create_storage_backend()
         self.kis_api = KISApi()
         self.krx_api = KRXApi()
         self.date_utils = DateUtils()
@@ -21,7 +21,7 @@ class StockSelector:
         """
         지정된 기간 동안의 모든 급등주를 선별하여 DB에 저장합니다.
         """
-        db = DatabaseManager()
+        db = create_storage_backend()
         try:
             print(f"{start_date_str}부터 {end_date_str}까지의 모든 급등주를 대상으로 선별을 시작합니다.")
 
@@ -35,7 +35,8 @@ class StockSelector:
             today_str = datetime.now().strftime('%Y%m%d')
 
             with ThreadPoolExecutor(max_workers=10) as executor:
-                future_to_stock = {executor.submit(self.check_conditions, stock, today_str): stock for stock in stocks_to_check}
+                future_to_stock = {executor.submit(self.check_conditions, stock, today_str): stock
+                                   for stock in stocks_to_check}
                 for future in as_completed(future_to_stock):
                     stock = future_to_stock[future]
                     try:
@@ -92,11 +93,13 @@ class StockSelector:
         # --- 조건4: 상장일 1년 경과 ---
         result_lstg = self.check_listing_date(stock.get('ticker'))
 
-        # --- 조건5: 시장 경고(과열/정지) 미지정 ---
-        result_warning = self.check_market_warnings(stock.get('ticker'))
+        # --- 조건5: 시장 경고(과열/정지) 미지정 (앞 조건을 통과한 종목만 확인) ---
+        result_warning = None
+        if result_high_price and result_decline and result_volume and result_lstg:
+            result_warning = self.check_market_warnings(stock.get('ticker'))
 
         # --- 최종 조건 통과 여부 ---
-        all_conditions_met = result_high_price and result_decline and result_volume and result_lstg and result_warning
+        all_conditions_met = bool(result_high_price and result_decline and result_volume and result_lstg and result_warning)
 
         # --- 💡 신규 로직: 강화된 모멘텀 식별 💡 ---
         is_strong_momentum = False
@@ -116,7 +119,8 @@ class StockSelector:
         log_messages.append(f"조건1: 상승일 기준 10일 전까지 고가 20% 넘지 않은은 이력 여부 체크: {result_high_price}")
         log_messages.append(f"조건2: 상승일 고가 - 매수일 현재가 = -7.5% 체크: {result_decline}")
         log_messages.append(f"조건4: 상장일 이후 1년 체크: {result_lstg}")
-        log_messages.append(f"조건5: 과열 종목 제외 체크: {result_warning}")
+        # 조건5는 앞 조건을 통과한 종목만 조회하므로, 조회하지 않은 경우는 None 대신 건너뜀으로 표시합니다.
+        log_messages.append(f"조건5: 과열 종목 제외 체크: {'건너뜀(앞 조건 미충족)' if result_warning is None else result_warning}")
 
         return all_conditions_met, is_strong_momentum, log_messages
 
@@ -140,13 +144,7 @@ class StockSelector:
         과열 또는 거래 정지 종목인지 확인합니다.
         """
         try:
-            stock_info = self.kis_api.get_stock_price(ticker)
-            if stock_info and stock_info.get('output'):
-                result_short_over_yn = stock_info['output'].get('short_over_yn', 'N') # 단기과열
-                result_trht_yn = stock_info['output'].get('trht_yn', 'N') # 거래정지
-                if result_short_over_yn == 'N' and result_trht_yn == 'N':
-                    return True
-            return False
+            return self.kis_api.check_market_warnings(ticker, QUOTE_MAX_AGE_SELECTION)
         except Exception as e:
             logging.error(f"{ticker} 시장 경고 확인 중 오류: {e}")
             return False
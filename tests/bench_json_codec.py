@@ -0,0 +1,73 @@
+"""
+JSON 코덱 마이크로 벤치마크
+
+result.txt(분봉 조회 응답)를 대표 페이로드로, 사용할 수 있는 코덱별로 다음 작업의 호출당 시간을 비교합니다.
+- 응답 디코딩 (바이트 → 객체, KISApi 응답 처리)
+- 응답 인코딩 (객체 → 문자열)
+- 주문 본문 직렬화 (키 정렬, KISApi._canonical_body)
+
+    python tests/bench_json_codec.py --number 2000 --rows 30
+"""
+import argparse
+import os
+import sys
+import timeit
+
+# 상위 디렉토리를 import path에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.json_codec import StdlibCodec, get_codec
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="JSON 코덱별 인코딩/디코딩 시간 비교")
+    parser.add_argument("--payload", default=os.path.join(ROOT, "result.txt"), help="대표 응답 JSON 파일")
+    parser.add_argument("--rows", type=int, default=30, help="응답 output2에서 사용할 분봉 행 수 (0이면 전체)")
+    parser.add_argument("--number", type=int, default=2000, help="작업별 반복 횟수")
+    parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수 (최솟값 사용)")
+    return parser.parse_args()
+
+
+def available_codecs():
+    codecs = [StdlibCodec()]
+    try:
+        codecs.append(get_codec("orjson"))
+    except ImportError:
+        print("orjson이 설치되어 있지 않아 표준 모듈만 측정합니다.")
+    return codecs
+
+
+def main():
+    args = parse_args()
+    with open(args.payload, encoding="utf-8") as f:
+        response = StdlibCodec.loads(f.read())
+    if args.rows:
+        response["output2"] = response["output2"][:args.rows]
+    raw = StdlibCodec.dumps_bytes(response)
+    order_body = {"CANO": "50000000", "ACNT_PRDT_CD": "01", "PDNO": "005930",
+                  "ORD_DVSN": "00", "ORD_QTY": "10", "ORD_UNPR": "71000"}
+
+    print(f"페이로드: {os.path.basename(args.payload)} ({len(response['output2'])}행, {len(raw):,} bytes)")
+    results = {}
+    for codec in available_codecs():
+        cases = {
+            "응답 디코딩": lambda: codec.loads(raw),
+            "응답 인코딩": lambda: codec.dumps(response),
+            "주문 본문 직렬화": lambda: codec.dumps(order_body, True),
+        }
+        for case, func in cases.items():
+            best = min(timeit.repeat(func, number=args.number, repeat=args.repeat))
+            results[(case, codec.name)] = best / args.number * 1e6
+
+    baseline = StdlibCodec.name
+    for case in ("응답 디코딩", "응답 인코딩", "주문 본문 직렬화"):
+        row = [f"{name}={micros:.2f}us" for (c, name), micros in results.items() if c == case]
+        line = f"{case}: " + "  ".join(row)
+        if (case, "orjson") in results:
+            line += f"  ({results[(case, baseline)] / results[(case, 'orjson')]:.1f}x)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+매수 주문 파이프라인 지연/처리량 벤치마크
+
+KIS REST 대역 서버(tests/kis_stub_server.py)를 띄우고 TradingUpper.buy_order(주문 → 체결 확인 → 미체결 정정)를
+여러 종목에 동시에 실행하여 주문 한 건의 종단 지연 백분위수와 처리량을 출력합니다.
+
+    python tests/bench_order_pipeline.py --orders 20 --partial-fill 0.3 --rate-limit-errors 0.05
+
+--limit-real/--limit-mock으로 호출 한도 제한기의 초당 한도를, --fill-wait로 체결 대기 시간(BUY_WAIT)을 바꿉니다.
+"""
+import argparse
+import statistics
+import sys
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+# 상위 디렉토리를 import path에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.credential_cache import credential_cache, ACCESS_TOKEN
+from api.http_session import http_post
+from api.rate_limiter import KISRateLimiter, ORDER
+from api import retry_policy
+import trading.trading_upper as trading_upper
+from trading.trading_upper import TradingUpper
+from kis_stub_server import KISStubServer, StubConfig, lognormal
+
+
+class _NullSlackLogger:
+    """벤치마크 중에는 슬랙으로 전송하지 않습니다."""
+
+    def send_log(self, *args, **kwargs):
+        return None
+
+
+def percentile(values, ratio):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(ratio * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="KIS 대역 서버로 매수 주문 파이프라인 지연 측정")
+    parser.add_argument("--orders", type=int, default=20, help="동시에 낼 매수 주문 수")
+    parser.add_argument("--quantity", type=int, default=10, help="주문당 수량")
+    parser.add_argument("--latency-median", type=float, default=0.03, help="응답 지연 중앙값(초)")
+    parser.add_argument("--latency-p99", type=float, default=0.15, help="응답 지연 99 백분위수(초)")
+    parser.add_argument("--partial-fill", type=float, default=0.3, help="부분 체결 확률")
+    parser.add_argument("--fill-delay", type=float, default=0.2, help="주문 후 체결이 조회되기까지 시간(초)")
+    parser.add_argument("--rate-limit-errors", type=float, default=0.0, help="무작위 EGW00201 응답 비율")
+    parser.add_argument("--server-rate-limit", type=float, default=None, help="대역 서버 초당 처리 한도")
+    parser.add_argument("--limit-real", type=float, default=20, help="실전 계정 초당 호출 한도 (제한기)")
+    parser.add_argument("--limit-mock", type=float, default=20, help="모의 계정 초당 호출 한도 (제한기)")
+    parser.add_argument("--fill-wait", type=float, default=0.5, help="체결 대기 시간 BUY_WAIT(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = StubConfig(
+        latency={"*": lognormal(args.latency_median, args.latency_p99)},
+        rate_limit_per_sec=args.server_rate_limit,
+        rate_limit_error_ratio=args.rate_limit_errors,
+        partial_fill_ratio=args.partial_fill,
+        fill_delay=args.fill_delay,
+        seed=args.seed,
+    )
+
+    with KISStubServer(config) as stub:
+        trading = TradingUpper()
+        trading.slack_logger = _NullSlackLogger()
+        trading.kis_api.real_url = trading.kis_api.mock_url = stub.url
+        trading.kis_api.rate_limiter = KISRateLimiter({
+            ('real', None): args.limit_real,
+            ('mock', None): args.limit_mock,
+            ('real', ORDER): args.limit_real,
+            ('mock', ORDER): args.limit_mock,
+        })
+        # 체결통보 없이 REST 체결 조회로 확인하므로 대기 시간을 대역 서버의 체결 지연에 맞춥니다.
+        trading_upper.BUY_WAIT = args.fill_wait
+
+        # 토큰은 대역 서버의 tokenP로 한 번 발급받아 캐시에 넣습니다. (DB 토큰 저장소를 거치지 않음)
+        token = http_post(f"{stub.url}/oauth2/tokenP", json={}).json()["access_token"]
+        for token_type in ("real", "mock"):
+            credential_cache.set(ACCESS_TOKEN, token_type, token, datetime.now(timezone.utc) + timedelta(hours=1))
+
+        latencies = {}
+
+        def timed_buy(ticker):
+            started = time.perf_counter()
+            result = trading.buy_order(f"STUB{ticker}", ticker, args.quantity, stub.price_of(ticker))
+            latencies[ticker] = time.perf_counter() - started
+            return result
+
+        tickers = [f"{i:06d}" for i in range(1, args.orders + 1)]
+        started = time.perf_counter()
+        results = trading._run_concurrently({ticker: (timed_buy, ticker) for ticker in tickers})
+        elapsed = time.perf_counter() - started
+
+    succeeded = sum(1 for result in results.values() if result and result.get('rt_cd') == '0')
+    values = list(latencies.values())
+    print(f"주문 {len(tickers)}건 / 성공 {succeeded}건 / 총 {elapsed:.2f}초 ({len(tickers) / elapsed:.1f}건/초)")
+    if values:
+        print("종단 지연(초): p50={:.3f} p90={:.3f} p99={:.3f} max={:.3f} mean={:.3f}".format(
+            percentile(values, 0.5), percentile(values, 0.9), percentile(values, 0.99),
+            max(values), statistics.mean(values)))
+    print(f"엔드포인트별 요청 수: {dict(stub.requests)}")
+    print(f"한도 초과 응답 수: {dict(stub.rate_limited)}")
+    for bucket, metrics in trading.kis_api.rate_limiter.snapshot().items():
+        print(f"[rate-limit] {bucket}: {metrics}")
+    for name, metrics in retry_policy.snapshot().items():
+        print(f"[retry] {name}: {metrics}")
+
+
+if __name__ == "__main__":
+    main()
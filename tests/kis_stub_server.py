@@ -0,0 +1,375 @@
+"""
+KIS REST 대역(stand-in) 서버
+
+실제 증권사 없이 KISApi / TradingUpper 주문 흐름의 지연과 처리량을 측정하기 위한 로컬 HTTP 서버입니다.
+KISApi.real_url / mock_url (또는 환경변수 KIS_REAL_URL / KIS_MOCK_URL)을 이 서버 주소로 바꿔 사용합니다.
+
+지원 엔드포인트: tokenP, hashkey, inquire-price-2, intstock-multprice, order-cash, order-rvsecncl,
+inquire-psbl-order, inquire-daily-ccld, inquire-balance, ranking/fluctuation, volume-rank
+- 엔드포인트별 지연 분포(latency), 초당 호출 한도 초과 응답(EGW00201), 부분 체결(partial_fill_ratio)을 설정할 수 있습니다.
+- 주문은 fill_delay초 뒤에 체결이 보이며, 정정 주문은 새 주문번호로 전량 체결됩니다.
+- 잔고는 체결된 주문으로 계산하고 balance_page_size 단위로 연속 조회(tr_cont)를 요구합니다.
+"""
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+Latency = Callable[[random.Random], float]
+
+# 지원하는 엔드포인트 (경로 마지막 부분)
+ENDPOINTS = frozenset({
+    "tokenP", "Approval", "hashkey", "inquire-price-2", "intstock-multprice", "order-cash", "order-rvsecncl",
+    "inquire-psbl-order", "inquire-daily-ccld", "inquire-balance", "fluctuation", "volume-rank",
+})
+RATE_LIMITED_BODY = {"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "초당 거래건수를 초과하였습니다."}
+
+
+def constant(seconds: float) -> Latency:
+    """항상 같은 지연(초)"""
+    return lambda rng: seconds
+
+
+def lognormal(median: float, p99: float) -> Latency:
+    """중앙값과 99 백분위수(초)로 정한 로그정규 지연 분포"""
+    sigma = math.log(p99 / median) / 2.326 if p99 > median else 0.0
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+@dataclass
+class StubConfig:
+    """대역 서버 동작 설정"""
+    # 엔드포인트(경로 마지막 부분, 예: 'order-cash')별 지연 분포. '*'는 기본값
+    latency: Dict[str, Latency] = field(default_factory=lambda: {"*": constant(0.0)})
+    # 초당 처리 한도 (넘으면 EGW00201 응답). None이면 제한 없음
+    rate_limit_per_sec: Optional[float] = None
+    # 한도와 관계없이 무작위로 EGW00201을 돌려줄 비율
+    rate_limit_error_ratio: float = 0.0
+    # 주문이 절반만 체결될 확률 (나머지는 정정 주문으로 체결)
+    partial_fill_ratio: float = 0.0
+    # 주문 후 체결이 조회되기까지 걸리는 시간(초)
+    fill_delay: float = 0.0
+    # 잔고 조회 한 페이지의 종목 수
+    balance_page_size: int = 50
+    # 주문가능 현금
+    cash: int = 1_000_000_000
+    # 종목별 현재가 (없으면 종목코드로 정한 가격)
+    prices: Dict[str, int] = field(default_factory=dict)
+    seed: int = 0
+
+
+@dataclass
+class _Order:
+    ticker: str
+    side: str
+    quantity: int
+    price: int
+    fill_qty: int
+    created: float
+    canceled: bool = False
+
+
+class KISStubServer:
+    """KIS REST 대역 서버. with 문 또는 start()/stop()으로 사용합니다."""
+
+    def __init__(self, config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or StubConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._orders: Dict[str, _Order] = {}
+        self._next_order_no = 1
+        self._window: list = []  # 최근 1초 요청 시각 (초당 한도 계산용)
+        self.requests = Counter()
+        self.rate_limited = Counter()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "KISStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="kis-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    ##########################################################################
+    # 요청 처리
+    ##########################################################################
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive 연결 재사용
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                self._respond(parts.path, dict(parse_qsl(parts.query, keep_blank_values=True)))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                self._respond(urlsplit(self.path).path, json.loads(raw or b"{}"))
+
+            def _respond(self, path, params):
+                headers = {key.lower(): value for key, value in self.headers.items()}
+                status, body, extra_headers = stub.handle(path, params, headers)
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in extra_headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _sleep_latency(self, endpoint: str):
+        latency = self.config.latency.get(endpoint) or self.config.latency.get("*")
+        if latency is not None:
+            with self._lock:
+                delay = latency(self._rng)
+            if delay > 0:
+                time.sleep(delay)
+
+    def _is_rate_limited(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self.config.rate_limit_error_ratio and self._rng.random() < self.config.rate_limit_error_ratio:
+                return True
+            if self.config.rate_limit_per_sec is None:
+                return False
+            self._window = [t for t in self._window if now - t < 1.0]
+            if len(self._window) >= self.config.rate_limit_per_sec:
+                return True
+            self._window.append(now)
+            return False
+
+    def handle(self, path: str, params: Dict[str, Any], headers: Dict[str, str]):
+        """(상태 코드, JSON 본문, 추가 응답 헤더)를 반환합니다."""
+        endpoint = path.rstrip("/").rsplit("/", 1)[-1]
+        with self._lock:
+            self.requests[endpoint] += 1
+        self._sleep_latency(endpoint)
+
+        if endpoint not in ("tokenP", "Approval") and self._is_rate_limited():
+            with self._lock:
+                self.rate_limited[endpoint] += 1
+            return 500, RATE_LIMITED_BODY, {}
+
+        handler = getattr(self, "_" + endpoint.replace("-", "_"), None) if endpoint in ENDPOINTS else None
+        if handler is None:
+            return 404, {"rt_cd": "1", "msg1": f"지원하지 않는 엔드포인트: {path}"}, {}
+        result = handler(params, headers)
+        if isinstance(result, tuple):
+            return 200, result[0], result[1]
+        return 200, result, {}
+
+    ##########################################################################
+    # 엔드포인트
+    ##########################################################################
+
+    def price_of(self, ticker: str) -> int:
+        if ticker in self.config.prices:
+            return self.config.prices[ticker]
+        return 1000 + (int(ticker) % 997) * 100 if ticker.isdigit() else 10000
+
+    def _tokenP(self, params, headers):
+        expires = datetime.now() + timedelta(hours=24)
+        return {
+            "access_token": "stub-token",
+            "token_type": "Bearer",
+            "expires_in": 86400,
+            "access_token_token_expired": expires.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def _Approval(self, params, headers):
+        return {"approval_key": "stub-approval"}
+
+    def _hashkey(self, params, headers):
+        return {"HASH": format(abs(hash(json.dumps(params, sort_keys=True))), "x"), "BODY": params}
+
+    def _quote(self, ticker: str) -> Dict[str, str]:
+        price = self.price_of(ticker)
+        return {
+            "stck_prpr": str(price),
+            "stck_hgpr": str(price),
+            "acml_vol": "100000",
+            "hts_kor_isnm": f"STUB{ticker}",
+            "trht_yn": "N",
+            "short_over_yn": "N",
+        }
+
+    def _inquire_price_2(self, params, headers):
+        return {"rt_cd": "0", "msg1": "정상처리 되었습니다.", "output": self._quote(params.get("FID_INPUT_ISCD", ""))}
+
+    def _intstock_multprice(self, params, headers):
+        output = []
+        for key, ticker in sorted(params.items()):
+            if not key.startswith("FID_INPUT_ISCD_") or not ticker:
+                continue
+            quote = self._quote(ticker)
+            output.append({
+                "inter_shrn_iscd": ticker,
+                "inter_kor_isnm": quote["hts_kor_isnm"],
+                "inter2_prpr": quote["stck_prpr"],
+                "inter2_hgpr": quote["stck_hgpr"],
+                "acml_vol": quote["acml_vol"],
+            })
+        return {"rt_cd": "0", "msg1": "정상처리 되었습니다.", "output": output}
+
+    def _new_order(self, ticker: str, side: str, quantity: int, price: int, partial: bool) -> str:
+        with self._lock:
+            order_no = f"{self._next_order_no:010d}"
+            self._next_order_no += 1
+            fill_qty = quantity // 2 if partial else quantity
+            self._orders[order_no] = _Order(ticker, side, quantity, price, fill_qty, time.monotonic())
+        return order_no
+
+    def _order_cash(self, params, headers):
+        side = "buy" if headers.get("tr_id", "").endswith("0802U") else "sell"
+        quantity = int(params.get("ORD_QTY") or 0)
+        ticker = params.get("PDNO", "")
+        price = int(params.get("ORD_UNPR") or 0) or self.price_of(ticker)
+        with self._lock:
+            partial = self._rng.random() < self.config.partial_fill_ratio
+        order_no = self._new_order(ticker, side, quantity, price, partial)
+        return {
+            "rt_cd": "0",
+            "msg_cd": "APBK0013",
+            "msg1": "주문 전송 완료 되었습니다.",
+            "output": {"KRX_FWDG_ORD_ORGNO": "00950", "ODNO": order_no, "ORD_TMD": datetime.now().strftime("%H%M%S")},
+        }
+
+    def _find_order(self, order_no) -> Optional[_Order]:
+        key = str(order_no).lstrip("0")
+        return next((order for no, order in self._orders.items() if no.lstrip("0") == key), None)
+
+    def _order_rvsecncl(self, params, headers):
+        with self._lock:
+            original = self._find_order(params.get("ORGN_ODNO", ""))
+        if original is None:
+            return {"rt_cd": "1", "msg_cd": "40330000", "msg1": "정정/취소할 주문이 없습니다."}
+        with self._lock:
+            original.canceled = True
+        if params.get("RVSE_CNCL_DVSN_CD") == "02":
+            return {"rt_cd": "0", "msg1": "주문 취소 완료", "output": {"ODNO": params.get("ORGN_ODNO")}}
+        quantity = int(params.get("ORD_QTY") or 0)
+        price = int(params.get("ORD_UNPR") or 0) or original.price
+        order_no = self._new_order(original.ticker, original.side, quantity, price, partial=False)
+        output = {"KRX_FWDG_ORD_ORGNO": "00950", "ODNO": order_no, "ORD_TMD": datetime.now().strftime("%H%M%S")}
+        return {"rt_cd": "0", "msg1": "정정 주문 전송 완료", "output": output, "output1": [output]}
+
+    def _visible_fill(self, order: _Order) -> int:
+        return order.fill_qty if time.monotonic() - order.created >= self.config.fill_delay else 0
+
+    def _inquire_daily_ccld(self, params, headers):
+        with self._lock:
+            order = self._find_order(params.get("ODNO", ""))
+            if order is None:
+                return {"rt_cd": "0", "output1": []}
+            filled = self._visible_fill(order)
+        return {"rt_cd": "0", "output1": [{
+            "odno": params.get("ODNO"),
+            "pdno": order.ticker,
+            "ord_qty": str(order.quantity),
+            "tot_ccld_qty": str(filled),
+            "rmn_qty": str(order.quantity - filled),
+            "avg_prvs": str(order.price),
+        }]}
+
+    def _inquire_psbl_order(self, params, headers):
+        return {"rt_cd": "0", "output": {"ord_psbl_cash": str(self.config.cash)}}
+
+    def holdings(self):
+        """체결된 주문으로 계산한 보유 종목 목록 (잔고 조회 output1 형식)"""
+        positions: Dict[str, list] = {}
+        with self._lock:
+            for order in self._orders.values():
+                filled = self._visible_fill(order)
+                if not filled:
+                    continue
+                qty, amount = positions.get(order.ticker, (0, 0))
+                if order.side == "buy":
+                    positions[order.ticker] = (qty + filled, amount + filled * order.price)
+                else:
+                    average = amount / qty if qty else 0
+                    positions[order.ticker] = (qty - filled, amount - filled * average)
+        return [
+            {
+                "pdno": ticker,
+                "prdt_name": f"STUB{ticker}",
+                "hldg_qty": str(qty),
+                "pchs_amt": str(int(amount)),
+                "pchs_avg_pric": f"{amount / qty:.4f}",
+                "prpr": str(self.price_of(ticker)),
+            }
+            for ticker, (qty, amount) in sorted(positions.items()) if qty > 0
+        ]
+
+    def _inquire_balance(self, params, headers):
+        holdings = self.holdings()
+        offset = int(params.get("CTX_AREA_NK100") or 0) if headers.get("tr_cont") == "N" else 0
+        size = self.config.balance_page_size
+        page = holdings[offset:offset + size]
+        has_more = offset + size < len(holdings)
+        body = {
+            "rt_cd": "0",
+            "output1": page,
+            "output2": [{"dnca_tot_amt": str(self.config.cash)}],
+            "ctx_area_fk100": "STUB",
+            "ctx_area_nk100": str(offset + size) if has_more else "",
+        }
+        return body, {"tr_cont": "M" if has_more else "D"}
+
+    def _fluctuation(self, params, headers):
+        output = [
+            {
+                "stck_shrn_iscd": f"{ticker:06d}",
+                "hts_kor_isnm": f"STUB{ticker:06d}",
+                "stck_prpr": str(self.price_of(f"{ticker:06d}")),
+                "prdy_ctrt": "29.90",
+                "acml_vol": "1000000",
+            }
+            for ticker in range(1, 31)
+        ]
+        return {"rt_cd": "0", "output": output}
+
+    def _volume_rank(self, params, headers):
+        output = [
+            {
+                "mksc_shrn_iscd": f"{ticker:06d}",
+                "hts_kor_isnm": f"STUB{ticker:06d}",
+                "data_rank": str(rank),
+                "stck_prpr": str(self.price_of(f"{ticker:06d}")),
+                "acml_vol": str(10_000_000 - rank * 1000),
+            }
+            for rank, ticker in enumerate(range(1, 31), start=1)
+        ]
+        return {"rt_cd": "0", "output": output}
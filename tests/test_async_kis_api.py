@@ -0,0 +1,83 @@
+"""AsyncKISApi 비동기 REST 클라이언트 테스트 (로컬 aiohttp 서버 사용)"""
+import sys
+import os
+import asyncio
+
+import pytest
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('mariadb')
+web = pytest.importorskip('aiohttp.web')
+
+from api import async_kis_api
+from api.async_kis_api import AsyncKISApi
+from api.rate_limiter import KISRateLimiter, ORDER
+
+
+async def _serve(handlers):
+    app = web.Application()
+    for method, path, handler in handlers:
+        app.router.add_route(method, path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def _client(monkeypatch, base_url):
+    monkeypatch.setattr(async_kis_api, 'M_ACCOUNT_NUMBER', '50000000')
+    client = AsyncKISApi()
+    client.kis_api.mock_url = base_url
+
+    async def _headers(is_mock=False, tr_id=None, hashkey=None):
+        headers = {"authorization": "Bearer token", "tr_id": tr_id or ""}
+        if hashkey:
+            headers["hashkey"] = hashkey
+        return headers
+    monkeypatch.setattr(client, '_build_headers', _headers)
+    client.rate_limiter = KISRateLimiter({('real', None): 100, ('mock', None): 100, ('mock', ORDER): 100}, headroom=1.0)
+    return client
+
+
+def test_balance_and_order_roundtrip(monkeypatch):
+    """잔고 조회와 주문이 KISApi와 같은 형식으로 반환되고, 한도 초과 응답은 재요청되어야 합니다."""
+    calls = {'order': 0}
+
+    async def hashkey(request):
+        return web.json_response({'HASH': 'h'})
+
+    async def balance(request):
+        assert request.headers['tr_id'] == 'VTTC8434R'
+        return web.json_response({'output1': [{'pdno': '005930', 'hldg_qty': '3'}]})
+
+    async def order(request):
+        calls['order'] += 1
+        if calls['order'] == 1:
+            return web.json_response({'rt_cd': '1', 'msg_cd': 'EGW00201', 'msg1': '초당 거래건수를 초과하였습니다.'}, status=500)
+        assert request.headers['hashkey'] == 'h'
+        return web.json_response({'rt_cd': '0', 'output': {'ODNO': '0000001'}})
+
+    async def _run():
+        runner, base_url = await _serve([
+            ('POST', '/uapi/hashkey', hashkey),
+            ('GET', '/uapi/domestic-stock/v1/trading/inquire-balance', balance),
+            ('POST', '/uapi/domestic-stock/v1/trading/order-cash', order),
+        ])
+        client = _client(monkeypatch, base_url)
+        try:
+            holdings = await client.balance_inquiry()
+            result = await client.place_order('005930', 3, order_type='sell', price=70000)
+        finally:
+            await client.close()
+            await runner.cleanup()
+        return holdings, result, client
+
+    holdings, result, client = asyncio.run(_run())
+    assert holdings == [{'pdno': '005930', 'hldg_qty': '3'}]
+    assert result['output']['ODNO'] == '0000001'
+    assert calls['order'] == 2
+    assert client.rate_limiter.snapshot()['mock:all']['penalties'] == 1
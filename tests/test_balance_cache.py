@@ -0,0 +1,67 @@
+"""계좌 잔고 스냅샷 테스트"""
+import sys
+import os
+import threading
+import time
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.balance_cache import BalanceSnapshot
+
+
+def test_holding_served_from_snapshot_until_invalidated():
+    """허용 나이 이내면 메모리에서 종목별 잔고를 반환하고, 무효화 후에는 새로 조회해야 합니다."""
+    snapshot = BalanceSnapshot()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [{'pdno': '005930', 'hldg_qty': str(10 * len(calls))}]
+
+    assert snapshot.holding('005930', loader, max_age=30)['hldg_qty'] == '10'
+    assert snapshot.holding('005930', loader, max_age=30)['hldg_qty'] == '10'
+    assert snapshot.holding('000660', loader, max_age=30) == {}
+    assert len(calls) == 1
+
+    snapshot.invalidate()
+    assert snapshot.holding('005930', loader, max_age=30)['hldg_qty'] == '20'
+
+    # 조회 실패(None)는 저장하지 않습니다.
+    snapshot.invalidate()
+    assert snapshot.get(lambda: None, max_age=30) is None
+    assert snapshot.peek(30) is None
+
+
+def test_invalidation_during_fetch_is_not_cached():
+    """조회 도중 체결로 무효화되면 그 결과는 반환만 하고 저장하지 않아야 합니다."""
+    snapshot = BalanceSnapshot()
+
+    def loader():
+        snapshot.invalidate()
+        return [{'pdno': '005930', 'hldg_qty': '1'}]
+
+    assert snapshot.get(loader, max_age=30) == [{'pdno': '005930', 'hldg_qty': '1'}]
+    assert snapshot.peek(30) is None
+
+
+def test_concurrent_refresh_single_flight():
+    """여러 세션이 동시에 잔고를 조회하면 한 번만 요청해야 합니다."""
+    snapshot = BalanceSnapshot()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return [{'pdno': '005930', 'hldg_qty': '5'}]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(snapshot.get(loader, max_age=0)))
+               for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 6 and all(result[0]['hldg_qty'] == '5' for result in results)
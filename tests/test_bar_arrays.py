@@ -0,0 +1,35 @@
+"""분봉 배열 변환 테스트"""
+import sys
+import os
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from database.bar_arrays import read_bar_arrays
+
+
+class _FakeCursor:
+    """fetchmany만 제공하는 커서"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchmany(self, size):
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+
+def test_read_bar_arrays_grows_when_expected_rows_is_stale():
+    """예상 행 수보다 많은 행이 조회되어도 모두 읽어야 합니다."""
+    rows = [(1, 1749546000 + i * 60, 100 + i) for i in range(25)]
+    bars = read_bar_arrays(_FakeCursor(rows), expected_rows=3, chunk_size=4)
+    assert len(bars['price']) == 25
+    assert bars['price'][-1] == 124
+    assert bars['datetime'][0] == np.datetime64(1749546000, 's')
+
+
+def test_read_bar_arrays_empty():
+    bars = read_bar_arrays(_FakeCursor([]), expected_rows=0)
+    assert len(bars['trade_session_id']) == 0
@@ -0,0 +1,85 @@
+"""프로세스 전역 자격 증명 캐시 테스트"""
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.credential_cache import ACCESS_TOKEN, WS_APPROVAL, CredentialCache
+
+
+def test_single_flight_refresh():
+    """동시에 여러 스레드가 요청해도 발급은 한 번만 이루어져야 합니다."""
+    cache = CredentialCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'token-1', datetime.now(timezone.utc) + timedelta(hours=24)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(ACCESS_TOKEN, 'real', loader)))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ['token-1'] * 10
+    assert cache.peek(ACCESS_TOKEN, 'real') == 'token-1'
+    # 종류/유형별로 따로 보관합니다.
+    assert cache.peek(ACCESS_TOKEN, 'mock') is None
+    assert cache.peek(WS_APPROVAL, 'real') is None
+
+
+def test_refresh_before_expiry_in_background():
+    """갱신 시점이 지났지만 만료 전이면 기존 값을 바로 반환하고 백그라운드에서 갱신해야 합니다."""
+    cache = CredentialCache(refresh_margin=timedelta(minutes=5))
+    cache.set(ACCESS_TOKEN, 'real', 'old', datetime.now(timezone.utc) + timedelta(minutes=4))
+    assert cache.peek(ACCESS_TOKEN, 'real') is None
+
+    loaded = threading.Event()
+
+    def loader():
+        loaded.set()
+        return 'new', datetime.now(timezone.utc) + timedelta(hours=24)
+
+    assert cache.get(ACCESS_TOKEN, 'real', loader) == 'old'
+    assert loaded.wait(1)
+    for _ in range(100):
+        if cache.peek(ACCESS_TOKEN, 'real') == 'new':
+            break
+        time.sleep(0.01)
+    assert cache.peek(ACCESS_TOKEN, 'real') == 'new'
+
+    # 시간대가 없는 만료 시각은 UTC로 간주합니다.
+    cache.set(WS_APPROVAL, 'mock', 'key', datetime.utcnow() + timedelta(hours=1))
+    assert cache.peek(WS_APPROVAL, 'mock') == 'key'
+
+
+def test_failed_load_is_not_cached():
+    """발급 실패 결과는 캐시하지 않아야 합니다."""
+    cache = CredentialCache()
+    assert cache.get(ACCESS_TOKEN, 'real', lambda: (None, None)) is None
+    assert cache.get(ACCESS_TOKEN, 'real', lambda: ('token', datetime.now(timezone.utc) + timedelta(hours=1))) == 'token'
+
+    cache.invalidate(ACCESS_TOKEN)
+    assert cache.peek(ACCESS_TOKEN, 'real') is None
+
+
+def test_proactive_refresh_with_lead():
+    """lead 안에 갱신 시점이 도래하는 값만 미리 갱신해야 합니다."""
+    cache = CredentialCache(refresh_margin=timedelta(minutes=5))
+    cache.set(ACCESS_TOKEN, 'real', 'old', datetime.now(timezone.utc) + timedelta(minutes=40))
+    new_token = lambda: ('new', datetime.now(timezone.utc) + timedelta(hours=24))
+
+    assert cache.refresh(ACCESS_TOKEN, 'real', new_token, lead=timedelta(minutes=10)) == 'old'
+    assert not cache.needs_refresh(ACCESS_TOKEN, 'real', timedelta(minutes=10))
+    assert cache.needs_refresh(ACCESS_TOKEN, 'real', timedelta(minutes=60))
+    assert cache.refresh(ACCESS_TOKEN, 'real', new_token, lead=timedelta(minutes=60)) == 'new'
+    assert cache.peek(ACCESS_TOKEN, 'real') == 'new'
@@ -0,0 +1,154 @@
+"""내장 SQLite 저장소 테스트"""
+import sys
+import os
+from datetime import datetime, date
+
+import pytest
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager_sqlite import SQLiteDatabaseManager
+
+
+def _minute_rows(trade_session_id, ticker, name, high_rise_date, prices):
+    return [
+        {
+            'trade_session_id': trade_session_id,
+            'high_rise_date': high_rise_date,
+            'ticker': ticker,
+            'name': name,
+            'datetime': datetime(2025, 6, 10, 9, i),
+            'price': price,
+        }
+        for i, price in enumerate(prices)
+    ]
+
+
+def test_wal_mode_enabled(tmp_path):
+    """파일 DB는 WAL 모드로 열려야 합니다."""
+    with SQLiteDatabaseManager(str(tmp_path / 'backtest.db')) as db:
+        db.cursor.execute('PRAGMA journal_mode')
+        assert db.cursor.fetchone()['journal_mode'] == 'wal'
+
+
+def test_save_and_read_minute_prices():
+    """분봉 저장/조회 결과가 MariaDB 구현과 같은 형태여야 합니다."""
+    with SQLiteDatabaseManager(':memory:') as db:
+        db.save_minute_prices(_minute_rows(1, '005930', '삼성전자', date(2025, 6, 9), [100, 101, 102]))
+        db.save_minute_prices(_minute_rows(2, '000660', 'SK하이닉스', date(2025, 6, 10), [200]))
+
+        sessions = db.get_minute_sessions()
+        assert [s['trade_session_id'] for s in sessions] == [2, 1]
+        assert sessions[1]['high_rise_date'] == date(2025, 6, 9)
+
+        rows = db.get_all_minute_prices_for_session(1)
+        assert [r['price'] for r in rows] == [100, 101, 102]
+        assert rows[0]['ticker'] == '005930'
+        assert rows[0]['datetime'] == datetime(2025, 6, 10, 9, 0)
+
+        after = db.get_minute_prices_after_datetime(1, datetime(2025, 6, 10, 9, 1))
+        assert [r['price'] for r in after] == [101, 102]
+
+
+def test_save_minute_prices_upsert():
+    """같은 (세션, 시간) 분봉은 덮어써야 합니다."""
+    with SQLiteDatabaseManager(':memory:') as db:
+        db.save_minute_prices(_minute_rows(1, '005930', '삼성전자', date(2025, 6, 9), [100, 101]))
+        db.save_minute_prices(_minute_rows(1, '005930', '삼성전자우', date(2025, 6, 9), [150]))
+
+        rows = db.get_all_minute_prices_for_session(1)
+        assert [r['price'] for r in rows] == [150, 101]
+        assert rows[0]['name'] == '삼성전자우'
+
+
+def test_pykrx_upper_stocks_roundtrip():
+    """pykrx_upper_stocks / selected_pykrx_upper_stocks 저장 및 조회"""
+    with SQLiteDatabaseManager(':memory:') as db:
+        db.save_pykrx_upper_stocks([
+            {'ticker': '005930', 'name': '삼성전자', 'date': date(2025, 6, 9), 'trade_condition': 'normal'},
+            {'ticker': '005930', 'name': '삼성전자', 'date': date(2025, 6, 9), 'trade_condition': 'strong_momentum'},
+        ])
+        stocks = db.get_pykrx_upper_stocks('2025-06-01', '2025-06-30')
+        assert len(stocks) == 1
+        assert stocks[0]['trade_condition'] == 'strong_momentum'
+
+        db.save_selected_pykrx_upper_stocks([
+            {'date': date(2025, 6, 9), 'ticker': 'A', 'name': 'a', 'closing_price': 1000, 'trade_condition': 'normal'},
+            {'date': date(2025, 6, 9), 'ticker': 'B', 'name': 'b', 'closing_price': 2000, 'trade_condition': 'strong_momentum'},
+        ])
+        selected = db.get_selected_pykrx_upper_stocks()
+        assert [s['ticker'] for s in selected] == ['B', 'A']
+
+
+def test_minute_session_summary():
+    """저장 시 세션 요약 정보(분봉 개수, 첫/마지막 시간, 체크섬)가 함께 갱신되어야 합니다."""
+    import zlib
+    from functools import reduce
+
+    with SQLiteDatabaseManager(':memory:') as db:
+        db.save_minute_prices(_minute_rows(1, '005930', '삼성전자', date(2025, 6, 9), [100, 101]))
+        db.save_minute_prices(_minute_rows(1, '005930', '삼성전자', date(2025, 6, 9), [100, 101, 105]))
+
+        session = db.get_minute_sessions()[0]
+        assert session['bar_count'] == 3
+        assert session['first_datetime'] == datetime(2025, 6, 10, 9, 0)
+        assert session['last_datetime'] == datetime(2025, 6, 10, 9, 2)
+
+        # MariaDB의 BIT_XOR(CRC32(CONCAT(datetime, ':', price)))와 같은 값
+        expected = reduce(lambda acc, bar: acc ^ zlib.crc32(bar.encode()), [
+            '2025-06-10 09:00:00:100', '2025-06-10 09:01:00:101', '2025-06-10 09:02:00:105',
+        ], 0)
+        assert session['checksum'] == expected
+
+        db.cursor.execute('UPDATE minute_sessions SET bar_count = 0, checksum = 0')
+        db.rebuild_minute_session_summary()
+        assert db.get_minute_sessions()[0]['checksum'] == expected
+
+
+def test_load_minute_bar_arrays():
+    """스트리밍 조회 결과가 세션/시간 순의 NumPy 배열로 반환되어야 합니다."""
+    import numpy as np
+
+    with SQLiteDatabaseManager(':memory:') as db:
+        db.save_minute_prices(_minute_rows(2, '000660', 'SK하이닉스', date(2025, 6, 10), [200, 201]))
+        db.save_minute_prices(_minute_rows(1, '005930', '삼성전자', date(2025, 6, 9), [100, 101, 102]))
+
+        # 청크 크기보다 많은 행을 읽어도 결과가 같아야 합니다.
+        bars = db.load_minute_bar_arrays(chunk_size=2)
+        assert bars['trade_session_id'].tolist() == [1, 1, 1, 2, 2]
+        assert bars['price'].tolist() == [100, 101, 102, 200, 201]
+        assert bars['datetime'][0] == np.datetime64('2025-06-10T09:00:00')
+
+        bars = db.load_minute_bar_arrays([2])
+        assert bars['price'].tolist() == [200, 201]
+        assert len(db.load_minute_bar_arrays([])['price']) == 0
+
+
+def test_selected_stocks_by_buy_date_range():
+    """급등일이 기간에 있고 매수일(급등일 → 다음 영업일 기준 buy_offset 영업일 후)도 기간에 포함되는 종목만 반환해야 합니다."""
+    pytest.importorskip('holidayskr')
+    with SQLiteDatabaseManager(':memory:') as db:
+        db.save_selected_pykrx_upper_stocks([
+            {'date': date(2025, 6, 13), 'ticker': 'A', 'name': 'a', 'closing_price': 1000, 'trade_condition': 'normal'},
+            # 주말(토요일) 급등은 다음 영업일(월요일)부터 셉니다.
+            {'date': date(2025, 6, 14), 'ticker': 'B', 'name': 'b', 'closing_price': 2000, 'trade_condition': 'normal'},
+            {'date': date(2025, 6, 19), 'ticker': 'C', 'name': 'c', 'closing_price': 3000, 'trade_condition': 'normal'},
+        ])
+        stocks = db.get_selected_pykrx_upper_stocks_by_date_range(date(2025, 6, 13), date(2025, 6, 17), buy_offset=1)
+        assert [(s['ticker'], s['buy_date']) for s in stocks] == [('A', date(2025, 6, 16)), ('B', date(2025, 6, 17))]
+
+
+def test_selected_stocks_by_buy_date_range_keeps_high_rise_date_boundary():
+    """매수일이 기간 안이어도 급등일이 시작일 이전이면 제외하고, 급등일이 기간 안이어도 매수일이 종료일 이후면 제외해야 합니다."""
+    pytest.importorskip('holidayskr')
+    with SQLiteDatabaseManager(':memory:') as db:
+        db.save_selected_pykrx_upper_stocks([
+            # 급등일 6/12(목) → 매수일 6/13(금): 매수일은 기간 안이지만 급등일이 시작일 이전
+            {'date': date(2025, 6, 12), 'ticker': 'BEFORE', 'name': 'before', 'closing_price': 1000, 'trade_condition': 'normal'},
+            {'date': date(2025, 6, 13), 'ticker': 'START', 'name': 'start', 'closing_price': 2000, 'trade_condition': 'normal'},
+            # 급등일 6/17(화) → 매수일 6/18(수): 급등일은 기간 안이지만 매수일이 종료일 이후
+            {'date': date(2025, 6, 17), 'ticker': 'END', 'name': 'end', 'closing_price': 3000, 'trade_condition': 'normal'},
+        ])
+        stocks = db.get_selected_pykrx_upper_stocks_by_date_range(date(2025, 6, 13), date(2025, 6, 17), buy_offset=1)
+        assert [s['ticker'] for s in stocks] == ['START']
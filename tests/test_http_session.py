@@ -0,0 +1,44 @@
+"""KIS REST keep-alive 세션 풀 테스트"""
+import sys
+import os
+import threading
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import http_session
+from config.config import HTTP_POOL_MAXSIZE, HTTP_RETRY_TOTAL
+
+REAL = "https://openapi.koreainvestment.com:9443"
+MOCK = "https://openapivts.koreainvestment.com:29443"
+
+
+def test_session_shared_per_host():
+    """같은 호스트는 하나의 세션을, 실전/모의 서버는 서로 다른 세션을 사용해야 합니다."""
+    http_session.close_sessions()
+    real = http_session.get_session(f"{REAL}/uapi/hashkey")
+    assert http_session.get_session(f"{REAL}/uapi/domestic-stock/v1/quotations/inquire-price-2") is real
+    assert http_session.get_session(f"{MOCK}/uapi/domestic-stock/v1/trading/order-cash") is not real
+
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(http_session.get_session(f"{MOCK}/uapi/hashkey")))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(session) for session in sessions}) == 1
+    http_session.close_sessions()
+
+
+def test_adapter_pool_and_retry_policy():
+    """연결 풀 크기가 설정값을 따르고, 어댑터는 연결 실패만 재시도해야 합니다. (읽기/상태 코드 재시도는 retry_policy에서만)"""
+    adapter = http_session.get_session(REAL).get_adapter(f"{REAL}/uapi/hashkey")
+    assert adapter._pool_maxsize == HTTP_POOL_MAXSIZE
+
+    retry = adapter.max_retries
+    assert retry.connect == HTTP_RETRY_TOTAL
+    assert retry.read == 0 and retry.status == 0
+    assert not retry.is_retry('GET', 503)
+    assert not retry.is_retry('POST', 503)
+    http_session.close_sessions()
@@ -0,0 +1,56 @@
+"""JSON 코덱 테스트"""
+import sys
+import os
+
+import pytest
+import requests
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import json_codec
+from utils.json_codec import StdlibCodec, get_codec
+from api.http_session import decode_json
+
+PAYLOAD = {
+    "rt_cd": "0",
+    "msg1": "정상처리 되었습니다.",
+    "output2": [{"stck_cntg_hour": "151700", "stck_prpr": "118", "cntg_vol": 3682}],
+}
+
+
+def test_codecs_produce_identical_text():
+    """orjson과 표준 모듈 코덱은 같은 문자열을 만들고 서로의 출력을 읽을 수 있어야 합니다."""
+    pytest.importorskip('orjson')
+    stdlib, fast = StdlibCodec(), get_codec("orjson")
+    for sort_keys in (False, True):
+        assert fast.dumps(PAYLOAD, sort_keys) == stdlib.dumps(PAYLOAD, sort_keys)
+    text = stdlib.dumps(PAYLOAD)
+    assert fast.loads(text.encode()) == stdlib.loads(text) == PAYLOAD
+    assert fast.dumps({1: None}) == stdlib.dumps({1: None}) == '{"1":null}'
+    assert '"msg1":"정상처리 되었습니다."' in text
+
+
+def test_set_codec_falls_back_and_rejects_unknown():
+    """표준 모듈 코덱으로 바꿀 수 있고, 알 수 없는 이름은 거부해야 합니다."""
+    previous = json_codec.codec
+    try:
+        assert json_codec.set_codec("json").name == "json"
+        assert json_codec.loads(json_codec.dumps_bytes([1, "가"])) == [1, "가"]
+    finally:
+        json_codec.codec = previous
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+
+
+def test_decode_json_raises_requests_decode_error():
+    """디코딩 실패는 response.json()처럼 requests의 JSONDecodeError(RequestException)로 발생해야 합니다."""
+    response = requests.models.Response()
+    response._content = '{"rt_cd": "0", "msg1": "정상"}'.encode()
+    assert decode_json(response) == {"rt_cd": "0", "msg1": "정상"}
+
+    response = requests.models.Response()
+    response._content = b"<html>502</html>"
+    with pytest.raises(requests.exceptions.JSONDecodeError) as exc_info:
+        decode_json(response)
+    assert isinstance(exc_info.value, requests.exceptions.RequestException)
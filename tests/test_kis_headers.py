@@ -0,0 +1,105 @@
+"""KISApi 요청별 헤더 생성 테스트"""
+import json
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('mariadb')
+
+from api.kis_api import KISApi
+
+
+def test_build_headers_does_not_share_state(monkeypatch):
+    """요청마다 독립된 헤더를 만들어야 하며 고정 헤더는 변경되지 않아야 합니다."""
+    api = KISApi()
+    monkeypatch.setattr(api, '_ensure_token', lambda is_mock: 'mock-token' if is_mock else 'real-token')
+
+    order = api._build_headers(is_mock=True, tr_id='VTTC0802U', hashkey='abc')
+    quote = api._build_headers(is_mock=False, tr_id='FHPST01010000')
+
+    assert order['authorization'] == 'Bearer mock-token'
+    assert order['hashkey'] == 'abc'
+    assert 'hashkey' not in quote
+    assert quote['tr_id'] == 'FHPST01010000'
+    assert 'authorization' not in KISApi._BASE_HEADERS[True]
+    with pytest.raises(TypeError):
+        KISApi._BASE_HEADERS[False]['tr_id'] = 'X'
+
+
+def test_build_headers_concurrently(monkeypatch):
+    """여러 스레드에서 동시에 만들어도 tr_id가 섞이지 않아야 합니다."""
+    api = KISApi()
+    monkeypatch.setattr(api, '_ensure_token', lambda is_mock: 'token')
+
+    tr_ids = [f"TR{i:04d}" for i in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda tr_id: api._build_headers(tr_id=tr_id)['tr_id'], tr_ids))
+    assert results == tr_ids
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, payload, headers=None):
+        self._payload = payload
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+    @property
+    def content(self):
+        return json.dumps(self._payload).encode()
+
+
+def test_hashkey_memoized_and_only_for_orders(monkeypatch):
+    """같은 주문 본문은 hashkey를 한 번만 발급받고, 조회 API는 hashkey를 요청하지 않아야 합니다."""
+    api = KISApi()
+    monkeypatch.setattr(api, '_ensure_token', lambda is_mock: 'token')
+    monkeypatch.setattr(KISApi, '_hashkey_memo', type(KISApi._hashkey_memo)())
+    requests_sent = []
+
+    def _request(method, url, is_mock=False, endpoint_class=None, **kwargs):
+        requests_sent.append(url.rsplit('/', 1)[-1])
+        if url.endswith('/hashkey'):
+            return _Response({'HASH': 'h'})
+        return _Response({'rt_cd': '0', 'output1': []})
+
+    monkeypatch.setattr(api, '_request', _request)
+
+    api.balance_inquiry()
+    api.cancel_order('1')
+    api.cancel_order('1')
+    assert requests_sent == ['inquire-balance', 'hashkey', 'order-rvsecncl', 'order-rvsecncl']
+    # 키 순서가 달라도 같은 본문이면 같은 직렬화 결과를 사용합니다.
+    assert KISApi._canonical_body({'b': 1, 'a': 2}) == KISApi._canonical_body({'a': 2, 'b': 1})
+
+
+def test_balance_inquiry_follows_continuation(monkeypatch):
+    """응답 헤더 tr_cont가 M이면 연속 조회 키로 다음 페이지를 이어서 조회해야 합니다."""
+    api = KISApi()
+    monkeypatch.setattr(api, '_ensure_token', lambda is_mock: 'token')
+    pages = [
+        _Response({'rt_cd': '0', 'output1': [{'pdno': '005930'}], 'ctx_area_fk100': 'FK', 'ctx_area_nk100': 'NK'},
+                  {'tr_cont': 'M'}),
+        _Response({'rt_cd': '0', 'output1': [{'pdno': '000660'}]}, {'tr_cont': 'D'}),
+    ]
+    sent = []
+
+    def _request(method, url, is_mock=False, endpoint_class=None, headers=None, params=None, **kwargs):
+        sent.append((headers.get('tr_cont'), params['CTX_AREA_FK100'], params['CTX_AREA_NK100']))
+        return pages[len(sent) - 1]
+
+    monkeypatch.setattr(api, '_request', _request)
+
+    holdings = api.balance_inquiry()
+    assert [item['pdno'] for item in holdings] == ['005930', '000660']
+    assert sent == [('', '', ''), ('N', 'FK', 'NK')]
@@ -0,0 +1,56 @@
+"""KIS REST 대역 서버로 KISApi 주문 흐름을 확인하는 테스트"""
+import sys
+import os
+
+import pytest
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('mariadb')
+
+from api.kis_api import KISApi
+from api.rate_limiter import KISRateLimiter, ORDER
+from kis_stub_server import KISStubServer, StubConfig
+
+
+def _api(monkeypatch, stub):
+    api = KISApi()
+    api.real_url = api.mock_url = stub.url
+    # 모의투자 한도(초당 2건) 대신 대역 서버에 맞춘 넉넉한 한도로 측정합니다.
+    api.rate_limiter = KISRateLimiter({(account, cls): 1000 for account in ('real', 'mock') for cls in (None, ORDER)})
+    monkeypatch.setattr(api, '_ensure_token', lambda is_mock: 'stub-token')
+    return api
+
+
+def test_partial_fill_then_revise_reaches_balance(monkeypatch):
+    """부분 체결된 주문을 정정하면 원주문 + 정정주문 체결 수량이 잔고에 반영되어야 합니다."""
+    with KISStubServer(StubConfig(partial_fill_ratio=1.0, balance_page_size=2)) as stub:
+        api = _api(monkeypatch, stub)
+        for ticker in ('000010', '000020', '000030'):
+            assert api.place_order(ticker, 2, order_type='buy', price=1000)['rt_cd'] == '0'
+
+        order = api.place_order('005930', 10, order_type='buy', price=70000)
+        order_no = order['output']['ODNO']
+        execution = api.daily_order_execution_inquiry(order_no)['output1'][0]
+        assert (execution['ord_qty'], execution['tot_ccld_qty']) == ('10', '5')
+
+        revised = api.revise_order(order_no, 5, 70100)
+        assert api.daily_order_execution_inquiry(revised['output']['ODNO'])['output1'][0]['tot_ccld_qty'] == '5'
+
+        # 보유 종목 4개를 2개씩 연속 조회로 모두 받아와야 합니다.
+        holdings = {item['pdno']: item for item in api.balance_inquiry()}
+        assert holdings['005930']['hldg_qty'] == '10'
+        assert holdings['000010']['hldg_qty'] == '1'  # 정정하지 않은 주문은 절반만 체결
+        assert stub.requests['inquire-balance'] == 2
+        assert stub.requests['hashkey'] == 5
+
+
+def test_rate_limited_requests_are_retried(monkeypatch):
+    """초당 거래건수 초과(EGW00201) 응답을 받으면 다시 요청하여 성공해야 합니다."""
+    with KISStubServer(StubConfig(rate_limit_error_ratio=0.3, prices={'005930': 70000})) as stub:
+        api = _api(monkeypatch, stub)
+        prices = [api.get_current_price('005930')[0] for _ in range(10)]
+
+        assert prices == [70000] * 10
+        assert stub.rate_limited['inquire-price-2'] >= 1
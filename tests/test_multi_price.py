@@ -0,0 +1,89 @@
+"""멀티종목 시세조회 배치 테스트"""
+import json
+import sys
+import os
+
+import pytest
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('mariadb')
+
+from api.kis_api import KISApi, MULTI_PRICE_MAX_TICKERS
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+    @property
+    def content(self):
+        return json.dumps(self._payload).encode()
+
+
+def _multprice_row(ticker):
+    """FHKST11300006(관심종목 멀티종목 시세조회) output 행. 단기과열/거래정지 필드는 없습니다."""
+    return {
+        'kospi_kosdaq_cls_name': '코스닥',
+        'mrkt_trtm_cls_name': '',
+        'hour_cls_code': '0',
+        'inter_shrn_iscd': ticker,
+        'inter_kor_isnm': f'종목{ticker}',
+        'inter2_prpr': str(1000 + int(ticker)),
+        'inter2_prdy_vrss': '10',
+        'prdy_vrss_sign': '2',
+        'prdy_ctrt': '1.00',
+        'acml_vol': '12345',
+        'inter2_oprc': '990',
+        'inter2_hgpr': '1100',
+        'inter2_lwpr': '980',
+        'acml_tr_pbmn': '12345000',
+    }
+
+
+def test_multi_price_batches_and_fans_out(monkeypatch):
+    """요청당 최대 종목 수로 나누어 조회하고 종목별 레코드로 돌려줘야 합니다."""
+    api = KISApi()
+    monkeypatch.setattr(api, '_ensure_token', lambda is_mock: 'token')
+    calls = []
+
+    def _request(method, url, is_mock=False, endpoint_class=None, params=None, **kwargs):
+        tickers = [value for key, value in params.items() if key.startswith('FID_INPUT_ISCD_')]
+        calls.append(len(tickers))
+        return _Response({'rt_cd': '0', 'msg1': '정상처리 되었습니다.', 'output': [_multprice_row(t) for t in tickers]})
+
+    monkeypatch.setattr(api, '_request', _request)
+
+    tickers = [f"{i:06d}" for i in range(65)]
+    records = api.get_multi_stock_prices(tickers + tickers[:5])
+
+    assert calls == [MULTI_PRICE_MAX_TICKERS, MULTI_PRICE_MAX_TICKERS, 5]
+    assert len(records) == 65
+    assert records['000042'] == {'stck_prpr': '1042', 'hts_kor_isnm': '종목000042', 'stck_hgpr': '1100', 'acml_vol': '12345'}
+
+
+def test_market_warnings_uses_single_price_inquiry(monkeypatch):
+    """경고 판정은 멀티종목 응답에 없는 필드이므로 주식현재가 시세2 응답(캐시 허용 나이 적용)으로 해야 합니다."""
+    api = KISApi()
+    single_calls = []
+    outputs = {'005930': {'short_over_yn': 'N', 'trht_yn': 'N'}, '000660': {'short_over_yn': 'Y', 'trht_yn': 'N'}}
+
+    def _get_stock_price(ticker, max_age=0):
+        single_calls.append((ticker, max_age))
+        return {'rt_cd': '0', 'output': outputs.get(ticker)}
+
+    monkeypatch.setattr(api, 'get_stock_price', _get_stock_price)
+
+    assert api.check_market_warnings('005930', 30) is True
+    assert api.check_market_warnings('000660', 30) is False
+    assert api.check_market_warnings('999999') is False
+    assert single_calls == [('005930', 30), ('000660', 30), ('999999', 0)]
@@ -0,0 +1,64 @@
+"""체결통보 기반 주문 체결 추적기 테스트"""
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.order_tracker import OrderTracker, ExecutionNotice, NOTICE_FIELDS
+
+
+def _notice(order_no, quantity, order_qty=10, is_fill=True):
+    row = {name: "" for name in NOTICE_FIELDS}
+    row.update({
+        "ODER_NO": order_no,
+        "SELN_BYOV_CLS": "02",
+        "STCK_SHRN_ISCD": "005930",
+        "CNTG_QTY": str(quantity),
+        "CNTG_UNPR": "70000",
+        "ODER_QTY": str(order_qty),
+        "RFUS_YN": "0",
+        "CNTG_YN": "2" if is_fill else "1",
+    })
+    return ExecutionNotice.from_fields([row[name] for name in NOTICE_FIELDS])
+
+
+def test_notice_before_wait_is_not_lost():
+    """대기 전에 도착한 체결통보도 누적되어 바로 반환해야 합니다. (주문번호 0 채움 무시)"""
+    tracker = OrderTracker()
+    tracker.publish(_notice("0000012345", 4))
+    tracker.publish(_notice("0000012345", 6))
+
+    started = time.monotonic()
+    assert tracker.wait_for_fill("12345", timeout=5) is True
+    assert time.monotonic() - started < 0.5
+    assert tracker.filled_quantity("0012345") == 10
+
+
+def test_thread_waiter_wakes_on_fill_or_times_out():
+    """체결통보가 오면 타임아웃 전에 깨어나고, 부분 체결이면 타임아웃 후 False를 반환해야 합니다."""
+    tracker = OrderTracker()
+    threading.Timer(0.1, tracker.publish, args=(_notice("777", 10),)).start()
+
+    started = time.monotonic()
+    assert tracker.wait_for_fill("777", 10, timeout=5) is True
+    assert time.monotonic() - started < 2
+
+    tracker.publish(_notice("888", 3))
+    assert tracker.wait_for_fill("888", 10, timeout=0.1) is False
+
+
+def test_async_waiter_wakes_from_other_thread():
+    """다른 스레드(웹소켓 수신)에서 publish해도 코루틴 대기자가 깨어나야 합니다."""
+    tracker = OrderTracker()
+
+    async def scenario():
+        threading.Timer(0.1, tracker.publish, args=(_notice("555", 10),)).start()
+        filled = await tracker.wait_for_fill_async("555", timeout=5)
+        not_filled = await tracker.wait_for_fill_async("556", timeout=0.1)
+        return filled, not_filled
+
+    assert asyncio.run(scenario()) == (True, False)
@@ -0,0 +1,102 @@
+"""분봉 Parquet 내보내기/가져오기 테스트"""
+import sys
+import os
+from datetime import datetime, date
+
+import pytest
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+from database.db_manager_sqlite import SQLiteDatabaseManager
+from database.parquet_store import ParquetMinuteReader, export_minute_bars, import_minute_bars
+
+
+def _minute_rows(trade_session_id, ticker, name, high_rise_date, datetimes, prices):
+    return [
+        {
+            'trade_session_id': trade_session_id,
+            'high_rise_date': high_rise_date,
+            'ticker': ticker,
+            'name': name,
+            'datetime': bar_datetime,
+            'price': price,
+        }
+        for bar_datetime, price in zip(datetimes, prices)
+    ]
+
+
+def _populate(db):
+    # 세션 1은 5월 말 ~ 6월 초에 걸쳐 있어 두 개의 월 파일로 나뉩니다.
+    db.save_minute_prices(_minute_rows(1, '005930', '삼성전자', date(2025, 5, 29), [
+        datetime(2025, 5, 30, 9, 0), datetime(2025, 5, 30, 9, 1), datetime(2025, 6, 2, 9, 0),
+    ], [100, 101, 102]))
+    db.save_minute_prices(_minute_rows(2, '000660', 'SK하이닉스', date(2025, 6, 10), [
+        datetime(2025, 6, 11, 9, 0), datetime(2025, 6, 11, 9, 1),
+    ], [200, 201]))
+
+
+def test_export_layout_and_encoding(tmp_path):
+    """월별 파티션으로 저장되고 ticker는 딕셔너리, datetime은 delta 인코딩이어야 합니다."""
+    with SQLiteDatabaseManager(':memory:') as db:
+        _populate(db)
+        exported = export_minute_bars(db, str(tmp_path))
+
+    assert exported == {'2025-05': 2, '2025-06': 3}
+    parquet_file = pq.ParquetFile(str(tmp_path / 'bars' / 'month=2025-06' / 'part-0.parquet'))
+    columns = {parquet_file.schema_arrow.names[i]: i for i in range(parquet_file.metadata.num_columns)}
+    row_group = parquet_file.metadata.row_group(0)
+    assert 'RLE_DICTIONARY' in row_group.column(columns['ticker']).encodings
+    assert 'DELTA_BINARY_PACKED' in row_group.column(columns['datetime']).encodings
+    assert parquet_file.read().column('ticker').to_pylist() == ['005930', '000660', '000660']
+
+
+def test_export_import_roundtrip(tmp_path):
+    """가져온 데이터의 세션 요약(체크섬 포함)이 원본과 같아야 합니다."""
+    with SQLiteDatabaseManager(':memory:') as db:
+        _populate(db)
+        original = db.get_minute_sessions()
+        export_minute_bars(db, str(tmp_path))
+
+    with SQLiteDatabaseManager(':memory:') as db:
+        assert import_minute_bars(db, str(tmp_path), batch_rows=2) == 5
+        assert db.get_minute_sessions() == original
+
+
+def test_reader_matches_database(tmp_path):
+    """ParquetMinuteReader는 DB 구현과 같은 형태로 분봉을 반환해야 합니다."""
+    with SQLiteDatabaseManager(':memory:') as db:
+        _populate(db)
+        export_minute_bars(db, str(tmp_path))
+        expected = db.get_all_minute_prices_for_session(1)
+        expected_after = db.get_minute_prices_after_datetime(1, datetime(2025, 5, 30, 9, 0))
+        expected_sessions = db.get_minute_sessions()
+
+    with ParquetMinuteReader(str(tmp_path)) as reader:
+        assert [s['trade_session_id'] for s in reader.get_minute_sessions()] == \
+            [s['trade_session_id'] for s in expected_sessions]
+        assert reader.get_all_minute_prices_for_session(1) == expected
+        assert reader.get_minute_prices_after_datetime(1, datetime(2025, 5, 30, 9, 0)) == expected_after
+        assert reader.get_all_minute_prices_for_session(99) == []
+
+        bars = reader.load_minute_bar_arrays([2])
+        assert bars['price'].tolist() == [200, 201]
+        assert str(bars['datetime'].dtype) == 'datetime64[s]'
+
+
+def test_export_loads_one_month_at_a_time_and_clears_stale_months(tmp_path):
+    """분봉은 월별로 해당 세션만 불러오고, 다시 내보내면 이전 월 디렉토리가 남지 않아야 합니다."""
+    with SQLiteDatabaseManager(':memory:') as db:
+        _populate(db)
+        export_minute_bars(db, str(tmp_path))
+
+        loaded = []
+        load_minute_bar_arrays = db.load_minute_bar_arrays
+        db.load_minute_bar_arrays = lambda ids: loaded.append(sorted(ids)) or load_minute_bar_arrays(ids)
+        assert export_minute_bars(db, str(tmp_path)) == {'2025-05': 2, '2025-06': 3}
+        assert loaded == [[1], [1, 2]]
+
+        assert export_minute_bars(db, str(tmp_path), trade_session_ids=[2]) == {'2025-06': 2}
+    assert sorted(os.listdir(tmp_path / 'bars')) == ['month=2025-06']
@@ -57,7 +57,17 @@ def test_consecutive_business_days():
     print(f"{day3}의 2일 전 영업일: {prev_day} (예상: {day1})")
     assert prev_day == day1, f"2일 전 영업일이 {day1}이 아닙니다!"
 
+def test_business_day_across_year_boundary():
+    """연도가 바뀌는 구간에서도 해당 연도의 휴장일을 사용해야 합니다."""
+    # 2024-12-31 연말 휴장일, 2025-01-01 신정
+    assert not DateUtils.is_business_day(date(2024, 12, 31))
+    assert DateUtils.get_previous_business_day(date(2025, 1, 2), 1) == date(2024, 12, 30)
+    assert DateUtils.get_target_date(date(2024, 12, 30), 1) == date(2025, 1, 2)
+    # 연도별 휴장일은 캐시되어 같은 객체를 반환합니다.
+    assert DateUtils.get_holidays(2025) is DateUtils.get_holidays(2025)
+
 if __name__ == "__main__":
     test_previous_business_day_from_business_day()
     test_consecutive_business_days()
+    test_business_day_across_year_boundary()
     print("\n모든 테스트가 성공적으로 완료되었습니다.")
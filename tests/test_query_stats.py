@@ -0,0 +1,65 @@
+"""쿼리 계측 모듈 테스트"""
+import sys
+import os
+import json
+import sqlite3
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.query_stats import InstrumentedCursor, QueryStats, fingerprint
+
+
+def test_fingerprint_normalizes_literals_and_in_lists():
+    """리터럴 값과 IN 목록 길이가 달라도 같은 지문이어야 합니다."""
+    a = fingerprint("SELECT * FROM minute_bars WHERE trade_session_id IN (%s, %s) AND price > 100")
+    b = fingerprint("SELECT *\n  FROM minute_bars WHERE trade_session_id IN (?) AND price > 2500")
+    assert a == b == "SELECT * FROM minute_bars WHERE trade_session_id IN (?+) AND price > ?"
+    assert fingerprint("DELETE FROM upper_stocks WHERE date < '2025-01-01'") == \
+        "DELETE FROM upper_stocks WHERE date < ?"
+
+
+def test_record_and_snapshot(tmp_path):
+    """실행 횟수/호출 메서드가 집계되고 느린 쿼리는 JSONL로 기록되어야 합니다."""
+    log_path = tmp_path / 'slow.jsonl'
+    stats = QueryStats(slow_query_ms=5, slow_query_log=str(log_path))
+
+    stats.record("SELECT 1", 1_000, 1, 'get_token')
+    stats.record("SELECT 2", 3_000, 1, 'get_token')
+    stats.record("UPDATE tokens SET access_token = %s", 10_000_000, 1, 'save_token')
+
+    snapshot = stats.snapshot()
+    assert snapshot[0]['fingerprint'] == "UPDATE tokens SET access_token = ?"
+    select = next(item for item in snapshot if item['fingerprint'] == "SELECT ?")
+    assert select['count'] == 2
+    assert select['callers'] == {'get_token': 2}
+    assert select['max_ms'] == 0.003
+
+    slow_entries = [json.loads(line) for line in log_path.read_text(encoding='utf-8').splitlines()]
+    assert len(slow_entries) == 1
+    assert slow_entries[0]['caller'] == 'save_token'
+
+    assert 'UPDATE tokens' in stats.format_snapshot()
+    stats.reset()
+    assert stats.snapshot() == []
+
+
+def test_instrumented_cursor_attributes_caller():
+    """커서 래퍼는 execute를 호출한 메서드 이름으로 통계를 남기고 나머지 속성은 위임해야 합니다."""
+    stats = QueryStats(slow_query_log=None)
+    conn = sqlite3.connect(':memory:')
+    cursor = InstrumentedCursor(conn.cursor(), stats)
+
+    def load_rows():
+        cursor.execute('SELECT ? + 1', (1,))
+        return cursor.fetchone()
+
+    assert load_rows() == (2,)
+    assert stats.snapshot()[0]['callers'] == {'load_rows': 1}
+
+    try:
+        cursor.execute('SELECT * FROM missing_table')
+    except sqlite3.OperationalError:
+        pass
+    failed = next(item for item in stats.snapshot() if 'missing_table' in item['fingerprint'])
+    assert failed['errors'] == 1
@@ -0,0 +1,56 @@
+"""현재가 단기 캐시 테스트"""
+import sys
+import os
+import threading
+import time
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.quote_cache import QuoteCache
+
+
+def _quote(price):
+    return {'rt_cd': '0', 'output': {'stck_prpr': str(price), 'trht_yn': 'N'}}
+
+
+def test_max_age_per_use_case():
+    """허용 나이 이내면 캐시를, max_age=0이면 항상 새로 조회해야 합니다."""
+    cache = QuoteCache()
+    calls = []
+    loader = lambda: calls.append(1) or _quote(1000 + len(calls))
+
+    assert cache.get('005930', loader, max_age=30)['output']['stck_prpr'] == '1001'
+    assert cache.get('005930', loader, max_age=30)['output']['stck_prpr'] == '1001'
+    assert cache.get('005930', loader, max_age=0)['output']['stck_prpr'] == '1002'
+    assert len(calls) == 2
+    assert cache.snapshot()['hits'] == 1
+
+    # 실패 응답은 저장하지 않습니다.
+    assert cache.get('000660', lambda: {'rt_cd': '1', 'msg1': 'error'}, max_age=30)['rt_cd'] == '1'
+    assert cache.peek('000660', 30) is None
+
+
+def test_concurrent_requests_single_flight():
+    """같은 종목을 동시에 조회하면 한 번만 요청해야 합니다."""
+    cache = QuoteCache()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return _quote(2000)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('035420', loader, max_age=5)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result['output']['stck_prpr'] == '2000' for result in results)
+    snapshot = cache.snapshot()
+    assert snapshot['misses'] == 1
+    assert snapshot['hits'] + snapshot['coalesced'] == 7
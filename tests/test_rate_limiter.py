@@ -0,0 +1,60 @@
+"""KIS REST 호출 한도 제한기(토큰 버킷) 테스트"""
+import sys
+import os
+import asyncio
+import time
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.rate_limiter import KISRateLimiter, QUOTE, ORDER
+
+
+def _limiter():
+    return KISRateLimiter({
+        ('real', None): 100,
+        ('mock', None): 20,
+        ('mock', ORDER): 10,
+    }, headroom=1.0)
+
+
+def test_acquire_spaces_calls_under_rate():
+    """한도를 넘는 연속 호출은 토큰 주기만큼 간격을 두고 통과해야 합니다."""
+    limiter = _limiter()
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.acquire(QUOTE, is_mock=True)
+    elapsed = time.monotonic() - started
+    # 첫 호출은 즉시, 이후 4번은 1/20초 간격
+    assert 0.18 <= elapsed < 0.5
+
+    metrics = limiter.snapshot()['mock:all']
+    assert metrics['acquired'] == 5
+    assert metrics['throttled'] == 4
+
+
+def test_order_uses_both_buckets_and_timeout():
+    """주문은 계정 전체 버킷과 주문 버킷을 모두 소모하며, timeout 안에 불가능하면 예약하지 않습니다."""
+    limiter = _limiter()
+    assert limiter.acquire(ORDER, is_mock=True)
+    assert limiter.acquire(ORDER, is_mock=True, timeout=0.01) is False
+
+    snapshot = limiter.snapshot()
+    assert snapshot['mock:order']['acquired'] == 1
+    assert snapshot['mock:all']['acquired'] == 1
+    # 실전 계정 버킷은 영향을 받지 않습니다.
+    assert limiter.acquire(QUOTE, is_mock=False, timeout=0)
+
+
+def test_penalize_and_async_acquire():
+    """한도 초과 응답 후에는 비동기 호출도 벌점 시간만큼 대기해야 합니다."""
+    limiter = _limiter()
+    limiter.penalize(is_mock=False, seconds=0.1)
+
+    async def _run():
+        started = time.monotonic()
+        await limiter.acquire_async(QUOTE, is_mock=False)
+        return time.monotonic() - started
+
+    assert asyncio.run(_run()) >= 0.1
+    assert limiter.snapshot()['real:all']['penalties'] == 1
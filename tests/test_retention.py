@@ -0,0 +1,97 @@
+"""보존 기간 청크 삭제 테스트"""
+import sys
+import os
+import sqlite3
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.retention import RETENTION_TARGETS, RetentionPurger
+
+
+class _SQLiteCursor:
+    """MariaDB 문법(%s, START TRANSACTION)을 SQLite로 바꿔 실행하는 테스트용 커서"""
+
+    def __init__(self, conn):
+        self._cursor = conn.cursor()
+        self.statements = []
+
+    def execute(self, sql, params=()):
+        self.statements.append(sql)
+        if sql.strip() == 'START TRANSACTION':
+            sql = 'BEGIN'
+        return self._cursor.execute(sql.replace('%s', '?'), params)
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+
+class _SQLiteDB:
+    def __init__(self):
+        self.conn = sqlite3.connect(':memory:', isolation_level=None)
+        self.conn.row_factory = lambda cursor, row: {col[0]: row[i] for i, col in enumerate(cursor.description)}
+        self.cursor = _SQLiteCursor(self.conn)
+        self.conn.execute('CREATE TABLE upper_stocks (`date` TEXT, ticker TEXT, PRIMARY KEY (`date`, ticker))')
+        self.conn.executemany('INSERT INTO upper_stocks VALUES (?, ?)', [
+            (f'2025-01-{day:02d}', f'{ticker:06d}') for day in range(1, 11) for ticker in range(3)
+        ])
+
+
+def _count(db):
+    return db.conn.execute('SELECT COUNT(*) AS cnt FROM upper_stocks').fetchone()['cnt']
+
+
+def test_purge_in_chunks_with_progress():
+    """청크 크기 단위로 나누어 삭제하고 진행 상황을 보고해야 합니다."""
+    db = _SQLiteDB()
+    progress = []
+    purger = RetentionPurger(db, chunk_rows=4, sleep_ms=0,
+                             progress=lambda table, deleted, total: progress.append((deleted, total)))
+
+    assert purger.purge('upper_stocks', '2025-01-06') == 15
+    assert _count(db) == 15
+    assert db.conn.execute('SELECT MIN(`date`) AS d FROM upper_stocks').fetchone()['d'] == '2025-01-06'
+    assert progress == [(4, 15), (8, 15), (12, 15), (15, 15)]
+    assert sum(1 for sql in db.cursor.statements if sql.startswith('DELETE')) == 4
+
+
+def test_purge_stops_at_deadline():
+    """마감 시각이 지났으면 삭제하지 않고 다음 실행으로 미뤄야 합니다."""
+    from datetime import datetime, timedelta
+
+    db = _SQLiteDB()
+    purger = RetentionPurger(db, chunk_rows=4, sleep_ms=0, progress=None,
+                             deadline=datetime.now() - timedelta(seconds=1))
+    assert purger.purge('upper_stocks', '2025-01-06') == 0
+    assert _count(db) == 30
+
+
+def test_minute_bar_purge_reports_sessions_inside_transaction():
+    """분봉 청크를 삭제할 때마다 분봉이 삭제된 세션 ID를 커밋 전에 콜백으로 넘겨야 합니다."""
+    db = _SQLiteDB()
+    db.conn.execute('CREATE TABLE minute_bars (trade_session_id INT, `datetime` TEXT, price INT, '
+                    'PRIMARY KEY (trade_session_id, `datetime`))')
+    # 세션 1은 cutoff 이전에만, 세션 2는 cutoff에 걸쳐, 세션 3은 cutoff 이후에만 분봉이 있습니다.
+    db.conn.executemany('INSERT INTO minute_bars VALUES (?, ?, ?)', [
+        (1, '2025-01-02 09:00:00', 100), (1, '2025-01-02 09:01:00', 101),
+        (2, '2025-01-03 09:00:00', 200), (2, '2025-01-03 09:01:00', 201), (2, '2025-01-06 09:00:00', 202),
+        (3, '2025-01-07 09:00:00', 300),
+    ])
+    purged = []
+
+    def on_purged(table, session_ids):
+        assert db.conn.in_transaction
+        purged.append((table, sorted(session_ids)))
+
+    purger = RetentionPurger(db, chunk_rows=3, sleep_ms=0, progress=None, on_purged=on_purged)
+    assert purger._delete_in_chunks(RETENTION_TARGETS['minute_bars'], '2025-01-06') == 4
+    assert purged == [('minute_bars', [1, 2]), ('minute_bars', [2])]
+    remaining = db.conn.execute('SELECT trade_session_id AS sid FROM minute_bars ORDER BY 1').fetchall()
+    assert [row['sid'] for row in remaining] == [2, 3]
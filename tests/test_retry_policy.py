@@ -0,0 +1,118 @@
+"""재시도 정책 / 작업 마감 / 서킷 브레이커 테스트"""
+import sys
+import os
+import time
+
+import pytest
+from requests.exceptions import RequestException
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.retry_policy import (
+    RetryPolicy, CircuitBreaker, Deadline, DeadlineExceeded, CircuitOpenError,
+    deadline_scope, current_deadline, request_timeout, limiter_timeout, retry_metrics
+)
+
+
+def test_backoff_grows_exponentially_and_is_capped():
+    """지터가 없으면 백오프는 배수로 늘어나고 max_delay에서 멈춰야 합니다."""
+    policy = RetryPolicy("test-backoff", base_delay=0.1, max_delay=0.5, jitter=0)
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == pytest.approx([0.1, 0.2, 0.4, 0.5, 0.5])
+
+
+def test_attempts_stop_when_exhausted_or_deadline_near():
+    """시도 횟수를 다 쓰거나 마감 전에 백오프를 마칠 수 없으면 더 시도하지 않아야 합니다."""
+    policy = RetryPolicy("test-attempts", max_attempts=3, base_delay=0.01, jitter=0)
+    assert list(policy.attempts()) == [1, 2, 3]
+
+    slow = RetryPolicy("test-deadline", max_attempts=10, base_delay=0.5, jitter=0)
+    started = time.monotonic()
+    with deadline_scope(Deadline.after(0.3)):
+        assert list(slow.attempts()) == [1]
+    assert time.monotonic() - started < 0.1
+
+    metrics = retry_metrics.snapshot()
+    assert metrics["test-attempts"] == {"attempts": 3, "retries": 2, "exhausted": 1}
+    assert metrics["test-deadline"]["deadline_exceeded"] == 1
+
+
+def test_deadline_scope_keeps_earlier_deadline_and_clamps_timeout():
+    """안쪽 범위가 더 늦은 마감을 지정해도 바깥의 이른 마감을 유지하고, 요청 타임아웃을 남은 시간으로 줄여야 합니다."""
+    assert request_timeout(10) == 10
+    with deadline_scope(Deadline.after(1)) as outer:
+        with deadline_scope(Deadline.after(60)):
+            assert current_deadline() is outer
+            assert request_timeout(10) <= 1
+    assert current_deadline() is None
+
+    with deadline_scope(Deadline.after(-1)):
+        with pytest.raises(DeadlineExceeded):
+            request_timeout(10)
+
+
+def test_limiter_timeout_follows_remaining_deadline():
+    """호출 한도 제한기 대기 시간은 마감이 없으면 무제한, 있으면 남은 시간으로 제한되어야 합니다."""
+    assert limiter_timeout() is None
+    with deadline_scope(Deadline.after(1)):
+        assert 0 < limiter_timeout() <= 1
+    with deadline_scope(Deadline.after(-1)):
+        assert limiter_timeout() == 0.0
+
+
+def test_circuit_breaker_trips_and_recovers_through_half_open():
+    """연속 실패로 열리면 바로 실패시키고, reset_timeout 뒤 시험 요청 하나가 성공하면 닫혀야 합니다."""
+    breaker = CircuitBreaker("test-breaker", failure_threshold=2, reset_timeout=0.1)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.check()
+    assert isinstance(exc_info.value, RequestException)
+
+    time.sleep(0.12)
+    assert breaker.allow()          # half-open 시험 요청
+    assert not breaker.allow()      # 시험 중에는 다른 요청을 막음
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.12)
+    assert breaker.allow()
+    breaker.release()               # 결과 없이 끝난 시험 요청은 슬롯만 반납
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert retry_metrics.snapshot()["test-breaker"] == {"trips": 2, "short_circuits": 2}
+
+
+def test_half_open_trial_released_when_request_fails_without_outcome(monkeypatch):
+    """시험 요청이 마감 초과나 응답 읽기 오류로 끝나도 슬롯을 반납하여 이후 요청이 계속 막히지 않아야 합니다."""
+    pytest.importorskip('mariadb')
+    import requests
+    import api.kis_api as kis_api_module
+    from api.kis_api import KISApi
+    from api.rate_limiter import KISRateLimiter
+
+    breaker = CircuitBreaker("test-release", failure_threshold=1, reset_timeout=0.05)
+    monkeypatch.setitem(kis_api_module.kis_circuit_breakers, False, breaker)
+    api = KISApi()
+    api.rate_limiter = KISRateLimiter({('real', None): 1000, ('mock', None): 1000})
+
+    def broken_send(url, **kwargs):
+        raise requests.exceptions.ChunkedEncodingError("connection broken mid-body")
+
+    monkeypatch.setattr(kis_api_module, "http_get", broken_send)
+    breaker.record_failure()
+    time.sleep(0.06)
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        api._request("GET", "http://kis.invalid/quote", timeout=1)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    breaker.release()
+
+    with deadline_scope(Deadline.after(-1)):
+        with pytest.raises(DeadlineExceeded):
+            api._request("GET", "http://kis.invalid/quote", timeout=1)
+    assert breaker.allow()
@@ -0,0 +1,37 @@
+"""세션별 주문 작업 동시 실행 테스트 (KIS/DB 없이 경량 인스턴스 사용)"""
+import sys
+import os
+import time
+
+import pytest
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('mariadb')
+
+from trading.trading_upper import TradingUpper
+
+
+class _Quiet:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def test_run_concurrently_overlaps_session_waits():
+    """세션별 주문/체결 대기가 순차가 아니라 동시에 진행되어야 합니다."""
+    trading = TradingUpper.__new__(TradingUpper)
+    trading.logger = _Quiet()
+
+    def slow_order(session):
+        time.sleep(0.3)
+        if session['id'] == 3:
+            raise RuntimeError("주문 실패")
+        return {'rt_cd': '0', 'output': {'ODNO': str(session['id'])}}
+
+    started = time.monotonic()
+    results = trading._run_concurrently({i: (slow_order, {'id': i}) for i in range(1, 5)})
+
+    assert time.monotonic() - started < 0.9
+    assert results[1]['output']['ODNO'] == '1'
+    assert results[3] is None
@@ -0,0 +1,94 @@
+"""매도 주문 체결 확인/미체결 정정 흐름 테스트 (KIS/DB 없이 가짜 클라이언트 사용)"""
+import asyncio
+import sys
+import os
+from threading import Lock
+
+import pytest
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('mariadb')
+
+import trading.trading_upper as trading_upper
+from trading.trading_upper import TradingUpper
+
+
+class _Quiet:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _FakeKIS:
+    """매도 주문은 접수되지만 체결 조회 전까지 일부만 체결되는 KIS 클라이언트"""
+
+    def __init__(self):
+        self.calls = []
+
+    def balance_inquiry(self, max_age=0):
+        self.calls.append('balance')
+        return [{'pdno': '005930', 'hldg_qty': '10', 'pchs_avg_pric': '70000'}]
+
+    def place_order(self, ticker, quantity, order_type=None, price=None):
+        self.calls.append('order')
+        return {'rt_cd': '0', 'msg1': '주문 전송 완료 되었습니다.', 'output': {'ODNO': '0000000001'}}
+
+    def get_current_price(self, ticker, max_age=0):
+        return 70000, 'N'
+
+    def revise_order(self, order_num, quantity, order_price):
+        self.calls.append(('revise', order_num, quantity))
+        return {'rt_cd': '0', 'output': {'ODNO': '0000000002'}}
+
+
+class _FakeAsyncKIS(_FakeKIS):
+    async def balance_inquiry(self, max_age=0):
+        return _FakeKIS.balance_inquiry(self, max_age)
+
+    async def place_order(self, ticker, quantity, order_type=None, price=None):
+        return _FakeKIS.place_order(self, ticker, quantity, order_type, price)
+
+    async def get_current_price(self, ticker, max_age=0):
+        return 70000, 'N'
+
+    async def revise_order(self, order_num, quantity, order_price):
+        return _FakeKIS.revise_order(self, order_num, quantity, order_price)
+
+
+def _trading(monkeypatch):
+    monkeypatch.setattr(trading_upper, 'SELL_WAIT', 0.01)
+    trading = TradingUpper.__new__(TradingUpper)
+    trading.kis_api = _FakeKIS()
+    trading.async_kis_api = _FakeAsyncKIS()
+    trading.logger = trading.slack_logger = _Quiet()
+    trading.api_lock = Lock()
+    trading.deleted = []
+    remaining = {'0000000001': 4, '0000000002': 0}
+    monkeypatch.setattr(trading, 'order_complete_check', lambda result: remaining[result['output']['ODNO']])
+    monkeypatch.setattr(trading, 'delete_finished_session', trading.deleted.append)
+    monkeypatch.setattr(trading, '_sync_session_after_sell', lambda session_id, ticker, balance: True)
+
+    async def _order_complete_check_async(result):
+        return remaining[result['output']['ODNO']]
+
+    monkeypatch.setattr(trading, '_order_complete_check_async', _order_complete_check_async)
+    return trading
+
+
+def test_sell_order_revises_unfilled_quantity_before_sync(monkeypatch):
+    """접수된 매도 주문이 일부만 체결되면 잔고 동기화 전에 미체결 수량을 정정 주문해야 합니다."""
+    trading = _trading(monkeypatch)
+    result = trading.sell_order(1, '005930')
+
+    assert result['output']['ODNO'] == '0000000002'
+    assert trading.kis_api.calls == ['balance', 'order', ('revise', '0000000001', 4), 'balance']
+
+
+def test_sell_order_async_revises_unfilled_quantity_before_sync(monkeypatch):
+    """비동기 매도도 같은 순서로 체결 확인 → 정정 → 잔고 동기화해야 합니다."""
+    trading = _trading(monkeypatch)
+    result = asyncio.run(trading.sell_order_async(1, '005930'))
+
+    assert result['output']['ODNO'] == '0000000002'
+    assert trading.async_kis_api.calls == ['balance', 'order', ('revise', '0000000001', 4), 'balance']
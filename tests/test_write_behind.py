@@ -0,0 +1,140 @@
+"""write-behind 큐 테스트"""
+import sys
+import os
+import threading
+from datetime import date, datetime
+
+# 상위 디렉토리를 모듈 검색 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database.write_behind as write_behind
+from database.write_behind import WriteBehindQueue, replay_dead_letters
+
+
+class _RecordingDB:
+    """save_trading_writes_batch 호출을 기록하는 저장소"""
+
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.fail_times = fail_times
+        self.release = threading.Event()
+        self.release.set()
+
+    def save_trading_writes_batch(self, session_rows, history_rows):
+        self.release.wait()
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("connection lost")
+        self.batches.append((list(session_rows), list(history_rows)))
+
+    def close(self):
+        pass
+
+
+def _submit_session(wb, session_id, quantity, avr_price, count):
+    wb.submit_session(session_id, date(2025, 6, 9), datetime(2025, 6, 10, 9, 5), '005930', '삼성전자',
+                      70000, 1000000, quantity * avr_price, quantity, avr_price, count, 'normal')
+
+
+def test_rows_are_grouped_into_one_batch_and_flushed_on_stop():
+    db = _RecordingDB()
+    wb = WriteBehindQueue(db_factory=lambda: db, flush_interval_ms=10_000, max_batch_rows=100)
+
+    _submit_session(wb, 1001, 10, 70000, 1)
+    wb.submit_trade_history(date(2025, 6, 10), datetime(2025, 6, 10, 9, 5).time(), '005930', '삼성전자',
+                            70000, 0, 10, 0, 0.0, 10)
+    _submit_session(wb, 1002, 5, 30000, 1)
+
+    assert wb.stop(timeout=5)
+    assert len(db.batches) == 1
+    session_rows, history_rows = db.batches[0]
+    assert [row[0] for row in session_rows] == [1001, 1002]
+    assert len(history_rows) == 1
+
+
+def test_max_batch_rows_splits_batches():
+    db = _RecordingDB()
+    wb = WriteBehindQueue(db_factory=lambda: db, flush_interval_ms=10_000, max_batch_rows=2)
+    for session_id in range(1, 6):
+        _submit_session(wb, session_id, 1, 1000, 1)
+    assert wb.flush(timeout=5)
+    assert [len(sessions) for sessions, _ in db.batches] == [2, 2, 1]
+    wb.stop(timeout=5)
+
+
+def test_pending_session_visible_until_committed():
+    db = _RecordingDB()
+    db.release.clear()
+    wb = WriteBehindQueue(db_factory=lambda: db, flush_interval_ms=0)
+
+    _submit_session(wb, 1001, 10, 70000, 1)
+    _submit_session(wb, 1001, 0, 0, 2)
+    pending = wb.get_pending_session(1001)
+    assert pending['count'] == 2
+    # 수량 0 upsert는 기존 평균가를 유지합니다.
+    assert pending['avr_price'] == 70000
+
+    db.release.set()
+    assert wb.flush(timeout=5)
+    assert wb.get_pending_session(1001) is None
+    wb.stop(timeout=5)
+
+
+def test_failed_batch_is_retried_with_new_connection():
+    db = _RecordingDB(fail_times=1)
+    created = []
+
+    def factory():
+        created.append(1)
+        return db
+
+    wb = WriteBehindQueue(db_factory=factory, flush_interval_ms=0)
+    wb.submit_trade_history(date(2025, 6, 10), None, '005930', '삼성전자', 70000, 0, 10, 0, 0.0, 10)
+    assert wb.stop(timeout=10)
+    assert len(db.batches) == 1
+    assert len(created) == 2
+
+
+def test_final_failure_goes_to_dead_letter_and_is_reported(tmp_path, monkeypatch):
+    """재시도 후에도 실패한 배치는 dead-letter 파일에 남고 flush()/stop()이 실패를 알려야 하며, 나중에 다시 저장할 수 있어야 합니다."""
+    monkeypatch.setattr(write_behind, 'WRITE_RETRY_DELAY', 0)
+    dead_letter = tmp_path / 'dead_letter.jsonl'
+    db = _RecordingDB(fail_times=write_behind.WRITE_RETRY)
+    wb = WriteBehindQueue(db_factory=lambda: db, flush_interval_ms=10_000, dead_letter_path=str(dead_letter))
+
+    _submit_session(wb, 1001, 10, 70000, 1)
+    wb.submit_trade_history(date(2025, 6, 10), None, '005930', '삼성전자', 70000, 0, 10, 0, 0.0, 10)
+    assert not wb.flush(timeout=5)
+    assert wb.failed_rows == 2
+    assert db.batches == []
+
+    # 이후 배치가 성공하면 flush()는 다시 True를 반환합니다.
+    _submit_session(wb, 1002, 5, 30000, 1)
+    assert wb.flush(timeout=5)
+    assert wb.stop(timeout=5)
+
+    assert replay_dead_letters(db, str(dead_letter)) == 2
+    session_rows, history_rows = db.batches[-1]
+    assert session_rows[0][0] == 1001 and session_rows[0][1] == '2025-06-09'
+    assert history_rows[0][2] == '005930'
+    assert not dead_letter.exists()
+
+
+def test_merge_pending_session_overlays_upsert_columns():
+    """DB 행에는 upsert가 갱신하는 컬럼만 대기 값으로 덮어쓰고, 수량 0이면 기존 평균가를 유지해야 합니다."""
+    db = _RecordingDB()
+    db.release.clear()
+    wb = WriteBehindQueue(db_factory=lambda: db, flush_interval_ms=0)
+    row = {'id': 1001, 'start_date': date(2025, 6, 9), 'name': '삼성전자', 'fund': 1000000,
+           'quantity': 10, 'avr_price': 70000, 'count': 1, 'is_strong_momentum': 0}
+
+    assert wb.merge_pending_session(1001, row) is row
+    _submit_session(wb, 1001, 0, 0, 2)
+    merged = wb.merge_pending_session(1001, row)
+    assert (merged['quantity'], merged['avr_price'], merged['count']) == (0, 70000, 2)
+    assert merged['fund'] == 1000000 and merged['is_strong_momentum'] == 0
+    # DB에 아직 없는 세션은 대기 중인 upsert 값을 그대로 반환합니다.
+    assert wb.merge_pending_session(1001, None)['count'] == 2
+
+    db.release.set()
+    wb.stop(timeout=5)
@@ -7,18 +7,25 @@ import time
 import asyncio
 from datetime import datetime, timedelta, date
 from database.db_manager_upper import DatabaseManager
+from database.write_behind import write_behind
+from config.config import MINUTE_BARS_RETENTION_DAYS, ORDER_CONCURRENCY
 from utils.date_utils import DateUtils
 from typing import Optional
 from utils.slack_logger import SlackLogger
 from utils.trading_logger import TradingLogger
 from api.kis_api import KISApi
+from api.async_kis_api import AsyncKISApi
 from api.krx_api import KRXApi
 from api.kis_websocket import KISWebSocket
+from api.order_tracker import order_tracker
+from api.retry_policy import Deadline, deadline_scope
 from config.condition import DAYS_LATER_UPPER, BUY_PERCENT_UPPER, BUY_WAIT, SELL_WAIT, COUNT_UPPER, SLOT_UPPER, UPPER_DAY_AGO_CHECK, BUY_DAY_AGO_UPPER, PRICE_BUFFER
+from config.condition import QUOTE_MAX_AGE_SELECTION, QUOTE_MAX_AGE_ORDER, QUOTE_MAX_AGE_REVISE
+from config.condition import BALANCE_MAX_AGE_SELL, BALANCE_MAX_AGE_SYNC, KRX_TRADING_END
 import threading
 from typing import List, Dict, Optional, Union
 from threading import Lock
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 
 
@@ -31,13 +38,15 @@ class TradingUpper():
 
     def __init__(self):
         self.kis_api = KISApi()
+        self.async_kis_api = AsyncKISApi(self.kis_api)  # 웹소켓 매도 경로용 비동기 클라이언트
         self.krx_api = KRXApi()
         self.date_utils = DateUtils()
         self.slack_logger = SlackLogger()
         self.logger = TradingLogger()  # 파일 로깅을 위한 TradingLogger 추가
         self.kis_websocket = None
         self.session_lock = Lock()  # 세션 업데이트용 락
-        self.api_lock = Lock()  # API 호출용 락
+        self.api_lock = Lock()  # 주문 API 호출용 락
+        self.write_behind = write_behind  # 세션/거래내역 그룹 커밋용 write-behind 큐 (프로세스 전역)
         # 모니터링 루프 참조 (MainProcess에서 주입)
         self._monitor_loop: Optional[asyncio.AbstractEventLoop] = None
 
@@ -135,6 +144,8 @@ class TradingUpper():
         selected_stocks = []
         tickers_with_prices = db.get_upper_stocks_days_ago(BUY_DAY_AGO_UPPER) or []  # N일 전 상승 종목 가져오기
         print('tickers_with_prices:  ',tickers_with_prices)
+        # 후보 종목 현재가를 멀티종목 시세조회로 한 번에 받아 옵니다. (누락 종목은 개별 조회)
+        quotes = self.kis_api.get_multi_stock_prices([stock.get('ticker') for stock in tickers_with_prices if stock])
         for stock in tickers_with_prices:
             if stock is None:
                 self.logger.warning("종목 정보가 None 입니다. 건너뜁니다.")
@@ -165,7 +176,11 @@ class TradingUpper():
             ### 조건2: 상승일 고가 - 매수일 현재가 -7.5% 체크 -> 매수하면서 체크
             last_high_price = df['고가'].iloc[-2]
             result_decline = False
-            current_price_opt, trht_yn = self.kis_api.get_current_price(stock.get('ticker'))
+            quote = quotes.get(ticker)
+            if quote and quote.get('stck_prpr'):
+                current_price_opt = quote['stck_prpr']
+            else:
+                current_price_opt, _ = self.kis_api.get_current_price(ticker, QUOTE_MAX_AGE_SELECTION)
             if current_price_opt is None:
                 # 가격 조회 실패 시 건너뛰거나 기본 처리
                 self.logger.warning(f"{stock.get('ticker')} 현재가 조회 실패")
@@ -183,14 +198,10 @@ class TradingUpper():
             ### 조건4: 상장일 이후 1년 체크
             result_lstg = self.check_listing_date(stock.get('ticker'))
             
-            ### 조건5: 과열 및 거래정지 종목 제외 체크
-            stock_info = self.kis_api.get_stock_price(stock.get('ticker'))
-            result_short_over_yn = stock_info.get('output', {}).get('short_over_yn', 'N')
-            result_trht_yn = stock_info.get('output', {}).get('trht_yn', 'N')
-            if result_short_over_yn == 'N' and result_trht_yn == 'N':
-                result_possible = True
-            else:
-                result_possible = False
+            ### 조건5: 과열 및 거래정지 종목 제외 체크 (앞 조건을 통과한 종목만 확인. 미확인은 None)
+            result_possible = None
+            if result_high_price and result_decline and result_lstg:
+                result_possible = self.kis_api.check_market_warnings(ticker, QUOTE_MAX_AGE_SELECTION)
             
             # 조건6: 강화된 모멘텀 확인 (D+1 수익률 10% 이상)
             result_strong_momentum = self._check_strong_momentum(stock, df)
@@ -201,7 +212,8 @@ class TradingUpper():
             print('조건2: 상승일 고가 - 매수일 현재가 = -7.5% 체크:',result_decline)
             # print('조건3: 상승일 거래량 대비 다음날 거래량 20% 이상 체크:',result_volume)
             print('조건4: 상장일 이후 1년 체크:',result_lstg)
-            print('조건5: 과열 종목 제외 체크:',result_possible)
+            # 조건5는 앞 조건을 통과한 종목만 조회하므로, 조회하지 않은 경우는 None 대신 건너뜀으로 표시
+            print('조건5: 과열 종목 제외 체크:', '건너뜀(앞 조건 미충족)' if result_possible is None else result_possible)
             
             
             # if result_high_price and result_decline and result_lstg and result_possible and result_volume:
@@ -243,9 +255,9 @@ class TradingUpper():
 ################################    삭제   ##########################################
 ######################################################################################
 
-    def delete_old_stocks(self):
+    def delete_old_stocks(self, deadline: Optional[datetime] = None):
         """
-        2개월 전 데이터 삭제
+        2개월 전 데이터 삭제 (deadline까지 끝나지 않은 분량은 다음 실행으로 미룸)
         """
         today = datetime.now().date()  # 현재 날짜
         all_holidays = self.date_utils.get_holidays()
@@ -268,8 +280,23 @@ class TradingUpper():
         
         #DB에서 2개월 전 데이터 삭제
         db = DatabaseManager()
-        db.delete_old_stocks(old_data_str)
-        db.close()
+        try:
+            db.delete_old_stocks(old_data_str, deadline=deadline)
+        finally:
+            db.close()
+
+    def delete_old_minute_bars(self, deadline: Optional[datetime] = None):
+        """
+        보존 기간(MINUTE_BARS_RETENTION_DAYS)이 지난 분봉 데이터 삭제
+        """
+        if MINUTE_BARS_RETENTION_DAYS <= 0:
+            return
+        cutoff = datetime.now().date() - timedelta(days=MINUTE_BARS_RETENTION_DAYS)
+        db = DatabaseManager()
+        try:
+            db.purge_old_minute_bars(cutoff, deadline=deadline)
+        finally:
+            db.close()
 
 
     def init_selected_stocks(self):
@@ -314,55 +341,59 @@ class TradingUpper():
                 
                 print("세션 확인 완료:", sessions)
 
-                # 주문 결과 리스트로 저장
-                sessions_que = deque(sessions)
-                order_lists = []
-                processed_sessions = []  # 처리 완료된 세션 추적
+                # 주문 결과를 세션 ID별로 저장
+                order_lists = {}
+                processed_sessions = set()  # 처리 완료된 세션 추적
+                pending_sessions = list(sessions)
+
+                # 대기 중인 세션들의 주문을 한 번에 동시 실행하고(주문 간격은 호출 한도 제한기가 조절),
+                # 주문 불가(501) 세션은 새 종목 세션으로 교체하여 다음 차수에 다시 주문합니다.
+                while pending_sessions:
+                    batch = []
+                    for session in pending_sessions:
+                        # 이미 처리된 세션인지 확인
+                        if session["id"] in processed_sessions:
+                            print(f"세션 ID {session['id']}는 이미 처리되었습니다.")
+                            continue
 
-                while sessions_que:
-                    session = sessions_que.popleft()
+                        # 2번 거래한 종목은 더이상 매수하지 않고 대기
+                        if session.get("count") == COUNT_UPPER:
+                            print(session.get('name'),"은 2번의 거래를 진행해 넘어갔습니다.")
+                            processed_sessions.add(session["id"])
+                            continue
 
-                    # 이미 처리된 세션인지 확인
-                    if session["id"] in processed_sessions:
-                        print(f"세션 ID {session['id']}는 이미 처리되었습니다.")
-                        continue
-                    
-                    # 2번 거래한 종목은 더이상 매수하지 않고 대기
-                    if session.get("count") == COUNT_UPPER:
-                        print(session.get('name'),"은 2번의 거래를 진행해 넘어갔습니다.")
-                        processed_sessions.append(session["id"])
-                        continue
-                    
-                    # 세션 정보로 주식 주문
-                    print(f"세션 {session['id']} ({session['name']}, {session['ticker']}) 주문 시작")
-                    order_result = self.place_order_session_upper(session)
+                        print(f"세션 {session['id']} ({session['name']}, {session['ticker']}) 주문 시작")
+                        batch.append(session)
 
-                    # 주문 불가 종목으로 재주문할 경우 501
-                    if order_result == 501:
-                        print(f"에러코드 501: 세션 {session['id']} ({session['name']}, {session['ticker']}) 삭제 후 새 종목 세션 추가")
-                        db.delete_session_one_row(session.get('id'))
-                        processed_sessions.append(session["id"])  # 처리 완료로 표시
+                    # 세션 정보로 주식 주문 (세션별 주문/체결 대기를 병렬로 진행)
+                    results = self._run_concurrently(
+                        {session["id"]: (self.place_order_session_upper, session) for session in batch}
+                    )
 
+                    replaced = False
+                    for session in batch:
+                        order_result = results.get(session["id"])
+                        processed_sessions.add(session["id"])  # 처리 완료로 표시
+
+                        # 주문 불가 종목으로 재주문할 경우 501
+                        if order_result == 501:
+                            print(f"에러코드 501: 세션 {session['id']} ({session['name']}, {session['ticker']}) 삭제 후 새 종목 세션 추가")
+                            db.delete_session_one_row(session.get('id'))
+                            replaced = True
+                        elif order_result:
+                            order_lists[session["id"]] = order_result
+
+                    pending_sessions = []
+                    if replaced:
                         # 새 종목 추가
                         add_info = self.add_new_trading_session()
                         self.logger.info(f"새 종목 추가: {add_info}")
-                        
-                        # 새로 추가된 세션만 가져오기
-                        new_sessions = db.load_trading_session_upper()
-                        if new_sessions:
-                            # 마지막 세션(가장 최근 추가된 세션) 확인
-                            new_session = new_sessions[-1]
+
+                        # 새로 추가된 (아직 주문하지 않은) 세션만 다음 차수로
+                        for new_session in db.load_trading_session_upper() or []:
                             if new_session["id"] not in processed_sessions:
                                 print(f"새 세션 {new_session['id']} ({new_session['name']}, {new_session['ticker']}) 큐에 추가")
-                                sessions_que.append(new_session)
-                                # 아직 미처리 세션이므로 processed_sessions 에 추가하지 않음 (주문 후에 추가)
-                        # 다음 세션으로 진행
-                        continue
-
-                    if order_result:
-                        order_lists.append(order_result)
-                        processed_sessions.append(session["id"])
-                        continue
+                                pending_sessions.append(new_session)
                 
             # 모든 세션 처리 완료 후 결과 반환
             return order_lists
@@ -370,6 +401,28 @@ class TradingUpper():
             print("Error in trading session: ", e)
 
 
+    def _run_concurrently(self, tasks: Dict[int, tuple]) -> Dict[int, object]:
+        """
+        세션 ID별 (함수, 인자...) 작업을 스레드 풀에서 동시에 실행하고 세션 ID별 결과를 반환합니다.
+        - 주문 API 호출 간격은 호출 한도 제한기가 조절하므로, 주문 전송과 체결/잔고 대기가 함께 겹칩니다.
+        - 작업에서 예외가 발생하면 해당 세션의 결과는 None입니다.
+        """
+        results = {}
+        if not tasks:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(len(tasks), ORDER_CONCURRENCY), thread_name_prefix="session") as executor:
+            futures = {executor.submit(func, *args): session_id for session_id, (func, *args) in tasks.items()}
+            for future in as_completed(futures):
+                session_id = futures[future]
+                try:
+                    results[session_id] = future.result()
+                except Exception as e:
+                    self.logger.error(f"세션 작업 실패: {e}", {"세션ID": session_id})
+                    results[session_id] = None
+        return results
+
+
     # def check_trading_session(self):
     #     """
     #     거래 전, 트레이딩 세션 테이블에 진행 중인 거래세션이 있는지 확인하고,
@@ -420,8 +473,7 @@ class TradingUpper():
                 # 방금 할당된 종목을 다음 할당에서 제외하기 위해 추가
                 exclude_tickers.append(stock['ticker'])
 
-                result = self.kis_api.get_stock_price(stock['ticker'])
-                time.sleep(1)
+                result = self.kis_api.get_stock_price(stock['ticker'], QUOTE_MAX_AGE_SELECTION)
                 if result.get('output').get('trht_yn') != 'N':
                     print(f"{stock['name']} - 매수가 불가능하여 다시 받아옵니다.")
                     continue
@@ -455,11 +507,9 @@ class TradingUpper():
         # DB 연결
         with DatabaseManager() as db:
             try:
-                time.sleep(0.9)  # API 호출 속도 제한
-
                 # 1. 예외 처리
                 ## 현재가 조회 (None, None 반환 가능)
-                price, trht_yn = self.kis_api.get_current_price(session.get('ticker'))
+                price, trht_yn = self.kis_api.get_current_price(session.get('ticker'), QUOTE_MAX_AGE_ORDER)
                 ###    -- api/kis_api.py: 실패 시 (None, None) 반환
                 if price is None:
                     print(f"현재가 조회 실패로 건너뛰기: {session.get('ticker')}")
@@ -473,7 +523,7 @@ class TradingUpper():
                     return None
 
                 ## 과열 종목 여부 확인: 업데이트 해야함 -> 정지일 경우 삭제하고 다시 종목 추가
-                stock_info = self.kis_api.get_stock_price(session.get('ticker'))
+                stock_info = self.kis_api.get_stock_price(session.get('ticker'), QUOTE_MAX_AGE_ORDER)
                 if stock_info.get('output', {}).get('short_over_yn') == 'Y':
                     print(f"과열 종목으로 건너뛰기: {session.get('ticker')}")
                     db.close()  # DB 세션 정리
@@ -564,12 +614,16 @@ class TradingUpper():
                 print("load_and_update_trading_session - 진행 중인 거래 세션이 없습니다.")
                 return
 
-            for session, order_result in zip(sessions, order_lists):
+            # 세션 ID별 주문 결과로 세션을 동시에 갱신 (체결/잔고 대기는 세션 락 밖에서 겹쳐 진행)
+            tasks = {}
+            for session in sessions:
+                order_result = order_lists.get(session.get('id'))
                 if order_result:
-                    self.update_session(session, order_result)
-                    print("update_session이 종료되었습니다.")
+                    tasks[session.get('id')] = (self.update_session, session, order_result)
                 else:
                     print(f"ticker {session.get('ticker')}에 대한 주문 결과가 없습니다.")
+            self._run_concurrently(tasks)
+            print("update_session이 종료되었습니다.")
 
             db.close()
         except Exception as e:
@@ -584,12 +638,43 @@ class TradingUpper():
         print(f"[DEBUG] 세션ID: {session.get('id')}, 주문 결과(order_result): {order_result}, count 증가: {increment_count}")
         print(f"[DEBUG] 세션: {session}")
         
-        MAX_RETRY = 15  # 체결 지연 대응을 위한 재시도 횟수 대폭 증가
-        RETRY_DELAY = 30  # 대기 시간도 2초로 증가 (총 최대 30초 이상 대기)
         try:
+            # 주문 결과 유효성 검사
+            if not order_result:
+                error_msg = f"유효하지 않은 주문 결과: {order_result}"
+                print(error_msg)
+                self.slack_logger.send_log(
+                    level="ERROR",
+                    message="세션 업데이트 실패",
+                    context={
+                        "세션ID": session.get('id'),
+                        "종목코드": session.get('ticker'),
+                        "에러": error_msg
+                    }
+                )
+                return
+            
+            # 주문 실패 체크
+            if order_result.get('rt_cd') != '0':
+                error_msg = f"주문 실패: {order_result.get('msg1', '알 수 없는 주문 오류')}"
+                print(error_msg)
+                self.slack_logger.send_log(
+                    level="ERROR",
+                    message="주문 실패",
+                    context={
+                        "세션ID": session.get('id'),
+                        "종목코드": session.get('ticker'),
+                        "에러": error_msg
+                    }
+                )
+                return
+
+            # 체결/잔고 반영 대기는 세션 락 밖에서 수행하여 다른 세션 업데이트를 막지 않습니다.
+            balance_data = self._wait_for_session_balance(session, order_result)
+
             with self.session_lock:
                 with DatabaseManager() as db:
-                    # 최신 세션 정보 다시 조회하여 count 동기화
+                    # 최신 세션 정보 다시 조회하여 count 동기화 (아직 커밋되지 않은 write-behind 상태 우선)
                     db_session = db.get_session_by_id(session.get('id'))
                     if db_session:
                         # DB에서 최신 count 값을 가져옴
@@ -600,72 +685,10 @@ class TradingUpper():
                     # count 증가 여부에 따라 처리
                     count = current_count + 1 if increment_count else current_count
 
-                    # 주문 결과 유효성 검사
-                    if not order_result:
-                        error_msg = f"유효하지 않은 주문 결과: {order_result}"
-                        print(error_msg)
-                        self.slack_logger.send_log(
-                            level="ERROR",
-                            message="세션 업데이트 실패",
-                            context={
-                                "세션ID": session.get('id'),
-                                "종목코드": session.get('ticker'),
-                                "에러": error_msg
-                            }
-                        )
-                        return
-                    
-                    # 주문 실패 체크
-                    if order_result.get('rt_cd') != '0':
-                        error_msg = f"주문 실패: {order_result.get('msg1', '알 수 없는 주문 오류')}"
-                        print(error_msg)
-                        self.slack_logger.send_log(
-                            level="ERROR",
-                            message="주문 실패",
-                            context={
-                                "세션ID": session.get('id'),
-                                "종목코드": session.get('ticker'),
-                                "에러": error_msg
-                            }
-                        )
-                        return
-
                     total_spent_fund = int(session.get('spent_fund', 0))
                     total_quantity = int(session.get('quantity', 0))
                     current_date = datetime.now()
 
-                    # 잔고 조회 재시도
-                    balance_data = None
-                    for retry in range(1, MAX_RETRY+1):
-                        try:
-                            balance_result = self.kis_api.balance_inquiry()
-                            if not balance_result:
-                                print(f"잔고 조회 실패: 응답 없음 (재시도 {retry}/{MAX_RETRY})")
-                                if retry < MAX_RETRY:
-                                    time.sleep(RETRY_DELAY)
-                                    continue
-                                else:
-                                    break
-                            balance_data = next(
-                                (item for item in balance_result if item.get('pdno') == session.get('ticker')),
-                                None
-                            )
-                            if not balance_data:
-                                print(f"종목 잔고 정보 없음: {session.get('ticker')} (재시도 {retry}/{MAX_RETRY})")
-                                if retry < MAX_RETRY:
-                                    time.sleep(RETRY_DELAY)
-                                    continue
-                                else:
-                                    break
-                            break  # 성공 시 루프 탈출
-                        except Exception as e:
-                            print(f"잔고 조회 중 오류: {e} (재시도 {retry}/{MAX_RETRY})")
-                            if retry < MAX_RETRY:
-                                time.sleep(RETRY_DELAY)
-                                continue
-                            else:
-                                break
-                            
                     # balance_data 조회 성공
                     if balance_data:
                         # 잔고 정보에서 실제 값 가져오기
@@ -676,8 +699,8 @@ class TradingUpper():
                         # 세션 횟수 업데이트
                         count = int(session.get('count', 0)) + 1
                         
-                        # DB 업데이트
-                        db.save_trading_session_upper(
+                        # DB 업데이트 (write-behind 큐에서 그룹 커밋)
+                        self.write_behind.submit_session(
                             session.get('id'),
                             session.get('start_date'),
                             current_date,
@@ -689,14 +712,14 @@ class TradingUpper():
                             actual_quantity,
                             actual_avg_price,
                             count,
-                            session.get('is_strong_momentum', False)
+                            session.get('trade_condition')
                         )
 
                         # === trade_history 저장 ===
                         try:
                             trade_date = current_date.date()
                             trade_time = current_date.time()
-                            db.save_trade_history(
+                            self.write_behind.submit_trade_history(
                                 trade_date,
                                 trade_time,
                                 session.get('ticker'),
@@ -779,6 +802,51 @@ class TradingUpper():
                 }
             )
 
+    def _wait_for_session_balance(self, session, order_result) -> Optional[Dict]:
+        """
+        매수 체결이 잔고에 반영될 때까지 기다린 뒤 종목의 잔고 행을 반환합니다. (세션 락 밖에서 호출)
+        체결통보로 전량 체결이 확인되면 잔고 반영만 기다리면 되므로 재시도 간격을 짧게 둡니다.
+        """
+        MAX_RETRY = 15  # 체결 지연 대응을 위한 재시도 횟수
+        filled = order_tracker.wait_for_fill(
+            order_result.get('output', {}).get('ODNO'),
+            timeout=BUY_WAIT if order_tracker.feed_active else 0
+        )
+        RETRY_DELAY = 1 if filled else 30  # 체결 미확인 시 기존처럼 길게 대기
+
+        # 잔고 조회 재시도
+        balance_data = None
+        for retry in range(1, MAX_RETRY+1):
+            try:
+                balance_result = self.kis_api.balance_inquiry(BALANCE_MAX_AGE_SYNC)
+                if not balance_result:
+                    print(f"잔고 조회 실패: 응답 없음 (재시도 {retry}/{MAX_RETRY})")
+                    if retry < MAX_RETRY:
+                        time.sleep(RETRY_DELAY)
+                        continue
+                    else:
+                        break
+                balance_data = next(
+                    (item for item in balance_result if item.get('pdno') == session.get('ticker')),
+                    None
+                )
+                if not balance_data:
+                    print(f"종목 잔고 정보 없음: {session.get('ticker')} (재시도 {retry}/{MAX_RETRY})")
+                    if retry < MAX_RETRY:
+                        time.sleep(RETRY_DELAY)
+                        continue
+                    else:
+                        break
+                break  # 성공 시 루프 탈출
+            except Exception as e:
+                print(f"잔고 조회 중 오류: {e} (재시도 {retry}/{MAX_RETRY})")
+                if retry < MAX_RETRY:
+                    time.sleep(RETRY_DELAY)
+                    continue
+                else:
+                    break
+        return balance_data
+
     def generate_random_id(self, min_value=1000, max_value=9999, exclude=None):
         """
         아이디값 랜덤 생성
@@ -952,40 +1020,35 @@ class TradingUpper():
         order_result = None
         
         try:
-            with self.api_lock:
-                while True:
-                    # 주문 실행
-                    order_result = self.kis_api.place_order(ticker, quantity, order_type='buy', price=price)
-                    print("주문 결과:", order_result)
-                    # 로그 기록: 주문 응답 결과
-                    self.logger.debug(f"KIS API 매수 주문 응답", {
-                        "name": name,
-                        "ticker": ticker,
-                        "rt_cd": order_result.get('rt_cd'),
-                        "msg": order_result.get('msg1')
-                    })
-                    
-                    # 응답 결과에 따른 처리
-                    ## 초당 거래 건수 초과 시 재시도
-                    if order_result['msg1'] == '초당 거래건수를 초과하였습니다.':
-                        self.logger.warning("초당 거래건수 초과로 재시도", {"name": name,"ticker": ticker})
-                        time.sleep(1)
-                        continue
-                    
-                    ## 주문 실패 시 반환
-                    if order_result.get('rt_cd') == '1':
-                        self.logger.error(f"매수 주문 실패", order_result)
-                        self.logger.warning("매매불가 종목으로 세션 생성 후 재시도", {"name": name,"ticker": ticker})
-                        return order_result
-                    
-                    # 주문번호가 존재하면 매수 루프 종료
-                    if order_result.get('output', {}).get('ODNO') is not None:
-                        break
+            # 주문 실행 (세션별 매수가 동시에 진행되므로 락 없이 호출 한도 제한기에 간격 조절을 맡김)
+            # 초당 거래건수 초과 재시도는 KISApi._request가 ORDER_RATE_LIMIT_RETRY로 한 번만 수행
+            order_result = self.kis_api.place_order(ticker, quantity, order_type='buy', price=price)
+            print("주문 결과:", order_result)
+            # 로그 기록: 주문 응답 결과
+            self.logger.debug(f"KIS API 매수 주문 응답", {
+                "name": name,
+                "ticker": ticker,
+                "rt_cd": order_result.get('rt_cd'),
+                "msg": order_result.get('msg1')
+            })
             
-            time.sleep(BUY_WAIT)
+            # 응답 결과에 따른 처리
+            ## 재시도 후에도 초당 거래 건수 초과면 주문 포기
+            if order_result.get('msg1') == '초당 거래건수를 초과하였습니다.':
+                self.logger.error("초당 거래건수 초과 재시도 소진으로 매수 주문 포기", {"name": name, "ticker": ticker})
+                return order_result
+            
+            ## 주문 실패 시 반환
+            if order_result.get('rt_cd') == '1' or order_result.get('output', {}).get('ODNO') is None:
+                self.logger.error(f"매수 주문 실패", order_result)
+                self.logger.warning("매매불가 종목으로 세션 생성 후 재시도", {"name": name,"ticker": ticker})
+                return order_result
             
-            # 주문 완료 체크
-            unfilled_qty = self.order_complete_check(order_result)
+            # 체결통보로 전량 체결이 확인되면 바로 진행하고, 아니면 BUY_WAIT 후 체결 조회로 확인
+            if order_tracker.wait_for_fill(order_result.get('output', {}).get('ODNO'), timeout=BUY_WAIT):
+                unfilled_qty = 0
+            else:
+                unfilled_qty = self.order_complete_check(order_result)
             self.logger.info(f"매수 주문 미체결 수량 확인", {"name": name,"ticker": ticker, "unfilled": unfilled_qty})
 
             ## 매수 성공. 매수 로직 종료
@@ -1005,7 +1068,7 @@ class TradingUpper():
                 )
 
                 # 현재가 + 두 틱 위 가격으로 재주문 가격 산정
-                new_price, _ = self.kis_api.get_current_price(ticker)
+                new_price, _ = self.kis_api.get_current_price(ticker, QUOTE_MAX_AGE_REVISE)
                 tick_size = self._get_tick_size(new_price)
                 revised_price = new_price + (tick_size * 2)
 
@@ -1061,7 +1124,9 @@ class TradingUpper():
                 order_result = revised_result
 
                 TRY_COUNT += 1
-                time.sleep(BUY_WAIT)
+                if unfilled_qty > 0 and order_tracker.wait_for_fill(
+                        order_result.get('output', {}).get('ODNO'), unfilled_qty, timeout=BUY_WAIT):
+                    unfilled_qty = 0
 
                 if TRY_COUNT > 5:
                     error_msg = f"미체결 주문 반복 실패: {name}({ticker}), {TRY_COUNT}회 재시도"
@@ -1105,7 +1170,20 @@ class TradingUpper():
             return order_result
 
 
-    def sell_order(self, session_id: int, ticker: str, price: Optional[int] = None) -> Optional[Dict]:            
+    @staticmethod
+    def _sell_deadline() -> Optional[Deadline]:
+        """장중이면 장 마감(KRX_TRADING_END)을 매도 작업 마감으로 반환합니다. (마감 이후 재시도 방지)"""
+        now = datetime.now()
+        if now.time() >= KRX_TRADING_END:
+            return None
+        return Deadline.at(KRX_TRADING_END, now)
+
+    def sell_order(self, session_id: int, ticker: str, price: Optional[int] = None) -> Optional[Dict]:
+        """장 마감까지를 작업 마감으로 두고 매도합니다. (주문/정정/조회 재시도가 마감을 넘지 않음)"""
+        with deadline_scope(self._sell_deadline()):
+            return self._sell_order(session_id, ticker, price)
+
+    def _sell_order(self, session_id: int, ticker: str, price: Optional[int] = None) -> Optional[Dict]:            
             """
             주식 매도 주문을 실행하고, 미체결 주문이 있으면 주문 수정을 통해 체결 시도.
 
@@ -1121,24 +1199,9 @@ class TradingUpper():
             try:
 
                 # 매도 주문 전 잔고 확인
-                balance_result = None
-                with self.api_lock:
-                    # balance_result: List
-                    balance_result = self.kis_api.balance_inquiry()
-                
-                # 보유 종목 확인
-                balance_data = {}
-                for stock in balance_result:
-                    if stock.get('pdno') == ticker:
-                        balance_data = stock
-
-                # 보유 수량 안전하게 추출
-                hold_qty = 0
-                if balance_data and isinstance(balance_data, dict):
-                    try:
-                        hold_qty = int(balance_data.get('hldg_qty', 0))
-                    except (ValueError, TypeError):
-                        hold_qty = 0
+                # balance_result: List (잔고 스냅샷이 BALANCE_MAX_AGE_SELL초 이내면 메모리에서 반환)
+                balance_result = self.kis_api.balance_inquiry(BALANCE_MAX_AGE_SELL)
+                balance_data, hold_qty = self._find_holding(balance_result, ticker)
                 
                 # 잔고가 없으면 세션 삭제하고 sell_completed 상태로 반환
                 if hold_qty <= 0:
@@ -1162,198 +1225,106 @@ class TradingUpper():
                     "실제보유": quantity
                 })
 
-                # 주문 실행
+                # 주문 실행 (락은 주문 API 호출에만 잡고, 체결 대기 중에는 잡지 않음)
+                # 초당 거래건수 초과 재시도는 KISApi._request가 ORDER_RATE_LIMIT_RETRY로 한 번만 수행
                 with self.api_lock:
-                    while True:
-                        # 주문 실행
-                        order_result = self.kis_api.place_order(ticker, quantity, order_type='sell', price=price)
-                        
-                        # 로그 기록: 주문 응답 결과
-                        self.logger.debug(f"KIS API 매도 주문 응답", {
-                            "세션ID": session_id,
-                            "ticker": ticker,
-                            "rt_cd": order_result.get('rt_cd'),
-                            "msg": order_result.get('msg1')
-                        })
-                        
-                        # 응답 결과에 따른 처리
-                        ## 초당 거래 건수 초과 시 재시도
-                        if order_result.get('msg1') == '초당 거래건수를 초과하였습니다.':
-                            self.logger.warning("초당 거래건수 초과로 재시도", {"세션ID": session_id, "ticker": ticker})
-                            time.sleep(1)
-                            continue
-                        
-                        ## 주문 실패 시 반환
-                        if order_result.get('rt_cd') == '1':
-                            self.logger.error(f"매도 주문 실패", order_result)
-                            self.slack_logger.send_log(
-                                level="ERROR",
-                                message="매도 주문 실패",
-                                context={
-                                    "세션ID": session_id,
-                                    "종목코드": ticker,
-                                    "주문번호": order_result.get('output', {}).get('ODNO'),
-                                    "메시지": order_result.get('msg1')
-                                }
-                            )
-                            return None
-                        
-                        # 주문번호가 존재하면 매도 루프 종료
-                        if order_result.get('output', {}).get('ODNO') is not None:
-                            break
+                    order_result = self.kis_api.place_order(ticker, quantity, order_type='sell', price=price)
                 
-                        # 주문 완료 후 대기
-                        time.sleep(SELL_WAIT)
-
-                        # 주문 완료 체크
-                        unfilled_qty = self.order_complete_check(order_result)
-                        self.logger.info(f"매도 주문 미체결 수량 확인", {"세션ID": session_id, "ticker": ticker, "unfilled": unfilled_qty})
-
-                        ## 매도 성공. 매도 로직 종료
-                        if unfilled_qty == 0:
-                            self.logger.info(f"매도 주문 전체 체결 완료", {"세션ID": session_id, "ticker": ticker})
-                            # 주문이 모두 체결되었으므로 세션을 DB에서 삭제
-                            self.delete_finished_session(session_id)
-                            # 슬랙 알림 전송
-                            self.slack_logger.send_log(
-                                level="INFO",
-                                message="매도 주문 전체 체결 및 세션 삭제",
-                                context={
-                                    "세션ID": session_id,
-                                    "종목코드": ticker
-                                }
-                            )
-                            break
-
-                        # 최초 주문번호(원주문번호)를 별도로 저장
-                        original_order_no = order_result.get('output', {}).get('ODNO')
-
-                        ## 미체결 시 주문 수정
-                        TRY_COUNT = 0
-                        while unfilled_qty > 0:
-                            self.logger.info(f"매도 미체결 주문 처리 시작", {"세션ID": session_id, "ticker": ticker, "unfilled": unfilled_qty})
-                            new_price, _ = self.kis_api.get_current_price(ticker)
-                            
-                            # 매도는 가격을 낮출수록 체결 확률 증가
-                            tick_size = self._get_tick_size(new_price)
-                            revised_price = new_price - (tick_size * 2)  # 두 틱 아래로 설정
-                            
-                            # 주문 수정 실행
-                            revised_result = self.kis_api.revise_order(
-                                original_order_no,
-                                unfilled_qty,
-                                revised_price
-                            )
-                            self.logger.info("revised_result", revised_result)
-                            # 수정된 주문번호로 체결 상태 확인
-                            unfilled_qty = self.order_complete_check(revised_result)
-                            self.logger.info(
-                                "after revise order_result / unfilled",
-                                {"revised_order_no": revised_result.get('output', {}).get('ODNO'),
-                                "unfilled": unfilled_qty}
-                            )
-                            # 다음 루프를 위한 최신 주문 결과 저장
-                            order_result = revised_result
-                            TRY_COUNT += 1
-                            time.sleep(SELL_WAIT)
-
-                            if TRY_COUNT > 5:
-                                error_msg = f"미체결 매도 주문 반복 실패: {ticker}, {TRY_COUNT}회 재시도"
-                                self.logger.error(error_msg, {"세션ID": session_id, "unfilled": unfilled_qty})
-                                raise Exception(error_msg)  # 명시적으로 예외 발생
-
-                # === 매도 완료 후 trade_history 저장 ===
-                MAX_RETRY = 5
-                RETRY_DELAY = 5  # 초
-                remaining_qty = None
-                for retry in range(1, MAX_RETRY + 1):
-                    balance_result = self.kis_api.balance_inquiry()
-                    balance_data = {}
-
-                    if not balance_result:
-                        # 조회 실패 시 재시도
-                        self.logger.warning("잔고 조회 결과 없음(재시도 단계)", {
+                # 로그 기록: 주문 응답 결과
+                self.logger.debug(f"KIS API 매도 주문 응답", {
+                    "세션ID": session_id,
+                    "ticker": ticker,
+                    "rt_cd": order_result.get('rt_cd'),
+                    "msg": order_result.get('msg1')
+                })
+                
+                # 응답 결과에 따른 처리
+                ## 재시도 후에도 초당 거래 건수 초과면 주문 포기
+                if order_result.get('msg1') == '초당 거래건수를 초과하였습니다.':
+                    self.logger.error("초당 거래건수 초과 재시도 소진으로 매도 주문 포기", {"세션ID": session_id, "ticker": ticker})
+                    return None
+                
+                ## 주문 실패 시 반환
+                if order_result.get('rt_cd') == '1' or order_result.get('output', {}).get('ODNO') is None:
+                    self.logger.error(f"매도 주문 실패", order_result)
+                    self.slack_logger.send_log(
+                        level="ERROR",
+                        message="매도 주문 실패",
+                        context={
                             "세션ID": session_id,
                             "종목코드": ticker,
-                            "retry": retry
-                        })
-                    else:    
-                        # 보유 종목 확인
-                        for stock in balance_result:
-                            if stock.get('pdno') == ticker:
-                                balance_data = stock
-
-                    # 잔고 조회 실패 시 None 반환
-                    if balance_result is None:
-                        return None
-
-                    remaining_qty = int(balance_data.get('hldg_qty', 0)) if balance_data else 0
-
-                    # 위에서 삭제함
-                    # if remaining_qty == 0:
-                    #     # 전체 매도 완료 → 세션 삭제
-                    #     self.delete_finished_session(session_id)
-                    #     self.logger.info("매도 주문 완료 및 세션 삭제",{"세션ID": session_id,"종목코드": ticker,"주문수량": quantity,"재시도": retry,"상태": "성공"})
-                    #     break
-                    # else:
-                    #     # 잔고가 남아있음 – 잔고 반영 지연 가능성 고려
-                    #     if retry < MAX_RETRY:
-                    #         time.sleep(RETRY_DELAY)
-                    #         continue
-
-                    # 최대 재시도 후에도 잔고가 남아있으면 부분 매도로 간주하고 세션 업데이트
-                    try:
-                        with DatabaseManager() as db:
-                            session_info = db.get_session_by_id(session_id)
-                            if session_info:
-                                # 값 보정: 음수/이상치 방지
-                                original_qty = max(0, int(session_info.get('quantity', 0)))
-                                remaining_qty = max(0, remaining_qty)
-                                avr_price = max(0, int(float(balance_data.get('pchs_avg_pric', 0))))
-                                new_spent_fund = max(0, remaining_qty * avr_price)
-
-                                # DB와 실제 잔고 불일치 시 동기화
-                                db.save_trading_session_upper(
-                                    session_id,
-                                    session_info.get('start_date'),
-                                    datetime.now(),
-                                    session_info.get('ticker'),
-                                    session_info.get('name'),
-                                    session_info.get('high_price'),
-                                    session_info.get('fund'),
-                                    new_spent_fund,
-                                    remaining_qty,
-                                    avr_price,
-                                    session_info.get('count', 0)
-                                )
-                                self.slack_logger.send_log(
-                                    level="WARNING",
-                                    message="매도 후 세션 DB-실잔고 불일치 → 동기화",
-                                    context={
-                                        "세션ID": session_id,
-                                        "종목코드": ticker,
-                                        "DB수량": original_qty,
-                                        "실제잔고": remaining_qty,
-                                        "DB평균단가": session_info.get('avr_price', 0),
-                                        "실제평균단가": avr_price,
-                                        "DB투자금액": session_info.get('spent_fund', 0),
-                                        "실제투자금액": new_spent_fund
-                                    }
-                                )
-                        return order_result
-                    except Exception as e:
-                        print(f"[ERROR] update_session 예외: {e}")
-                        self.slack_logger.send_log(
-                            level="ERROR",
-                            message="매도 후 세션 업데이트 실패",
-                            context={
-                                "세션ID": session_id,
-                                "종목코드": ticker,
-                                "에러": str(e)
-                            }
-                        )
+                            "주문번호": order_result.get('output', {}).get('ODNO'),
+                            "메시지": order_result.get('msg1')
+                        }
+                    )
+                    return None
+
+                # 체결통보로 전량 체결을 기다리고(최대 SELL_WAIT), 확인되지 않으면 체결 조회
+                if order_tracker.wait_for_fill(order_result.get('output', {}).get('ODNO'), quantity, timeout=SELL_WAIT):
+                    unfilled_qty = 0
+                else:
+                    unfilled_qty = self.order_complete_check(order_result)
+                self.logger.info(f"매도 주문 미체결 수량 확인", {"세션ID": session_id, "ticker": ticker, "unfilled": unfilled_qty})
+
+                ## 매도 성공. 매도 로직 종료
+                if unfilled_qty == 0:
+                    self.logger.info(f"매도 주문 전체 체결 완료", {"세션ID": session_id, "ticker": ticker})
+                    # 주문이 모두 체결되었으므로 세션을 DB에서 삭제
+                    self.delete_finished_session(session_id)
+                    # 슬랙 알림 전송
+                    self.slack_logger.send_log(
+                        level="INFO",
+                        message="매도 주문 전체 체결 및 세션 삭제",
+                        context={
+                            "세션ID": session_id,
+                            "종목코드": ticker
+                        }
+                    )
+
+                # 최초 주문번호(원주문번호)를 별도로 저장
+                original_order_no = order_result.get('output', {}).get('ODNO')
+
+                ## 미체결 시 주문 수정
+                TRY_COUNT = 0
+                while unfilled_qty > 0:
+                    self.logger.info(f"매도 미체결 주문 처리 시작", {"세션ID": session_id, "ticker": ticker, "unfilled": unfilled_qty})
+                    new_price, _ = self.kis_api.get_current_price(ticker, QUOTE_MAX_AGE_REVISE)
                     
-                    break
+                    # 매도는 가격을 낮출수록 체결 확률 증가
+                    tick_size = self._get_tick_size(new_price)
+                    revised_price = new_price - (tick_size * 2)  # 두 틱 아래로 설정
+                    
+                    # 주문 수정 실행
+                    revised_result = self.kis_api.revise_order(
+                        original_order_no,
+                        unfilled_qty,
+                        revised_price
+                    )
+                    self.logger.info("revised_result", revised_result)
+                    # 수정된 주문번호로 체결 상태 확인
+                    unfilled_qty = self.order_complete_check(revised_result)
+                    self.logger.info(
+                        "after revise order_result / unfilled",
+                        {"revised_order_no": revised_result.get('output', {}).get('ODNO'),
+                        "unfilled": unfilled_qty}
+                    )
+                    # 다음 루프를 위한 최신 주문 결과 저장
+                    order_result = revised_result
+                    TRY_COUNT += 1
+                    if unfilled_qty > 0 and order_tracker.wait_for_fill(
+                            order_result.get('output', {}).get('ODNO'), unfilled_qty, timeout=SELL_WAIT):
+                        unfilled_qty = 0
+
+                    if TRY_COUNT > 5:
+                        error_msg = f"미체결 매도 주문 반복 실패: {ticker}, {TRY_COUNT}회 재시도"
+                        self.logger.error(error_msg, {"세션ID": session_id, "unfilled": unfilled_qty})
+                        raise Exception(error_msg)  # 명시적으로 예외 발생
+
+                # === 매도 완료 후 실제 잔고로 세션 동기화 ===
+                balance_result = self.kis_api.balance_inquiry(BALANCE_MAX_AGE_SYNC)
+                if self._sync_session_after_sell(session_id, ticker, balance_result):
+                    return order_result
+                return None
 
             except Exception as e:
                 # 로그 기록: 매도 주문 중 예외 발생
@@ -1365,6 +1336,216 @@ class TradingUpper():
                 return None  # 생성된 주문 정보 반환 또는 None 반환
 
 
+    @staticmethod
+    def _find_holding(balance_result, ticker: str):
+        """잔고 목록에서 종목의 잔고 행과 보유 수량을 찾습니다. 없으면 ({}, 0)"""
+        balance_data = {}
+        for stock in balance_result or []:
+            if stock.get('pdno') == ticker:
+                balance_data = stock
+
+        # 보유 수량 안전하게 추출
+        hold_qty = 0
+        if balance_data and isinstance(balance_data, dict):
+            try:
+                hold_qty = int(balance_data.get('hldg_qty', 0))
+            except (ValueError, TypeError):
+                hold_qty = 0
+        return balance_data, hold_qty
+
+    def _sync_session_after_sell(self, session_id: int, ticker: str, balance_result) -> bool:
+        """
+        매도 후 실제 잔고로 세션의 수량/평균단가/투자금액을 동기화합니다.
+
+        Returns:
+            bool: 동기화까지 마쳤으면 True, 잔고 조회 실패나 DB 오류면 False
+        """
+        if not balance_result:
+            self.logger.warning("잔고 조회 결과 없음", {
+                "세션ID": session_id,
+                "종목코드": ticker,
+            })
+        # 잔고 조회 실패
+        if balance_result is None:
+            return False
+
+        balance_data, remaining_qty = self._find_holding(balance_result, ticker)
+
+        try:
+            with DatabaseManager() as db:
+                session_info = db.get_session_by_id(session_id)
+                if session_info:
+                    # 값 보정: 음수/이상치 방지
+                    original_qty = max(0, int(session_info.get('quantity', 0)))
+                    remaining_qty = max(0, remaining_qty)
+                    avr_price = max(0, int(float(balance_data.get('pchs_avg_pric', 0))))
+                    new_spent_fund = max(0, remaining_qty * avr_price)
+
+                    # DB와 실제 잔고 불일치 시 동기화
+                    db.save_trading_session_upper(
+                        session_id,
+                        session_info.get('start_date'),
+                        datetime.now(),
+                        session_info.get('ticker'),
+                        session_info.get('name'),
+                        session_info.get('high_price'),
+                        session_info.get('fund'),
+                        new_spent_fund,
+                        remaining_qty,
+                        avr_price,
+                        session_info.get('count', 0)
+                    )
+                    self.slack_logger.send_log(
+                        level="WARNING",
+                        message="매도 후 세션 DB-실잔고 불일치 → 동기화",
+                        context={
+                            "세션ID": session_id,
+                            "종목코드": ticker,
+                            "DB수량": original_qty,
+                            "실제잔고": remaining_qty,
+                            "DB평균단가": session_info.get('avr_price', 0),
+                            "실제평균단가": avr_price,
+                            "DB투자금액": session_info.get('spent_fund', 0),
+                            "실제투자금액": new_spent_fund
+                        }
+                    )
+            return True
+        except Exception as e:
+            print(f"[ERROR] update_session 예외: {e}")
+            self.slack_logger.send_log(
+                level="ERROR",
+                message="매도 후 세션 업데이트 실패",
+                context={
+                    "세션ID": session_id,
+                    "종목코드": ticker,
+                    "에러": str(e)
+                }
+            )
+        return False
+
+    async def sell_order_async(self, session_id: int, ticker: str, price: Optional[int] = None) -> Optional[Dict]:
+        """장 마감까지를 작업 마감으로 두고 비동기로 매도합니다."""
+        with deadline_scope(self._sell_deadline()):
+            return await self._sell_order_async(session_id, ticker, price)
+
+    async def _sell_order_async(self, session_id: int, ticker: str, price: Optional[int] = None) -> Optional[Dict]:
+        """
+        sell_order의 비동기 버전. 웹소켓 모니터링 루프에서 스레드 풀을 거치지 않고 매도합니다.
+        - API 호출은 AsyncKISApi로, DB 작업은 별도 스레드에서 수행합니다.
+        - 주문 간격은 호출 한도 제한기가, 동시 매도는 KISWebSocket의 매도 세마포어가 제한합니다.
+
+        Args:
+            session_id (int): 세션 ID
+            ticker (str): 종목 코드
+            price (Optional[int], optional): 매도 호가. 미입력 시 시장가
+
+        Returns:
+            Optional[Dict]: 주문 결과 딕셔너리 또는 실패 시 None
+        """
+        order_result = None
+        try:
+            balance_result = await self.async_kis_api.balance_inquiry(BALANCE_MAX_AGE_SELL)
+            balance_data, quantity = self._find_holding(balance_result, ticker)
+
+            if quantity <= 0:
+                await asyncio.to_thread(self.delete_finished_session, session_id)
+                self.logger.info("잔고 없음 - 세션 삭제 완료", {
+                    "세션ID": session_id,
+                    "종목이름": balance_data.get('prdt_name'),
+                    "종목코드": ticker
+                })
+                return {"rt_cd": "0", "msg1": "잔고 없음 세션 삭제"}
+
+            self.logger.info("매도 수량 확인", {"세션ID": session_id, "종목코드": ticker, "실제보유": quantity})
+
+            # 초당 거래건수 초과 재시도는 AsyncKISApi._request가 ORDER_RATE_LIMIT_RETRY로 한 번만 수행
+            order_result = await self.async_kis_api.place_order(ticker, quantity, order_type='sell', price=price)
+            self.logger.debug("KIS API 매도 주문 응답", {
+                "세션ID": session_id,
+                "ticker": ticker,
+                "rt_cd": order_result.get('rt_cd'),
+                "msg": order_result.get('msg1')
+            })
+
+            ## 재시도 후에도 초당 거래 건수 초과면 주문 포기
+            if order_result.get('msg1') == '초당 거래건수를 초과하였습니다.':
+                self.logger.error("초당 거래건수 초과 재시도 소진으로 매도 주문 포기", {"세션ID": session_id, "ticker": ticker})
+                return None
+
+            if order_result.get('rt_cd') == '1' or order_result.get('output', {}).get('ODNO') is None:
+                self.logger.error("매도 주문 실패", order_result)
+                await asyncio.to_thread(
+                    self.slack_logger.send_log,
+                    level="ERROR",
+                    message="매도 주문 실패",
+                    context={
+                        "세션ID": session_id,
+                        "종목코드": ticker,
+                        "주문번호": order_result.get('output', {}).get('ODNO'),
+                        "메시지": order_result.get('msg1')
+                    }
+                )
+                return None
+
+            # 체결통보로 전량 체결을 기다리고(최대 SELL_WAIT), 확인되지 않으면 체결 조회
+            if await order_tracker.wait_for_fill_async(order_result.get('output', {}).get('ODNO'), quantity, SELL_WAIT):
+                unfilled_qty = 0
+            else:
+                unfilled_qty = await self._order_complete_check_async(order_result)
+            if unfilled_qty == 0:
+                self.logger.info("매도 주문 전체 체결 완료", {"세션ID": session_id, "ticker": ticker})
+                await asyncio.to_thread(self.delete_finished_session, session_id)
+                await asyncio.to_thread(
+                    self.slack_logger.send_log,
+                    level="INFO",
+                    message="매도 주문 전체 체결 및 세션 삭제",
+                    context={"세션ID": session_id, "종목코드": ticker}
+                )
+
+            ## 미체결 시 주문 수정
+            original_order_no = order_result.get('output', {}).get('ODNO')
+            try_count = 0
+            while unfilled_qty > 0:
+                new_price, _ = await self.async_kis_api.get_current_price(ticker, QUOTE_MAX_AGE_REVISE)
+                revised_price = new_price - (self._get_tick_size(new_price) * 2)  # 두 틱 아래로 설정
+                order_result = await self.async_kis_api.revise_order(original_order_no, unfilled_qty, revised_price)
+                unfilled_qty = await self._order_complete_check_async(order_result)
+                try_count += 1
+                if unfilled_qty > 0 and await order_tracker.wait_for_fill_async(
+                        order_result.get('output', {}).get('ODNO'), unfilled_qty, SELL_WAIT):
+                    unfilled_qty = 0
+                if try_count > 5:
+                    error_msg = f"미체결 매도 주문 반복 실패: {ticker}, {try_count}회 재시도"
+                    self.logger.error(error_msg, {"세션ID": session_id, "unfilled": unfilled_qty})
+                    raise Exception(error_msg)
+
+            # === 매도 완료 후 실제 잔고로 세션 동기화 ===
+            balance_result = await self.async_kis_api.balance_inquiry(BALANCE_MAX_AGE_SYNC)
+            if await asyncio.to_thread(self._sync_session_after_sell, session_id, ticker, balance_result):
+                return order_result
+            return None
+
+        except Exception as e:
+            self.logger.error(f"매도 주문 예외 발생: {e}", {
+                "세션ID": session_id,
+                "종목코드": ticker,
+                "가격": price
+            })
+            return None
+
+    async def _order_complete_check_async(self, order_result: Dict) -> int:
+        """order_complete_check의 비동기 버전"""
+        try:
+            order_num = order_result.get('output', {}).get('ODNO')
+            if not order_num:
+                return 0
+            conclusion_result = await self.async_kis_api.daily_order_execution_inquiry(order_num)
+            row = conclusion_result.get('output1', [{}])[0]
+            return int(row.get('ord_qty', 0)) - int(row.get('tot_ccld_qty', 0))
+        except Exception as e:
+            self.logger.error(f"주문 체결 확인 실패 - 주문번호:, {order_result.get('output', {}).get('ODNO')}, 에러:, {str(e)}")
+            return 0
+
     def delete_finished_session(self, session_id):        
         with DatabaseManager() as db:
             db.delete_session_one_row(session_id)
@@ -1379,7 +1560,7 @@ class TradingUpper():
         try:
             # KISWebSocket 인스턴스 재사용 (중복 연결 방지)
             if self.kis_websocket is None:
-                self.kis_websocket = KISWebSocket(self.sell_order)
+                self.kis_websocket = KISWebSocket(self.sell_order_async, self.async_kis_api)
             complete = await self.kis_websocket.real_time_monitoring(sessions_info)
             if complete:
                 print("모니터링이 정상적으로 종료되었습니다. 종목:", sessions_info)
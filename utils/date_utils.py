@@ -1,10 +1,30 @@
 """ 날짜 관련 유틸리티 모듈 """
 from datetime import timedelta, date, datetime
+from functools import lru_cache
+from typing import FrozenSet, Optional
 import holidayskr
 from datetime import timedelta, date as dt
 import xml.etree.ElementTree as ET
 from config.config import DATA_GO_KR_API_KEY
 
+# holidayskr에 포함되지 않는 임시 휴장일
+ADDITIONAL_MARKET_HOLIDAYS = {
+    dt(2025, 6, 3),     # 제21대 대통령 선거
+}
+
+
+@lru_cache(maxsize=None)
+def _market_holidays(year: int) -> FrozenSet[dt]:
+    """
+    해당 연도의 휴장일 (공휴일 + 연말 휴장일 + 임시 휴장일)
+
+    holidayskr 조회 결과를 연도별로 캐시하여 영업일 계산마다 다시 만들지 않습니다.
+    """
+    holidays = {holiday[0] for holiday in holidayskr.year_holidays(year)}
+    holidays.add(dt(year, 12, 31))  # 연말 휴장일
+    holidays.update(d for d in ADDITIONAL_MARKET_HOLIDAYS if d.year == year)
+    return frozenset(holidays)
+
 class DateUtils:
     """날짜 관련 유틸리티 기능을 제공하는 클래스입니다."""
 
@@ -50,9 +70,6 @@ class DateUtils:
         Returns:
             datetime: 계산된 이전 영업일
         """
-        # 공휴일 목록 가져오기
-        all_holidays = DateUtils.get_holidays()
-        
         # date가 datetime 객체인 경우 date 객체로 변환
         if hasattr(date, 'date'):
             current_date = date.date()
@@ -60,15 +77,15 @@ class DateUtils:
             current_date = date
 
         # 시작일이 영업일이 아닌 경우
-        if current_date.weekday() >= 5 or current_date in all_holidays:
+        if not DateUtils.is_business_day(current_date):
             # days_back이 1이면 가장 최근 영업일 반환
             if days_back == 1:
-                while current_date.weekday() >= 5 or current_date in all_holidays:
+                while not DateUtils.is_business_day(current_date):
                     current_date -= timedelta(days=1)
                 return current_date
             # days_back이 1보다 크면 최근 영업일을 찾고 그로부터 days_back-1만큼 더 이동
             else:
-                while current_date.weekday() >= 5 or current_date in all_holidays:
+                while not DateUtils.is_business_day(current_date):
                     current_date -= timedelta(days=1)
                 return DateUtils.get_previous_business_day(current_date, days_back - 1)
         
@@ -78,7 +95,7 @@ class DateUtils:
             current_date -= timedelta(days=1)
             
             # 영업일인 경우만 카운트
-            if current_date.weekday() < 5 and current_date not in all_holidays:
+            if DateUtils.is_business_day(current_date):
                 business_days_count += 1
                 
         return current_date
@@ -101,11 +118,8 @@ class DateUtils:
         else:
             check_date = date
             
-        # 한국의 공휴일 가져오기
-        all_holidays = DateUtils.get_holidays()
-        
-        # 주말이거나 공휴일이면 영업일이 아님 (False 반환)
-        if check_date.weekday() >= 5 or check_date in all_holidays:
+        # 주말이거나 해당 연도의 휴장일이면 영업일이 아님 (False 반환)
+        if check_date.weekday() >= 5 or check_date in _market_holidays(check_date.year):
             return False
             
         # 주말도 아니고 공휴일도 아니라면 영업일 (True 반환)
@@ -130,9 +144,6 @@ class DateUtils:
         else:
             target_date = date
         
-        # 한국의 공휴일 가져오기
-        all_holidays = DateUtils.get_holidays()
-        
         # 출발 날짜가 영업일이 아니면 가장 가까운 영업일로 설정
         if not DateUtils.is_business_day(target_date):
             # 출발 날짜가 영업일이 될 때까지 다음 날로 이동
@@ -152,41 +163,17 @@ class DateUtils:
         return target_date
 
     @staticmethod
-    def get_holidays():
+    def get_holidays(year: Optional[int] = None):
         """
         공휴일 받아오기 (holidayskr 패키지 활용)
+
+        Args:
+            year (int, optional): 조회 연도. 생략하면 올해와 작년 휴장일을 함께 반환합니다.
+
+        Returns:
+            frozenset: 휴장일 날짜 집합
         """
-        # holidayskr 패키지를 사용하여 한국 공휴일 가져오기
-        year = 2025
-        kr_holidays_dict = {}
-        
-        # holidayskr로 한국 공휴일 가져오기 (year_holidays 함수 사용)
-        holidays_list = holidayskr.year_holidays(year)
-        
-        # 날짜와 이름을 딕셔너리로 변환
-        for holiday in holidays_list:
-            date = holiday[0].strftime('%Y-%m-%d')
-            name = holiday[1]
-            kr_holidays_dict[date] = name
-        
-        # 추가 공휴일 수동으로 추가 (필요한 경우)
-        additional_holidays = [
-            dt(year, 6, 3),     # 기존에 추가했던 공휴일
-            dt(year, 12, 31),    # 휴장일
-            dt(year-1, 12, 31)    # 휴장일
-        ]
-        
-        # 날짜 문자열을 date 객체로 변환하여 set에 추가
-        holiday_dates_set = set()
-        for date_str in kr_holidays_dict.keys():
-            # 'YYYY-MM-DD' 형식을 year, month, day로 변환
-            y, m, d = map(int, date_str.split('-'))
-            holiday_dates_set.add(dt(y, m, d))
-        
-        # 추가 공휴일과 합치기
-        all_holidays = holiday_dates_set.union(additional_holidays)
-        
-        # 디버깅을 위해 공휴일 목록 출력
-        # print(f"2025년 공휴일 목록: {sorted([h.strftime('%Y-%m-%d') for h in all_holidays])}")
-        
-        return all_holidays
+        if year is not None:
+            return _market_holidays(year)
+        this_year = dt.today().year
+        return _market_holidays(this_year) | _market_holidays(this_year - 1)
@@ -0,0 +1,102 @@
+"""
+JSON 인코딩/디코딩 코덱
+
+KIS REST 응답 디코딩, 주문 본문 직렬화, 웹소켓 제어 메시지처럼 자주 호출되는 경로에서 사용합니다.
+(구조화 로그는 기존 로그 형식(ASCII 이스케이프, 기본 구분자)을 유지하기 위해 표준 json 모듈을 그대로 사용합니다.)
+- orjson이 설치되어 있으면 사용하고, 없으면 표준 json 모듈로 대체합니다. (JSON_CODEC 환경변수로 강제 가능)
+- 두 코덱 모두 공백 없는 구분자와 UTF-8 그대로(비ASCII 이스케이프 없음) 출력하므로 결과 문자열이 같습니다.
+- 디코딩 실패는 두 코덱 모두 json.JSONDecodeError(의 하위 클래스)로 발생합니다.
+"""
+import json
+from typing import Any, Union
+
+from config.config import JSON_CODEC
+
+JSONDecodeError = json.JSONDecodeError
+
+
+class StdlibCodec:
+    """표준 json 모듈 코덱"""
+
+    name = "json"
+
+    @staticmethod
+    def loads(data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj: Any, sort_keys: bool = False) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys)
+
+    @classmethod
+    def dumps_bytes(cls, obj: Any, sort_keys: bool = False) -> bytes:
+        return cls.dumps(obj, sort_keys).encode("utf-8")
+
+
+class OrjsonCodec:
+    """orjson 코덱 (문자열이 아닌 딕셔너리 키도 표준 모듈처럼 문자열로 변환)"""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+        self._sorted_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps_bytes(self, obj: Any, sort_keys: bool = False) -> bytes:
+        return self._orjson.dumps(obj, option=self._sorted_options if sort_keys else self._options)
+
+    def dumps(self, obj: Any, sort_keys: bool = False) -> str:
+        return self.dumps_bytes(obj, sort_keys).decode("utf-8")
+
+
+def get_codec(name: str = "auto"):
+    """
+    이름에 해당하는 코덱을 반환합니다.
+
+    Args:
+        name: "auto"(orjson이 있으면 orjson, 없으면 표준 모듈), "orjson", "json"
+
+    Raises:
+        ImportError: "orjson"을 지정했는데 설치되어 있지 않은 경우
+        ValueError: 알 수 없는 코덱 이름
+    """
+    if name == "json":
+        return StdlibCodec()
+    if name == "orjson":
+        try:
+            return OrjsonCodec()
+        except ImportError as e:
+            raise ImportError("JSON_CODEC=orjson을 사용하려면 orjson을 설치하세요. (pip install orjson)") from e
+    if name == "auto":
+        try:
+            return OrjsonCodec()
+        except ImportError:
+            return StdlibCodec()
+    raise ValueError(f"알 수 없는 JSON 코덱: {name}")
+
+
+codec = get_codec(JSON_CODEC)
+
+
+def set_codec(name: str):
+    """프로세스 전역 코덱을 바꿉니다. (측정/테스트용)"""
+    global codec
+    codec = get_codec(name)
+    return codec
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    return codec.loads(data)
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> str:
+    return codec.dumps(obj, sort_keys)
+
+
+def dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    return codec.dumps_bytes(obj, sort_keys)